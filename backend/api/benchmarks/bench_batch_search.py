@@ -0,0 +1,113 @@
+"""
+질문별 검색과 배치 검색 비교
+
+합성 컬렉션(L2 인덱스 + metadata.json)을 만들고 같은 질문 N개를
+1) 질문마다 rag.search (임베딩 요청 1회 + 컬렉션마다 1행 index.search)
+2) rag.search_batch (embedding_batch_size개씩 묶은 임베딩 요청 + 컬렉션마다 행렬 index.search 1회)
+로 처리해 걸린 시간과 임베딩 API 요청 수를 비교한다.
+임베딩 API는 요청마다 --latency초 지연 후 무작위 벡터를 돌려주는 가짜 클라이언트로 대체한다.
+--latency 0이면 임베딩을 미리 캐시에 넣고 FAISS 검색만 비교한다.
+
+실행: backend 디렉토리에서 python -m api.benchmarks.bench_batch_search --queries 500 --latency 0.05
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+import openai
+
+from api.main import RAGService
+from api.benchmarks.stress_collections import build_synthetic_collections
+
+
+class FakeEmbeddingClient:
+    """OpenAI 호환 임베딩 클라이언트 대체 (요청 수 기록)"""
+
+    calls = 0
+    latency = 0.0
+    dim = 1024
+
+    def __init__(self, *args, **kwargs):
+        self.embeddings = self
+
+    def create(self, input, model):
+        FakeEmbeddingClient.calls += 1
+        time.sleep(self.latency)
+        texts = [input] if isinstance(input, str) else list(input)
+        rng = np.random.default_rng(abs(hash(tuple(texts))) % (2 ** 32))
+        vectors = rng.standard_normal((len(texts), self.dim)).astype(np.float32)
+        return SimpleNamespace(
+            data=[SimpleNamespace(index=i, embedding=vector.tolist()) for i, vector in enumerate(vectors)]
+        )
+
+
+def make_rag(base_path: str) -> RAGService:
+    rag = RAGService()
+    rag.base_path = base_path
+    rag.api_key = "bench-api-key"
+    return rag
+
+
+def run(mode: str, base_path: str, names: list, queries: list, args) -> dict:
+    rag = make_rag(base_path)
+    for name in names:
+        assert rag.load_collection(name)
+    if not args.latency:
+        rng = np.random.default_rng(1)
+        for query in queries:
+            rag.embedding_cache.put(query, rng.standard_normal((1, args.dim)).astype(np.float32))
+
+    FakeEmbeddingClient.calls = 0
+    started_at = time.perf_counter()
+    if mode == "per_query":
+        results = [rag.search(query, names, top_k=args.top_k) for query in queries]
+    else:
+        results = [item["results"] for item in rag.search_batch(queries, names, top_k=args.top_k)]
+    elapsed = time.perf_counter() - started_at
+    return {
+        "mode": mode,
+        "seconds": round(elapsed, 3),
+        "ms_per_query": round(elapsed / len(queries) * 1000, 3),
+        "embedding_requests": FakeEmbeddingClient.calls,
+        "chunks_per_query": round(sum(len(r) for r in results) / len(queries), 2),
+    }
+
+
+def main(args) -> dict:
+    FakeEmbeddingClient.latency = args.latency
+    FakeEmbeddingClient.dim = args.dim
+    openai.OpenAI = FakeEmbeddingClient
+
+    queries = [f"합성 약관 질문 {i}" for i in range(args.queries)]
+    with tempfile.TemporaryDirectory() as base_path:
+        names = build_synthetic_collections(base_path, args.collections, args.vectors, args.dim)
+        results = [run(mode, base_path, names, queries, args) for mode in ("per_query", "batch")]
+
+    per_query, batch = results
+    return {
+        "queries": args.queries,
+        "collections": args.collections,
+        "vectors": args.vectors,
+        "latency": args.latency,
+        "results": results,
+        "speedup": round(per_query["seconds"] / batch["seconds"], 2) if batch["seconds"] else None,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="질문별 검색과 배치 검색 비교")
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--collections", type=int, default=3)
+    parser.add_argument("--vectors", type=int, default=5000)
+    parser.add_argument("--dim", type=int, default=1024)
+    parser.add_argument("--top-k", type=int, default=2)
+    parser.add_argument("--latency", type=float, default=0.05, help="임베딩 요청당 지연(초), 0이면 캐시 사용")
+    args = parser.parse_args()
+    print(json.dumps(main(args), ensure_ascii=False, indent=2))
@@ -0,0 +1,63 @@
+"""
+MySQL 커넥션 풀 부하 테스트
+
+여러 스레드가 동시에 비교설계 쿼리를 실행하는 동안 서버의 Threads_connected를
+주기적으로 기록한다. 풀을 사용하면 연결 수가 pool_size 이하에서 평탄하게 유지되어야 한다.
+
+실행: backend 디렉토리에서 python -m api.benchmarks.bench_db_pool --threads 32 --queries 200
+(로컬 MySQL과 DB_CONFIG 설정이 필요)
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from api.rag.src.config import DEFAULT_CONFIG, DB_POOL_CONFIG
+from api.rag.src.db import db, mysql_threads_connected
+from api.rag.src.sql_builder import build_compare_query, render_sql
+
+
+def sample_connections(samples: list, stop: threading.Event, interval: float) -> None:
+    while not stop.is_set():
+        samples.append(mysql_threads_connected())
+        stop.wait(interval)
+
+
+def run(threads: int, queries: int, interval: float = 0.2) -> dict:
+    compare_query = build_compare_query("40세 남자 무해지 보험료", DEFAULT_CONFIG)
+    sql, params = render_sql(compare_query)
+
+    baseline = mysql_threads_connected()
+    samples = []
+    stop = threading.Event()
+    sampler = threading.Thread(target=sample_connections, args=(samples, stop, interval))
+    sampler.start()
+
+    started_at = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(lambda _: db.execute(sql, params), range(queries)))
+    elapsed = time.perf_counter() - started_at
+
+    stop.set()
+    sampler.join()
+    return {
+        "threads": threads,
+        "queries": queries,
+        "pool_size": DB_POOL_CONFIG["pool_size"],
+        "queries_per_second": queries / elapsed,
+        "threads_connected_before": baseline,
+        "threads_connected_max": max(samples) if samples else baseline,
+        "threads_connected_after": mysql_threads_connected(),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="MySQL 커넥션 풀 부하 테스트")
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+    for name, value in run(args.threads, args.queries).items():
+        print(f"{name}: {value}")
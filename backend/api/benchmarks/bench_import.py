@@ -0,0 +1,94 @@
+"""
+import 시간 프로파일
+
+새 파이썬 프로세스에서 모듈을 import 하는 데 걸리는 시간을 반복 측정하고(python -X importtime),
+누적 시간이 큰 모듈과 import 후 로드된 무거운 외부 모듈(openai, langchain 등)을 출력한다.
+워커 재시작/오토스케일링 콜드 스타트에서 요청을 받기 전까지의 비용에 해당한다.
+
+- api.main: 서버 앱 (클라이언트 생성은 lifespan에서 하므로 포함되지 않음)
+- api.rag.src.storage, api.rag.src.intent: CLI(SQLite 내보내기, 의도 분류 모델 학습)가 쓰는 모듈
+
+실행: backend 디렉토리에서 python -m api.benchmarks.bench_import --runs 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+HEAVY_MODULES = (
+    "openai", "langchain_openai", "langchain_core", "langsmith", "mysql.connector", "faiss", "numpy",
+)
+
+PROBE = """
+import sys, time
+started_at = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started_at
+print("RESULT", elapsed, ",".join(m for m in {heavy!r} if m in sys.modules))
+"""
+
+
+def run_once(module: str, importtime: bool = False) -> tuple:
+    command = [sys.executable]
+    if importtime:
+        command += ["-X", "importtime"]
+    command += ["-c", PROBE.format(module=module, heavy=HEAVY_MODULES)]
+    completed = subprocess.run(command, cwd=BACKEND_DIR, capture_output=True, text=True, check=True)
+    line = next(line for line in completed.stdout.splitlines() if line.startswith("RESULT"))
+    _, elapsed, loaded = line.split(" ", 2)
+    return float(elapsed), [name for name in loaded.split(",") if name], completed.stderr
+
+
+def top_modules(stderr: str, limit: int) -> list:
+    """-X importtime 출력에서 누적 시간이 큰 모듈 (import 깊이 2까지)"""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, raw_name = line[len("import time:"):].split("|")
+        name = raw_name.strip()
+        depth = (len(raw_name) - len(raw_name.lstrip()) - 1) // 2
+        if depth <= 2:
+            entries.append({
+                "module": name,
+                "depth": depth,
+                "cumulative_ms": round(int(cumulative_us) / 1000, 1),
+            })
+    return sorted(entries, key=lambda entry: entry["cumulative_ms"], reverse=True)[:limit]
+
+
+def profile(module: str, runs: int, limit: int) -> dict:
+    # 첫 실행은 .pyc 생성/디스크 캐시 비용이 섞이므로 버림
+    run_once(module)
+    timings = []
+    loaded = []
+    for _ in range(runs):
+        elapsed, loaded, _ = run_once(module)
+        timings.append(elapsed)
+    _, _, stderr = run_once(module, importtime=True)
+    return {
+        "module": module,
+        "median_ms": round(statistics.median(timings) * 1000, 1),
+        "min_ms": round(min(timings) * 1000, 1),
+        "heavy_modules_loaded": loaded,
+        "top_imports": top_modules(stderr, limit),
+    }
+
+
+def main(args) -> list:
+    return [profile(module, args.runs, args.top) for module in args.modules]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="import 시간 프로파일")
+    parser.add_argument(
+        "--modules", nargs="+", default=["api.main", "api.rag.src.storage", "api.rag.src.intent"]
+    )
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="출력할 누적 시간 상위 모듈 수")
+    args = parser.parse_args()
+    print(json.dumps(main(args), ensure_ascii=False, indent=2))
@@ -0,0 +1,94 @@
+"""
+로그 레벨별 요청당 CPU 사용량 비교
+
+합성 컬렉션(L2 인덱스 + metadata.json)을 만들고 같은 작업(컬렉션 로드, 벡터 검색)을
+DEBUG(기존 print 진단과 같은 양의 출력)와 INFO(기본값) 레벨에서 각각 실행해
+프로세스 CPU 시간(리스너 스레드의 직렬화/쓰기 포함)을 비교한다.
+로그는 /dev/null로 보내므로 터미널 출력 비용은 포함하지 않는다.
+임베딩은 미리 캐시에 넣어 외부 API 호출 없이 측정한다.
+
+실행: backend 디렉토리에서 python -m api.benchmarks.bench_logging --collections 11 --requests 500
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from api.main import RAGService
+from api.rag.src import log
+from api.benchmarks.stress_collections import build_synthetic_collections
+
+
+def measure(level: str, names: list, base_path: str, queries: list, vectors: np.ndarray) -> dict:
+    log.configure(level=level)
+    rag = RAGService()
+    rag.base_path = base_path
+
+    started_at = time.process_time()
+    for name in names:
+        assert rag.load_collection(name)
+    log.flush()
+    load_cpu = time.process_time() - started_at
+
+    for query, vector in zip(queries, vectors):
+        rag.embedding_cache.put(query, vector.reshape(1, -1))
+
+    started_at = time.process_time()
+    for query in queries:
+        # 요청마다 보험사 2곳을 비교하는 검색
+        rag.search(query, names[:2], top_k=2)
+    log.flush()
+    search_cpu = time.process_time() - started_at
+
+    return {
+        "level": level,
+        "load_cpu_ms_per_collection": round(load_cpu / len(names) * 1000, 3),
+        "search_cpu_ms_per_request": round(search_cpu / len(queries) * 1000, 3),
+        "dropped_records": log.stats()["dropped"],
+    }
+
+
+def main(args) -> dict:
+    rng = np.random.default_rng(1)
+    queries = [f"합성 질문 {i}" for i in range(args.requests)]
+    vectors = rng.standard_normal((args.requests, args.dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    with tempfile.TemporaryDirectory() as base_path, open(os.devnull, "w") as devnull:
+        names = build_synthetic_collections(base_path, args.collections, args.vectors, args.dim)
+        log.configure(stream=devnull)
+        # 첫 실행의 초기화 비용(FAISS, 페이지 캐시)이 한쪽에만 들어가지 않도록 한 번 버림
+        measure("INFO", names, base_path, queries[:20], vectors[:20])
+        results = [
+            measure(level, names, base_path, queries, vectors) for level in ("DEBUG", "INFO")
+        ]
+
+    debug, info = results
+    return {
+        "collections": args.collections,
+        "vectors": args.vectors,
+        "dim": args.dim,
+        "requests": args.requests,
+        "results": results,
+        "search_cpu_saved_ms_per_request": round(
+            debug["search_cpu_ms_per_request"] - info["search_cpu_ms_per_request"], 3
+        ),
+        "load_cpu_saved_ms_per_collection": round(
+            debug["load_cpu_ms_per_collection"] - info["load_cpu_ms_per_collection"], 3
+        ),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="로그 레벨별 요청당 CPU 사용량 비교")
+    parser.add_argument("--collections", type=int, default=11)
+    parser.add_argument("--vectors", type=int, default=5000)
+    parser.add_argument("--dim", type=int, default=1024)
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args()
+    print(json.dumps(main(args), ensure_ascii=False, indent=2))
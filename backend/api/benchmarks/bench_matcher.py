@@ -0,0 +1,62 @@
+"""
+컬렉션/키워드 매칭 마이크로벤치마크
+
+실제 질문 코퍼스(questions.txt)에 대해 기존 방식(키워드마다 부분 문자열 검사)과
+Aho-Corasick 오토마톤 한 번 스캔을 비교한다.
+
+실행: backend 디렉토리에서 python -m api.benchmarks.bench_matcher
+"""
+import os
+import sys
+import timeit
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from api.rag.src.config import COMPANY_REGISTRY, INSURANCE_TYPE_KEYWORDS, COMPARISON_KEYWORDS
+from api.rag.src.matcher import match_question, select_collections
+
+CORPUS_PATH = os.path.join(os.path.dirname(__file__), "questions.txt")
+COLLECTIONS = [entry["collection"] for entry in COMPANY_REGISTRY.values()]
+
+
+def load_corpus(path: str = CORPUS_PATH) -> list:
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def naive_match(question: str):
+    """기존 방식: 키워드 목록마다 정규화된 질문을 다시 훑음"""
+    normalized = question.lower().replace(" ", "")
+    companies = [
+        company
+        for company, entry in COMPANY_REGISTRY.items()
+        if any(alias in normalized for alias in entry["aliases"])
+    ]
+    types = [keyword for keyword in INSURANCE_TYPE_KEYWORDS if keyword in normalized]
+    comparisons = [keyword for keyword in COMPARISON_KEYWORDS if keyword in normalized]
+    return companies, types, comparisons
+
+
+def run(repeat: int = 5, number: int = 200) -> dict:
+    corpus = load_corpus()
+
+    def bench(fn):
+        best = min(timeit.repeat(fn, repeat=repeat, number=number))
+        return best / (number * len(corpus)) * 1e6  # 질문당 마이크로초
+
+    results = {
+        "questions": len(corpus),
+        "naive_scan_us": bench(lambda: [naive_match(q) for q in corpus]),
+        "automaton_scan_us": bench(lambda: [match_question(q) for q in corpus]),
+        "select_collections_us": bench(
+            lambda: [select_collections(match_question(q), COLLECTIONS) for q in corpus]
+        ),
+    }
+    return results
+
+
+if __name__ == "__main__":
+    for name, value in run().items():
+        if isinstance(value, float):
+            print(f"{name}: {value:.2f}")
+        else:
+            print(f"{name}: {value}")
@@ -0,0 +1,72 @@
+"""
+요청 프로파일러 오버헤드 측정
+
+HTTP 서버 없이 ASGI 앱을 직접 호출해 요청 하나당 처리 시간을 비교한다.
+- none: ProfilingMiddleware 없음 (ADMIN_TOKEN 미설정 서버)
+- unarmed: 미들웨어는 있지만 예약/프로파일 헤더 없음
+- armed: 모든 요청을 프로파일 (샘플링 스레드 + speedscope/folded 파일 저장 포함)
+
+실행: backend 디렉토리에서 python -m api.benchmarks.bench_profiler --requests 3000
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from fastapi import FastAPI
+
+from api.benchmarks.bench_responses import drive, terms_payload
+from api.middleware import ProfilingMiddleware
+from api.rag.src.config import PROFILING_CONFIG
+from api.rag.src.profiler import SamplingProfiler
+
+
+def make_app(payload: dict, profiler=None):
+    app = FastAPI()
+
+    @app.get("/payload")
+    async def endpoint():
+        return payload
+
+    if profiler is not None:
+        app.add_middleware(ProfilingMiddleware, profiler=profiler)
+    return app
+
+
+def main(args) -> dict:
+    payload = terms_payload()
+    results = {}
+    with tempfile.TemporaryDirectory() as output_dir:
+        config = dict(
+            PROFILING_CONFIG, admin_token="bench-token", output_dir=output_dir,
+            max_requests=args.requests * 2, max_profiles=args.requests * 2,
+        )
+        results["none"] = asyncio.run(drive(make_app(payload), args.requests))
+
+        profiler = SamplingProfiler(config)
+        results["unarmed"] = asyncio.run(drive(make_app(payload, profiler), args.requests))
+
+        profiler = SamplingProfiler(config)
+        armed_requests = min(args.requests, args.armed_requests)
+        # drive()는 측정 전에 최대 200개를 먼저 보냄
+        profiler.arm(armed_requests + min(armed_requests, 200))
+        results["armed"] = asyncio.run(drive(make_app(payload, profiler), armed_requests))
+        results["armed"]["profiles_saved"] = profiler.profiled
+
+    baseline = results["none"]["us_per_request"]
+    for result in results.values():
+        result.pop("content_type", None)
+        result.pop("content_encoding", None)
+        result["overhead_us"] = round(result["us_per_request"] - baseline, 2)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="요청 프로파일러 오버헤드 측정")
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--armed-requests", type=int, default=300, help="armed 측정 요청 수 (요청마다 파일 저장)")
+    args = parser.parse_args()
+    print(json.dumps(main(args), ensure_ascii=False, indent=2))
@@ -0,0 +1,154 @@
+"""
+응답 직렬화와 미들웨어 오버헤드 측정
+
+1) 직렬화: 표준 JSONResponse(json.dumps) 대비 UTF8JSONResponse(orjson)의 render 시간
+   - 약관 답변 응답 (긴 한글 문자열 + 대화 이력)
+   - 비교설계 표 응답 (보험사/상품/보장항목별 보험료 행 목록)
+2) 미들웨어: HTTP 서버 없이 ASGI 앱을 직접 호출해 요청 하나당 처리 시간 비교
+   - 미들웨어 없음 / @app.middleware("http") 함수 미들웨어(기존 charset 헤더 추가) /
+     UTF8CharsetMiddleware / CompressionMiddleware(gzip, 작은 응답과 큰 응답)
+   압축 결과 크기도 함께 출력한다.
+
+실행: backend 디렉토리에서 python -m api.benchmarks.bench_responses --requests 3000
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from api.encoders import UTF8JSONResponse
+from api.middleware import CompressionMiddleware, UTF8CharsetMiddleware
+from api.rag.src.config import COMPRESSION_CONFIG
+
+COMPANIES = ["삼성화재", "현대해상", "DB손해보험", "KB손해보험", "메리츠화재"]
+
+
+def terms_payload() -> dict:
+    answer = "삼성화재 암보험의 일반암 진단비는 가입금액의 100%를 지급하며 면책기간은 90일입니다. " * 40
+    return {
+        "answer": answer,
+        "intent": "그 외의 질문",
+        "session_id": "bench",
+        "chat_history": [
+            {"role": "user", "content": "삼성화재 암보험 진단비 알려줘", "timestamp": "2026-01-01T00:00:00"},
+            {"role": "assistant", "content": answer, "timestamp": "2026-01-01T00:00:01"},
+        ],
+    }
+
+
+def compare_payload(rows_per_company: int = 60) -> dict:
+    rows = []
+    for company in COMPANIES:
+        for number in range(rows_per_company):
+            rows.append({
+                "구분": "상세",
+                "보험사명": company,
+                "상품명": f"{company} 무배당 건강보험 {number % 3}종",
+                "보장항목명": f"암진단비(유사암제외) {number}",
+                "보험료": 1000 + number * 37,
+                "sort_id": str(number),
+            })
+    return {"answer": {"table": rows, "config": {"insu_age": 40, "sex": 1}}, "intent": "비교설계 질문"}
+
+
+def measure_render(payload: dict, requests: int) -> dict:
+    results = {}
+    for name, response_class in (("json", JSONResponse), ("orjson", UTF8JSONResponse)):
+        response = response_class(content=None)
+        started_at = time.perf_counter()
+        for _ in range(requests):
+            body = response.render(payload)
+        results[name] = {
+            "us_per_render": round((time.perf_counter() - started_at) / requests * 1e6, 2),
+            "bytes": len(body),
+        }
+    return results
+
+
+def make_app(payload: dict, middleware: str):
+    app = FastAPI()
+
+    @app.get("/payload")
+    async def endpoint():
+        # 기존 방식처럼 charset 없는 JSONResponse를 반환해 charset 미들웨어가 헤더를 바꾸게 함
+        return JSONResponse(payload)
+
+    if middleware == "function":
+        @app.middleware("http")
+        async def add_utf8_charset_header(request: Request, call_next):
+            response = await call_next(request)
+            content_type = response.headers.get("content-type", "")
+            if "application/json" in content_type and "charset" not in content_type:
+                response.headers["content-type"] = "application/json; charset=utf-8"
+            return response
+    elif middleware == "asgi":
+        app.add_middleware(UTF8CharsetMiddleware)
+    elif middleware == "compress":
+        app.add_middleware(CompressionMiddleware, config=dict(COMPRESSION_CONFIG, enabled=True))
+    return app
+
+
+async def drive(app, requests: int) -> dict:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": "/payload", "raw_path": b"/payload", "query_string": b"",
+        "root_path": "", "headers": [(b"host", b"bench"), (b"accept-encoding", b"gzip, br")],
+        "client": ("127.0.0.1", 1), "server": ("bench", 80),
+    }
+    sent = {}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            sent["headers"] = dict(message["headers"])
+            sent["size"] = 0
+        elif message["type"] == "http.response.body":
+            sent["size"] += len(message.get("body", b""))
+
+    for _ in range(min(requests, 200)):
+        await app(dict(scope), receive, send)
+    started_at = time.perf_counter()
+    for _ in range(requests):
+        await app(dict(scope), receive, send)
+    elapsed = time.perf_counter() - started_at
+    return {
+        "us_per_request": round(elapsed / requests * 1e6, 2),
+        "body_bytes": sent["size"],
+        "content_type": sent["headers"].get(b"content-type", b"").decode(),
+        "content_encoding": sent["headers"].get(b"content-encoding", b"").decode(),
+    }
+
+
+def main(args) -> dict:
+    terms = terms_payload()
+    compare = compare_payload()
+    small = {"status": "ok", "message": "한글 인코딩 테스트: 정상 작동 중"}
+
+    middleware = {}
+    for label, payload in (("small", small), ("terms", terms), ("compare", compare)):
+        for kind in ("none", "function", "asgi", "compress"):
+            result = asyncio.run(drive(make_app(payload, kind), args.requests))
+            middleware[f"{label}/{kind}"] = result
+
+    return {
+        "render": {
+            "terms": measure_render(terms, args.requests),
+            "compare": measure_render(compare, args.requests),
+        },
+        "middleware": middleware,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="응답 직렬화와 미들웨어 오버헤드 측정")
+    parser.add_argument("--requests", type=int, default=3000)
+    args = parser.parse_args()
+    print(json.dumps(main(args), ensure_ascii=False, indent=2))
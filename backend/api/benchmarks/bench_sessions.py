@@ -0,0 +1,88 @@
+"""
+대화 길이별 /chat 요청 크기와 파싱 시간, 세션 저장소 처리 시간
+
+- 이전 방식: 클라이언트가 매 요청마다 전체 대화 이력(chat_history)을 보냄
+- 세션 저장소: 새 메시지만 보내고 서버가 최근 MAX_HISTORY_LENGTH개를 보관
+대화 턴 수별로 요청 본문 크기와 ChatSession 파싱(JSON + 검증) 시간, 그리고 저장소별
+append(이번 대화 추가 + 이력 반환) 시간을 비교한다.
+
+실행: backend 디렉토리에서 python -m api.benchmarks.bench_sessions --turns 10 50 200
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from api.main import ChatSession
+from api.rag.src.config import SESSION_CONFIG
+from api.rag.src.session_store import MemorySessionStore, SQLiteSessionStore
+
+QUESTION = "삼성화재 암보험 진단비 보장 범위를 현대해상과 비교해줘"
+ANSWER = "삼성화재 암보험의 일반암 진단비는 최대 5천만원이며 ... " * 10
+
+
+def history(turns: int) -> list:
+    messages = []
+    for turn in range(turns):
+        messages.append({"role": "user", "content": f"{QUESTION} ({turn})"})
+        messages.append({"role": "assistant", "content": ANSWER})
+    return messages
+
+
+def parse_time_us(body: bytes, repeat: int) -> float:
+    started_at = time.perf_counter()
+    for _ in range(repeat):
+        ChatSession.model_validate_json(body)
+    return round((time.perf_counter() - started_at) / repeat * 1e6, 2)
+
+
+def append_time_us(store, repeat: int) -> float:
+    messages = [{"role": "user", "content": QUESTION}, {"role": "assistant", "content": ANSWER}]
+    started_at = time.perf_counter()
+    for number in range(repeat):
+        store.append(f"session-{number % 100}", messages)
+    return round((time.perf_counter() - started_at) / repeat * 1e6, 2)
+
+
+def main(args) -> dict:
+    payloads = []
+    for turns in args.turns:
+        full = json.dumps(
+            {"session_id": "bench", "message": QUESTION, "chat_history": history(turns)},
+            ensure_ascii=False,
+        ).encode("utf-8")
+        payloads.append({
+            "turns": turns,
+            "full_history_bytes": len(full),
+            "full_history_parse_us": parse_time_us(full, args.repeat),
+        })
+    message_only = json.dumps({"session_id": "bench", "message": QUESTION}, ensure_ascii=False).encode()
+
+    config = dict(SESSION_CONFIG, cleanup_interval=0)
+    with tempfile.TemporaryDirectory() as directory:
+        stores = [
+            MemorySessionStore(config),
+            SQLiteSessionStore(config, path=os.path.join(directory, "sessions.sqlite3")),
+        ]
+        append = {store.name: append_time_us(store, args.repeat) for store in stores}
+        for store in stores:
+            store.close()
+
+    return {
+        "max_history": SESSION_CONFIG["max_history"],
+        "full_history": payloads,
+        "message_only_bytes": len(message_only),
+        "message_only_parse_us": parse_time_us(message_only, args.repeat),
+        "store_append_us": append,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="대화 길이별 요청 크기/파싱 시간과 세션 저장소 처리 시간")
+    parser.add_argument("--turns", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+    print(json.dumps(main(args), ensure_ascii=False, indent=2))
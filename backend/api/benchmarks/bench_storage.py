@@ -0,0 +1,147 @@
+"""
+비교설계 저장소 벤치마크 (MySQL vs 내장 SQLite)
+
+sql_builder 템플릿 두 형태(보험료 합계, 보장항목별 상세)를 보험사 필터/기본플랜 조합과
+여러 프로필로 섞은 쿼리 묶음을 각 저장소에서 실행해 지연시간(p50/p95/p99), 처리량, 결과 행 수를 비교한다.
+
+실행: backend 디렉토리에서
+    python -m api.benchmarks.bench_storage                      # MySQL + SQLite 파일(STORAGE_CONFIG)
+    python -m api.benchmarks.bench_storage --synthetic /tmp/premiums.sqlite3   # 합성 데이터, MySQL 없이
+"""
+import argparse
+import json
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from api.rag.src.config import COMPANY_REGISTRY
+from api.rag.src.schema import SQLITE_SCHEMA, SQLITE_PREMIUM_TOTALS_REBUILD
+from api.rag.src.sql_builder import CompareQuery, TOTALS_SHAPE, DETAILED_SHAPE, render_sql
+from api.rag.src.storage import MySQLBackend, SQLiteBackend
+
+EXPIRY_YEARS = ["10y_100", "20y_100", "30y_100"]
+
+
+def build_synthetic_sqlite(
+    path: str, products_per_company: int = 2, coverages: int = 60, ages=range(20, 66)
+) -> str:
+    """COMPANY_REGISTRY 보험사로 합성 요금표 SQLite 파일 생성"""
+    if os.path.exists(path):
+        os.remove(path)
+    rng = random.Random(0)
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.executescript(SQLITE_SCHEMA)
+
+    companies = [(f"C{index:02d}", name) for index, name in enumerate(COMPANY_REGISTRY)]
+    conn.executemany(
+        "INSERT INTO insu_company VALUES (?, ?, 1)", [(cid, name) for cid, name in companies]
+    )
+    products = [
+        (cid, f"P{number}", f"{name} 상품{number}")
+        for cid, name in companies
+        for number in range(products_per_company)
+    ]
+    conn.executemany("INSERT INTO insu_product VALUES (?, ?, ?, 1)", products)
+    conn.executemany(
+        "INSERT INTO coverage VALUES (?, ?, 10000000, ?)",
+        [(f"V{index:03d}", f"보장항목{index}", int(index % 3 == 0)) for index in range(coverages)],
+    )
+
+    def rows():
+        for age in ages:
+            for sex in (0, 1):
+                for product_type in ("nr", "r"):
+                    for number, (cid, pid, _) in enumerate(products):
+                        expiry = EXPIRY_YEARS[number % len(EXPIRY_YEARS)]
+                        for index in range(coverages):
+                            yield (
+                                "홍길동", age, sex, product_type, expiry, cid, pid,
+                                f"V{index:03d}", rng.randint(100, 20000),
+                            )
+
+    conn.executemany("INSERT INTO comparison VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows())
+    conn.execute(SQLITE_PREMIUM_TOTALS_REBUILD)
+    conn.execute("INSERT INTO data_version VALUES ('comparison', 'synthetic')")
+    conn.commit()
+    conn.execute("ANALYZE")
+    conn.close()
+    return path
+
+
+def query_mix(count: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    company_names = list(COMPANY_REGISTRY)
+    queries = []
+    for _ in range(count):
+        queries.append(
+            CompareQuery(
+                shape=rng.choice([TOTALS_SHAPE, TOTALS_SHAPE, DETAILED_SHAPE]),
+                insu_age=rng.randint(20, 65),
+                sex=rng.randint(0, 1),
+                product_type=rng.choice(["nr", "r"]),
+                expiry_year=rng.choice(EXPIRY_YEARS),
+                companies=tuple(rng.sample(company_names, rng.choice([0, 0, 1, 2]))),
+                default_only=rng.random() < 0.2,
+            )
+        )
+    return queries
+
+
+def percentile(values: list, ratio: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * ratio))]
+
+
+def run(backend, queries: list, use_aggregates: bool = False) -> dict:
+    latencies = []
+    row_counts = []
+    started_at = time.perf_counter()
+    for query in queries:
+        sql, params = render_sql(query, placeholder=backend.placeholder, use_aggregates=use_aggregates)
+        query_started_at = time.perf_counter()
+        rows = backend.execute(sql, params)
+        latencies.append((time.perf_counter() - query_started_at) * 1000)
+        row_counts.append(len(rows))
+    elapsed = time.perf_counter() - started_at
+    return {
+        "backend": backend.name,
+        "use_aggregates": use_aggregates,
+        "queries": len(queries),
+        "queries_per_second": round(len(queries) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies), 3),
+        "p95_ms": round(percentile(latencies, 0.95), 3),
+        "p99_ms": round(percentile(latencies, 0.99), 3),
+        "rows": sum(row_counts),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="비교설계 저장소 벤치마크")
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--sqlite-path", default=None)
+    parser.add_argument("--synthetic", default=None, help="합성 데이터 SQLite 파일을 만들어 사용 (MySQL 생략)")
+    parser.add_argument("--aggregates", action="store_true", help="premium_totals 집계 테이블 사용")
+    args = parser.parse_args()
+
+    queries = query_mix(args.queries)
+    results = []
+    if args.synthetic:
+        build_synthetic_sqlite(args.synthetic)
+        sqlite_path = args.synthetic
+    else:
+        sqlite_path = args.sqlite_path
+        results.append(run(MySQLBackend(), queries, args.aggregates))
+
+    for mmap_size in (0, 256 * 1024 * 1024):
+        backend = SQLiteBackend(sqlite_path, read_only=True, mmap_size=mmap_size)
+        result = run(backend, queries, args.aggregates)
+        result["mmap_size"] = mmap_size
+        results.append(result)
+        backend.close()
+
+    print(json.dumps(results, ensure_ascii=False, indent=2))
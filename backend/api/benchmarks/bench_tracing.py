@@ -0,0 +1,117 @@
+"""
+트레이싱 오버헤드 측정
+
+요청 하나를 루트 span + 하위 span 3개(임베딩, 벡터 검색, 답변 생성 모양, 메타데이터 포함)로 보고
+요청 스레드에서 걸리는 시간을 비교한다.
+- langsmith.trace (기존 방식, API 키 없음)
+- tracer 꺼짐 (API 키 없음: no-op)
+- tracer 켜짐, 샘플링 비율 0.1 / 1.0 (전송은 버리는 sender로 대체)
+- tracer 켜짐, 샘플링 1.0, 느린 전송(배치마다 지연): 요청 스레드는 기다리지 않고 넘치는 span은 버림
+
+실행: backend 디렉토리에서 python -m api.benchmarks.bench_tracing --requests 20000
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from api.rag.src.config import TRACING_CONFIG
+from api.rag.src.tracing import TraceExporter, Tracer
+
+QUERY = "삼성화재 암보험 진단비 보장 범위와 면책 기간을 현대해상, DB손해보험과 비교해줘 " * 8
+COLLECTIONS = [f"Synthetic_YakMu{number:03d}" for number in range(11)]
+
+
+def one_request(trace, **trace_kwargs):
+    with trace(
+        name="chat_request", tags=["insupanda", "chat"], metadata={"session_id": "bench"}, **trace_kwargs
+    ) as root:
+        with trace(
+            name="upstage_embedding", tags=["insupanda", "embedding"],
+            metadata={"text_length": len(QUERY)}, **trace_kwargs
+        ) as run:
+            if run:
+                run.add_metadata({"embedding_dimension": 4096, "success": True})
+        with trace(
+            name="vector_search", tags=["insupanda", "vector_search"],
+            metadata={"query": QUERY, "collections": COLLECTIONS, "top_k": 2}, **trace_kwargs
+        ) as run:
+            if run:
+                run.add_metadata({"result_count": 22, "collections_searched": COLLECTIONS})
+        with trace(
+            name="generate_insurance_answer", tags=["insupanda", "llm_response"],
+            metadata={"query": QUERY, "companies": ["삼성화재", "현대해상"], "context_length": 4000},
+            **trace_kwargs
+        ) as run:
+            if run:
+                run.add_metadata({"status": "응답 성공"})
+        if root:
+            root.add_metadata({"intent": "그 외의 질문"})
+
+
+def measure(name: str, trace, requests: int, exporter: TraceExporter = None, **trace_kwargs) -> dict:
+    for _ in range(min(requests, 200)):
+        one_request(trace, **trace_kwargs)
+    started_at = time.perf_counter()
+    for _ in range(requests):
+        one_request(trace, **trace_kwargs)
+    elapsed = time.perf_counter() - started_at
+    result = {"mode": name, "us_per_request": round(elapsed / requests * 1e6, 2)}
+    if exporter is not None:
+        exporter.flush(timeout=30)
+        result.update(exporter.stats())
+    return result
+
+
+def make_tracer(sample_rate: float, send_delay: float = 0.0, queue_size: int = None) -> Tracer:
+    config = dict(
+        TRACING_CONFIG,
+        enabled=True,
+        sample_rate=sample_rate,
+        flush_interval=0.05,
+        queue_size=queue_size or TRACING_CONFIG["queue_size"],
+    )
+
+    def sink(runs):
+        if send_delay:
+            time.sleep(send_delay)
+        json.dumps(runs, default=str, ensure_ascii=False)
+
+    return Tracer(config, TraceExporter(config, sender=sink))
+
+
+def main(args) -> list:
+    results = []
+
+    os.environ.pop("LANGCHAIN_TRACING_V2", None)
+    import langsmith
+
+    results.append(measure(
+        "langsmith.trace (기존, 키 없음)", langsmith.trace, args.requests,
+        project_name=TRACING_CONFIG["project"],
+    ))
+
+    disabled = Tracer(dict(TRACING_CONFIG, enabled=False))
+    results.append(measure("tracer 꺼짐", disabled.trace, args.requests))
+
+    for sample_rate in (0.1, 1.0):
+        tracer = make_tracer(sample_rate)
+        results.append(measure(
+            f"tracer 켜짐 (샘플링 {sample_rate})", tracer.trace, args.requests, tracer.exporter
+        ))
+
+    slow = make_tracer(1.0, send_delay=args.slow_send, queue_size=1000)
+    results.append(measure(
+        f"tracer 켜짐 (샘플링 1.0, 전송 지연 {args.slow_send}s)", slow.trace, args.requests, slow.exporter
+    ))
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="트레이싱 오버헤드 측정")
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--slow-send", type=float, default=0.2, help="느린 전송 모드의 배치당 지연(초)")
+    args = parser.parse_args()
+    print(json.dumps(main(args), ensure_ascii=False, indent=2))
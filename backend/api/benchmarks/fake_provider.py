@@ -0,0 +1,154 @@
+"""
+OpenAI 호환 가짜 LLM/임베딩 서버 (부하 테스트용)
+
+/v1/chat/completions와 /v1/embeddings를 흉내 내며 실제 API 대신 지연시간만 재현한다.
+- 채팅: 첫 토큰까지 --latency초 + 생성 토큰 수 / --token-rate초 뒤 응답
+  - 의도 분류 프롬프트(INTENT_PROMPT)는 질문에 비교설계 키워드가 있으면 "비교설계 질문"
+  - SQL 생성 프롬프트(BASE_PROMPT)는 SQLite/MySQL에서 모두 실행되는 보험료 합계 SQL
+  - 그 외(약관 답변)는 --answer-tokens 토큰 분량의 한글 답변
+- 임베딩: --embedding-latency초 뒤 입력 문자열마다 같은 값이 나오는 --dim 차원 벡터
+
+서버 앱(api.main)은 OPENAI_BASE_URL / UPSTAGE_BASE_URL 환경 변수로 이 서버를 가리키게 한다.
+load_e2e 하네스가 프로세스 안에서 띄우며, 실행 중인 서버를 대상으로 할 때는 따로 실행한다.
+
+실행: backend 디렉토리에서 python -m api.benchmarks.fake_provider --port 8099 --latency 0.3 --token-rate 80
+"""
+import argparse
+import asyncio
+import hashlib
+import re
+import threading
+import time
+
+import numpy as np
+import uvicorn
+from fastapi import FastAPI, Request
+
+COMPARE_KEYWORDS = ("보험료", "비교설계", "얼마")
+QUESTION_PATTERN = re.compile(r"\*\*질문:\*\*\s*`(.*?)`", re.S)
+FAKE_SQL = (
+    "SELECT ic.company_name AS 보험사명, ip.product_name AS 상품명, "
+    "SUM(c.premium_amount) AS 보험료합계 "
+    "FROM comparison c "
+    "JOIN insu_company ic ON ic.company_id = c.company_id "
+    "JOIN insu_product ip ON ip.company_id = c.company_id AND ip.product_id = c.product_id "
+    "WHERE c.insu_age = 40 AND c.sex = 1 "
+    "GROUP BY ic.company_name, ip.product_name ORDER BY 보험료합계 LIMIT 20"
+)
+ANSWER_SENTENCE = "해당 약관에 따르면 보험금은 진단확정 시 가입금액 기준으로 지급됩니다. "
+
+
+class ProviderSettings:
+    def __init__(self, latency=0.3, token_rate=80.0, answer_tokens=200, embedding_latency=0.05, dim=1024):
+        self.latency = latency
+        self.token_rate = token_rate
+        self.answer_tokens = answer_tokens
+        self.embedding_latency = embedding_latency
+        self.dim = dim
+        self.requests = {"chat": 0, "embeddings": 0}
+
+
+def fake_completion(messages: list, settings: ProviderSettings) -> tuple:
+    """(응답 문자열, 생성 토큰 수)"""
+    system = next((m["content"] for m in messages if m.get("role") == "system"), "")
+    user = next((m["content"] for m in reversed(messages) if m.get("role") == "user"), "")
+    if "비교설계 질문" in user and "그 외의 질문" in user:
+        match = QUESTION_PATTERN.search(user)
+        question = match.group(1) if match else user
+        intent = "비교설계 질문" if any(k in question for k in COMPARE_KEYWORDS) else "그 외의 질문"
+        return intent, 4
+    if "SELECT" in system or "SQL" in system:
+        return FAKE_SQL, 80
+    # 한글은 대략 한 글자에 토큰 하나로 계산
+    answer = (ANSWER_SENTENCE * (settings.answer_tokens // len(ANSWER_SENTENCE) + 1))[:settings.answer_tokens]
+    return answer, settings.answer_tokens
+
+
+def fake_embedding(text: str, dim: int) -> list:
+    seed = int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
+    vector = np.random.default_rng(seed).standard_normal(dim).astype(np.float32)
+    return (vector / np.linalg.norm(vector)).tolist()
+
+
+def create_app(settings: ProviderSettings) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        settings.requests["chat"] += 1
+        content, tokens = fake_completion(body.get("messages", []), settings)
+        await asyncio.sleep(settings.latency + tokens / settings.token_rate)
+        return {
+            "id": f"chatcmpl-fake-{settings.requests['chat']}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "fake"),
+            "choices": [
+                {"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}
+            ],
+            "usage": {"prompt_tokens": 0, "completion_tokens": tokens, "total_tokens": tokens},
+        }
+
+    @app.post("/v1/embeddings")
+    async def embeddings(request: Request):
+        body = await request.json()
+        settings.requests["embeddings"] += 1
+        texts = body["input"] if isinstance(body["input"], list) else [body["input"]]
+        await asyncio.sleep(settings.embedding_latency)
+        return {
+            "object": "list",
+            "model": body.get("model", "fake"),
+            "data": [
+                {"object": "embedding", "index": i, "embedding": fake_embedding(text, settings.dim)}
+                for i, text in enumerate(texts)
+            ],
+            "usage": {"prompt_tokens": 0, "total_tokens": 0},
+        }
+
+    @app.get("/stats")
+    async def stats():
+        return settings.requests
+
+    return app
+
+
+def start_in_thread(settings: ProviderSettings, host: str = "127.0.0.1", port: int = 0) -> tuple:
+    """백그라운드 스레드에서 서버 실행 -> (서버, 기본 URL). port=0이면 빈 포트 사용"""
+    config = uvicorn.Config(create_app(settings), host=host, port=port, log_level="warning", lifespan="off")
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, name="fake-provider", daemon=True)
+    thread.start()
+    while not server.started:
+        if not thread.is_alive():
+            raise RuntimeError("가짜 LLM 서버를 시작하지 못했습니다.")
+        time.sleep(0.01)
+    bound_port = server.servers[0].sockets[0].getsockname()[1]
+    return server, f"http://{host}:{bound_port}/v1"
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--latency", type=float, default=0.3, help="채팅 응답 첫 토큰까지 지연(초)")
+    parser.add_argument("--token-rate", type=float, default=80.0, help="초당 생성 토큰 수")
+    parser.add_argument("--answer-tokens", type=int, default=200, help="약관 답변 토큰 수")
+    parser.add_argument("--embedding-latency", type=float, default=0.05, help="임베딩 요청당 지연(초)")
+    parser.add_argument("--dim", type=int, default=1024, help="임베딩 차원")
+
+
+def settings_from_args(args) -> ProviderSettings:
+    return ProviderSettings(
+        latency=args.latency,
+        token_rate=args.token_rate,
+        answer_tokens=args.answer_tokens,
+        embedding_latency=args.embedding_latency,
+        dim=args.dim,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="OpenAI 호환 가짜 LLM/임베딩 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    add_arguments(parser)
+    args = parser.parse_args()
+    uvicorn.run(create_app(settings_from_args(args)), host=args.host, port=args.port, log_level="warning")
@@ -0,0 +1,142 @@
+"""
+비교설계 포맷터 퍼즈 테스트
+
+로컬 포맷터(format_compare_rows)의 출력을 LLM 변환(convert_sql_to_json_format) 결과와
+비교한다. 입력은 기록된 쿼리 결과(JSONL, 한 줄에 {"설정값": ..., "결과": [...]})와
+무작위로 생성한 두 가지 형식의 결과 행이다.
+
+실행: backend 디렉토리에서
+    python -m api.benchmarks.fuzz_formatter --cases 50                 # 무작위 + LLM 비교
+    python -m api.benchmarks.fuzz_formatter --recorded rows.jsonl      # 기록된 쿼리 + LLM 비교
+    python -m api.benchmarks.fuzz_formatter --offline --cases 1000     # LLM 없이 불변식만 검사
+"""
+import argparse
+import json
+import os
+import random
+import sys
+from decimal import Decimal
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from api.rag.src.config import COMPANY_REGISTRY, DEFAULT_CONFIG
+from api.rag.src.formatter import format_compare_rows
+
+COVERAGES = ["일반상해사망", "질병사망", "암진단비", "유사암진단비", "뇌혈관질환진단비", "허혈성심장질환진단비"]
+
+
+def random_case(rng: random.Random) -> dict:
+    config = dict(DEFAULT_CONFIG)
+    config["insu_age"] = rng.randint(20, 70)
+    config["sex"] = rng.randint(0, 1)
+    config["product_type"] = rng.choice(["nr", "r"])
+    companies = rng.sample(list(COMPANY_REGISTRY), rng.randint(1, 5))
+
+    rows = []
+    if rng.random() < 0.5:
+        for company in companies:
+            rows.append(
+                {"보험사명": company, "상품명": f"무){company}건강보험", "보험료합계": Decimal(rng.randint(30000, 300000))}
+            )
+    else:
+        for company in companies:
+            details = [
+                {
+                    "구분": "상세",
+                    "보험사명": company,
+                    "상품명": f"무){company}건강보험",
+                    "보장항목명": coverage,
+                    "보험료": rng.randint(100, 50000),
+                    "sort_id": str(index + 1),
+                }
+                for index, coverage in enumerate(rng.sample(COVERAGES, rng.randint(1, len(COVERAGES))))
+            ]
+            rows.append(
+                {
+                    "구분": "합계",
+                    "보험사명": company,
+                    "상품명": None,
+                    "보장항목명": None,
+                    "보험료": Decimal(sum(row["보험료"] for row in details)),
+                    "sort_id": "0",
+                }
+            )
+            rows.extend(details)
+    return {"설정값": config, "결과": rows}
+
+
+def check_invariants(case: dict, formatted: dict) -> list:
+    """LLM 없이 검사 가능한 불변식"""
+    errors = []
+    json.loads(json.dumps(formatted, ensure_ascii=False, default=str))
+    rows = case["결과"]
+    companies = {row["보험사명"] for row in rows}
+    if {company["이름"] for company in formatted["보험사"]} != companies:
+        errors.append("보험사 목록 불일치")
+    for company in formatted["보험사"]:
+        if "상품" in company:
+            detail_sum = sum(
+                amount for product in company["상품"] for amount in product["보장항목"].values()
+            )
+            if detail_sum != company["보험료합계"]:
+                errors.append(f"{company['이름']} 합계 불일치: {detail_sum} != {company['보험료합계']}")
+    return errors
+
+
+def normalize(data):
+    """비교용 정규화 (숫자 문자열 -> 숫자)"""
+    if isinstance(data, dict):
+        return {key: normalize(value) for key, value in data.items()}
+    if isinstance(data, list):
+        return [normalize(value) for value in data]
+    if isinstance(data, str) and data.isdigit():
+        return int(data)
+    return data
+
+
+def run(cases: list, offline: bool) -> dict:
+    mismatches = 0
+    errors = 0
+    for index, case in enumerate(cases):
+        formatted = format_compare_rows(case["결과"], case["설정값"])
+        if formatted is None:
+            print(f"[{index}] 알 수 없는 결과 형식")
+            errors += 1
+            continue
+        invariant_errors = check_invariants(case, formatted)
+        if invariant_errors:
+            print(f"[{index}] 불변식 위반: {invariant_errors}")
+            errors += 1
+        if offline:
+            continue
+
+        from api.rag.src.utils import convert_sql_to_json_format
+        from api.rag.src.prompts import EXAMPLE_PROMPT
+
+        llm_output = convert_sql_to_json_format(case, EXAMPLE_PROMPT)
+        try:
+            llm_formatted = json.loads(llm_output)
+        except json.JSONDecodeError:
+            print(f"[{index}] LLM 출력이 올바른 JSON이 아님")
+            mismatches += 1
+            continue
+        if normalize(llm_formatted) != normalize(json.loads(json.dumps(formatted, default=str))):
+            print(f"[{index}] LLM 출력과 다름")
+            mismatches += 1
+    return {"cases": len(cases), "invariant_errors": errors, "llm_mismatches": mismatches}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="비교설계 포맷터 퍼즈 테스트")
+    parser.add_argument("--cases", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--recorded", default=None, help="기록된 쿼리 결과 JSONL")
+    parser.add_argument("--offline", action="store_true", help="LLM 비교 없이 불변식만 검사")
+    args = parser.parse_args()
+
+    if args.recorded:
+        with open(args.recorded, "r", encoding="utf-8") as f:
+            cases = [json.loads(line) for line in f if line.strip()]
+    else:
+        rng = random.Random(args.seed)
+        cases = [random_case(rng) for _ in range(args.cases)]
+    print(run(cases, args.offline))
@@ -0,0 +1,147 @@
+"""
+/chat 동시성 부하 테스트
+
+동시 요청 수를 늘려가며 /chat 처리량(req/s)과 지연시간을 측정한다.
+블로킹 단계가 단계별 스레드 풀에서 실행되면 워커 하나에서도 처리량이 동시성에 비례해 늘어야 한다.
+
+실행: backend 디렉토리에서
+    # 실행 중인 서버 대상
+    python -m api.benchmarks.load_chat --url http://localhost:8095 --concurrency 1,4,16
+    # 서버 없이 앱을 프로세스 안에서 실행하고, 외부 호출(LLM/DB/검색)은 지정한 지연시간으로 대체
+    python -m api.benchmarks.load_chat --simulate --latency 0.2
+    # 비교용: 단계별 스레드 풀 없이 이벤트 루프에서 직접 실행
+    python -m api.benchmarks.load_chat --simulate --latency 0.2 --inline
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+import httpx
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+QUESTIONS_PATH = os.path.join(os.path.dirname(__file__), "questions.txt")
+
+
+def load_questions() -> list:
+    with open(QUESTIONS_PATH, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def simulate_external_calls(main, latency: float, inline: bool) -> None:
+    """LLM/DB/검색 호출을 time.sleep으로 대체 (블로킹 특성은 그대로 유지)"""
+    from api.rag.src import utils
+    from api.rag.src.config import DEFAULT_CONFIG, RESULT_CACHE_CONFIG
+    from api.rag.src.db import db
+    from api.rag.src.intent import COMPARE_INTENT, OTHER_INTENT
+
+    RESULT_CACHE_CONFIG["enabled"] = False
+
+    def classify_response(self):
+        time.sleep(latency)
+        return COMPARE_INTENT if "보험료" in self.user_question else OTHER_INTENT
+
+    def build_query(self, user_question):
+        time.sleep(latency / 4)
+        return None, "SELECT 1", None, dict(DEFAULT_CONFIG)
+
+    def execute(sql, params=None, timeout_ms=None):
+        time.sleep(latency / 4)
+        return [{"보험사명": "삼성화재", "상품명": "상품", "보험료합계": 10000}]
+
+    def retrieve(query, cancel_event=None):
+        time.sleep(latency / 2)
+        return []
+
+    def response(query, search_results=None):
+        time.sleep(latency)
+        return "답변"
+
+    main.IntentModule.classify_response = classify_response
+    main.CompareModule.build_query = build_query
+    main.retrieve = retrieve
+    main.response = response
+    db.execute = execute
+
+    if inline:
+        async def run_inline(stage, fn, *args, **kwargs):
+            return fn(*args, **kwargs)
+
+        main.run_in_stage = run_inline
+        utils.run_in_stage = run_inline
+        sys.modules["api.rag.src.db"].run_in_stage = run_inline
+
+
+async def run_level(client: httpx.AsyncClient, questions: list, concurrency: int, requests: int) -> dict:
+    latencies = []
+    errors = 0
+    status_counts = {}
+    counter = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for index in counter:
+            question = questions[index % len(questions)]
+            started_at = time.perf_counter()
+            try:
+                result = await client.post(
+                    "/chat", json={"session_id": f"load-{index}", "message": question}
+                )
+                status_counts[result.status_code] = status_counts.get(result.status_code, 0) + 1
+                if result.status_code != 200:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append(time.perf_counter() - started_at)
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started_at
+    ordered = sorted(latencies)
+    return {
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": errors,
+        # 수락 제어가 거절한 요청은 429/503으로 집계됨
+        "status_counts": status_counts,
+        "requests_per_second": round(requests / elapsed, 2),
+        "p50_seconds": round(statistics.median(ordered), 3),
+        "p95_seconds": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3),
+    }
+
+
+async def main_async(args) -> list:
+    questions = load_questions()
+    if args.simulate:
+        import api.main as main
+
+        simulate_external_calls(main, args.latency, args.inline)
+        transport = httpx.ASGITransport(app=main.app)
+        client = httpx.AsyncClient(transport=transport, base_url="http://load-test", timeout=None)
+    else:
+        client = httpx.AsyncClient(base_url=args.url, timeout=None)
+
+    results = []
+    async with client:
+        for concurrency in args.concurrency:
+            requests = args.requests or concurrency * 4
+            results.append(await run_level(client, questions, concurrency, requests))
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="/chat 동시성 부하 테스트")
+    parser.add_argument("--url", default="http://localhost:8095")
+    parser.add_argument(
+        "--concurrency", type=lambda value: [int(v) for v in value.split(",")], default=[1, 4, 16, 32]
+    )
+    parser.add_argument("--requests", type=int, default=0, help="단계별 요청 수 (기본: 동시성 x 4)")
+    parser.add_argument("--simulate", action="store_true", help="앱을 프로세스 안에서 실행하고 외부 호출은 지연시간으로 대체")
+    parser.add_argument("--latency", type=float, default=0.2, help="--simulate 시 LLM 호출 지연시간(초)")
+    parser.add_argument("--inline", action="store_true", help="--simulate 시 단계별 스레드 풀 없이 실행 (비교용)")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(main_async(args)), ensure_ascii=False, indent=2))
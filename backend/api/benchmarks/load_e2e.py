@@ -0,0 +1,245 @@
+"""
+/chat 종단 간 부하 테스트 (외부 API/MySQL 없이)
+
+실제 OpenAI/Upstage/MySQL 대신 로컬 대역을 띄우고 약관/비교설계 질문을 섞어 /chat을 호출한다.
+- LLM/임베딩: fake_provider (OpenAI 호환 HTTP 서버, 지연시간과 토큰 생성 속도 설정 가능)
+- 약관 벡터DB: 보험사 컬렉션 11개를 합성 벡터 + 한글 조항으로 생성 (suite.build_collections)
+- 비교설계 DB: 합성 요금표 SQLite 파일 (bench_storage.build_synthetic_sqlite, STORAGE_BACKEND=sqlite)
+앱은 프로세스 안에서 lifespan까지 실행하며, 호출 코드는 그대로 두고 환경 변수
+(OPENAI_BASE_URL, UPSTAGE_BASE_URL, STORAGE_BACKEND, VECTOR_DB_PATH ...)로만 대역을 연결한다.
+
+동시성 단계마다 처리량(req/s), 전체/의도별 지연시간 p50/p95/p99, Server-Timing 헤더에서
+읽은 단계별(intent, sql_build, db, embedding, faiss, generation ...) p50/p95/p99를 출력한다.
+비교설계 질문 중 --llm-sql-ratio 비율은 템플릿 밖 조건(보장항목)을 넣어 LLM SQL 생성 경로를 탄다.
+
+실행: backend 디렉토리에서
+    python -m api.benchmarks.load_e2e --concurrency 1,8,32 --requests 200 --latency 0.3 --token-rate 80
+    # 실행 중인 서버 대상 (서버는 fake_provider를 가리키는 환경 변수로 시작해 둠)
+    python -m api.benchmarks.fake_provider --port 8099 &
+    OPENAI_BASE_URL=http://127.0.0.1:8099/v1 UPSTAGE_BASE_URL=http://127.0.0.1:8099/v1 \\
+        STORAGE_BACKEND=sqlite python -m api.serve &
+    python -m api.benchmarks.load_e2e --url http://localhost:8095
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+import httpx
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from api.benchmarks import fake_provider
+
+QUESTIONS_PATH = os.path.join(os.path.dirname(__file__), "questions.txt")
+COMPANIES = ["삼성화재", "DB손해보험", "현대해상", "KB손해보험", "메리츠화재", "한화손해보험", "흥국화재"]
+COMPARE_TEMPLATES = [
+    "{age}세 {sex} {company} 보험료 비교해줘",
+    "{age}세 {sex} {company} {other} 보험료 보장항목별 상세 비교",
+    "{age}세 {sex} 전체 보험사 보험료 비교설계 해줘",
+    "{age}세 {sex} {company} 기본플랜 보험료 얼마야",
+]
+# 템플릿 문법 밖 조건 (sql_builder.UNSUPPORTED_KEYWORDS) -> LLM SQL 생성
+LLM_SQL_TEMPLATE = "{age}세 {sex} {company} 암진단비 보험료 비교해줘"
+
+
+def load_questions() -> list:
+    with open(QUESTIONS_PATH, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def build_traffic(count: int, args, seed: int = 0) -> list:
+    """(종류, 질문) 목록. 종류는 terms / compare / compare_llm_sql"""
+    rng = random.Random(seed)
+    terms = load_questions()
+    traffic = []
+    for number in range(count):
+        if rng.random() >= args.compare_ratio:
+            question = rng.choice(terms)
+            # 같은 질문 반복이면 임베딩 캐시만 맞으므로 기본은 질문마다 문구를 조금씩 바꿈
+            if not args.repeat_questions:
+                question = f"{question} (문의 {number})"
+            traffic.append(("terms", question))
+            continue
+        values = {
+            "age": rng.randint(20, 65),
+            "sex": rng.choice(["남자", "여자"]),
+            "company": rng.choice(COMPANIES),
+            "other": rng.choice(COMPANIES),
+        }
+        if rng.random() < args.llm_sql_ratio:
+            traffic.append(("compare_llm_sql", LLM_SQL_TEMPLATE.format(**values)))
+        else:
+            traffic.append(("compare", rng.choice(COMPARE_TEMPLATES).format(**values)))
+    return traffic
+
+
+def parse_server_timing(header: str) -> dict:
+    """'intent;dur=12.3, db;dur=4.0, total;dur=20.1' -> {"intent": 12.3, ...} (ms)"""
+    stages = {}
+    for entry in filter(None, (part.strip() for part in header.split(","))):
+        name, _, params = entry.partition(";")
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "dur":
+                stages[name] = stages.get(name, 0.0) + float(value)
+    return stages
+
+
+def percentiles(values: list) -> dict:
+    ordered = sorted(values)
+    if not ordered:
+        return {"count": 0}
+
+    def pick(q):
+        return round(ordered[min(len(ordered) - 1, int(len(ordered) * q))], 2)
+
+    return {"count": len(ordered), "p50": pick(0.5), "p95": pick(0.95), "p99": pick(0.99)}
+
+
+async def run_level(client: httpx.AsyncClient, traffic: list, concurrency: int) -> dict:
+    samples = []
+    status_counts = {}
+    errors = 0
+    counter = iter(range(len(traffic)))
+
+    async def worker():
+        nonlocal errors
+        for index in counter:
+            kind, question = traffic[index]
+            started_at = time.perf_counter()
+            try:
+                result = await client.post(
+                    "/chat", json={"session_id": f"load-e2e-{index}", "message": question}
+                )
+            except httpx.HTTPError:
+                errors += 1
+                continue
+            elapsed_ms = (time.perf_counter() - started_at) * 1000
+            status_counts[result.status_code] = status_counts.get(result.status_code, 0) + 1
+            if result.status_code != 200:
+                errors += 1
+                continue
+            samples.append({
+                "kind": kind,
+                "intent": result.json().get("intent"),
+                "ms": elapsed_ms,
+                "stages": parse_server_timing(result.headers.get("server-timing", "")),
+            })
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started_at
+
+    by_kind = {}
+    stage_values = {}
+    for sample in samples:
+        by_kind.setdefault(sample["kind"], []).append(sample["ms"])
+        for stage, duration in sample["stages"].items():
+            stage_values.setdefault(stage, []).append(duration)
+    misclassified = sum(
+        1 for sample in samples
+        if (sample["kind"] == "terms") != (sample["intent"] == "그 외의 질문")
+    )
+    return {
+        "concurrency": concurrency,
+        "requests": len(traffic),
+        "errors": errors,
+        # 수락 제어가 거절한 요청은 429/503으로 집계됨
+        "status_counts": status_counts,
+        "requests_per_second": round(len(traffic) / elapsed, 2),
+        "latency_ms": percentiles([sample["ms"] for sample in samples]),
+        "latency_ms_by_kind": {kind: percentiles(values) for kind, values in sorted(by_kind.items())},
+        "stages_ms": {stage: percentiles(values) for stage, values in stage_values.items()},
+        "misclassified_intents": misclassified,
+    }
+
+
+def prepare_local_stack(workdir: str, provider_url: str, args) -> None:
+    """대역 데이터를 만들고 앱이 대역을 쓰도록 환경 변수 설정 (api.main import 전에 호출)"""
+    os.environ.update({
+        "OPENAI_BASE_URL": provider_url,
+        "OPENAI_API_BASE": provider_url,
+        "UPSTAGE_BASE_URL": provider_url,
+        "STORAGE_BACKEND": "sqlite",
+        "SQLITE_DB_PATH": os.path.join(workdir, "premiums.sqlite3"),
+        "VECTOR_DB_PATH": os.path.join(workdir, "vector_db"),
+        "INSU_DATA_DIR": os.path.join(workdir, "data"),
+        "SESSION_BACKEND": "memory",
+        "RESULT_CACHE_ENABLED": "false" if args.no_result_cache else "true",
+        "LOCAL_INTENT_ENABLED": "false" if args.llm_intent else "true",
+    })
+    os.makedirs(os.environ["INSU_DATA_DIR"], exist_ok=True)
+
+    from api.benchmarks.bench_storage import build_synthetic_sqlite
+    from api.benchmarks.suite import build_collections, synthetic_names
+    from api.rag.src.config import COMPANY_REGISTRY
+
+    build_synthetic_sqlite(os.environ["SQLITE_DB_PATH"])
+    build_collections(
+        os.environ["VECTOR_DB_PATH"], synthetic_names(len(COMPANY_REGISTRY)), args.vectors, args.dim
+    )
+
+
+async def drive(client: httpx.AsyncClient, args) -> list:
+    for kind, question in build_traffic(args.warmup, args, seed=1):
+        await client.post("/chat", json={"session_id": "load-e2e-warmup", "message": question})
+    results = []
+    for level, concurrency in enumerate(args.concurrency):
+        traffic = build_traffic(args.requests or concurrency * 8, args, seed=100 + level)
+        results.append(await run_level(client, traffic, concurrency))
+    return results
+
+
+async def main_async(args) -> dict:
+    if args.url:
+        async with httpx.AsyncClient(base_url=args.url, timeout=None) as client:
+            return {"target": args.url, "levels": await drive(client, args)}
+
+    settings = fake_provider.settings_from_args(args)
+    server, provider_url = fake_provider.start_in_thread(settings)
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            prepare_local_stack(workdir, provider_url, args)
+            import api.main as main
+
+            transport = httpx.ASGITransport(app=main.app)
+            async with main.lifespan(main.app):
+                async with httpx.AsyncClient(transport=transport, base_url="http://load-e2e", timeout=None) as client:
+                    levels = await drive(client, args)
+    finally:
+        server.should_exit = True
+
+    return {
+        "provider": {
+            "latency": args.latency,
+            "token_rate": args.token_rate,
+            "answer_tokens": args.answer_tokens,
+            "embedding_latency": args.embedding_latency,
+            "requests": dict(settings.requests),
+        },
+        "traffic": {"compare_ratio": args.compare_ratio, "llm_sql_ratio": args.llm_sql_ratio},
+        "levels": levels,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="/chat 종단 간 부하 테스트 (로컬 LLM/DB 대역)")
+    parser.add_argument("--url", help="실행 중인 서버 주소 (생략하면 앱과 대역을 프로세스 안에서 실행)")
+    parser.add_argument(
+        "--concurrency", type=lambda value: [int(v) for v in value.split(",")], default=[1, 8, 32]
+    )
+    parser.add_argument("--requests", type=int, default=0, help="단계별 요청 수 (기본: 동시성 x 8)")
+    parser.add_argument("--warmup", type=int, default=5, help="측정 전 순차 요청 수")
+    parser.add_argument("--compare-ratio", type=float, default=0.4, help="비교설계 질문 비율")
+    parser.add_argument("--llm-sql-ratio", type=float, default=0.1, help="비교설계 중 LLM SQL 생성 비율")
+    parser.add_argument("--repeat-questions", action="store_true", help="약관 질문을 그대로 반복 (임베딩 캐시 적중)")
+    parser.add_argument("--no-result-cache", action="store_true", help="비교설계 결과 캐시 끄기")
+    parser.add_argument("--llm-intent", action="store_true", help="로컬 의도 분류기 끄기 (모든 의도 분류를 LLM으로)")
+    parser.add_argument("--vectors", type=int, default=1000, help="합성 컬렉션당 벡터 수")
+    fake_provider.add_arguments(parser)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(main_async(args)), ensure_ascii=False, indent=2))
@@ -0,0 +1,107 @@
+"""
+사전 로드 서버 워커 수별 메모리 보고서 (Linux)
+
+워커 수를 바꿔가며 api.serve를 실행하고, 마스터와 워커 프로세스의 RSS/PSS와
+공유/전용 메모리를 /proc/<pid>/smaps_rollup에서 읽어 합산한다.
+copy-on-write 공유가 잘 되면 워커를 늘려도 전체 PSS는 워커당 전용 메모리만큼만 늘어난다.
+
+실행: backend 디렉토리에서
+    python -m api.benchmarks.report_memory --workers 1,2,4
+    python -m api.benchmarks.report_memory --synthetic 11   # 합성 컬렉션 11개로 측정
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+FIELDS = ("Rss", "Pss", "Shared_Clean", "Shared_Dirty", "Private_Clean", "Private_Dirty")
+
+
+def read_smaps_rollup(pid: int) -> dict:
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup", "r") as f:
+        for line in f:
+            name, _, rest = line.partition(":")
+            if name in FIELDS:
+                values[name] = int(rest.split()[0]) / 1024  # kB -> MB
+    return values
+
+
+def child_pids(pid: int) -> list:
+    with open(f"/proc/{pid}/task/{pid}/children", "r") as f:
+        return [int(value) for value in f.read().split()]
+
+
+def wait_ready(port: int, workers: int, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/stats/collections", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    raise TimeoutError(f"{timeout}초 안에 서버가 준비되지 않았습니다.")
+
+
+def measure(workers: int, port: int, env: dict, timeout: float) -> dict:
+    process = subprocess.Popen(
+        [sys.executable, "-m", "api.serve", "--workers", str(workers), "--port", str(port), "--host", "127.0.0.1"],
+        cwd=BACKEND_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_ready(port, workers, timeout)
+        while len(child_pids(process.pid)) < workers:
+            time.sleep(0.2)
+        time.sleep(1)
+        master = read_smaps_rollup(process.pid)
+        children = [read_smaps_rollup(pid) for pid in child_pids(process.pid)]
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+    processes = [master] + children
+    return {
+        "workers": workers,
+        "total_rss_mb": round(sum(p["Rss"] for p in processes), 1),
+        "total_pss_mb": round(sum(p["Pss"] for p in processes), 1),
+        "master_rss_mb": round(master["Rss"], 1),
+        "worker_rss_mb": round(sum(p["Rss"] for p in children) / len(children), 1),
+        "worker_private_mb": round(
+            sum(p["Private_Clean"] + p["Private_Dirty"] for p in children) / len(children), 1
+        ),
+        "worker_shared_mb": round(
+            sum(p["Shared_Clean"] + p["Shared_Dirty"] for p in children) / len(children), 1
+        ),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="사전 로드 서버 워커 수별 메모리 보고서")
+    parser.add_argument("--workers", type=lambda value: [int(v) for v in value.split(",")], default=[1, 2, 4])
+    parser.add_argument("--port", type=int, default=18095)
+    parser.add_argument("--synthetic", type=int, default=0, help="합성 컬렉션 수 (0이면 vector_db 사용)")
+    parser.add_argument("--vectors", type=int, default=20000)
+    parser.add_argument("--timeout", type=float, default=300)
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    with tempfile.TemporaryDirectory() as vector_db:
+        if args.synthetic:
+            from api.benchmarks.stress_collections import build_synthetic_collections
+
+            build_synthetic_collections(vector_db, args.synthetic, args.vectors, 1024)
+            env["VECTOR_DB_PATH"] = vector_db
+        report = [measure(workers, args.port, env, args.timeout) for workers in args.workers]
+    print(json.dumps(report, ensure_ascii=False, indent=2))
@@ -0,0 +1,134 @@
+"""
+컬렉션 레지스트리 동시성 스트레스 테스트
+
+합성 FAISS 컬렉션(L2 인덱스 + metadata.json)을 임시 디렉토리에 만들고, 여러 스레드가
+아직 로드되지 않은 컬렉션을 동시에 요청하게 한다. 컬렉션마다 파일은 한 번만 읽혀야 하며
+(single-flight), 중복 등록 없이 모든 요청이 같은 인덱스 객체를 받아야 한다.
+임베딩 캐시도 같은 방식으로 동시에 읽고 쓰며 크기 제한이 지켜지는지 확인한다.
+
+실행: backend 디렉토리에서 python -m api.benchmarks.stress_collections --threads 64 --collections 11
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import faiss
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from api.main import RAGService
+from api.rag.src.collection_registry import EmbeddingCache
+
+
+def build_synthetic_collections(base_path: str, count: int, vectors: int, dim: int) -> list:
+    rng = np.random.default_rng(0)
+    names = []
+    for number in range(count):
+        name = f"Synthetic_YakMu{number:03d}"
+        collection_dir = os.path.join(base_path, name)
+        os.makedirs(collection_dir, exist_ok=True)
+        index = faiss.IndexFlatL2(dim)
+        index.add(rng.standard_normal((vectors, dim)).astype(np.float32))
+        faiss.write_index(index, os.path.join(collection_dir, "index.faiss"))
+        with open(os.path.join(collection_dir, "metadata.json"), "w", encoding="utf-8") as f:
+            json.dump([{"text": f"{name} 조항 {i}"} for i in range(vectors)], f, ensure_ascii=False)
+        names.append(name)
+    return names
+
+
+def stress_collections(threads: int, rounds: int, names: list, base_path: str) -> dict:
+    rag = RAGService()
+    rag.base_path = base_path
+    reads = {name: 0 for name in names}
+    reads_lock = threading.Lock()
+    read_collection = rag._read_collection
+
+    def counting_read(name):
+        with reads_lock:
+            reads[name] += 1
+        return read_collection(name)
+
+    rag._read_collection = counting_read
+    barrier = threading.Barrier(threads)
+    seen = {name: set() for name in names}
+    seen_lock = threading.Lock()
+
+    def worker(seed):
+        rng = random.Random(seed)
+        barrier.wait()
+        for _ in range(rounds):
+            name = rng.choice(names)
+            assert rag.load_collection(name)
+            collection = rag.registry.get(name)
+            with seen_lock:
+                seen[name].add(id(collection["index"]))
+            # 읽기 경로: 로드 중에도 스냅샷 순회가 깨지지 않아야 함
+            [c["name"] for c in rag.collections]
+
+    started_at = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(worker, range(threads)))
+    elapsed = time.perf_counter() - started_at
+
+    loaded_names = [c["name"] for c in rag.collections]
+    result = {
+        "threads": threads,
+        "requests": threads * rounds,
+        "seconds": round(elapsed, 3),
+        "file_reads": sum(reads.values()),
+        "collections": len(names),
+        "duplicate_reads": sum(count - 1 for count in reads.values() if count > 1),
+        "duplicate_entries": len(loaded_names) - len(set(loaded_names)),
+        "distinct_index_objects_per_collection": max(len(ids) for ids in seen.values()),
+        "registry": rag.registry.stats(),
+    }
+    assert result["duplicate_reads"] == 0, result
+    assert result["duplicate_entries"] == 0, result
+    assert result["distinct_index_objects_per_collection"] == 1, result
+    return result
+
+
+def stress_embedding_cache(threads: int, rounds: int, dim: int, max_entries: int = 256) -> dict:
+    cache = EmbeddingCache(max_entries=max_entries)
+
+    def worker(seed):
+        rng = random.Random(seed)
+        for _ in range(rounds):
+            text = f"질문 {rng.randint(0, max_entries * 2)}"
+            vector = cache.get(text)
+            if vector is None:
+                cache.put(text, np.full((1, dim), seed + 1, dtype=np.float32))
+            else:
+                # 반환된 벡터를 수정해도 캐시 원본은 바뀌지 않아야 함
+                vector *= 0
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(worker, range(threads)))
+    stats = cache.stats()
+    assert stats["entries"] <= max_entries, stats
+    assert all(cache.get(text).all() for text in list(cache._entries)), "캐시 원본이 변경됨"
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="컬렉션 레지스트리 동시성 스트레스 테스트")
+    parser.add_argument("--threads", type=int, default=64)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--collections", type=int, default=11)
+    parser.add_argument("--vectors", type=int, default=2000)
+    parser.add_argument("--dim", type=int, default=256)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as base_path:
+        names = build_synthetic_collections(base_path, args.collections, args.vectors, args.dim)
+        report = {
+            "collections": stress_collections(args.threads, args.rounds, names, base_path),
+            "embedding_cache": stress_embedding_cache(args.threads, args.rounds * 10, args.dim),
+        }
+    print(json.dumps(report, ensure_ascii=False, indent=2))
@@ -0,0 +1,315 @@
+"""
+오프라인 마이크로벤치마크 모음
+
+합성 약관 컬렉션(IP 인덱스 + 한글 조항 metadata.json)을 임시 디렉토리에 만들고
+검색 파이프라인의 각 단계를 외부 API/DB 없이 측정한다.
+- load: 컬렉션 하나를 처음 로드 (FAISS 인덱스 + 메타데이터 읽기)
+- search_1 / search_11 / search_100: 컬렉션 1/11/100개 대상 검색 (질문 임베딩은 미리 캐시)
+- find_matching_collections: questions.txt 질문별 보험사 컬렉션 매칭
+- process_query: 비교설계 질문 슬롯 추출
+- build_context: 검색 결과를 보험사별 LLM 컨텍스트로 조립
+- compare_formatter: 비교설계 SQL 결과 행을 표 JSON으로 변환
+
+결과는 단계별 min/median/p95/mean(ms)으로 출력하고, --baseline 파일과 비교해 min이
+--tolerance 비율 이상 느려진 단계를 regressions로 표시한다 (공유 머신의 잡음은 대부분
+측정 시간을 늘리는 방향이므로 최솟값이 median보다 안정적이다).
+컬렉션 이름은 실제 보험사 컬렉션 11개 + 보험사 접두사를 붙인 합성 컬렉션으로 만들어
+매칭/컨텍스트 조립이 실제와 같은 보험사 분기를 타게 한다.
+
+실행: backend 디렉토리에서
+  python -m api.benchmarks.suite --output /tmp/bench.json --baseline api/benchmarks/baseline.json
+  python -m api.benchmarks.suite --save-baseline api/benchmarks/baseline.json
+"""
+import argparse
+import itertools
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+import faiss
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from api.main import RAGService
+from api.benchmarks.fuzz_formatter import random_case
+from api.rag.src.config import COMPANY_REGISTRY, DEFAULT_CONFIG
+from api.rag.src.formatter import format_compare_json
+from api.rag.src.utils import process_query
+
+QUESTIONS_PATH = os.path.join(os.path.dirname(__file__), "questions.txt")
+
+CLAUSE_TITLES = [
+    "보험금의 지급사유", "보험금을 지급하지 않는 사유", "보험금 지급에 관한 세부규정",
+    "계약 전 알릴 의무", "보험료의 납입연체", "계약의 소멸", "암의 정의 및 진단확정",
+]
+
+COMPARE_QUESTIONS = [
+    "40세 남자 삼성화재 암진단비 보험료 비교해줘",
+    "35세 여성 한화손해보험 뇌혈관질환 보험료 알려줘",
+    "50세 남성 전체 보험사 질병사망 보험료 비교",
+]
+
+
+def synthetic_names(count: int) -> list:
+    """실제 보험사 컬렉션 이름 + 보험사 접두사를 붙인 합성 컬렉션 이름"""
+    names = [entry["collection"] for entry in COMPANY_REGISTRY.values()][:count]
+    prefixes = [entry["collection"].split("_")[0] for entry in COMPANY_REGISTRY.values()]
+    number = 0
+    while len(names) < count:
+        names.append(f"{prefixes[number % len(prefixes)]}_YakMuSynth{number:03d}")
+        number += 1
+    return names
+
+
+def clause_text(rng: random.Random, company: str, number: int) -> str:
+    title = rng.choice(CLAUSE_TITLES)
+    return (
+        f"제{number}조({title}) {company}는 피보험자가 보험기간 중 암보장개시일 이후에 "
+        f"암으로 진단확정되었을 때에는 보험수익자에게 가입금액의 {rng.choice([10, 20, 50, 100])}%를 "
+        f"보험금으로 지급합니다. 다만 계약일부터 90일 이내에 진단확정된 경우에는 지급하지 않습니다."
+    )
+
+
+def build_collections(base_path: str, names: list, vectors: int, dim: int) -> None:
+    """정규화된 벡터의 IndexFlatIP + 딕셔너리 형식 metadata.json (로드 시 L2 변환 없음)"""
+    np_rng = np.random.default_rng(0)
+    rng = random.Random(0)
+    for name in names:
+        collection_dir = os.path.join(base_path, name)
+        os.makedirs(collection_dir, exist_ok=True)
+        embeddings = np_rng.standard_normal((vectors, dim)).astype(np.float32)
+        faiss.normalize_L2(embeddings)
+        index = faiss.IndexFlatIP(dim)
+        index.add(embeddings)
+        faiss.write_index(index, os.path.join(collection_dir, "index.faiss"))
+        company = name.split("_")[0]
+        metadata = {
+            str(i): {"text": clause_text(rng, company, i + 1), "source": f"{name}.pdf", "page": i // 3 + 1}
+            for i in range(vectors)
+        }
+        with open(os.path.join(collection_dir, "metadata.json"), "w", encoding="utf-8") as f:
+            json.dump(metadata, f, ensure_ascii=False)
+
+
+def load_questions() -> list:
+    with open(QUESTIONS_PATH, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def make_rag(base_path: str) -> RAGService:
+    rag = RAGService()
+    rag.base_path = base_path
+    return rag
+
+
+def measure(func, repeat: int, min_time: float) -> dict:
+    """func()를 repeat번 실행한 시간(ms) 요약. func가 처리 건수를 돌려주면 1건당 시간으로 나눔.
+    빠른 단계는 타이머 오차보다 충분히 길도록 한 번 측정에 min_time초 이상 반복한다 (timeit 방식)"""
+    func()
+    number = 1
+    while True:
+        started_at = time.perf_counter()
+        for _ in range(number):
+            func()
+        if time.perf_counter() - started_at >= min_time or number >= 1 << 16:
+            break
+        number *= 2
+
+    timings = []
+    for _ in range(repeat):
+        count = 0
+        started_at = time.perf_counter()
+        for _ in range(number):
+            count += func() or 1
+        timings.append((time.perf_counter() - started_at) * 1000 / count)
+    timings.sort()
+    return {
+        "min_ms": round(timings[0], 4),
+        "median_ms": round(statistics.median(timings), 4),
+        "p95_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 4),
+        "mean_ms": round(statistics.fmean(timings), 4),
+        "runs": repeat,
+        "loops": number,
+    }
+
+
+def bench_load(base_path: str, names: list, repeat: int) -> dict:
+    targets = itertools.cycle(names)
+
+    def load_one():
+        # 매번 새 서비스로 로드해 레지스트리에 캐시되지 않은 상태를 측정
+        rag = make_rag(base_path)
+        assert rag.load_collection(next(targets))
+
+    return measure(load_one, repeat, min_time=0)
+
+
+def bench_search(rag: RAGService, names: list, questions: list, repeat: int, min_time: float, top_k: int) -> dict:
+    def search_all():
+        for question in questions:
+            rag.search(question, names, top_k=top_k)
+        return len(questions)
+
+    return measure(search_all, repeat, min_time)
+
+
+def bench_matching(rag: RAGService, names: list, questions: list, repeat: int, min_time: float) -> dict:
+    def match_all():
+        for question in questions:
+            rag.find_matching_collections(question, names)
+        return len(questions)
+
+    return measure(match_all, repeat, min_time)
+
+
+def bench_process_query(questions: list, repeat: int, min_time: float) -> dict:
+    def process_all():
+        for question in questions:
+            process_query(question, DEFAULT_CONFIG)
+        return len(questions)
+
+    return measure(process_all, repeat, min_time)
+
+
+def bench_context(rag: RAGService, names: list, questions: list, repeat: int, min_time: float, top_k: int) -> dict:
+    # 비교 질문처럼 여러 보험사 결과가 섞인 검색 결과로 조립
+    results = [rag.search(question, names, top_k=top_k) for question in questions]
+
+    def build_all():
+        for search_results in results:
+            rag.build_context(search_results)
+        return len(results)
+
+    return measure(build_all, repeat, min_time)
+
+
+def bench_formatter(cases: int, repeat: int, min_time: float) -> dict:
+    rng = random.Random(0)
+    samples = [random_case(rng) for _ in range(cases)]
+
+    def format_all():
+        for sample in samples:
+            format_compare_json(sample["결과"], sample["설정값"])
+        return len(samples)
+
+    return measure(format_all, repeat, min_time)
+
+
+def run_suite(args) -> dict:
+    questions = load_questions()
+    names = synthetic_names(max(args.collections))
+    rng = np.random.default_rng(1)
+
+    cases = {}
+    with tempfile.TemporaryDirectory() as base_path:
+        build_collections(base_path, names, args.vectors, args.dim)
+        cases["load"] = bench_load(base_path, names, args.repeat)
+
+        rag = make_rag(base_path)
+        for name in names:
+            assert rag.load_collection(name)
+        for question in questions:
+            rag.embedding_cache.put(question, rng.standard_normal((1, args.dim)).astype(np.float32))
+
+        for count in args.collections:
+            cases[f"search_{count}"] = bench_search(
+                rag, names[:count], questions, args.repeat, args.min_time, args.top_k
+            )
+        cases["find_matching_collections"] = bench_matching(rag, names, questions, args.repeat, args.min_time)
+        cases["process_query"] = bench_process_query(questions + COMPARE_QUESTIONS, args.repeat, args.min_time)
+        cases["build_context"] = bench_context(
+            rag, names[:len(COMPANY_REGISTRY)], questions, args.repeat, args.min_time, args.top_k
+        )
+        cases["compare_formatter"] = bench_formatter(args.formatter_cases, args.repeat, args.min_time)
+
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "faiss": getattr(faiss, "__version__", ""),
+            "machine": platform.machine(),
+            "collections": args.collections,
+            "vectors": args.vectors,
+            "dim": args.dim,
+            "top_k": args.top_k,
+            "repeat": args.repeat,
+            "min_time": args.min_time,
+            "questions": len(questions),
+        },
+        "cases": cases,
+    }
+
+
+def compare_baseline(results: dict, baseline: dict, tolerance: float) -> dict:
+    """min 기준 비교. 현재/기준 비율이 1 + tolerance를 넘으면 회귀"""
+    comparison = {}
+    regressions = []
+    for name, current in results["cases"].items():
+        previous = baseline.get("cases", {}).get(name)
+        if not previous or not previous.get("min_ms"):
+            comparison[name] = {"status": "new"}
+            continue
+        ratio = current["min_ms"] / previous["min_ms"]
+        status = "regression" if ratio > 1 + tolerance else "improved" if ratio < 1 - tolerance else "ok"
+        if status == "regression":
+            regressions.append(name)
+        comparison[name] = {
+            "baseline_ms": previous["min_ms"],
+            "current_ms": current["min_ms"],
+            "ratio": round(ratio, 3),
+            "status": status,
+        }
+    mismatched = {
+        key: {"baseline": baseline.get("meta", {}).get(key), "current": value}
+        for key, value in results["meta"].items()
+        if key in ("collections", "vectors", "dim", "top_k") and baseline.get("meta", {}).get(key) != value
+    }
+    return {"tolerance": tolerance, "cases": comparison, "regressions": regressions, "meta_mismatch": mismatched}
+
+
+def main(args) -> int:
+    if args.quick:
+        args.vectors, args.dim, args.repeat = 200, 256, 5
+    # 컬렉션 로드 INFO 로그가 측정에 섞이지 않도록 경고 이상만 출력
+    logging.getLogger("insu").setLevel(logging.WARNING)
+    results = run_suite(args)
+
+    if args.baseline and os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            results["baseline"] = compare_baseline(results, json.load(f), args.tolerance)
+
+    output = json.dumps(results, ensure_ascii=False, indent=2)
+    print(output)
+    for path in filter(None, (args.output, args.save_baseline)):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(output if path == args.output else json.dumps(
+                {"meta": results["meta"], "cases": results["cases"]}, ensure_ascii=False, indent=2
+            ) + "\n")
+
+    if args.fail_on_regression and results.get("baseline", {}).get("regressions"):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="오프라인 마이크로벤치마크 모음")
+    parser.add_argument("--collections", type=int, nargs="+", default=[1, 11, 100])
+    parser.add_argument("--vectors", type=int, default=500, help="컬렉션당 벡터(청크) 수")
+    parser.add_argument("--dim", type=int, default=1024)
+    parser.add_argument("--top-k", type=int, default=2)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--min-time", type=float, default=0.05, help="한 번 측정의 최소 시간(초)")
+    parser.add_argument("--formatter-cases", type=int, default=200)
+    parser.add_argument("--quick", action="store_true", help="작은 컬렉션으로 빠르게 실행 (vectors=200, dim=256)")
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    parser.add_argument("--baseline", help="비교할 기준 결과 JSON")
+    parser.add_argument("--save-baseline", help="이번 결과를 기준 결과로 저장할 경로")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="회귀로 볼 min 증가 비율")
+    parser.add_argument("--fail-on-regression", action="store_true", help="회귀가 있으면 종료 코드 1")
+    sys.exit(main(parser.parse_args()))
@@ -12,6 +12,7 @@ class Config:
     # 서버 설정
     HOST = "0.0.0.0"  # 모든 인터페이스에서 수신
     PORT = 8095      # 프록시 서버가 이 포트로 요청을 전달
+    WORKERS = 4      # 사전 로드 서버(api.serve) 워커 프로세스 수
     
     # 로깅 설정
     LOG_LEVEL = "INFO"
@@ -3,10 +3,18 @@ UTF-8 인코딩 관련 헬퍼 모듈
 한글 텍스트의 올바른 처리를 보장하기 위한 유틸리티 함수
 """
 import json
+from decimal import Decimal
 from typing import Any, Dict
 from datetime import datetime
 from fastapi.responses import JSONResponse
 
+try:
+    import orjson
+except ImportError:  # orjson이 없으면 표준 json으로 직렬화
+    orjson = None
+
+UTF8_JSON_MEDIA_TYPE = "application/json; charset=utf-8"
+
 
 class UTF8JSONEncoder(json.JSONEncoder):
     """UTF-8 문자열 처리 및 특수 객체 변환을 위한 JSON 인코더"""
@@ -15,9 +23,52 @@ class UTF8JSONEncoder(json.JSONEncoder):
         """객체 타입 별 직렬화 처리"""
         if isinstance(obj, datetime):
             return obj.isoformat()
+        if isinstance(obj, Decimal):
+            return int(obj) if obj == obj.to_integral_value() else float(obj)
         return super().default(obj)
 
 
+def _orjson_default(obj):
+    """orjson이 직접 처리하지 못하는 타입 변환 (DB 조회 결과의 Decimal 등)"""
+    if isinstance(obj, Decimal):
+        return int(obj) if obj == obj.to_integral_value() else float(obj)
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump()
+    raise TypeError(f"JSON으로 변환할 수 없는 타입입니다: {type(obj).__name__}")
+
+
+def dumps_utf8(content: Any) -> bytes:
+    """
+    JSON을 UTF-8 바이트로 직렬화 (한글은 이스케이프하지 않음)
+
+    orjson이 있으면 orjson(datetime, numpy 배열/스칼라 직접 지원), 없으면 표준 json 사용
+    """
+    if orjson is not None:
+        return orjson.dumps(
+            content,
+            default=_orjson_default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+        )
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+        cls=UTF8JSONEncoder,
+    ).encode("utf-8")
+
+
+class UTF8JSONResponse(JSONResponse):
+    """orjson으로 직렬화하고 Content-Type에 charset=utf-8을 명시하는 JSON 응답"""
+
+    media_type = UTF8_JSON_MEDIA_TYPE
+
+    def render(self, content: Any) -> bytes:
+        return dumps_utf8(content)
+
+
 def utf8_json_response(content: Dict[str, Any], status_code: int = 200) -> JSONResponse:
     """
     UTF-8 인코딩을 명시적으로 포함한 JSON 응답 헬퍼
@@ -29,11 +80,7 @@ def utf8_json_response(content: Dict[str, Any], status_code: int = 200) -> JSONR
     Returns:
         한글 처리를 위한 인코딩 헤더가 포함된 JSONResponse
     """
-    return JSONResponse(
-        content=content,
-        status_code=status_code,
-        headers={"Content-Type": "application/json; charset=utf-8"},
-    )
+    return UTF8JSONResponse(content=content, status_code=status_code)
 
 
 def ensure_utf8_encoding(text: str) -> str:
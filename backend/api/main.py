@@ -1,62 +1,67 @@
 import os
 os.environ["OPENAI_API_KEY"] = 
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI, Header, HTTPException, Request
+from fastapi.responses import FileResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
 from typing import Optional, List, Any
 
 import datetime
 
+from .encoders import UTF8JSONResponse
+from .middleware import CompressionMiddleware, ProfilingMiddleware
 from .rag.src.utils import *
 from .rag.src.prompts import BASE_PROMPT, EXAMPLE_PROMPT, INTENT_PROMPT, LLM_PROMPT
+from .rag.src.intent import classify_intent_locally, log_intent_decision
+from .rag.src.matcher import (
+    collection_company_mapping, match_question, resolve_collection_name, select_collections,
+)
+from .rag.src.pipeline import start_speculation, speculation_stats
+from .rag.src.sql_builder import build_compare_query, render_sql
+from .rag.src.premium_cube import premium_cube
+from .rag.src.result_cache import result_cache
+from .rag.src.storage import storage
+from .rag.src.executors import get_stage_executors, run_in_stage
+from .rag.src.collection_registry import CollectionRegistry, EmbeddingCache
+from .rag.src.chunk_store import ChunkStore
+from .rag.src.admission import AdmissionRejected, get_admission
+from .rag.src.config import COLLECTION_CONFIG, EXECUTOR_CONFIG, PROFILING_CONFIG
+from .rag.src.log import get_logger
+from .rag.src import log as log_module
+from .rag.src.tracing import get_tracer
+from .rag.src.session_store import close_session_store, get_session_store
+from .rag.src.profiler import get_profiler
+from .rag.src.metrics import (
+    MetricFamily,
+    PROMETHEUS_CONTENT_TYPE,
+    ServerTimingMiddleware,
+    registry as metrics_registry,
+    stage_timer,
+    timed,
+)
 
 
 import os
+import hmac
 import json
-import numpy as np
-import faiss
+import time
+import importlib
+import asyncio
+import logging
+from contextlib import asynccontextmanager
 
 from pydantic import BaseModel
 from typing import List, Union
 
 from dotenv import load_dotenv
-# LangSmith 트래킹 관련 임포트 수정
-from langsmith import Client, traceable
-import langsmith
-# OpenAI 래핑을 위한 임포트
-from langsmith.wrappers import wrap_openai
 
 load_dotenv()
 
-# LangChain 임포트
-from langchain_openai import ChatOpenAI
-from langchain_core.messages import SystemMessage, HumanMessage
-
-# LangSmith 설정
-# 이 변수들은 환경 변수에서 가져오거나 직접 설정할 수 있습니다
-LANGCHAIN_API_KEY = os.getenv("LANGCHAIN_API_KEY", "")
-LANGCHAIN_PROJECT = os.getenv("LANGCHAIN_PROJECT", "insupanda")
-LANGCHAIN_ENDPOINT = os.getenv("LANGCHAIN_ENDPOINT", "https://api.smith.langchain.com")
-
-# LangSmith 트래킹 활성화 (환경 변수로도 설정 가능)
-if LANGCHAIN_API_KEY:
-    os.environ["LANGCHAIN_TRACING_V2"] = "true"
-    os.environ["LANGCHAIN_PROJECT"] = LANGCHAIN_PROJECT
+logger = get_logger("main")
 
-    # LangSmith 클라이언트 초기화
-    # langsmith_client = Client(api_key=LANGCHAIN_API_KEY, api_url=LANGCHAIN_ENDPOINT)
-    # print("LangSmith 트래킹이 활성화되었습니다.")
-
-    # OpenAI 래핑 설정 (추후 OpenAI 클라이언트 사용 시)
-    try:
-        # OpenAI 클래스를 직접 래핑하는 대신 각 인스턴스별로 래핑
-        # from openai import OpenAI
-        # wrapped_openai = wrap_openai(OpenAI)  # 이 방식은 작동하지 않음
-        print("OpenAI 래핑은 get_upstage_embedding 메서드에서 개별적으로 수행됨")
-    except ImportError:
-        print("OpenAI SDK를 가져올 수 없습니다. OpenAI 래핑은 건너뜁니다.")
-else:
-    print("LangSmith API 키가 설정되지 않았습니다. 트래킹은 비활성화됩니다.")
+# langchain/openai/faiss는 import 비용이 커서 모듈 import 시점이 아니라 처음 사용할 때(또는 lifespan에서) 로드한다.
+# LangSmith 트레이싱은 rag/src/tracing.py (요청 단위 샘플링 + 백그라운드 전송)로만 보낸다.
+# LANGCHAIN_TRACING_V2를 켜면 LangChain이 모든 LLM 호출을 샘플링 없이 따로 전송하므로 켜지 않는다.
 
 
 class NestedQuery(BaseModel):
@@ -92,263 +97,195 @@ class RAGService:
     def __init__(self, upstage_api_key=None):
         # self.api_key = upstage_api_key or os.getenv("UPSTAGE_API_KEY")
         self.api_key = 
-        self.collections = []
-        self.cached_embeddings = {}
-        self.base_path = os.path.join(
+        self.registry = CollectionRegistry()
+        self.embedding_cache = EmbeddingCache()
+        # 외부 API 클라이언트는 처음 사용할 때(서버는 lifespan에서) 생성
+        self._embedding_client = None
+        self._chat_models = {}
+        self.base_path = os.getenv("VECTOR_DB_PATH") or os.path.join(
             os.path.dirname(os.path.dirname(__file__)), "./vector_db"
         )
-        self.collection_to_company_mapping = {
-            "DBSonBo_YakMu20250123": "DB손해보험",
-            "Samsung_YakMu2404103NapHae20250113": "삼성화재",
-            "HaNa_YakMuHaGaengPyo20250101": "하나손해보험",
-            "HanWha_YakHan20250201": "한화손해보험",
-            "Heung_YakMu250220250205": "흥국화재",
-            "HyunDai_YakMuSeH1Il2Nap20250213": "현대해상",
-            "KB_YakKSeHaeMu250120250214": "KB손해보험",
-            "LotteSonBo_YakMuLDeo25011220250101": "롯데손해보험",
-            "MGSonBo_YakMuWon2404Se20250101": "MG손해보험",
-            "Meritz_YakMu220250113": "메리츠화재",
-            "NH_YakMuN5250120250101": "NH농협손해보험"
-        }
+        self.collection_to_company_mapping = collection_company_mapping()
 
     def load_collection(self, collection_name):
         try:
-            # 컬렉션 이름 로깅 (디버깅용)
-            print(f"컬렉션 로드 요청 받음: '{collection_name}'")
-
-            # 이미 로드된 컬렉션 확인
-            for coll in self.collections:
-                if coll["name"] == collection_name:
-                    print(f"{collection_name} 컬렉션이 이미 로드되어 있습니다.")
-                    return True
-
-            # 하드코딩된 매핑 대신 동적으로 컬렉션 이름 사용
-            # 예외 처리: 알려진 별칭이 있는 경우 실제 디렉토리 이름으로 매핑
-            collection_mapping = {
-                # DB손해보험 관련 매핑
-                "db손해보험": "DBSonBo_YakMu20250123",
-                "DB손해보험": "DBSonBo_YakMu20250123",
-                "db손보": "DBSonBo_YakMu20250123",
-                "디비손해보험": "DBSonBo_YakMu20250123",
-                "디비손보": "DBSonBo_YakMu20250123",
-                "디비": "DBSonBo_YakMu20250123",
-                "DBSonbo_Yakwan20250123": "DBSonBo_YakMu20250123",
-
-                # 삼성화재 관련 매핑
-                "삼성화재": "Samsung_YakMu2404103NapHae20250113",
-                "삼성": "Samsung_YakMu2404103NapHae20250113",
-                "samsung": "Samsung_YakMu2404103NapHae20250113",
-
-                # 하나손해보험 관련 매핑
-                "하나손해보험": "HaNa_YakMuHaGaengPyo20250101",
-                "하나손보": "HaNa_YakMuHaGaengPyo20250101",
-                "하나": "HaNa_YakMuHaGaengPyo20250101",
-                "hana": "HaNa_YakMuHaGaengPyo20250101",
-
-                # 한화손해보험 관련 매핑
-                "한화손해보험": "HanWha_YakHan20250201",
-                "한화손보": "HanWha_YakHan20250201",
-                "한화": "HanWha_YakHan20250201",
-                "hanwha": "HanWha_YakHan20250201",
-
-                # 흥국화재 관련 매핑
-                "흥국화재": "Heung_YakMu250220250205",
-                "흥국": "Heung_YakMu250220250205",
-                "heung": "Heung_YakMu250220250205",
-                
+            # 로드된 컬렉션은 잠금 없이 확인하고, 처음 요청된 컬렉션은 한 스레드만 파일을 읽음
+            self.registry.get_or_load(collection_name, self._read_collection)
+            return True
+        except Exception as e:
+            logger.warning("%s 컬렉션 로드 중 오류: %s", collection_name, e)
+            return False
 
-                # 현대해상 관련 매핑
-                "현대해상": "HyunDai_YakMuSeH1Il2Nap20250213",
-                "현대": "HyunDai_YakMuSeH1Il2Nap20250213",
-                "hyundai": "HyunDai_YakMuSeH1Il2Nap20250213",
-
-                # KB손해보험 관련 매핑
-                "KB손해보험": "KB_YakKSeHaeMu250120250214",
-                "KB손보": "KB_YakKSeHaeMu250120250214",
-                "KB": "KB_YakKSeHaeMu250120250214",
-                "케이비": "KB_YakKSeHaeMu250120250214",
-
-                # 롯데손해보험 관련 매핑
-                "롯데손해보험": "LotteSonBo_YakMuLDeo25011220250101",
-                "롯데손보": "LotteSonBo_YakMuLDeo25011220250101",
-                "롯데": "LotteSonBo_YakMuLDeo25011220250101",
-                "lotte": "LotteSonBo_YakMuLDeo25011220250101",
-
-                # MG손해보험 관련 매핑
-                "MG손해보험": "MGSonBo_YakMuWon2404Se20250101",
-                "MG손보": "MGSonBo_YakMuWon2404Se20250101",
-                "MG": "MGSonBo_YakMuWon2404Se20250101",
-                "엠지": "MGSonBo_YakMuWon2404Se20250101",
-
-                # 메리츠화재 관련 매핑
-                "메리츠화재": "Meritz_YakMu220250113",
-                "메리츠": "Meritz_YakMu220250113",
-                "meritz": "Meritz_YakMu220250113",
-
-                # NH농협손해보험 관련 매핑
-                "NH농협손해보험": "NH_YakMuN5250120250101",
-                "NH손해보험": "NH_YakMuN5250120250101",
-                "농협손해보험": "NH_YakMuN5250120250101",
-                "NH손보": "NH_YakMuN5250120250101",
-                "농협손보": "NH_YakMuN5250120250101",
-                "NH": "NH_YakMuN5250120250101",
-                "농협": "NH_YakMuN5250120250101",
-            }
+    @timed("load")
+    def _read_collection(self, collection_name):
+        """FAISS 인덱스와 메타데이터 파일을 읽어 컬렉션 항목 생성 (실패 시 예외)"""
+        import faiss
+        import numpy as np
 
-            # 로깅을 위한 원래 이름 저장
-            original_name = collection_name
+        # 컬렉션 이름 로깅 (디버깅용)
+        logger.debug("컬렉션 로드 요청 받음: '%s'", collection_name)
 
-            # 매핑 적용
-            actual_collection_name = collection_mapping.get(
-                collection_name, collection_name
-            )
+        # 로깅을 위한 원래 이름 저장
+        original_name = collection_name
 
-            # 원본 이름과 매핑된 이름이 다른 경우 로그 출력
-            if original_name != actual_collection_name:
-                print(f"자동 변환: '{original_name}' -> '{actual_collection_name}'")
+        # 보험사 이름/별칭이면 COMPANY_REGISTRY의 실제 디렉토리 이름으로 변환
+        actual_collection_name = resolve_collection_name(collection_name)
 
-            # 추가 로깅으로 클라이언트 요청 정보 기록
-            print(
-                f"컬렉션 요청 정보: 원본={original_name}, 매핑 후={actual_collection_name}"
-            )
+        # 원본 이름과 매핑된 이름이 다른 경우 로그 출력
+        if original_name != actual_collection_name:
+            logger.info("자동 변환: '%s' -> '%s'", original_name, actual_collection_name)
 
-            # 만약 존재하지 않는 경로일 경우 추가 처리
-            if not os.path.exists(os.path.join(self.base_path, actual_collection_name)):
-                print(
-                    f"경로가 존재하지 않음: {os.path.join(self.base_path, actual_collection_name)}"
-                )
+        # 만약 존재하지 않는 경로일 경우 추가 처리
+        if not os.path.exists(os.path.join(self.base_path, actual_collection_name)):
+            logger.warning(
+                "경로가 존재하지 않음: %s (사용 가능한 컬렉션 디렉토리: %s)",
+                os.path.join(self.base_path, actual_collection_name),
+                os.listdir(self.base_path),
+            )
 
-                # 실제 존재하는 모든 컬렉션 디렉토리 확인
-                print(f"사용 가능한 컬렉션 디렉토리:")
+            # sonbo/SONBO/Sonbo 대소문자 문제 처리
+            if (
+                "sonbo" in actual_collection_name.lower()
+                or "손보" in actual_collection_name
+            ):
+                # 실제 존재하는 디렉토리 찾기
                 for dir_name in os.listdir(self.base_path):
-                    print(f"  - {dir_name}")
-
-                # sonbo/SONBO/Sonbo 대소문자 문제 처리
-                if (
-                    "sonbo" in actual_collection_name.lower()
-                    or "손보" in actual_collection_name
-                ):
-                    print("DB손해보험 관련 컬렉션 찾는 중...")
-                    # 실제 존재하는 디렉토리 찾기
-                    for dir_name in os.listdir(self.base_path):
-                        if "sonbo" in dir_name.lower() or "SonBo" in dir_name:
-                            actual_collection_name = dir_name
-                            print(f"DB손해보험 컬렉션 찾음: {dir_name}")
-                            break
-
-            print(f"컬렉션 로드 시도: '{original_name}' -> '{actual_collection_name}'")
-
-            collection_dir = os.path.join(self.base_path, actual_collection_name)
-            possible_index_files = ["index.faiss", "faiss.index", "index"]
-            index_path = None
-            for idx_file in possible_index_files:
-                temp_path = os.path.join(collection_dir, idx_file)
-                if os.path.exists(temp_path):
-                    index_path = temp_path
-                    print(f"인덱스 파일을 찾았습니다: {idx_file}")
-                    break
-
-            if not index_path:
-                raise FileNotFoundError(
-                    f"인덱스 파일을 찾을 수 없습니다: {collection_dir}"
-                )
-
-            metadata_path = os.path.join(collection_dir, "metadata.json")
-            if not os.path.exists(metadata_path):
-                raise FileNotFoundError(
-                    f"메타데이터 파일을 찾을 수 없습니다: {metadata_path}"
-                )
-
-            index = faiss.read_index(index_path)
+                    if "sonbo" in dir_name.lower() or "SonBo" in dir_name:
+                        actual_collection_name = dir_name
+                        logger.info("DB손해보험 컬렉션 찾음: %s", dir_name)
+                        break
+
+        logger.debug("컬렉션 로드 시도: '%s' -> '%s'", original_name, actual_collection_name)
+
+        collection_dir = os.path.join(self.base_path, actual_collection_name)
+        possible_index_files = ["index.faiss", "faiss.index", "index"]
+        index_path = None
+        for idx_file in possible_index_files:
+            temp_path = os.path.join(collection_dir, idx_file)
+            if os.path.exists(temp_path):
+                index_path = temp_path
+                logger.debug("인덱스 파일을 찾았습니다: %s", idx_file)
+                break
+
+        if not index_path:
+            raise FileNotFoundError(
+                f"인덱스 파일을 찾을 수 없습니다: {collection_dir}"
+            )
 
-            # 인덱스 타입 확인
-            index_type = type(index).__name__
-            print(f"로드된 인덱스 타입: {index_type}")
+        metadata_path = os.path.join(collection_dir, "metadata.json")
+        if not os.path.exists(metadata_path):
+            raise FileNotFoundError(
+                f"메타데이터 파일을 찾을 수 없습니다: {metadata_path}"
+            )
 
-            # 인덱스 정보 출력
-            print(f"인덱스 차원: {index.d}, 벡터 수: {index.ntotal}")
+        index = faiss.read_index(index_path)
 
-            # L2 인덱스를 내적(코사인 유사도) 인덱스로 변환
-            if isinstance(index, faiss.IndexFlatL2) or "L2" in index_type:
-                print("유클리드 거리 인덱스를 코사인 유사도 인덱스로 변환합니다...")
-                try:
-                    # 벡터 추출 시도
-                    vectors = index.reconstruct_n(0, index.ntotal)
+        # 인덱스 타입 확인
+        index_type = type(index).__name__
+        logger.debug("로드된 인덱스: %s, 차원: %d, 벡터 수: %d", index_type, index.d, index.ntotal)
 
-                    # 벡터 통계 확인
-                    print(f"추출된 벡터 형태: {vectors.shape}")
-                    print(
-                        f"벡터 통계: 최소값={np.min(vectors)}, 최대값={np.max(vectors)}"
-                    )
+        # L2 인덱스를 내적(코사인 유사도) 인덱스로 변환
+        if isinstance(index, faiss.IndexFlatL2) or "L2" in index_type:
+            logger.info("%s: 유클리드 거리 인덱스를 코사인 유사도 인덱스로 변환합니다.", collection_name)
+            try:
+                # 벡터 추출 시도
+                vectors = index.reconstruct_n(0, index.ntotal)
 
-                    # 벡터 노름 확인
+                # 전체 행렬 통계는 디버그 로그가 켜져 있을 때만 계산
+                debug = logger.isEnabledFor(logging.DEBUG)
+                if debug:
                     norms = np.linalg.norm(vectors, axis=1)
-                    print(
-                        f"변환 전 벡터 노름 - 평균: {np.mean(norms)}, 최소: {np.min(norms)}, 최대: {np.max(norms)}"
+                    logger.debug(
+                        "변환 전 벡터 %s - 최소값: %s, 최대값: %s, 노름 평균: %s, 최소: %s, 최대: %s",
+                        vectors.shape, np.min(vectors), np.max(vectors),
+                        np.mean(norms), np.min(norms), np.max(norms),
                     )
 
-                    # 정규화 수행
-                    faiss.normalize_L2(vectors)
+                # 정규화 수행
+                faiss.normalize_L2(vectors)
 
-                    # 정규화 후 노름 확인
+                if debug:
                     norms_after = np.linalg.norm(vectors, axis=1)
-                    print(
-                        f"변환 후 벡터 노름 - 평균: {np.mean(norms_after)}, 최소: {np.min(norms_after)}, 최대: {np.max(norms_after)}"
+                    logger.debug(
+                        "변환 후 벡터 노름 - 평균: %s, 최소: %s, 최대: %s",
+                        np.mean(norms_after), np.min(norms_after), np.max(norms_after),
                     )
 
-                    # 새 내적 인덱스 생성
-                    new_index = faiss.IndexFlatIP(index.d)
-                    new_index.add(vectors)
-
-                    print(
-                        f"변환 완료: {index.ntotal}개 벡터가 코사인 유사도 인덱스로 변환됨"
-                    )
-                    index = new_index
-                except Exception as e:
-                    print(f"인덱스 변환 중 오류: {e}")
-                    print("원본 인덱스를 계속 사용합니다.")
-
-            # 메타데이터 파일 로드 및 디버깅
-            with open(metadata_path, "r", encoding="utf-8") as f:
-                metadata_raw = json.load(f)
-
-            # 메타데이터 형식 확인 및 변환
-            if isinstance(metadata_raw, list):
-                print(f"메타데이터가 리스트 형식입니다. 딕셔너리로 변환합니다.")
-                metadata = {}
-                for i, item in enumerate(metadata_raw):
-                    metadata[str(i)] = item
-                print(f"리스트를 딕셔너리로 변환 완료: {len(metadata)}개 항목")
-            else:
-                metadata = metadata_raw
+                # 새 내적 인덱스 생성
+                new_index = faiss.IndexFlatIP(index.d)
+                new_index.add(vectors)
+                index = new_index
+            except Exception as e:
+                logger.warning("인덱스 변환 중 오류, 원본 인덱스를 계속 사용합니다: %s", e)
+
+        # 메타데이터 파일 로드 및 디버깅
+        with open(metadata_path, "r", encoding="utf-8") as f:
+            metadata_raw = json.load(f)
+
+        # 메타데이터 형식 확인 및 변환
+        if isinstance(metadata_raw, list):
+            metadata = {}
+            for i, item in enumerate(metadata_raw):
+                metadata[str(i)] = item
+            logger.debug("리스트 형식 메타데이터를 딕셔너리로 변환: %d개 항목", len(metadata))
+        else:
+            metadata = metadata_raw
 
-            # 메타데이터 형식 분석
-            metadata_count = len(metadata)
+        # 메타데이터 형식 분석 (디버그 로그가 켜져 있을 때만)
+        if logger.isEnabledFor(logging.DEBUG):
             sample_keys = list(metadata.keys())[:5]
-            print(f"메타데이터 항목 수: {metadata_count}")
-            print(f"메타데이터 샘플 키: {sample_keys}")
-            if sample_keys:
-                key_types = [type(k) for k in sample_keys]
-                print(f"메타데이터 키 타입: {key_types}")
-
-                # 첫 번째 메타데이터 항목 내용 확인
-                first_item = metadata[sample_keys[0]]
-                print(
-                    f"메타데이터 첫 항목: {first_item.keys() if isinstance(first_item, dict) else 'Not a dict'}"
-                )
+            first_item = metadata[sample_keys[0]] if sample_keys else None
+            logger.debug(
+                "메타데이터 샘플 키: %s, 키 타입: %s, 첫 항목: %s",
+                sample_keys,
+                [type(k).__name__ for k in sample_keys],
+                list(first_item.keys()) if isinstance(first_item, dict) else "Not a dict",
+            )
+
+        # 청크 메타데이터는 하나의 바이트 버퍼로 보관 (fork 후에도 공유 페이지 유지)
+        metadata = ChunkStore(metadata)
+        logger.info(
+            "컬렉션 로드 완료",
+            extra={"collection": collection_name, "vectors": index.ntotal, "chunks": len(metadata)},
+        )
+        return {"name": collection_name, "index": index, "metadata": metadata}
+
+    @property
+    def collections(self):
+        """로드된 컬렉션 목록 (잠금 없이 읽는 스냅샷)"""
+        return self.registry.snapshot()
+
+    def get_embedding_client(self):
+        """Upstage 임베딩용 OpenAI 호환 클라이언트 (한 번만 생성해 커넥션 재사용)"""
+        if self._embedding_client is None:
+            from openai import OpenAI
 
-            self.collections.append(
-                {"name": collection_name, "index": index, "metadata": metadata}
+            self._embedding_client = OpenAI(
+                api_key=self.api_key, base_url=COLLECTION_CONFIG["embedding_base_url"]
             )
-            print(f"{collection_name} 컬렉션 로드 완료: {len(metadata)}개 벡터")
-            return True
-        except Exception as e:
-            print(f"{collection_name} 컬렉션 로드 중 오류: {e}")
-            return False
+        return self._embedding_client
+
+    def get_chat_model(self, openai_api_key):
+        """답변 생성용 ChatOpenAI (API 키별로 한 번만 생성)"""
+        chat = self._chat_models.get(openai_api_key)
+        if chat is None:
+            from langchain_openai import ChatOpenAI
+
+            chat = self._chat_models[openai_api_key] = ChatOpenAI(
+                api_key=openai_api_key,
+                temperature=0.7,
+                max_tokens=2000,
+                model="gpt-4o-mini",
+            )
+        return chat
 
     def get_upstage_embedding(self, text):
-        if text in self.cached_embeddings:
-            return self.cached_embeddings[text]
+        import faiss
+        import numpy as np
+
+        cached = self.embedding_cache.get(text)
+        if cached is not None:
+            return cached
 
         if not self.api_key or len(self.api_key) < 10:
             raise ValueError(
@@ -356,54 +293,44 @@ class RAGService:
             )
 
         try:
-            # OpenAI 클라이언트 생성
-            from openai import OpenAI
-
-            client = OpenAI(
-                api_key=self.api_key, base_url="https://api.upstage.ai/v1/solar"
-            )
-
-            # LangSmith 트래킹이 활성화된 경우 클라이언트 래핑
-            if os.getenv("LANGCHAIN_API_KEY"):
-                from langsmith.wrappers import wrap_openai
-
-                client = wrap_openai(client)  # 인스턴스를 래핑
+            client = self.get_embedding_client()
 
             # 임베딩 생성 요청과 트래킹
-            with langsmith.trace(
+            with get_tracer().trace(
                 name="upstage_embedding",
-                project_name=LANGCHAIN_PROJECT,
                 tags=["insupanda", "embedding"],
                 metadata={"text_length": len(text)},
             ) as run:
-                response = client.embeddings.create(input=text, model="embedding-query")
+                with stage_timer("embedding"):
+                    response = client.embeddings.create(input=text, model="embedding-query")
                 embedding = response.data[0].embedding
 
-                print(f"임베딩 생성 성공, 차원: {len(embedding)}")
-
                 vector = np.array(embedding, dtype=np.float32).reshape(1, -1)
                 # 원본 벡터 차원 저장
                 original_dim = vector.shape[1]
 
                 # 정규화 이전 벡터 노름 계산
                 norm_before = np.linalg.norm(vector)
-                print(f"정규화 전 벡터 노름: {norm_before}")
 
                 # L2 정규화 수행
                 faiss.normalize_L2(vector)
 
                 # 정규화 이후 벡터 노름 확인 (항상 1에 가까워야 함)
                 norm_after = np.linalg.norm(vector)
-                print(f"정규화 후 벡터 노름: {norm_after}")
 
-                # 벡터 통계치 확인
-                print(
-                    f"벡터 통계: 최소값={np.min(vector)}, 최대값={np.max(vector)}, 평균={np.mean(vector)}"
+                logger.debug(
+                    "임베딩 생성 성공, 차원: %d, 정규화 전/후 노름: %s/%s",
+                    original_dim, norm_before, norm_after,
                 )
-                print(f"내적 기반 검색을 위해 준비된 임베딩 형태: {vector.shape}")
+                # 벡터 통계는 디버그 로그가 켜져 있을 때만 계산
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(
+                        "벡터 통계: 최소값=%s, 최대값=%s, 평균=%s",
+                        np.min(vector), np.max(vector), np.mean(vector),
+                    )
 
                 # 결과 캐싱 및 메타데이터 추가
-                self.cached_embeddings[text] = vector
+                self.embedding_cache.put(text, vector)
                 if run:
                     run.add_metadata(
                         {
@@ -416,11 +343,10 @@ class RAGService:
 
                 return vector
         except Exception as e:
-            print(f"임베딩 생성 오류: {e}")
-            if os.getenv("LANGCHAIN_API_KEY"):
-                with langsmith.trace(
+            logger.error("임베딩 생성 오류: %s", e)
+            if get_tracer().enabled:
+                with get_tracer().trace(
                     name="embedding_error",
-                    project_name=LANGCHAIN_PROJECT,
                     tags=["insupanda", "error", "embedding"],
                     metadata={"error": str(e)},
                 ) as error_run:
@@ -432,7 +358,156 @@ class RAGService:
                 "임베딩 생성에 실패했습니다. API 키와 네트워크 상태를 확인하세요."
             )
 
+    def get_upstage_embeddings(self, texts):
+        """
+        여러 질문의 임베딩을 (질문 수, 차원) 행렬로 반환
+
+        캐시에 없는 질문만 중복 없이 embedding_batch_size개씩 묶어 한 번의 API 요청으로 만든다.
+        """
+        import faiss
+        import numpy as np
+
+        vectors = {}
+        missing = []
+        for text in dict.fromkeys(texts):
+            cached = self.embedding_cache.get(text)
+            if cached is not None:
+                vectors[text] = cached.reshape(-1)
+            else:
+                missing.append(text)
+
+        if missing:
+            if not self.api_key or len(self.api_key) < 10:
+                raise ValueError("유효한 Upstage API 키가 없습니다.")
+
+            client = self.get_embedding_client()
+            batch_size = COLLECTION_CONFIG["embedding_batch_size"]
+            with get_tracer().trace(
+                name="upstage_embedding_batch",
+                tags=["insupanda", "embedding"],
+                metadata={"texts": len(missing), "batch_size": batch_size},
+            ):
+                for start in range(0, len(missing), batch_size):
+                    chunk = missing[start : start + batch_size]
+                    with stage_timer("embedding"):
+                        response = client.embeddings.create(input=chunk, model="embedding-query")
+                    # 응답 순서가 아니라 index 기준으로 질문과 맞춤
+                    data = sorted(response.data, key=lambda item: item.index)
+                    matrix = np.array([item.embedding for item in data], dtype=np.float32)
+                    faiss.normalize_L2(matrix)
+                    for text, vector in zip(chunk, matrix):
+                        self.embedding_cache.put(text, vector.reshape(1, -1))
+                        vectors[text] = vector
+            logger.debug("배치 임베딩 생성: %d개 (캐시 적중 %d개)", len(missing), len(vectors) - len(missing))
+
+        return np.vstack([vectors[text] for text in texts]).astype(np.float32, copy=False)
+
+    @staticmethod
+    def _fit_query_matrix(matrix, dimension):
+        """질문 벡터 행렬을 인덱스 차원에 맞추고(0 패딩 또는 자름) 다시 L2 정규화"""
+        import faiss
+        import numpy as np
+
+        if matrix.shape[1] < dimension:
+            fitted = np.zeros((matrix.shape[0], dimension), dtype=np.float32)
+            fitted[:, : matrix.shape[1]] = matrix
+        else:
+            fitted = np.ascontiguousarray(matrix[:, :dimension], dtype=np.float32)
+        faiss.normalize_L2(fitted)
+        return fitted
+
+    def search_batch(self, queries, collection_names=None, top_k=2):
+        """
+        여러 질문을 한 번에 검색해 질문별 {query, collections, results} 목록 반환
+
+        collection_names가 없으면 질문마다 보험사 키워드로 컬렉션을 고른다.
+        컬렉션마다 그 컬렉션을 쓰는 질문들의 벡터 행렬로 index.search를 한 번만 호출하고,
+        질문별 결과는 점수가 높은 순으로 정렬한다.
+        """
+        import numpy as np
+
+        if collection_names:
+            targets = [list(collection_names)] * len(queries)
+        else:
+            available_collections = [
+                d
+                for d in os.listdir(self.base_path)
+                if os.path.isdir(os.path.join(self.base_path, d))
+            ]
+            targets = [
+                self.find_matching_collections(query, available_collections) for query in queries
+            ]
+
+        # 컬렉션 이름 -> 그 컬렉션을 검색할 질문 위치 목록
+        positions_by_collection = {}
+        for position, names in enumerate(targets):
+            for name in names:
+                positions_by_collection.setdefault(name, []).append(position)
+
+        for name in positions_by_collection:
+            self.load_collection(name)
+        loaded = {c["name"]: c for c in self.collections if c["name"] in positions_by_collection}
+
+        results = [[] for _ in queries]
+        with get_tracer().trace(
+            name="vector_search_batch",
+            tags=["insupanda", "vector_search"],
+            metadata={
+                "queries": len(queries),
+                "collections": list(positions_by_collection),
+                "top_k": top_k,
+            },
+        ) as run:
+            embeddings = self.get_upstage_embeddings(queries) if positions_by_collection else None
+
+            for name, positions in positions_by_collection.items():
+                collection = loaded.get(name)
+                if collection is None:
+                    continue
+                index = collection["index"]
+                metadata = collection["metadata"]
+                matrix = self._fit_query_matrix(embeddings[positions], index.d)
+
+                with stage_timer("faiss"):
+                    distances, indices = index.search(matrix, top_k)
+                # 내적 값(-1~1)을 0~1 점수로 변환 (높을수록 유사)
+                scores = (np.minimum(distances, 1.0) + 1) / 2
+
+                for row, position in enumerate(positions):
+                    for idx, score in zip(indices[row], scores[row]):
+                        if idx == -1:
+                            continue
+                        doc_id = str(idx)
+                        results[position].append(
+                            {
+                                "collection": name,
+                                "id": doc_id,
+                                "score": float(score),
+                                "metadata": metadata[doc_id]
+                                if doc_id in metadata
+                                else {"text": f"인덱스 {idx}의 메타데이터를 찾을 수 없습니다."},
+                            }
+                        )
+
+            for ranked in results:
+                ranked.sort(key=lambda x: x["score"], reverse=True)
+
+            if run:
+                run.add_metadata({"result_count": sum(len(ranked) for ranked in results)})
+
+        logger.info(
+            "배치 벡터 검색 완료",
+            extra={"queries": len(queries), "collections": list(loaded)},
+        )
+        return [
+            {"query": query, "collections": names, "results": ranked}
+            for query, names, ranked in zip(queries, targets, results)
+        ]
+
     def search(self, query, collection_names=None, top_k=2):
+        import faiss
+        import numpy as np
+
         if not self.collections:
             return [
                 {
@@ -459,16 +534,17 @@ class RAGService:
                 }
             ]
 
-        print(f"\n-------- 벡터 검색 시작 --------")
-        print(f"쿼리: '{query}'")
-        print(f"대상 컬렉션: {[c['name'] for c in use_collections]}")
-        print(f"각 컬렉션당 top_k: {top_k}")
+        debug = logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            logger.debug(
+                "벡터 검색 시작: '%s', 대상 컬렉션: %s, top_k: %d",
+                query, [c["name"] for c in use_collections], top_k,
+            )
 
         try:
             # LangSmith로 임베딩 생성 및 검색 과정 트래킹
-            with langsmith.trace(
+            with get_tracer().trace(
                 name="vector_search",
-                project_name=LANGCHAIN_PROJECT,
                 tags=["insupanda", "vector_search"],
                 metadata={
                     "query": query,
@@ -477,22 +553,15 @@ class RAGService:
                 },
             ) as run:
                 query_embedding = self.get_upstage_embedding(query)
-                # 임베딩 형태 출력
-                print(
-                    f"쿼리 임베딩 형태: {type(query_embedding)}, 타입: {query_embedding.dtype}"
-                )
                 if isinstance(query_embedding, list):
                     query_embedding = np.array(
                         query_embedding, dtype=np.float32
                     ).reshape(1, -1)
-                    print(f"리스트에서 배열로 변환됨: {query_embedding.shape}")
 
                 if len(query_embedding.shape) == 1:
                     query_embedding = query_embedding.reshape(1, -1)
-                    print(f"1D 배열에서 2D로 변환됨: {query_embedding.shape}")
 
                 query_dim = query_embedding.shape[1]
-                print(f"쿼리 임베딩 차원: {query_dim}")
 
                 # 각 컬렉션에서 항상 top_k개의 문서 검색
                 for collection in use_collections:
@@ -501,63 +570,49 @@ class RAGService:
                         metadata = collection["metadata"]
                         collection_name = collection["name"]
 
-                        print(f"\n검색 중: {collection_name} 컬렉션")
-                        print(f"인덱스 차원: {index.d}, 인덱스 타입: {type(index)}")
-                        print(
-                            f"메타데이터 타입: {type(metadata)}, 항목 수: {len(metadata)}"
-                        )
-
                         if query_dim != index.d:
-                            print(f"차원 불일치: 쿼리={query_dim}, 인덱스={index.d}")
+                            logger.warning(
+                                "%s: 차원 불일치 (쿼리=%d, 인덱스=%d), 쿼리 벡터를 맞춥니다.",
+                                collection_name, query_dim, index.d,
+                            )
                             # 차원이 다른 경우 벡터를 올바른 차원으로 패딩하거나 자름
                             if query_dim < index.d:
                                 # 패딩: 부족한 차원을 0으로 채움
                                 padded = np.zeros((1, index.d), dtype=np.float32)
                                 padded[0, :query_dim] = query_embedding[0, :]
                                 query_embedding = padded
-                                print(
-                                    f"쿼리 벡터를 {query_dim}에서 {index.d}로 패딩했습니다."
-                                )
                             else:
                                 # 자름: 여분의 차원을 제거
                                 query_embedding = query_embedding[0, : index.d].reshape(
                                     1, -1
                                 )
-                                print(
-                                    f"쿼리 벡터를 {query_dim}에서 {index.d}로 잘랐습니다."
-                                )
 
                         # L2 정규화 다시 적용
                         faiss.normalize_L2(query_embedding)
 
-                        # 검색 전 벡터 상태 로깅
                         query_norm = np.linalg.norm(query_embedding)
-                        print(f"검색 전 쿼리 벡터 노름: {query_norm}")
-
                         # 노름이 1과 크게 차이나면 경고
                         if abs(query_norm - 1.0) > 1e-5:
-                            print(f"경고: 쿼리 벡터 노름이 1이 아닙니다: {query_norm}")
+                            logger.warning("쿼리 벡터 노름이 1이 아닙니다: %s", query_norm)
                             # 강제로 정규화
                             query_embedding = query_embedding / query_norm
-                            print(
-                                f"강제 정규화 후 노름: {np.linalg.norm(query_embedding)}"
-                            )
-
-                        print(f"검색 쿼리 차원: {query_embedding.shape}")
 
                         # 각 컬렉션에서 항상 top_k개의 문서 검색
-                        distances, indices = index.search(query_embedding, top_k)
+                        with stage_timer("faiss"):
+                            distances, indices = index.search(query_embedding, top_k)
 
                         # 내적 값이 1보다 크면 경고
                         if np.any(distances > 1.01):  # 약간의 오차 허용
-                            print(
-                                f"경고: 내적 값이 1보다 큽니다. 최댓값: {np.max(distances)}"
-                            )
+                            logger.warning("내적 값이 1보다 큽니다. 최댓값: %s", np.max(distances))
                             # 내적 값이 1을 초과하는 경우 1로 제한
                             distances = np.minimum(distances, 1.0)
 
                         # 내적 기반 검색에서는 값이 클수록 유사도가 높음
-                        print(f"검색 결과: 내적 값={distances}, 인덱스={indices}")
+                        if debug:
+                            logger.debug(
+                                "%s 검색 결과: 내적 값=%s, 인덱스=%s",
+                                collection_name, distances.tolist(), indices.tolist(),
+                            )
 
                         # 유사도 점수 변환 (내적 값은 -1~1 범위, 높을수록 유사)
                         # 결과를 0~1 범위로 정규화 (옵션)
@@ -571,13 +626,8 @@ class RAGService:
                                 # 메타데이터에서 해당 인덱스의 정보 가져오기
                                 doc_id = str(idx)
 
-                                # 디버깅: 메타데이터 키 확인
-                                print(f"메타데이터 키 검색: {doc_id}")
-                                print(f"메타데이터 키 타입: {type(doc_id)}")
-
                                 # 메타데이터 키가 존재하는지 확인
                                 if doc_id in metadata:
-                                    print(f"메타데이터에서 키 {doc_id} 찾음")
                                     doc_metadata = metadata[doc_id]
                                     # 결과 추가 (점수는 높을수록 유사함을 의미)
                                     collection_results.append(
@@ -592,14 +642,13 @@ class RAGService:
                                     )
                                 else:
                                     # 키가 존재하지 않으면 다른 형식으로 시도
-                                    print(
-                                        f"메타데이터에서 키 {doc_id} 찾을 수 없음. 다른 형식 시도..."
+                                    logger.debug(
+                                        "메타데이터에서 키 %s 찾을 수 없음. 다른 형식 시도", doc_id
                                     )
 
                                     # 정수 키로 시도
                                     int_id = str(int(idx))
                                     if int_id in metadata:
-                                        print(f"정수 키 {int_id}로 찾음")
                                         doc_metadata = metadata[int_id]
                                         collection_results.append(
                                             {
@@ -616,8 +665,9 @@ class RAGService:
                                             idx_int = int(idx)
                                             meta_len = len(metadata)
                                             if 0 <= idx_int < meta_len:
-                                                print(
-                                                    f"인덱스 {idx_int}를 배열 접근으로 시도 (배열 길이: {meta_len})"
+                                                logger.debug(
+                                                    "인덱스 %d를 배열 접근으로 시도 (배열 길이: %d)",
+                                                    idx_int, meta_len,
                                                 )
                                                 try:
                                                     # 리스트로 변환된 딕셔너리에서 키로 접근
@@ -625,7 +675,6 @@ class RAGService:
                                                     if idx_int < len(list_keys):
                                                         key = list_keys[idx_int]
                                                         doc_metadata = metadata[key]
-                                                        print(f"변환된 키 {key}로 찾음")
                                                         collection_results.append(
                                                             {
                                                                 "collection": collection_name,
@@ -636,17 +685,14 @@ class RAGService:
                                                         )
                                                         continue
                                                 except Exception as e:
-                                                    print(f"키 변환 접근 오류: {e}")
+                                                    logger.debug("키 변환 접근 오류: %s", e)
                                         except Exception as e:
-                                            print(f"인덱스 기반 접근 시도 중 오류: {e}")
-
-                                        # 메타데이터 키 출력 (처음 10개만)
-                                        meta_keys = list(metadata.keys())[:10]
-                                        print(f"메타데이터 샘플 키: {meta_keys}")
+                                            logger.debug("인덱스 기반 접근 시도 중 오류: %s", e)
 
                                         # 모든 방법 실패 시 기본 메타데이터 생성
-                                        print(
-                                            f"모든 키 검색 실패, 기본 메타데이터 사용"
+                                        logger.warning(
+                                            "%s: 인덱스 %s의 메타데이터를 찾을 수 없어 기본 메타데이터 사용",
+                                            collection_name, idx,
                                         )
                                         collection_results.append(
                                             {
@@ -673,21 +719,17 @@ class RAGService:
                         # all_results에 collection_results 추가
                         all_results.extend(collection_results)
 
-                        print(
-                            f"{collection_name} 컬렉션에서 {len(collection_results)}개 결과 찾음"
-                        )
-                        # 각 청크의 시작 부분 미리보기 출력
-                        for i, result in enumerate(collection_results):
-                            text = result.get("metadata", {}).get("text", "")
-                            preview = text[:100] + "..." if text else "텍스트 없음"
-                            print(
-                                f"  청크 {i+1}: 점수={result['score']:.4f}, 미리보기: {preview}"
-                            )
+                        # 각 청크의 시작 부분 미리보기 (디버그 로그가 켜져 있을 때만)
+                        if debug:
+                            for i, result in enumerate(collection_results):
+                                text = result.get("metadata", {}).get("text", "")
+                                logger.debug(
+                                    "%s 청크 %d: 점수=%.4f, 미리보기: %s",
+                                    collection_name, i + 1, result["score"],
+                                    text[:100] + "..." if text else "텍스트 없음",
+                                )
                     except Exception as e:
-                        print(f"컬렉션 '{collection_name}' 검색 중 오류: {e}")
-                        import traceback
-
-                        print(f"상세 오류 정보: {traceback.format_exc()}")
+                        logger.exception("컬렉션 '%s' 검색 중 오류: %s", collection_name, e)
                         if run:
                             run.add_metadata(
                                 {
@@ -699,8 +741,13 @@ class RAGService:
                 # 결과를 점수에 따라 정렬
                 all_results.sort(key=lambda x: x["score"])
 
-                print(f"\n총 {len(all_results)}개 청크 검색됨")
-                print(f"-------- 벡터 검색 완료 --------\n")
+                logger.info(
+                    "벡터 검색 완료",
+                    extra={
+                        "collections": [c["name"] for c in use_collections],
+                        "chunks": len(all_results),
+                    },
+                )
 
                 # 트레이싱 메타데이터 업데이트
                 if run:
@@ -727,11 +774,10 @@ class RAGService:
                 )
 
         except Exception as e:
-            print(f"벡터 검색 중 오류: {e}")
-            if os.getenv("LANGCHAIN_API_KEY"):
-                with langsmith.trace(
+            logger.error("벡터 검색 중 오류: %s", e)
+            if get_tracer().enabled:
+                with get_tracer().trace(
                     name="vector_search_error",
-                    project_name=LANGCHAIN_PROJECT,
                     tags=["insupanda", "error"],
                     metadata={"error": str(e), "query": query},
                 ) as error_run:
@@ -748,17 +794,8 @@ class RAGService:
                 }
             ]
 
-    def generate_answer(self, query, search_results, openai_api_key):
-        if not search_results:
-            return "검색 결과가 없습니다. 다른 질문을 시도해보세요."
-        if not openai_api_key:
-            return "OpenAI API key가 제공되지 않았습니다. 환경 변수 OPENAI_API_KEY를 설정해주세요."
-
-        print(f"\n-------- 답변 생성 시작 --------")
-        print(f"질문: '{query}'")
-        print(f"검색 결과 수: {len(search_results)}")
-
-        # 검색 결과를 보험사별로 그룹화
+    def build_context(self, search_results):
+        """검색 결과를 보험사별로 묶어 LLM 컨텍스트 문자열 생성 -> (컨텍스트, 보험사별 결과)"""
         company_results = {}
         for result in search_results:
             collection_name = result.get("collection", "")
@@ -767,19 +804,16 @@ class RAGService:
                 company_results[company_name] = []
             company_results[company_name].append(result)
 
-        print(f"검색된 보험사 수: {len(company_results)}")
-        for company, results in company_results.items():
-            print(f"- {company}: {len(results)}개 청크")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "보험사별 청크 수: %s",
+                {company: len(results) for company, results in company_results.items()},
+            )
 
         # 보험사별 컨텍스트 생성
         context = ""
         multiple_companies = len(company_results) > 1
 
-        if multiple_companies:
-            print(f"\n여러 보험사 비교 컨텍스트 생성 중...")
-        else:
-            print(f"\n단일 보험사 컨텍스트 생성 중...")
-
         for company, results in company_results.items():
             company_context = ""
 
@@ -792,53 +826,44 @@ class RAGService:
                     company_context += f"\n---\n{text}"
 
             context += company_context
-            text_preview = (
-                company_context[:150] + "..."
-                if len(company_context) > 150
-                else company_context
-            )
-            print(f"{company} 컨텍스트: {text_preview}")
+            logger.debug("%s 컨텍스트: %.150s", company, company_context)
+
+        return context, company_results
+
+    @timed("generation")
+    def generate_answer(self, query, search_results, openai_api_key):
+        if not search_results:
+            return "검색 결과가 없습니다. 다른 질문을 시도해보세요."
+        if not openai_api_key:
+            return "OpenAI API key가 제공되지 않았습니다. 환경 변수 OPENAI_API_KEY를 설정해주세요."
+
+        logger.debug("답변 생성 시작: '%s', 검색 결과 수: %d", query, len(search_results))
+
+        context, company_results = self.build_context(search_results)
+        multiple_companies = len(company_results) > 1
 
         if not context:
             return "관련 정보를 찾을 수 없습니다. 더 구체적인 질문을 해주시거나, 다른 키워드를 사용해보세요."
 
         # 비교 요청인지 감지
-        query_lower = query.lower()
-        comparison_keywords = [
-            "비교",
-            "차이",
-            "다른",
-            "다른점",
-            "비교해",
-            "비교해줘",
-            "차이점",
-            "알려줘",
-            "뭐가 더 나은가",
-        ]
-        detected_comparison_keywords = [
-            kw for kw in comparison_keywords if kw in query_lower
-        ]
+        detected_comparison_keywords = match_question(query).comparison_keywords
         is_comparison = len(detected_comparison_keywords) > 0
 
         if is_comparison:
-            print(f"비교 질문 감지: {detected_comparison_keywords}")
+            logger.debug("비교 질문 감지: %s", detected_comparison_keywords)
 
         system_message = LLM_PROMPT
 
         prompt = f"""질문: {query}\n\n관련 문서: {context}\n\n답변:"""
 
-        print(f"시스템 메시지: {system_message}")
-        print(f"프롬프트 길이: {len(prompt)} 자")
+        logger.debug("시스템 메시지: %s", system_message)
+        logger.debug("프롬프트 길이: %d 자", len(prompt))
 
-        # LangChain의 ChatOpenAI 모델 초기화 - 최신 버전 호환성 반영
+        # LangChain의 ChatOpenAI 모델 (API 키별로 재사용)
         try:
-            # 최신 LangChain API와 호환되도록 수정
-            chat = ChatOpenAI(
-                api_key=openai_api_key,
-                temperature=0.7,
-                max_tokens=2000,
-                model="gpt-4o-mini",
-            )
+            from langchain_core.messages import SystemMessage, HumanMessage
+
+            chat = self.get_chat_model(openai_api_key)
 
             # 메타데이터 기록을 위한 정보
             metadata = {
@@ -855,24 +880,23 @@ class RAGService:
                 HumanMessage(content=prompt),
             ]
 
-            print(f"LLM 호출 중...")
 
             # LangSmith 런 생성 및 트래킹 - 최신 API로 업데이트
             try:
-                with langsmith.trace(
+                with get_tracer().trace(
                     name="generate_insurance_answer",
-                    project_name=LANGCHAIN_PROJECT,
                     tags=["insupanda", "llm_response"],
                     metadata=metadata,
                 ) as run:
                     response = chat.invoke(messages)
                     answer = response.content
-                    print(f"LLM 응답 생성 완료 (길이: {len(answer)} 자)")
+                    logger.info(
+                        "답변 생성 완료",
+                        extra={"answer_length": len(answer), "context_length": len(context)},
+                    )
+                    logger.debug("answer: %s", answer)
                     if run:
                         run.add_metadata({"status": "응답 성공"})
-
-                    print(f"-------- 답변 생성 완료 --------\n")
-                    print("answer", answer)
                     
                     # 답변에서 컬렉션 이름을 실제 보험사 이름으로 변환
                     for collection_name, company_name in self.collection_to_company_mapping.items():
@@ -881,13 +905,15 @@ class RAGService:
                     
                     return answer
             except Exception as e:
-                print(f"LangSmith 트래킹 오류: {e}")
+                logger.warning("LangSmith 트래킹 오류: %s", e)
                 # LangSmith 오류가 있어도 LLM 응답은 계속 진행
                 response = chat.invoke(messages)
                 answer = response.content
-                print(f"LLM 응답 생성 완료 (길이: {len(answer)} 자)")
-                print(f"-------- 답변 생성 완료 --------\n")
-                print(answer)
+                logger.info(
+                    "답변 생성 완료",
+                    extra={"answer_length": len(answer), "context_length": len(context)},
+                )
+                logger.debug("answer: %s", answer)
                 
                 # 답변에서 컬렉션 이름을 실제 보험사 이름으로 변환
                 for collection_name, company_name in self.collection_to_company_mapping.items():
@@ -897,8 +923,7 @@ class RAGService:
                 return answer
 
         except Exception as e:
-            print(f"LLM 호출 오류: {e}")
-            print(f"직접 OpenAI API 호출 시도 중...")
+            logger.warning("LLM 호출 오류, 직접 OpenAI API 호출 시도: %s", e)
             # 최후의 수단으로 직접 OpenAI API 호출 시도
             try:
                 from openai import OpenAI
@@ -914,8 +939,10 @@ class RAGService:
                     max_tokens=2000,
                 )
                 answer = response.choices[0].message.content
-                print(f"OpenAI API 직접 호출 성공 (길이: {len(answer)} 자)")
-                print(f"-------- 답변 생성 완료 --------\n")
+                logger.info(
+                    "답변 생성 완료 (OpenAI API 직접 호출)",
+                    extra={"answer_length": len(answer), "context_length": len(context)},
+                )
                 
                 # 답변에서 컬렉션 이름을 실제 보험사 이름으로 변환
                 for collection_name, company_name in self.collection_to_company_mapping.items():
@@ -924,341 +951,38 @@ class RAGService:
                 
                 return answer
             except Exception as fallback_error:
-                print(f"직접 OpenAI API 호출 오류: {fallback_error}")
-                print(f"-------- 답변 생성 실패 --------\n")
+                logger.error("직접 OpenAI API 호출 오류: %s", fallback_error)
                 return f"답변 생성 중 오류가 발생했습니다. 관리자에게 문의해주세요. 오류: {str(e)}"
 
+    @timed("match")
     def find_matching_collections(self, question, available_collections):
         """
         사용자 질문에서 보험사 관련 키워드를 검출하여 일치하는 컬렉션 이름 목록 반환
         비교 질문인 경우 관련된 모든 보험사 컬렉션 반환
         """
-        print(f"\n-------- 컬렉션 매칭 시작 --------")
-        print(f"질문: '{question}'")
-        print(f"사용 가능한 컬렉션: {available_collections}")
-
         if not question or not available_collections:
-            print(f"질문이 비어있거나 사용 가능한 컬렉션이 없음")
-            print("-------- 컬렉션 매칭 실패 --------\n")
+            logger.info("질문이 비어있거나 사용 가능한 컬렉션이 없음")
             return []
 
-        # 정규화된 질문 (소문자, 공백 제거)
-        normalized_question = question.lower().replace(" ", "")
-
-        # 보험사 키워드 매핑
-        insurance_company_keywords = {
-            "삼성화재": ["삼성화재", "삼성", "samsung"],
-            "DB손해보험": [
-                "db손해보험",
-                "db손해",
-                "db보험",
-                "db",
-                "디비손해보험",
-                "디비",
-            ],
-            "하나손해보험": ["하나손해보험", "하나손보", "하나", "hana"],
-            "한화손해보험": ["한화손해보험", "한화손보", "한화", "hanwha"],
-            "흥국화재": ["흥국화재", "흥국", "heung", "흥국생명"],
-            "현대해상": ["현대해상", "현대", "hyundai"],
-            "KB손해보험": ["KB손해보험", "KB손보", "KB", "케이비"],
-            "롯데손해보험": ["롯데손해보험", "롯데손보", "롯데", "lotte"],
-            "MG손해보험": ["MG손해보험", "MG손보", "MG", "엠지"],
-            "메리츠화재": ["메리츠화재", "메리츠", "meritz"],
-            "NH농협손해보험": [
-                "NH농협손해보험",
-                "NH손해보험",
-                "농협손해보험",
-                "NH손보",
-                "농협손보",
-                "NH",
-                "농협",
-            ],
-        }
-
-        # 보험 종류 키워드
-        insurance_type_keywords = [
-            "암",
-            "상해",
-            "질병",
-            "재물",
-            "화재",
-            "운전자",
-            "자동차",
-            "실손",
-        ]
-
-        # 비교 요청 키워드
-        comparison_keywords = [
-            "비교",
-            "차이",
-            "다른",
-            "다른점",
-            "비교해",
-            "비교해줘",
-            "차이점",
-            "알려줘",
-            "뭐가 더 나은가",
-        ]
+        # 보험사/보험 종류/비교 키워드를 한 번의 스캔으로 검출
+        match = match_question(question)
+        matched_collections = select_collections(match, available_collections)
 
-        # 언급된 보험사 추적
-        mentioned_companies = []
-        for company, keywords in insurance_company_keywords.items():
-            if any(keyword in normalized_question for keyword in keywords):
-                mentioned_companies.append(company)
-                print(f"보험사 키워드 감지: {company}")
-
-        # 비교 요청 감지
-        is_comparison_request = any(
-            keyword in normalized_question for keyword in comparison_keywords
+        logger.debug(
+            "컬렉션 매칭: '%s' -> %s (보험사: %s, 비교: %s, 보험 종류: %s)",
+            question, matched_collections,
+            match.companies, match.comparison_keywords, match.insurance_types,
         )
-        if is_comparison_request:
-            detected_keywords = [
-                keyword
-                for keyword in comparison_keywords
-                if keyword in normalized_question
-            ]
-            print(f"비교 키워드 감지: {detected_keywords}")
-
-        # 보험 종류 키워드 감지
-        detected_insurance_types = [
-            keyword
-            for keyword in insurance_type_keywords
-            if keyword in normalized_question
-        ]
-        if detected_insurance_types:
-            print(f"보험 종류 키워드 감지: {detected_insurance_types}")
-
-        # 컬렉션 매칭 로직
-        matched_collections = []
-
-        # 두 개 이상 보험사가 언급되었거나 비교 요청이 있는 경우
-        # '암' 키워드가 언급된 경우에도 모든 보험사 정보가 필요할 수 있음
-        if (
-            len(mentioned_companies) > 1
-            or is_comparison_request
-            or "암" in detected_insurance_types
-        ):
-            print(f"다중 보험사 비교 또는 암 관련 질문 감지됨")
-            # 모든 보험사 컬렉션 추가
-            for collection in available_collections:
-                is_relevant = False
-
-                # 삼성화재 컬렉션 매칭
-                if "samsung" in collection.lower() or "삼성" in collection:
-                    matched_collections.append(collection)
-                    is_relevant = True
-                    print(f"삼성화재 컬렉션 매칭: {collection}")
-
-                # DB손해보험 컬렉션 매칭
-                elif (
-                    "db" in collection.lower()
-                    or "디비" in collection
-                    or "sonbo" in collection.lower()
-                ):
-                    matched_collections.append(collection)
-                    is_relevant = True
-                    print(f"DB손해보험 컬렉션 매칭: {collection}")
-
-                # 하나손해보험 컬렉션 매칭
-                elif (
-                    "hana" in collection.lower()
-                    or "하나" in collection
-                    or "ha" in collection.lower()
-                ):
-                    matched_collections.append(collection)
-                    is_relevant = True
-                    print(f"하나손해보험 컬렉션 매칭: {collection}")
-
-                # 한화손해보험 컬렉션 매칭
-                elif (
-                    "hanwha" in collection.lower()
-                    or "한화" in collection
-                    or "hw" in collection.lower()
-                ):
-                    matched_collections.append(collection)
-                    is_relevant = True
-                    print(f"한화손해보험 컬렉션 매칭: {collection}")
-
-                # 흥국화재 컬렉션 매칭
-                elif (
-                    "heung" in collection.lower()
-                    or "흥국" in collection
-                    or "hg" in collection.lower()
-                ):
-                    matched_collections.append(collection)
-                    is_relevant = True
-                    print(f"흥국화재 컬렉션 매칭: {collection}")
-
-                # 현대해상 컬렉션 매칭
-                elif (
-                    "hyundai" in collection.lower()
-                    or "현대" in collection
-                    or "hd" in collection.lower()
-                ):
-                    matched_collections.append(collection)
-                    is_relevant = True
-                    print(f"현대해상 컬렉션 매칭: {collection}")
-
-                # KB손해보험 컬렉션 매칭
-                elif (
-                    "kb" in collection.lower()
-                    or "KB" in collection
-                    or "케이비" in collection
-                ):
-                    matched_collections.append(collection)
-                    is_relevant = True
-                    print(f"KB손해보험 컬렉션 매칭: {collection}")
-
-                # 롯데손해보험 컬렉션 매칭
-                elif (
-                    "lotte" in collection.lower()
-                    or "롯데" in collection
-                    or "lt" in collection.lower()
-                ):
-                    matched_collections.append(collection)
-                    is_relevant = True
-                    print(f"롯데손해보험 컬렉션 매칭: {collection}")
-
-                # MG손해보험 컬렉션 매칭
-                elif (
-                    "mg" in collection.lower()
-                    or "MG" in collection
-                    or "엠지" in collection
-                ):
-                    matched_collections.append(collection)
-                    is_relevant = True
-                    print(f"MG손해보험 컬렉션 매칭: {collection}")
-
-                # 메리츠화재 컬렉션 매칭
-                elif (
-                    "meritz" in collection.lower()
-                    or "메리츠" in collection
-                    or "mz" in collection.lower()
-                ):
-                    matched_collections.append(collection)
-                    is_relevant = True
-                    print(f"메리츠화재 컬렉션 매칭: {collection}")
-
-                # NH농협손해보험 컬렉션 매칭
-                elif (
-                    "nh" in collection.lower()
-                    or "NH" in collection
-                    or "농협" in collection
-                ):
-                    matched_collections.append(collection)
-                    is_relevant = True
-                    print(f"NH농협손해보험 컬렉션 매칭: {collection}")
-
-                if not is_relevant and len(mentioned_companies) == 0:
-                    # 특정 보험사가 언급되지 않은 경우 모든 컬렉션 추가
-                    matched_collections.append(collection)
-                    print(f"기본 컬렉션 매칭: {collection}")
-        else:
-            # 단일 보험사만 언급된 경우
-            for collection in available_collections:
-                if "삼성화재" in mentioned_companies and (
-                    "samsung" in collection.lower() or "삼성" in collection
-                ):
-                    matched_collections.append(collection)
-                    print(f"삼성화재 컬렉션 매칭: {collection}")
-
-                elif "DB손해보험" in mentioned_companies and (
-                    "db" in collection.lower()
-                    or "디비" in collection
-                    or "sonbo" in collection.lower()
-                ):
-                    matched_collections.append(collection)
-                    print(f"DB손해보험 컬렉션 매칭: {collection}")
-
-                elif "하나손해보험" in mentioned_companies and (
-                    "hana" in collection.lower()
-                    or "하나" in collection
-                    or "ha" in collection.lower()
-                ):
-                    matched_collections.append(collection)
-                    print(f"하나손해보험 컬렉션 매칭: {collection}")
-
-                elif "한화손해보험" in mentioned_companies and (
-                    "hanwha" in collection.lower()
-                    or "한화" in collection
-                    or "hw" in collection.lower()
-                ):
-                    matched_collections.append(collection)
-                    print(f"한화손해보험 컬렉션 매칭: {collection}")
-
-                elif "흥국화재" in mentioned_companies and (
-                    "heung" in collection.lower()
-                    or "흥국" in collection
-                    or "hg" in collection.lower()
-                ):
-                    matched_collections.append(collection)
-                    print(f"흥국화재 컬렉션 매칭: {collection}")
-
-                elif "현대해상" in mentioned_companies and (
-                    "hyundai" in collection.lower()
-                    or "현대" in collection
-                    or "hd" in collection.lower()
-                ):
-                    matched_collections.append(collection)
-                    print(f"현대해상 컬렉션 매칭: {collection}")
-
-                elif "KB손해보험" in mentioned_companies and (
-                    "kb" in collection.lower()
-                    or "KB" in collection
-                    or "케이비" in collection
-                ):
-                    matched_collections.append(collection)
-                    print(f"KB손해보험 컬렉션 매칭: {collection}")
-
-                elif "롯데손해보험" in mentioned_companies and (
-                    "lotte" in collection.lower()
-                    or "롯데" in collection
-                    or "lt" in collection.lower()
-                ):
-                    matched_collections.append(collection)
-                    print(f"롯데손해보험 컬렉션 매칭: {collection}")
-
-                elif "MG손해보험" in mentioned_companies and (
-                    "mg" in collection.lower()
-                    or "MG" in collection
-                    or "엠지" in collection
-                ):
-                    matched_collections.append(collection)
-                    print(f"MG손해보험 컬렉션 매칭: {collection}")
-
-                elif "메리츠화재" in mentioned_companies and (
-                    "meritz" in collection.lower()
-                    or "메리츠" in collection
-                    or "mz" in collection.lower()
-                ):
-                    matched_collections.append(collection)
-                    print(f"메리츠화재 컬렉션 매칭: {collection}")
-
-                elif "NH농협손해보험" in mentioned_companies and (
-                    "nh" in collection.lower()
-                    or "NH" in collection
-                    or "농협" in collection
-                ):
-                    matched_collections.append(collection)
-                    print(f"NH농협손해보험 컬렉션 매칭: {collection}")
-
-                # 보험사가 언급되지 않은 경우 모든 컬렉션 추가
-                elif len(mentioned_companies) == 0:
-                    matched_collections.append(collection)
-                    print(f"기본 컬렉션 매칭: {collection}")
-
-        # 중복 제거
-        matched_collections = list(set(matched_collections))
-
-        print(f"최종 매칭된 컬렉션: {matched_collections}")
-        print(f"-------- 컬렉션 매칭 완료 --------\n")
 
         return matched_collections
 
     def create_index(self, embeddings, dimension=1024):
         """임베딩 배열로부터 FAISS 인덱스를 생성합니다."""
+        import faiss
+        import numpy as np
+
         try:
-            print(f"인덱스 생성 시작: {len(embeddings)}개 벡터, 차원={dimension}")
+            logger.debug("인덱스 생성 시작: %d개 벡터, 차원=%d", len(embeddings), dimension)
 
             # 모든 벡터가 L2 정규화되어 있는지 확인
             embeddings_array = np.array(embeddings, dtype=np.float32)
@@ -1272,14 +996,15 @@ class RAGService:
             # 인덱스에 벡터 추가
             index.add(embeddings_array)
 
-            print(f"인덱스 생성 완료: {index.ntotal}개 벡터")
+            logger.info("인덱스 생성 완료: %d개 벡터", index.ntotal)
             return index
         except Exception as e:
-            print(f"인덱스 생성 중 오류: {e}")
+            logger.error("인덱스 생성 중 오류: %s", e)
             raise e
 
 
-def response(query: SearchQuery):
+def retrieve(query: SearchQuery, cancel_event=None):
+    """컬렉션 매칭, 로드, 벡터 검색까지 수행 (cancel_event가 설정되면 다음 단계 전에 중단)"""
     global rag
     # 만약 query가 문자열이면 SearchQuery 객체로 감쌈
     if isinstance(query, str):
@@ -1290,7 +1015,6 @@ def response(query: SearchQuery):
         for d in os.listdir(rag.base_path)
         if os.path.isdir(os.path.join(rag.base_path, d))
     ]
-    print(f"사용 가능한 컬렉션: {available_collections}")
 
     # 요청된 컬렉션이 있거나 쿼리 기반으로 컬렉션을 찾습니다
     use_collections = (
@@ -1298,14 +1022,29 @@ def response(query: SearchQuery):
         if query.collections
         else rag.find_matching_collections(query.query_text, available_collections)
     )
-    print(f"사용할 컬렉션: {use_collections}")
+    logger.debug("사용할 컬렉션: %s", use_collections)
 
     # 찾은 컬렉션 로드
     for collection_name in use_collections:
+        if cancel_event is not None and cancel_event.is_set():
+            return None
         rag.load_collection(collection_name)
 
+    if cancel_event is not None and cancel_event.is_set():
+        return None
+
     # 청크 탐색 (각 컬렉션당 top_k=2)
-    search_results = rag.search(query.query_text, use_collections, top_k=2)
+    return rag.search(query.query_text, use_collections, top_k=2)
+
+
+def response(query: SearchQuery, search_results=None):
+    global rag
+    if isinstance(query, str):
+        query = SearchQuery(query=query, collections=[])
+
+    # 미리 검색한 결과가 없으면 지금 검색
+    if search_results is None:
+        search_results = retrieve(query)
 
     # 답변 생성
     answer = rag.generate_answer(
@@ -1320,14 +1059,14 @@ def search(query: SearchQuery):
         global rag
         # 디버깅을 위한 요청 본문 출력
         query_text = query.query_text if hasattr(query, "query_text") else "None"
-        print(f"\n============== API 요청 받음 ==============")
-        print(f"POST /api/search - 쿼리: '{query_text}'")
-        print(f"요청된 컬렉션: {query.collections}")
+        logger.info(
+            "API 요청 받음: POST /api/search",
+            extra={"query": query_text, "collections": query.collections},
+        )
 
         # LangSmith에서 전체 API 요청 트래킹
-        with langsmith.trace(
+        with get_tracer().trace(
             name="search_api_request",
-            project_name=LANGCHAIN_PROJECT,
             tags=["insupanda", "api", "post_request"],
             metadata={
                 "query": query_text,
@@ -1340,7 +1079,6 @@ def search(query: SearchQuery):
                 for d in os.listdir(rag.base_path)
                 if os.path.isdir(os.path.join(rag.base_path, d))
             ]
-            print(f"사용 가능한 컬렉션: {available_collections}")
 
             # 요청된 컬렉션이 있거나 쿼리 기반으로 컬렉션을 찾습니다
             use_collections = (
@@ -1350,11 +1088,11 @@ def search(query: SearchQuery):
                     query.query_text, available_collections
                 )
             )
-            print(f"사용할 컬렉션: {use_collections}")
+            logger.debug("사용할 컬렉션: %s", use_collections)
             if not use_collections:
                 if run:
                     run.add_metadata({"notification": "사용할 컬렉션을 찾을 수 없음"})
-                return JSONResponse(
+                return UTF8JSONResponse(
                     content={
                         "answer": "질문에 해당하는 보험사 정보를 찾을 수 없습니다. 보험사 이름이나 보험 종류를 명확히 언급해 주세요.",
                         "collections_used": [],
@@ -1377,7 +1115,6 @@ def search(query: SearchQuery):
 
             # 사용된 컬렉션 목록 반환
             friendly_names = [get_friendly_name(c) for c in use_collections]
-            print(f"사용된 컬렉션: {friendly_names}")
 
             # 메타데이터 업데이트
             if run:
@@ -1389,7 +1126,7 @@ def search(query: SearchQuery):
                     }
                 )
 
-            return JSONResponse(
+            return UTF8JSONResponse(
                 content={
                     "answer": answer,
                     "collections_used": friendly_names,
@@ -1398,17 +1135,16 @@ def search(query: SearchQuery):
                 headers={"Content-Type": "application/json; charset=utf-8"},
             )
     except Exception as e:
-        print(f"API 오류: {e}")
-        if os.getenv("LANGCHAIN_API_KEY"):
-            with langsmith.trace(
+        logger.exception("API 오류: %s", e)
+        if get_tracer().enabled:
+            with get_tracer().trace(
                 name="search_api_error",
-                project_name=LANGCHAIN_PROJECT,
                 tags=["insupanda", "error", "api"],
                 metadata={"error": str(e), "endpoint": "/search (POST)"},
             ) as error_run:
                 if error_run:
                     error_run.add_metadata({"error_message": f"API 오류: {str(e)}"})
-        return JSONResponse(
+        return UTF8JSONResponse(
             content={
                 "answer": f"오류 발생: {str(e)}",
                 "collections_used": [],
@@ -1423,14 +1159,14 @@ async def search_get(query: str, collections: List[str] = None):
     try:
         global rag
         # 디버깅을 위한 요청 본문 출력
-        print(f"\n============== API 요청 받음 ==============")
-        print(f"GET /api/search - 쿼리: '{query}'")
-        print(f"요청된 컬렉션: {collections}")
+        logger.info(
+            "API 요청 받음: GET /api/search",
+            extra={"query": query, "collections": collections},
+        )
 
         # LangSmith에서 전체 API 요청 트래킹
-        with langsmith.trace(
+        with get_tracer().trace(
             name="search_api_request",
-            project_name=LANGCHAIN_PROJECT,
             tags=["insupanda", "api", "get_request"],
             metadata={
                 "query": query,
@@ -1443,7 +1179,6 @@ async def search_get(query: str, collections: List[str] = None):
                 for d in os.listdir(rag.base_path)
                 if os.path.isdir(os.path.join(rag.base_path, d))
             ]
-            print(f"사용 가능한 컬렉션: {available_collections}")
 
             # 요청된 컬렉션이 있거나 쿼리 기반으로 컬렉션을 찾습니다
             use_collections = (
@@ -1451,11 +1186,11 @@ async def search_get(query: str, collections: List[str] = None):
                 if collections
                 else rag.find_matching_collections(query, available_collections)
             )
-            print(f"사용할 컬렉션: {use_collections}")
+            logger.debug("사용할 컬렉션: %s", use_collections)
             if not use_collections:
                 if run:
                     run.add_metadata({"notification": "사용할 컬렉션을 찾을 수 없음"})
-                return JSONResponse(
+                return UTF8JSONResponse(
                     content={
                         "answer": "질문에 해당하는 보험사 정보를 찾을 수 없습니다. 보험사 이름이나 보험 종류를 명확히 언급해 주세요.",
                         "collections_used": [],
@@ -1478,7 +1213,6 @@ async def search_get(query: str, collections: List[str] = None):
 
             # 사용된 컬렉션 목록 반환
             friendly_names = [get_friendly_name(c) for c in use_collections]
-            print(f"사용된 컬렉션: {friendly_names}")
 
             # 메타데이터 업데이트
             if run:
@@ -1490,7 +1224,7 @@ async def search_get(query: str, collections: List[str] = None):
                     }
                 )
 
-            return JSONResponse(
+            return UTF8JSONResponse(
                 content={
                     "answer": answer,
                     "collections_used": friendly_names,
@@ -1499,17 +1233,16 @@ async def search_get(query: str, collections: List[str] = None):
                 headers={"Content-Type": "application/json; charset=utf-8"},
             )
     except Exception as e:
-        print(f"API 오류: {e}")
-        if os.getenv("LANGCHAIN_API_KEY"):
-            with langsmith.trace(
+        logger.exception("API 오류: %s", e)
+        if get_tracer().enabled:
+            with get_tracer().trace(
                 name="search_api_error",
-                project_name=LANGCHAIN_PROJECT,
                 tags=["insupanda", "error", "api"],
                 metadata={"error": str(e), "endpoint": "/search (GET)"},
             ) as error_run:
                 if error_run:
                     error_run.add_metadata({"error_message": f"API 오류: {str(e)}"})
-        return JSONResponse(
+        return UTF8JSONResponse(
             content={
                 "answer": f"오류 발생: {str(e)}",
                 "collections_used": [],
@@ -1522,18 +1255,94 @@ async def search_get(query: str, collections: List[str] = None):
 rag = RAGService()
 
 
+# 처음 사용할 때 로드하는 무거운 모듈. 사전 로드 서버(api.serve)는 fork 전에 import 해 두고
+# 워커는 lifespan에서 클라이언트만 만든다
+CLIENT_MODULES = ("openai", "langchain_openai", "langchain_core.messages")
+
+
+def preload_client_modules() -> None:
+    for module_name in CLIENT_MODULES:
+        importlib.import_module(module_name)
+
+
+def create_clients() -> dict:
+    """외부 API 클라이언트 생성 (OpenAI, Upstage 임베딩, 답변 생성용 ChatOpenAI)"""
+    factories = {
+        "openai": get_openai_client,
+        "upstage_embedding": rag.get_embedding_client,
+        "chat_model": lambda: rag.get_chat_model(os.getenv("OPENAI_API_KEY")),
+    }
+    created = {}
+    for name, factory in factories.items():
+        try:
+            factory()
+            created[name] = True
+        except Exception as e:
+            # 생성에 실패해도 서버는 뜨고, 해당 기능을 처음 사용할 때 다시 시도
+            logger.warning("%s 클라이언트 생성 실패: %s", name, e)
+            created[name] = False
+    return created
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    워커가 요청을 받기 전에 한 번 실행 (모듈 import 시점에는 클라이언트와 저장소를 만들지 않음)
+
+    api.serve 다중 워커에서는 fork 후 워커마다 실행되므로 HTTP 커넥션 풀을 워커끼리 공유하지 않는다.
+    """
+    log_module.configure()
+    tracer = get_tracer()
+    if tracer.enabled:
+        logger.info("LangSmith 트레이싱 활성화 (샘플링 비율: %s)", tracer.sample_rate)
+    else:
+        logger.info("LangSmith API 키가 설정되지 않았습니다. 트래킹은 비활성화됩니다.")
+    started_at = time.perf_counter()
+    # 요청 처리에 쓰는 저장소/수락 제어/스레드 풀/프로파일러 (import 시점에는 만들지 않음)
+    sessions = get_session_store()
+    get_admission()
+    get_stage_executors()
+    if PROFILING_CONFIG["admin_token"]:
+        get_profiler()
+    clients = create_clients()
+    logger.info(
+        "외부 API 클라이언트 준비 완료",
+        extra={
+            "clients": clients,
+            "session_store": sessions.name,
+            "seconds": round(time.perf_counter() - started_at, 3),
+        },
+    )
+    yield
+    close_session_store()
+    if tracer.enabled:
+        tracer.exporter.flush(timeout=2.0)
+    get_stage_executors().shutdown()
+
+
 app = FastAPI(
     title="보험 상담 API",
     description="보험 약관 및 비교설계 질문에 답변하는 API",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    # orjson 직렬화 + charset=utf-8 (encoders.py)
+    default_response_class=UTF8JSONResponse,
 )
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:8096", "http://localhost:8095"],
     allow_methods=["*"],
     allow_headers=["*"],
-    allow_credentials=True
+    allow_credentials=True,
+    expose_headers=["Server-Timing"],
 )
+# 긴 약관 답변/비교설계 표 응답 압축 (Server-Timing의 compress 단계로 기록)
+app.add_middleware(CompressionMiddleware)
+# 관리자가 예약한 요청/프로파일 헤더가 붙은 요청의 샘플링 프로파일 (관리자 토큰이 없으면 붙이지 않음)
+if PROFILING_CONFIG["admin_token"]:
+    app.add_middleware(ProfilingMiddleware)
+# 요청별 단계 시간(Server-Timing 헤더)과 HTTP 지표
+app.add_middleware(ServerTimingMiddleware)
 
 # 채팅 메시지 모델
 class ChatMessage(BaseModel):
@@ -1545,7 +1354,8 @@ class ChatMessage(BaseModel):
 class ChatSession(BaseModel):
     session_id: str = Field(..., description="고유 세션 ID")
     message: str = Field(..., description="사용자 메시지")
-    chat_history: Optional[List[ChatMessage]] = Field(default=[], description="대화 이력")
+    # 대화 이력은 서버 세션 저장소가 보관한다. 이전 방식 클라이언트가 보낸 이력은 새 세션의 초기값으로만 사용
+    chat_history: Optional[List[ChatMessage]] = Field(default=[], description="대화 이력 (생략 가능)")
 
 # 응답 모델
 class ChatResponse(BaseModel):
@@ -1561,10 +1371,18 @@ class ChatResponse(BaseModel):
 
 class IntentModule:
     def __init__(self, user_question: str, PROMPT):
+        self.user_question = user_question
         self.prompt = PROMPT.format(question=user_question)
 
+    @timed("intent")
     def classify_response(self):
-        response = client.chat.completions.create(
+        # 로컬 분류기의 신뢰도가 충분하면 LLM 호출 생략
+        local_intent, confidence = classify_intent_locally(self.user_question)
+        if local_intent is not None:
+            logger.debug("로컬 의도 분류: %s (신뢰도: %.3f)", local_intent, confidence)
+            return local_intent
+
+        response = get_openai_client().chat.completions.create(
             model="gpt-4-turbo",
             messages=[
                 {
@@ -1574,7 +1392,10 @@ class IntentModule:
                 {"role": "user", "content": self.prompt},
             ],
         )
-        return response.choices[0].message.content
+        result = response.choices[0].message.content
+        # 로컬 분류 모델 학습용으로 LLM 분류 결과 기록
+        log_intent_decision(self.user_question, result)
+        return result
 
 
 class CompareModule:
@@ -1582,52 +1403,385 @@ class CompareModule:
         self.default_config = DEFAULT_CONFIG
 
     def setting_information(self, config):
-        # 설정값과 쿼리 출력
-        print("\n=== 실행 결과 ===")
-        print("\n[설정값]")
-        print(f"이름: {config['custom_name']}")
-        print(f"나이: {config['insu_age']}세")
-        print(f"성별: {'남자' if config['sex'] == 1 else '여자'}")
-        print(
-            f"상품유형: {'무해지형' if config['product_type'] == 'nr' else '해지환급형'}"
+        # 설정값 기록
+        logger.debug(
+            "비교설계 설정값 - 이름: %s, 나이: %s세, 성별: %s, 상품유형: %s, 보험기간: %s",
+            config["custom_name"],
+            config["insu_age"],
+            "남자" if config["sex"] == 1 else "여자",
+            "무해지형" if config["product_type"] == "nr" else "해지환급형",
+            config["expiry_year"],
         )
-        print(f"보험기간: {config['expiry_year']}")
 
-    def handle_prompt(self, user_question: str) -> str:
+    def prepare_query(self, user_question: str):
+        """슬롯 추출과 템플릿 SQL 생성 (LLM 호출 없음). 템플릿 밖의 질문이면 SQL은 None"""
         prompt, current_config = process_query(user_question, self.default_config)
-        generated_sql = generate_sql_query(prompt, current_config)
+        # 템플릿으로 표현 가능한 질문은 LLM 없이 SQL 생성
+        compare_query = build_compare_query(prompt, current_config)
+        generated_sql, params = None, None
+        if compare_query is not None:
+            generated_sql, params = render_sql(compare_query, placeholder=storage.placeholder)
         self.setting_information(current_config)
-        result = execute_sql_query(generated_sql, current_config)
+        return prompt, compare_query, generated_sql, params, current_config
+
+    @timed("sql_build")
+    def build_query(self, user_question: str):
+        prompt, compare_query, generated_sql, params, current_config = self.prepare_query(user_question)
+        if compare_query is None:
+            generated_sql = generate_sql_query(prompt, current_config)
+        return compare_query, generated_sql, params, current_config
+
+    def handle_prompt(self, user_question: str) -> str:
+        compare_query, generated_sql, params, current_config = self.build_query(user_question)
+        # 인메모리 보험료 큐브가 켜져 있으면 템플릿 쿼리는 DB 없이 계산
+        if compare_query is not None and premium_cube.enabled:
+            try:
+                rows = premium_cube.query(compare_query)
+            except Exception:
+                logger.exception("보험료 큐브 조회 실패, SQL로 조회합니다.")
+                rows = None
+            if rows is not None:
+                return format_query_results(rows, generated_sql, current_config)
+        result = execute_sql_query(generated_sql, current_config, params)
+        return result
+
+    async def handle_prompt_async(self, user_question: str) -> str:
+        # 블로킹 단계(LLM SQL 생성/결과 변환, 큐브/DB 조회)는 단계별 스레드 풀에서 실행 (이벤트 루프를 막지 않음)
+        # 템플릿 SQL 생성은 LLM을 쓰지 않으므로 바로 실행하고 llm 스레드는 LLM 호출에만 사용
+        with stage_timer("sql_build"):
+            prompt, compare_query, generated_sql, params, current_config = self.prepare_query(user_question)
+            if compare_query is None:
+                generated_sql = await run_in_stage("llm", generate_sql_query, prompt, current_config)
+        if compare_query is not None and premium_cube.enabled:
+            try:
+                rows = await run_in_stage("db", premium_cube.query, compare_query)
+            except Exception:
+                logger.exception("보험료 큐브 조회 실패, SQL로 조회합니다.")
+                rows = None
+            if rows is not None:
+                return await format_query_results_async(rows, generated_sql, current_config)
+        result = await execute_sql_query_async(generated_sql, current_config, params)
         return result
 
 
+@app.exception_handler(AdmissionRejected)
+async def admission_rejected_handler(request: Request, exc: AdmissionRejected):
+    """처리 한도 초과 요청은 즉시 429/503 + Retry-After로 응답"""
+    return UTF8JSONResponse(
+        status_code=exc.status_code,
+        content={"detail": exc.reason, "request_class": exc.request_class},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
 @app.post("/chat", response_model=ChatResponse)
 async def chat(request: ChatSession):
     user_question = request.message.strip()
-    print("User question:", user_question)
-
-    classify_intent = IntentModule(user_question, INTENT_PROMPT)
-    compare_module = CompareModule()
-    result_intent = classify_intent.classify_response()
-    print("Intent:", result_intent)
-
-    if result_intent == "비교설계 질문":
-        answer = compare_module.handle_prompt(user_question)
-        print("Answer:", type(answer))
-        print("Answer2:", answer)
-    else:
-        print("그 외 약관")
-        answer = response(user_question)
+    logger.debug("User question: %s", user_question)
+
+    # 요청 단위 루트 span (샘플링은 여기서 한 번 정하고 하위 span이 따름)
+    with get_tracer().trace(
+        name="chat_request",
+        tags=["insupanda", "chat"],
+        metadata={"session_id": request.session_id},
+    ) as run:
+        classify_intent = IntentModule(user_question, INTENT_PROMPT)
+        compare_module = CompareModule()
+        speculation = None
+        # 요청 종류별 동시 처리 한도 (초과 시 AdmissionRejected -> 429/503)
+        # 비교설계/약관 어느 쪽도 받을 수 없으면 의도 분류(LLM)를 쓰기 전에 거절
+        get_admission().check("compare", "terms")
+        # 약관 슬롯을 바로 얻을 수 있을 때만 미리 잡고 검색을 시작 (비교설계로 분류되면 반납)
+        terms_admission = get_admission().reserve("terms")
+        try:
+            async with get_admission().admit("intent"):
+                # 의도 분류와 동시에 약관 검색을 미리 시작 (PIPELINE_CONFIG 설정 시)
+                if terms_admission is not None:
+                    speculation = start_speculation(retrieve, user_question)
+                result_intent = await run_in_stage("intent", classify_intent.classify_response)
+        except BaseException:
+            # 의도 분류 실패(LLM 오류, 수락 거절, 요청 취소 등) 시 미리 시작한 검색과 슬롯도 반납
+            if speculation is not None:
+                speculation.cancel()
+            if terms_admission is not None:
+                terms_admission.release()
+            raise
+        logger.info("의도 분류 완료", extra={"session_id": request.session_id, "intent": result_intent})
+        if run:
+            run.add_metadata({"intent": result_intent})
+
+        if result_intent == "비교설계 질문":
+            if speculation is not None:
+                speculation.cancel()
+            if terms_admission is not None:
+                terms_admission.release()
+            async with get_admission().admit("compare"):
+                answer = await compare_module.handle_prompt_async(user_question)
+            logger.debug("Answer: %s", answer)
+        else:
+            try:
+                async with terms_admission or get_admission().admit("terms"):
+                    if speculation is not None:
+                        search_results = await speculation.result_async()
+                    else:
+                        search_results = await run_in_stage("search", retrieve, user_question)
+                    answer = await run_in_stage("llm", response, user_question, search_results)
+            except BaseException:
+                # 수락 거절이나 오류로 결과를 쓰지 않으면 미리 시작한 검색 중단
+                if speculation is not None:
+                    speculation.cancel()
+                raise
+
+    # 서버 세션 저장소에 이번 대화를 추가하고 최근 이력(MAX_HISTORY_LENGTH개)을 돌려줌
+    chat_history = await get_session_store().append_async(
+        request.session_id,
+        [{"role": "user", "content": user_question}, {"role": "assistant", "content": answer}],
+        seed=request.chat_history,
+    )
 
     return ChatResponse(
         answer=answer,
         intent=result_intent,
         session_id=request.session_id,
-        chat_history=[{
-            "role": "user",
-            "content": user_question
-        }, {
-            "role": "assistant",
-            "content": answer,
-        }]
+        chat_history=chat_history,
+    )
+
+
+class BatchSearchRequest(BaseModel):
+    queries: List[str] = Field(
+        ...,
+        min_length=1,
+        max_length=COLLECTION_CONFIG["batch_max_queries"],
+        description="검색할 질문 목록",
+    )
+    collections: Optional[List[str]] = Field(
+        default=None, description="검색할 컬렉션 (없으면 질문마다 보험사 키워드로 선택)"
     )
+    top_k: int = Field(default=2, ge=1, le=50, description="컬렉션당 검색할 청크 수")
+    generate: bool = Field(default=False, description="질문별 LLM 답변 생성 여부")
+
+
+class BatchSearchItem(BaseModel):
+    query: str
+    collections: List[str]
+    results: List[dict] = Field(..., description="점수가 높은 순으로 정렬된 청크")
+    answer: Optional[str] = None
+
+
+class BatchSearchResponse(BaseModel):
+    results: List[BatchSearchItem]
+
+
+# 배치 답변 생성이 동시에 차지할 수 있는 LLM 스레드 수 (프로세스 전체)
+batch_llm_slots = asyncio.Semaphore(EXECUTOR_CONFIG["batch_llm_concurrency"])
+
+
+async def _generate_batch_answer(item: dict) -> str:
+    # 슬롯을 얻은 뒤에만 LLM 스레드 풀에 넣으므로 대기 중인 배치 작업이 풀 대기열을 차지하지 않음
+    async with batch_llm_slots:
+        return await run_in_stage(
+            "llm", rag.generate_answer, item["query"], item["results"], os.getenv("OPENAI_API_KEY")
+        )
+
+
+@app.post("/search/batch", response_model=BatchSearchResponse)
+async def batch_search(request: BatchSearchRequest):
+    """
+    여러 약관 질문을 한 번에 검색 (QA/일괄 점검용)
+
+    임베딩은 묶어서 요청하고 컬렉션마다 FAISS 검색을 한 번씩만 실행한다.
+    generate=true면 질문별 답변도 생성한다. 모든 배치 요청을 합쳐 LLM 스레드 풀의
+    batch_llm_concurrency개까지만 쓰므로 큰 배치가 /chat 답변 생성 앞에 쌓이지 않는다.
+    """
+    async with get_admission().admit("batch"):
+        items = await run_in_stage(
+            "search", rag.search_batch, request.queries, request.collections, request.top_k
+        )
+        if request.generate:
+            answers = await asyncio.gather(*(_generate_batch_answer(item) for item in items))
+            for item, answer in zip(items, answers):
+                item["answer"] = answer
+    return {"results": items}
+
+
+@app.get("/chat/{session_id}/history", response_model=List[ChatMessage])
+async def chat_history(session_id: str):
+    """서버에 보관 중인 세션의 최근 대화 이력"""
+    return await get_session_store().get_history_async(session_id)
+
+
+@app.delete("/chat/{session_id}")
+async def delete_chat_session(session_id: str):
+    """세션 대화 이력 삭제 (새 대화 시작)"""
+    await run_in_stage("db", get_session_store().delete, session_id)
+    return {"session_id": session_id, "deleted": True}
+
+
+@app.get("/stats/pipeline")
+def pipeline_stats():
+    """투기적 검색 통계 (낭비된 작업 비율)"""
+    return speculation_stats.snapshot()
+
+
+@app.get("/stats/executors")
+def executor_stats():
+    """/chat 단계별 스레드 풀 사용 현황"""
+    return get_stage_executors().stats()
+
+
+@app.get("/stats/admission")
+def admission_stats():
+    """요청 종류별 처리 중/대기 요청 수와 거절 횟수"""
+    return get_admission().stats()
+
+
+@app.get("/stats/collections")
+def collection_stats():
+    """약관 컬렉션 로드/임베딩 캐시 현황"""
+    return {
+        "collections": rag.registry.stats(),
+        "embedding_cache": rag.embedding_cache.stats(),
+    }
+
+
+@app.get("/stats/cache")
+def cache_stats():
+    """비교설계 결과 캐시 적중률"""
+    return result_cache.stats()
+
+
+@app.get("/stats/logging")
+def logging_stats():
+    """로그 레벨과 출력 대기/버려진 레코드 수"""
+    return log_module.stats()
+
+
+@app.get("/stats/sessions")
+def session_stats():
+    """세션 저장소 종류, 보관 중인 세션 수와 만료 삭제 수"""
+    return get_session_store().stats()
+
+
+@app.get("/stats/tracing")
+def tracing_stats():
+    """트레이싱 샘플링 비율과 span 전송/버림/실패 수"""
+    return get_tracer().stats()
+
+
+def require_admin(x_admin_token: Optional[str] = Header(default=None)):
+    """관리자 토큰 확인 (토큰이 설정되지 않은 서버에서는 관리 엔드포인트가 없는 것처럼 404)"""
+    if not PROFILING_CONFIG["admin_token"]:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not x_admin_token or not hmac.compare_digest(
+        x_admin_token.encode("utf-8"), PROFILING_CONFIG["admin_token"].encode("utf-8")
+    ):
+        raise HTTPException(status_code=403, detail="관리자 토큰이 올바르지 않습니다.")
+
+
+class ProfilingArmRequest(BaseModel):
+    requests: int = Field(default=1, ge=1, description="프로파일할 다음 요청 수")
+
+
+@app.post("/admin/profiling/arm", dependencies=[Depends(require_admin)])
+def arm_profiling(request: ProfilingArmRequest):
+    """다음 N개 요청을 샘플링 프로파일 (api.serve 워커 모두가 함께 소모)"""
+    return {"armed": get_profiler().arm(request.requests)}
+
+
+@app.delete("/admin/profiling/arm", dependencies=[Depends(require_admin)])
+def disarm_profiling():
+    """남은 프로파일 예약 취소"""
+    get_profiler().disarm()
+    return {"armed": 0}
+
+
+@app.get("/admin/profiling", dependencies=[Depends(require_admin)])
+def list_profiles():
+    """프로파일러 상태와 저장된 프로파일 목록 (단계별 시간 포함, 최신순)"""
+    return {**get_profiler().stats(), "profiles": get_profiler().list_profiles()}
+
+
+@app.get("/admin/profiling/{profile_id}", dependencies=[Depends(require_admin)])
+def download_profile(profile_id: str, format: str = "speedscope"):
+    """
+    프로파일 다운로드
+
+    - speedscope: https://www.speedscope.app 에서 여는 JSON (스레드별 프로파일, 이름에 단계별 시간)
+    - folded: flamegraph.pl / inferno-flamegraph 입력 (값은 마이크로초)
+    """
+    path = get_profiler().profile_path(profile_id, format)
+    if path is None:
+        raise HTTPException(status_code=404, detail="프로파일을 찾을 수 없습니다.")
+    media_type = "application/json" if format == "speedscope" else "text/plain; charset=utf-8"
+    return FileResponse(path, media_type=media_type, filename=os.path.basename(path))
+
+
+def collect_service_metrics():
+    """캐시 적중률, 수락 제어/스레드 풀 현황 등 다른 곳에서 세는 값을 수집 시점에 지표로 변환"""
+    embedding = rag.embedding_cache.stats()
+    cache = result_cache.stats()
+    caches = {
+        "embedding": (embedding["hits"], embedding["misses"], embedding["hit_rate"]),
+        "result_rows": (cache["rows_hits"], cache["rows_misses"], cache["rows_hit_rate"]),
+        "result_formatted": (
+            cache["formatted_hits"], cache["formatted_misses"], cache["formatted_hit_rate"]
+        ),
+    }
+    yield MetricFamily("insu_cache_hits_total", "counter", "캐시 적중 수", [
+        ({"cache": name}, hits, "") for name, (hits, _, _) in caches.items()
+    ])
+    yield MetricFamily("insu_cache_misses_total", "counter", "캐시 미스 수", [
+        ({"cache": name}, misses, "") for name, (_, misses, _) in caches.items()
+    ])
+    yield MetricFamily("insu_cache_hit_ratio", "gauge", "캐시 적중률", [
+        ({"cache": name}, ratio, "") for name, (_, _, ratio) in caches.items()
+    ])
+
+    classes = get_admission().stats()["classes"]
+    yield MetricFamily("insu_admission_in_flight", "gauge", "요청 종류별 처리 중 요청 수", [
+        ({"class": name}, stats["in_flight"], "") for name, stats in classes.items()
+    ])
+    yield MetricFamily("insu_admission_queue_depth", "gauge", "요청 종류별 대기 요청 수", [
+        ({"class": name}, stats["queue_depth"], "") for name, stats in classes.items()
+    ])
+    yield MetricFamily("insu_admission_rejected_total", "counter", "요청 종류별 거절 수", [
+        ({"class": name, "reason": reason}, stats[f"rejected_{reason}"], "")
+        for name, stats in classes.items()
+        for reason in ("queue_full", "queue_timeout")
+    ])
+
+    executors = get_stage_executors().stats()
+    yield MetricFamily("insu_executor_running", "gauge", "단계별 스레드 풀 실행 중 작업 수", [
+        ({"stage": stage}, stats["running"], "") for stage, stats in executors.items()
+    ])
+    yield MetricFamily("insu_executor_queued", "gauge", "단계별 스레드 풀 대기 작업 수", [
+        ({"stage": stage}, stats["queued"], "") for stage, stats in executors.items()
+    ])
+
+    speculation = speculation_stats.snapshot()
+    yield MetricFamily("insu_speculation_total", "counter", "투기적 검색 결과별 수", [
+        ({"result": result}, speculation[result], "") for result in ("reused", "discarded")
+    ])
+    yield MetricFamily("insu_collections_loaded", "gauge", "로드된 약관 컬렉션 수", [
+        ({}, rag.registry.stats()["loaded"], "")
+    ])
+    yield MetricFamily("insu_log_records_dropped_total", "counter", "큐가 가득 차 버려진 로그 레코드 수", [
+        ({}, log_module.stats()["dropped"], "")
+    ])
+    sessions = get_session_store()
+    yield MetricFamily("insu_sessions_evicted_total", "counter", "만료/초과로 삭제된 대화 세션 수", [
+        ({"backend": sessions.name}, sessions.evicted, "")
+    ])
+    trace_stats = get_tracer().exporter.stats()
+    yield MetricFamily("insu_trace_spans_total", "counter", "트레이스 span 전송 결과별 수", [
+        ({"result": result}, trace_stats[result], "") for result in ("exported", "dropped", "failed")
+    ])
+
+
+metrics_registry.register_collector(collect_service_metrics)
+
+
+@app.get("/metrics")
+def metrics():
+    """Prometheus 형식 지표 (단계별 처리 시간, HTTP 지표, 캐시 적중률, 처리 중 요청 수)"""
+    return Response(metrics_registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
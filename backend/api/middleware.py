@@ -0,0 +1,279 @@
+"""
+응답 처리 ASGI 미들웨어
+
+@app.middleware("http") 함수 미들웨어는 응답 전체를 StreamingResponse로 다시 감싸므로
+요청마다 태스크와 버퍼링 비용이 든다. 여기의 미들웨어는 ASGI send 메시지만 가로챈다.
+
+- CompressionMiddleware: minimum_size 이상인 JSON/텍스트 응답을 brotli(설치된 경우) 또는 gzip으로 압축
+- UTF8CharsetMiddleware: charset이 없는 JSON 응답의 Content-Type에 charset=utf-8 추가
+- ProfilingMiddleware: 예약된 요청/프로파일 헤더가 붙은 요청을 샘플링 프로파일러로 기록 (rag/src/profiler.py)
+"""
+import asyncio
+import sys
+import time
+import zlib
+
+from .rag.src.config import COMPRESSION_CONFIG
+from .rag.src.log import get_logger
+from .rag.src.metrics import current_stage_durations, record_stage
+from .rag.src.profiler import get_profiler
+
+logger = get_logger("middleware")
+
+try:
+    import brotli
+except ImportError:  # brotli가 없으면 gzip만 사용
+    brotli = None
+
+UTF8_JSON_CONTENT_TYPE = b"application/json; charset=utf-8"
+
+
+def _header(headers: list, name: bytes):
+    for key, value in headers:
+        if key.lower() == name:
+            return value
+    return None
+
+
+def _accepted_encodings(header: bytes) -> set:
+    """Accept-Encoding에서 q=0이 아닌 인코딩 목록"""
+    encodings = set()
+    for part in header.decode("latin-1").split(","):
+        token, _, params = part.strip().partition(";")
+        params = params.replace(" ", "")
+        if params.startswith("q="):
+            try:
+                if float(params[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        if token:
+            encodings.add(token.lower())
+    return encodings
+
+
+class _GzipEncoder:
+    name = b"gzip"
+
+    def __init__(self, config: dict):
+        # wbits=31: gzip 헤더/트레일러 포함
+        self._compressor = zlib.compressobj(config["gzip_level"], zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        """지금까지 넣은 데이터를 모두 내보냄 (스트림은 계속)"""
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class _BrotliEncoder:
+    name = b"br"
+
+    def __init__(self, config: dict):
+        self._compressor = brotli.Compressor(quality=config["brotli_quality"])
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        """지금까지 넣은 데이터를 모두 내보냄 (스트림은 계속)"""
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class CompressionMiddleware:
+    """
+    응답 압축 ASGI 미들웨어
+
+    한 번에 전송되는 응답(JSONResponse 등)은 크기를 보고 minimum_size 이상이고 압축 결과가 더
+    작을 때만 압축한다. 여러 조각으로 나뉜 스트리밍 응답은 조각마다 이어서 압축하고 flush해
+    조각이 도착하는 대로 보낸다 (Content-Length가 minimum_size 미만이면 압축하지 않음).
+    압축 시간은 "compress" 단계로 기록한다 (Server-Timing, insu_stage_seconds).
+    """
+
+    def __init__(self, app, config: dict = None):
+        self.app = app
+        self.config = config or COMPRESSION_CONFIG
+        self.content_types = tuple(
+            content_type.encode("latin-1") for content_type in self.config["content_types"]
+        )
+
+    def _choose_encoder(self, scope):
+        header = _header(scope.get("headers", []), b"accept-encoding")
+        if not header:
+            return None
+        accepted = _accepted_encodings(header)
+        if brotli is not None and "br" in accepted:
+            return _BrotliEncoder
+        if "gzip" in accepted:
+            return _GzipEncoder
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.config["enabled"]:
+            await self.app(scope, receive, send)
+            return
+        encoder_class = self._choose_encoder(scope)
+        if encoder_class is None:
+            await self.app(scope, receive, send)
+            return
+
+        minimum_size = self.config["minimum_size"]
+        start_message = None
+        encoder = None
+        passthrough = False
+
+        def compressed_headers(content_length: int = None) -> list:
+            headers = [
+                (key, value)
+                for key, value in start_message.get("headers", [])
+                if key.lower() not in (b"content-length", b"vary")
+            ]
+            vary = _header(start_message.get("headers", []), b"vary")
+            headers.append((b"vary", vary + b", Accept-Encoding" if vary else b"Accept-Encoding"))
+            headers.append((b"content-encoding", encoder_class.name))
+            if content_length is not None:
+                headers.append((b"content-length", str(content_length).encode("latin-1")))
+            return headers
+
+        async def send_compressed(message):
+            nonlocal start_message, encoder, passthrough
+            if passthrough:
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                headers = message.get("headers", [])
+                content_type = _header(headers, b"content-type") or b""
+                if _header(headers, b"content-encoding") is not None or not content_type.startswith(
+                    self.content_types
+                ):
+                    passthrough = True
+                    await send(message)
+                    return
+                # 본문 크기를 보고 압축 여부를 정할 때까지 시작 메시지를 보류
+                start_message = message
+                return
+
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if encoder is None:
+                if not more_body:
+                    # 한 번에 전송되는 응답
+                    if len(body) >= minimum_size:
+                        started_at = time.perf_counter()
+                        candidate = encoder_class(self.config)
+                        compressed = candidate.compress(body) + candidate.finish()
+                        record_stage("compress", time.perf_counter() - started_at)
+                        if len(compressed) < len(body):
+                            start_message["headers"] = compressed_headers(len(compressed))
+                            await send(start_message)
+                            await send({"type": "http.response.body", "body": compressed})
+                            return
+                    passthrough = True
+                    await send(start_message)
+                    await send(message)
+                    return
+                # 스트리밍 응답: 전체 길이를 아는 작은 응답(FileResponse 등)은 그대로 전송
+                content_length = _header(start_message.get("headers", []), b"content-length")
+                if content_length is not None and int(content_length) < minimum_size:
+                    passthrough = True
+                    await send(start_message)
+                    await send(message)
+                    return
+                # 압축 후 길이는 미리 알 수 없으므로 Content-Length 없이 이어서 압축
+                encoder = encoder_class(self.config)
+                start_message["headers"] = compressed_headers()
+                await send(start_message)
+
+            started_at = time.perf_counter()
+            # 조각마다 flush하지 않으면 압축기가 데이터를 쥐고 있어 스트림이 끝날 때까지 전송이 밀림
+            chunk = encoder.compress(body) + (encoder.flush() if more_body else encoder.finish())
+            record_stage("compress", time.perf_counter() - started_at)
+            await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
+
+
+class UTF8CharsetMiddleware:
+    """charset이 없는 JSON 응답의 Content-Type을 application/json; charset=utf-8로 바꾸는 ASGI 미들웨어"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_charset(message):
+            if message["type"] == "http.response.start":
+                headers = message.get("headers", [])
+                content_type = _header(headers, b"content-type")
+                if (
+                    content_type is not None
+                    and content_type.startswith(b"application/json")
+                    and b"charset" not in content_type
+                ):
+                    message["headers"] = [
+                        (key, UTF8_JSON_CONTENT_TYPE if key.lower() == b"content-type" else value)
+                        for key, value in headers
+                    ]
+            await send(message)
+
+        await self.app(scope, receive, send_with_charset)
+
+
+class ProfilingMiddleware:
+    """
+    프로파일 대상 요청의 호출 스택을 샘플링하고 끝나면 파일로 저장하는 ASGI 미들웨어
+
+    ServerTimingMiddleware 안쪽에 붙여 요청의 단계별 시간을 프로파일에 함께 기록한다.
+    응답에는 X-Profile-Id 헤더로 저장될 프로파일 ID를 알려준다.
+    """
+
+    def __init__(self, app, profiler=None):
+        self.app = app
+        self.profiler = profiler or get_profiler()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.profiler.should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        # 이벤트 루프 스레드 샘플은 이 프레임 아래에서 실행 중일 때만 이 요청으로 기록
+        profile, token = self.profiler.start(scope["method"], scope["path"], sys._getframe())
+        status = 500
+
+        async def send_with_profile_id(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-profile-id", profile.id.encode("latin-1"))
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            self.profiler.stop(profile, token)
+            stages = current_stage_durations()
+            try:
+                # 응답은 이미 보냈으므로 파일 저장은 이벤트 루프 밖에서
+                await asyncio.get_running_loop().run_in_executor(
+                    None, self.profiler.save, profile, status, stages
+                )
+            except Exception as e:
+                logger.warning("프로파일 저장 실패: %s", e)
@@ -1,24 +1,32 @@
-from .collection_loader import CollectionLoader
-from .config import Config
-from .document import Document
-from .embedding import EmbeddingService
-from .generate_answer import AnswerGenerator
-from .main_prompt import MainPrompt
-from .prompts import Prompts
-from .schema import SearchQuery, NestedQuery
-from .search import SearchService
-from .utils import Utils
+# 하위 모듈은 처음 접근할 때 import 한다 (generate_answer가 langchain_openai를 로드하므로
+# 패키지 import만으로 rag.src 모듈을 쓰는 서버/CLI가 느려지지 않도록 함)
+import importlib
 
-__all__ = [
-    'CollectionLoader',
-    'Config',
-    'Document',
-    'EmbeddingService',
-    'AnswerGenerator',
-    'MainPrompt',
-    'Prompts',
-    'SearchQuery',
-    'NestedQuery',
-    'SearchService',
-    'Utils'
-] 
\ No newline at end of file
+_EXPORTS = {
+    'CollectionLoader': '.collection_loader',
+    'Config': '.config',
+    'Document': '.document',
+    'EmbeddingService': '.embedding',
+    'AnswerGenerator': '.generate_answer',
+    'MainPrompt': '.main_prompt',
+    'Prompts': '.prompts',
+    'SearchQuery': '.schema',
+    'NestedQuery': '.schema',
+    'SearchService': '.search',
+    'Utils': '.utils',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
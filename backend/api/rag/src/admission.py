@@ -0,0 +1,212 @@
+"""
+/chat 요청 수락 제어 (admission control)
+
+요청 종류(의도 분류, 비교설계, 약관)별로 동시에 처리하는 요청 수를 제한한다.
+한도를 넘은 요청은 짧은 대기열에서 기다리며, 대기열이 가득 차면 즉시 429를,
+대기 시간 예산(queue_timeout)을 넘기면 503을 Retry-After와 함께 돌려준다.
+급증한 요청을 모두 받아 외부 API 호출 뒤에 쌓아 두다가 클라이언트가 시간 초과로
+끊는 대신, 처리할 수 있는 만큼만 받고 나머지는 빨리 거절한다.
+종류가 의도 분류 뒤에 정해지는 /chat은 분류 전에 check()로 받을 수 없는 요청을 거절하고,
+reserve()로 빈 슬롯을 미리 잡아 두었다가 다른 종류로 분류되면 반납한다.
+워커 프로세스의 이벤트 루프 하나에서 사용한다 (스레드 안전하지 않음).
+"""
+import asyncio
+import time
+from collections import deque
+from typing import Optional
+
+from .config import ADMISSION_CONFIG
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, request_class: str, status_code: int, retry_after: int, reason: str):
+        super().__init__(f"{request_class}: {reason}")
+        self.request_class = request_class
+        self.status_code = status_code
+        self.retry_after = retry_after
+        self.reason = reason
+
+
+class AdmissionLimiter:
+    def __init__(
+        self,
+        name: str,
+        max_in_flight: int,
+        max_queue: int,
+        queue_timeout: float,
+        retry_after: int = 1,
+    ):
+        self.name = name
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.in_flight = 0
+        self._waiters = deque()
+
+        self.admitted = 0
+        self.queued_total = 0
+        self.rejected_queue_full = 0
+        self.rejected_queue_timeout = 0
+        self.rejected_precheck = 0
+        self.queue_wait_seconds = 0.0
+        self.max_queue_wait_seconds = 0.0
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(1 for waiter in self._waiters if not waiter.done())
+
+    @property
+    def saturated(self) -> bool:
+        """지금 acquire()하면 바로 429로 거절되는지 여부"""
+        if self.in_flight < self.max_in_flight and not self.queue_depth:
+            return False
+        return self.queue_depth >= self.max_queue
+
+    def try_acquire(self) -> bool:
+        """기다리지 않고 바로 얻을 수 있을 때만 슬롯 획득"""
+        if self.in_flight < self.max_in_flight and not self.queue_depth:
+            self.in_flight += 1
+            self.admitted += 1
+            return True
+        return False
+
+    async def acquire(self) -> None:
+        if self.try_acquire():
+            return
+
+        if self.queue_depth >= self.max_queue:
+            self.rejected_queue_full += 1
+            raise AdmissionRejected(self.name, 429, self.retry_after, "대기열이 가득 찼습니다.")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.queued_total += 1
+        started_at = time.perf_counter()
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except asyncio.TimeoutError:
+            # 시간 초과와 동시에 슬롯을 넘겨받은 경우는 그대로 수락
+            if not (waiter.done() and not waiter.cancelled()):
+                self.rejected_queue_timeout += 1
+                raise AdmissionRejected(
+                    self.name, 503, self.retry_after, "대기 시간 한도를 넘었습니다."
+                )
+        except asyncio.CancelledError:
+            # 슬롯을 넘겨받은 직후 취소되면 다음 대기 요청에 넘김
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+        finally:
+            waited = time.perf_counter() - started_at
+            self.queue_wait_seconds += waited
+            self.max_queue_wait_seconds = max(self.max_queue_wait_seconds, waited)
+            try:
+                self._waiters.remove(waiter)
+            except ValueError:
+                pass
+        # release()가 슬롯을 그대로 넘겨줬으므로 in_flight는 이미 반영됨
+        self.admitted += 1
+
+    def release(self) -> None:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(True)
+                return
+        self.in_flight -= 1
+
+    def stats(self) -> dict:
+        queued = self.queued_total
+        return {
+            "max_in_flight": self.max_in_flight,
+            "max_queue": self.max_queue,
+            "queue_timeout": self.queue_timeout,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "admitted": self.admitted,
+            "queued": queued,
+            "rejected_queue_full": self.rejected_queue_full,
+            "rejected_queue_timeout": self.rejected_queue_timeout,
+            "rejected_precheck": self.rejected_precheck,
+            "avg_queue_wait_seconds": round(self.queue_wait_seconds / queued, 4) if queued else 0.0,
+            "max_queue_wait_seconds": round(self.max_queue_wait_seconds, 4),
+        }
+
+
+class _Admission:
+    def __init__(self, limiter: AdmissionLimiter, acquired: bool = False):
+        self.limiter = limiter
+        self.acquired = acquired
+
+    async def __aenter__(self):
+        if self.limiter is not None and not self.acquired:
+            await self.limiter.acquire()
+            self.acquired = True
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.release()
+        return False
+
+    def release(self) -> None:
+        """슬롯 반납 (여러 번 호출해도 한 번만 반납)"""
+        if self.limiter is not None and self.acquired:
+            self.acquired = False
+            self.limiter.release()
+
+
+class AdmissionController:
+    def __init__(self, config: dict = None):
+        self.config = config or ADMISSION_CONFIG
+        self.limiters = {
+            name: AdmissionLimiter(name, **settings)
+            for name, settings in self.config["classes"].items()
+        }
+
+    @property
+    def enabled(self) -> bool:
+        return self.config["enabled"]
+
+    def admit(self, request_class: str) -> _Admission:
+        """async with get_admission().admit("compare"): ... (한도 초과 시 AdmissionRejected)"""
+        return _Admission(self.limiters[request_class] if self.enabled else None)
+
+    def reserve(self, request_class: str) -> Optional[_Admission]:
+        """빈 슬롯이 있으면 바로 잡은 _Admission, 없으면 None (대기하지 않음)"""
+        if not self.enabled:
+            return _Admission(None)
+        limiter = self.limiters[request_class]
+        return _Admission(limiter, acquired=True) if limiter.try_acquire() else None
+
+    def check(self, *request_classes: str) -> None:
+        """주어진 종류가 모두 한도를 넘어 어느 쪽으로도 받을 수 없으면 AdmissionRejected(429)"""
+        if not self.enabled:
+            return
+        limiters = [self.limiters[name] for name in request_classes]
+        if all(limiter.saturated for limiter in limiters):
+            for limiter in limiters:
+                limiter.rejected_precheck += 1
+            raise AdmissionRejected(
+                "/".join(request_classes),
+                429,
+                max(limiter.retry_after for limiter in limiters),
+                "대기열이 가득 찼습니다.",
+            )
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "classes": {name: limiter.stats() for name, limiter in self.limiters.items()},
+        }
+
+
+_controller = None
+
+
+def get_admission() -> AdmissionController:
+    """워커 프로세스의 수락 제어 (main.lifespan에서 생성, 이벤트 루프 스레드에서만 사용)"""
+    global _controller
+    if _controller is None:
+        _controller = AdmissionController()
+    return _controller
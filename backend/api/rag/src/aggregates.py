@@ -0,0 +1,58 @@
+"""
+보험료 합계 집계 테이블(premium_totals) 관리
+
+프로필(보험나이, 성별, 상품유형, 만기)과 상품별 보험료 합계 및 기본플랜 합계를 미리 계산해 둔다.
+comparison/coverage 행이 바뀌면 트리거가 해당 합계만 증분 갱신하고,
+대량 적재 후에는 refresh_premium_totals로 전체 또는 일부 프로필을 다시 계산한다.
+"""
+from typing import Iterable, Optional, Tuple
+
+from .db import db
+from .log import configure
+from .schema import PREMIUM_TOTALS_SCHEMA, PREMIUM_TOTALS_TRIGGERS, PREMIUM_TOTALS_REBUILD
+
+PROFILE_COLUMNS = ("insu_age", "sex", "product_type", "expiry_year")
+
+
+def install_premium_totals() -> None:
+    """집계 테이블과 트리거를 만들고 전체 합계를 채움"""
+    with db.transaction() as cursor:
+        cursor.execute(PREMIUM_TOTALS_SCHEMA)
+        for statement in PREMIUM_TOTALS_TRIGGERS:
+            cursor.execute(statement)
+    refresh_premium_totals()
+
+
+def refresh_premium_totals(profiles: Optional[Iterable[Tuple]] = None) -> int:
+    """
+    합계 재계산
+
+    Args:
+        profiles: (insu_age, sex, product_type, expiry_year) 목록. None이면 전체 재계산
+
+    Returns:
+        다시 계산한 집계 행 수
+    """
+    with db.transaction() as cursor:
+        if profiles is None:
+            cursor.execute("DELETE FROM premium_totals")
+            cursor.execute(PREMIUM_TOTALS_REBUILD.format(where=""))
+            return cursor.rowcount
+
+        refreshed = 0
+        condition = " AND ".join(f"{column} = %s" for column in PROFILE_COLUMNS)
+        rebuild = PREMIUM_TOTALS_REBUILD.format(
+            where="WHERE " + " AND ".join(f"c.{column} = %s" for column in PROFILE_COLUMNS)
+        )
+        for profile in profiles:
+            profile = tuple(profile)
+            cursor.execute(f"DELETE FROM premium_totals WHERE {condition}", profile)
+            cursor.execute(rebuild, profile)
+            refreshed += cursor.rowcount
+        return refreshed
+
+
+if __name__ == "__main__":
+    configure()
+    install_premium_totals()
+    print("premium_totals 집계 테이블 설치 및 재계산 완료")
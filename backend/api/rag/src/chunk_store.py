@@ -0,0 +1,76 @@
+"""
+약관 청크 메타데이터 저장소
+
+컬렉션 메타데이터(청크 텍스트 등)를 수만 개의 파이썬 dict/str 객체로 들고 있는 대신
+하나의 NumPy 바이트 버퍼와 오프셋 배열에 JSON으로 묶어 보관하고, 조회할 때만 해당 항목을 디코딩한다.
+사전 로드 후 fork 하는 서버(api.serve)에서 워커가 메타데이터를 읽어도 참조 카운트 갱신으로
+공유 페이지가 복사되지 않으며, 단일 프로세스에서도 메모리 사용량이 줄어든다.
+"""
+import json
+from collections.abc import Mapping
+
+import numpy as np
+
+
+class ChunkStore(Mapping):
+    """읽기 전용 메타데이터 매핑 (키 -> 항목 dict)"""
+
+    def __init__(self, metadata: Mapping):
+        keys = list(metadata.keys())
+        encoded = [
+            json.dumps(metadata[key], ensure_ascii=False).encode("utf-8") for key in keys
+        ]
+        self._buffer = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+        self._offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(item) for item in encoded], out=self._offsets[1:])
+
+        # 리스트에서 변환된 메타데이터("0", "1", ...)는 키 배열 없이 위치로 찾음
+        self._sequential = all(key == str(index) for index, key in enumerate(keys))
+        if self._sequential:
+            self._keys = None
+            self._sorted_keys = None
+            self._order = None
+        else:
+            self._keys = np.array(keys, dtype=str)
+            self._order = np.argsort(self._keys, kind="stable")
+            self._sorted_keys = self._keys[self._order]
+        self._buffer.flags.writeable = False
+        self._offsets.flags.writeable = False
+
+    def _position(self, key) -> int:
+        if not isinstance(key, str):
+            return -1
+        if self._sequential:
+            if not (key.isascii() and key.isdigit()) or (len(key) > 1 and key[0] == "0"):
+                return -1
+            position = int(key)
+            return position if position < len(self) else -1
+        index = int(np.searchsorted(self._sorted_keys, key))
+        if index < len(self._sorted_keys) and self._sorted_keys[index] == key:
+            return int(self._order[index])
+        return -1
+
+    def __getitem__(self, key):
+        position = self._position(key)
+        if position < 0:
+            raise KeyError(key)
+        start, end = self._offsets[position], self._offsets[position + 1]
+        return json.loads(self._buffer[start:end].tobytes().decode("utf-8"))
+
+    def __contains__(self, key) -> bool:
+        return self._position(key) >= 0
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __iter__(self):
+        if self._sequential:
+            return (str(index) for index in range(len(self)))
+        return (str(key) for key in self._keys)
+
+    @property
+    def nbytes(self) -> int:
+        size = self._buffer.nbytes + self._offsets.nbytes
+        if self._keys is not None:
+            size += self._keys.nbytes + self._sorted_keys.nbytes + self._order.nbytes
+        return size
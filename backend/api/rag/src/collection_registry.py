@@ -0,0 +1,134 @@
+"""
+동시 요청용 컬렉션 레지스트리와 임베딩 캐시
+
+컬렉션 목록은 copy-on-write 딕셔너리로 관리한다. 읽기는 현재 딕셔너리를 잠금 없이 참조하고,
+쓰기(새 컬렉션 등록)는 잠금 안에서 복사본을 만들어 통째로 교체한다.
+아직 로드되지 않은 컬렉션을 여러 요청이 동시에 찾으면 한 스레드만 FAISS 파일을 읽고
+나머지는 같은 Future를 기다려 결과(또는 오류)를 함께 받는다 (single-flight).
+"""
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional
+
+from .config import COLLECTION_CONFIG
+
+
+class CollectionRegistry:
+    def __init__(self):
+        self._collections: Dict[str, dict] = {}
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.loads = 0
+        self.shared_waits = 0
+        self.failures = 0
+
+    def get(self, name: str) -> Optional[dict]:
+        return self._collections.get(name)
+
+    def snapshot(self) -> List[dict]:
+        """로드된 컬렉션 목록 (등록 순서)"""
+        return list(self._collections.values())
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._collections
+
+    def __len__(self) -> int:
+        return len(self._collections)
+
+    def get_or_load(self, name: str, loader: Callable[[str], dict]) -> dict:
+        """로드된 컬렉션을 반환하고, 없으면 loader(name)를 한 번만 실행해 등록"""
+        collection = self._collections.get(name)
+        if collection is not None:
+            return collection
+
+        with self._lock:
+            collection = self._collections.get(name)
+            if collection is not None:
+                return collection
+            future = self._inflight.get(name)
+            is_loader = future is None
+            if is_loader:
+                future = Future()
+                self._inflight[name] = future
+            else:
+                self.shared_waits += 1
+
+        if not is_loader:
+            return future.result()
+
+        try:
+            collection = loader(name)
+        except BaseException as e:
+            with self._lock:
+                self.failures += 1
+                del self._inflight[name]
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            collections = dict(self._collections)
+            collections[name] = collection
+            self._collections = collections
+            self.loads += 1
+            del self._inflight[name]
+        future.set_result(collection)
+        return collection
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "loaded": len(self._collections),
+                "loading": len(self._inflight),
+                "loads": self.loads,
+                "shared_waits": self.shared_waits,
+                "failures": self.failures,
+            }
+
+
+class EmbeddingCache:
+    """크기가 제한된 LRU 임베딩 캐시 (스레드 안전)"""
+
+    def __init__(self, max_entries: int = None):
+        self.max_entries = max_entries or COLLECTION_CONFIG["embedding_cache_size"]
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, text: str):
+        with self._lock:
+            vector = self._entries.get(text)
+            if vector is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(text)
+            self.hits += 1
+        # 검색 단계에서 벡터를 제자리 정규화하므로 복사본을 반환
+        return vector.copy()
+
+    def put(self, text: str, vector) -> None:
+        with self._lock:
+            self._entries[text] = vector.copy()
+            self._entries.move_to_end(text)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __contains__(self, text: str) -> bool:
+        with self._lock:
+            return text in self._entries
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
@@ -1,3 +1,12 @@
+import os
+
+from ...config import Config as _ApiConfig
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+# 런타임 데이터 디렉토리 (vector_db와 같은 위치의 data 폴더)
+DATA_DIR = os.getenv("INSU_DATA_DIR", os.path.join(BACKEND_DIR, "data"))
+
 # 데이터베이스 연결 설정
 DB_CONFIG = {
     "host": "localhost",
@@ -16,3 +25,295 @@ DEFAULT_CONFIG = {
     "expiry": 20,
     "duration": 100,
 }
+
+# 로컬 의도 분류 설정
+INTENT_CONFIG = {
+    "enabled": os.getenv("LOCAL_INTENT_ENABLED", "true").lower() == "true",
+    # 이 값보다 신뢰도가 낮으면 LLM(gpt-4-turbo)으로 분류
+    "confidence_threshold": float(os.getenv("LOCAL_INTENT_THRESHOLD", "0.9")),
+    # 학습 모델이 없거나 샘플이 부족할 때 규칙만으로 판단하는 임계값 (키워드 하나로는 넘지 못하는 값)
+    "rule_only_threshold": float(os.getenv("LOCAL_INTENT_RULE_THRESHOLD", "0.98")),
+    # 이 수 이상의 LLM 분류 기록으로 학습된 모델만 단독으로 신뢰
+    "min_model_samples": int(os.getenv("LOCAL_INTENT_MIN_SAMPLES", "200")),
+    # LLM 분류 결과 기록 (로컬 모델 학습 데이터)
+    "decision_log_path": os.path.join(DATA_DIR, "intent_decisions.jsonl"),
+    "model_path": os.path.join(DATA_DIR, "intent_model.json"),
+}
+
+# 보험사 레지스트리 (약관 벡터DB 컬렉션, insu_company.company_name 검색어, 질문 내 별칭)
+COMPANY_REGISTRY = {
+    "삼성화재": {
+        "collection": "Samsung_YakMu2404103NapHae20250113",
+        "collection_prefix": "samsung",
+        "db_keyword": "삼성",
+        "aliases": ["삼성화재", "삼성", "samsung"],
+    },
+    "DB손해보험": {
+        "collection": "DBSonBo_YakMu20250123",
+        "collection_prefix": "dbsonbo",
+        "db_keyword": "DB",
+        "aliases": ["db손해보험", "db손해", "db보험", "db손보", "db", "디비손해보험", "디비손보", "디비"],
+        # 이전 디렉토리 이름 (약관 컬렉션 로드 시 현재 이름으로 변환)
+        "legacy_collections": ["DBSonbo_Yakwan20250123"],
+    },
+    "하나손해보험": {
+        "collection": "HaNa_YakMuHaGaengPyo20250101",
+        "collection_prefix": "hana",
+        "db_keyword": "하나",
+        "aliases": ["하나손해보험", "하나손보", "하나", "hana"],
+    },
+    "한화손해보험": {
+        "collection": "HanWha_YakHan20250201",
+        "collection_prefix": "hanwha",
+        "db_keyword": "한화",
+        "aliases": ["한화손해보험", "한화손보", "한화", "hanwha"],
+    },
+    "흥국화재": {
+        "collection": "Heung_YakMu250220250205",
+        "collection_prefix": "heung",
+        "db_keyword": "흥국",
+        "aliases": ["흥국화재", "흥국", "heung", "흥국생명"],
+    },
+    "현대해상": {
+        "collection": "HyunDai_YakMuSeH1Il2Nap20250213",
+        "collection_prefix": "hyundai",
+        "db_keyword": "현대",
+        "aliases": ["현대해상", "현대", "hyundai"],
+    },
+    "KB손해보험": {
+        "collection": "KB_YakKSeHaeMu250120250214",
+        "collection_prefix": "kb",
+        "db_keyword": "KB",
+        "aliases": ["KB손해보험", "KB손보", "KB", "케이비"],
+    },
+    "롯데손해보험": {
+        "collection": "LotteSonBo_YakMuLDeo25011220250101",
+        "collection_prefix": "lottesonbo",
+        "db_keyword": "롯데",
+        "aliases": ["롯데손해보험", "롯데손보", "롯데", "lotte"],
+    },
+    "MG손해보험": {
+        "collection": "MGSonBo_YakMuWon2404Se20250101",
+        "collection_prefix": "mgsonbo",
+        "db_keyword": "MG",
+        "aliases": ["MG손해보험", "MG손보", "MG", "엠지"],
+    },
+    "메리츠화재": {
+        "collection": "Meritz_YakMu220250113",
+        "collection_prefix": "meritz",
+        "db_keyword": "메리츠",
+        "aliases": ["메리츠화재", "메리츠", "meritz"],
+    },
+    "NH농협손해보험": {
+        "collection": "NH_YakMuN5250120250101",
+        "collection_prefix": "nh",
+        "db_keyword": "농협",
+        "aliases": ["NH농협손해보험", "NH손해보험", "농협손해보험", "NH손보", "농협손보", "NH", "농협"],
+    },
+}
+
+# 보험 종류 키워드
+INSURANCE_TYPE_KEYWORDS = ["암", "상해", "질병", "재물", "화재", "운전자", "자동차", "실손"]
+
+# 비교 요청 키워드
+COMPARISON_KEYWORDS = [
+    "비교", "차이", "다른", "다른점", "비교해", "비교해줘", "차이점", "알려줘", "뭐가 더 나은가",
+]
+
+# /chat 파이프라인 설정
+PIPELINE_CONFIG = {
+    # 의도 분류와 동시에 약관 검색(임베딩 + 벡터 검색)을 미리 시작
+    "speculative_retrieval": os.getenv("SPECULATIVE_RETRIEVAL", "false").lower() == "true",
+    "speculative_workers": int(os.getenv("SPECULATIVE_WORKERS", "4")),
+}
+
+# /chat 단계별 전용 스레드 풀 크기 (블로킹 호출을 이벤트 루프 밖에서 실행)
+EXECUTOR_CONFIG = {
+    # 의도 분류 (로컬 분류기 또는 LLM)
+    "intent_workers": int(os.getenv("INTENT_WORKERS", "16")),
+    # LLM 호출 (SQL 생성, 답변 생성, 결과 변환)
+    "llm_workers": int(os.getenv("LLM_WORKERS", "16")),
+    # 약관 검색 (컬렉션 로드, 임베딩, FAISS 검색)
+    "search_workers": int(os.getenv("SEARCH_WORKERS", "8")),
+    # DB 조회 (기본값: 커넥션 풀 크기와 동일)
+    "db_workers": int(os.getenv("DB_WORKERS", os.getenv("DB_POOL_SIZE", "8"))),
+}
+# /search/batch 답변 생성이 동시에 쓰는 LLM 스레드 수 (나머지는 /chat 몫으로 남김)
+EXECUTOR_CONFIG["batch_llm_concurrency"] = int(
+    os.getenv("BATCH_LLM_CONCURRENCY", str(max(1, EXECUTOR_CONFIG["llm_workers"] // 4)))
+)
+
+# /chat 요청 수락 제어 (워커별). 한도를 넘으면 대기열에서 기다리고, 대기열이 차면 즉시 거절
+ADMISSION_CONFIG = {
+    "enabled": os.getenv("ADMISSION_ENABLED", "true").lower() == "true",
+    "classes": {
+        # 의도 분류 단계
+        "intent": {
+            "max_in_flight": int(os.getenv("ADMISSION_INTENT_IN_FLIGHT", "64")),
+            "max_queue": int(os.getenv("ADMISSION_INTENT_QUEUE", "128")),
+            "queue_timeout": float(os.getenv("ADMISSION_INTENT_QUEUE_TIMEOUT", "1")),
+            "retry_after": 1,
+        },
+        # 비교설계 (DB/큐브 조회 위주)
+        "compare": {
+            "max_in_flight": int(os.getenv("ADMISSION_COMPARE_IN_FLIGHT", "32")),
+            "max_queue": int(os.getenv("ADMISSION_COMPARE_QUEUE", "64")),
+            "queue_timeout": float(os.getenv("ADMISSION_COMPARE_QUEUE_TIMEOUT", "2")),
+            "retry_after": 1,
+        },
+        # 약관 질문 (임베딩 + LLM 답변 생성)
+        "terms": {
+            "max_in_flight": int(os.getenv("ADMISSION_TERMS_IN_FLIGHT", "16")),
+            "max_queue": int(os.getenv("ADMISSION_TERMS_QUEUE", "16")),
+            "queue_timeout": float(os.getenv("ADMISSION_TERMS_QUEUE_TIMEOUT", "5")),
+            "retry_after": 5,
+        },
+        # 배치 검색 (/search/batch, 질문 수백~수천 개를 한 요청으로 처리)
+        "batch": {
+            "max_in_flight": int(os.getenv("ADMISSION_BATCH_IN_FLIGHT", "2")),
+            "max_queue": int(os.getenv("ADMISSION_BATCH_QUEUE", "4")),
+            "queue_timeout": float(os.getenv("ADMISSION_BATCH_QUEUE_TIMEOUT", "10")),
+            "retry_after": 10,
+        },
+    },
+}
+
+# 약관 컬렉션/임베딩 캐시 설정
+COLLECTION_CONFIG = {
+    "embedding_cache_size": int(os.getenv("EMBEDDING_CACHE_SIZE", "4096")),
+    # 배치 검색에서 임베딩 API 요청 하나에 묶는 질문 수
+    "embedding_batch_size": int(os.getenv("EMBEDDING_BATCH_SIZE", "100")),
+    # /search/batch 요청 하나의 최대 질문 수
+    "batch_max_queries": int(os.getenv("BATCH_MAX_QUERIES", "1000")),
+    # Upstage 임베딩 API 주소 (부하 테스트에서는 로컬 가짜 서버 주소로 바꿈.
+    # OpenAI 호출은 openai SDK가 OPENAI_BASE_URL 환경 변수를 그대로 따름)
+    "embedding_base_url": os.getenv("UPSTAGE_BASE_URL", "https://api.upstage.ai/v1/solar"),
+}
+
+# MySQL 커넥션 풀 설정
+DB_POOL_CONFIG = {
+    "pool_name": "insu_pool",
+    "pool_size": int(os.getenv("DB_POOL_SIZE", "8")),
+    # 풀이 모두 사용 중일 때 커넥션을 기다리는 최대 시간(초)
+    "acquire_timeout": float(os.getenv("DB_POOL_ACQUIRE_TIMEOUT", "5")),
+    # 이 시간(초)이 지난 커넥션은 다시 연결
+    "recycle_seconds": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+    # 이 시간(초) 이상 쉬었던 커넥션은 사용 전에 ping으로 상태 확인
+    "health_check_interval": int(os.getenv("DB_POOL_HEALTH_CHECK", "30")),
+    # 쿼리별 최대 실행 시간(ms), MySQL max_execution_time
+    "query_timeout_ms": int(os.getenv("DB_QUERY_TIMEOUT_MS", "5000")),
+}
+
+# 인메모리 보험료 큐브 설정
+PREMIUM_CUBE_CONFIG = {
+    "enabled": os.getenv("PREMIUM_CUBE_ENABLED", "false").lower() == "true",
+    # 데이터 버전 확인 주기(초). 버전이 바뀌면 큐브를 다시 만든다
+    "version_check_seconds": float(os.getenv("PREMIUM_CUBE_VERSION_CHECK", "10")),
+    "load_batch_size": 50000,
+    # 큐브 생성 실패 시 재시도 대기(초). 연속 실패마다 두 배로 늘리되 최대값까지
+    "retry_seconds": float(os.getenv("PREMIUM_CUBE_RETRY", "30")),
+    "max_retry_seconds": float(os.getenv("PREMIUM_CUBE_MAX_RETRY", "600")),
+}
+
+# 보험료 합계 집계 테이블(premium_totals) 사용 여부
+AGGREGATE_CONFIG = {
+    "enabled": os.getenv("PREMIUM_TOTALS_ENABLED", "false").lower() == "true",
+}
+
+# 비교설계 SQL 결과 캐시 설정 (켜져 있어도 data_version 테이블이 없으면 사용하지 않음)
+RESULT_CACHE_CONFIG = {
+    "enabled": os.getenv("RESULT_CACHE_ENABLED", "true").lower() == "true",
+    "max_entries": int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "1024")),
+    # 데이터 버전 확인 주기(초)
+    "version_check_seconds": float(os.getenv("RESULT_CACHE_VERSION_CHECK", "5")),
+}
+
+# 비교설계 저장소 설정 (mysql 또는 sqlite)
+STORAGE_CONFIG = {
+    "backend": os.getenv("STORAGE_BACKEND", "mysql").lower(),
+    # vector_db와 함께 배포하는 SQLite 파일 (python -m api.rag.src.storage export 로 생성)
+    "sqlite_path": os.getenv("SQLITE_DB_PATH", os.path.join(BACKEND_DIR, "premiums.sqlite3")),
+    "sqlite_read_only": os.getenv("SQLITE_READ_ONLY", "true").lower() == "true",
+    # 읽기 전용 매체에 둔 파일은 immutable로 열어 잠금/WAL 확인을 생략
+    "sqlite_immutable": os.getenv("SQLITE_IMMUTABLE", "false").lower() == "true",
+    "sqlite_mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+    # 내보내기가 파일(심볼릭 링크)을 바꿨는지 확인하는 주기(초)
+    "sqlite_reopen_check_seconds": float(os.getenv("SQLITE_REOPEN_CHECK", "5")),
+}
+
+# 로깅 설정 (rag/src/log.py)
+LOG_CONFIG = {
+    "level": os.getenv("LOG_LEVEL", "INFO").upper(),
+    # json: 한 줄에 레코드 하나씩 JSON, text: 사람이 읽는 한 줄 형식
+    "format": os.getenv("LOG_FORMAT", "json").lower(),
+    # 출력 대기 레코드 수 한도. 넘치면 요청 스레드를 막지 않고 버린다
+    "queue_size": int(os.getenv("LOG_QUEUE_SIZE", "10000")),
+}
+
+# LangSmith 트레이싱 설정 (rag/src/tracing.py). API 키가 없으면 트레이싱 호출은 모두 no-op
+TRACING_CONFIG = {
+    "enabled": bool(os.getenv("LANGCHAIN_API_KEY"))
+    and os.getenv("TRACING_ENABLED", "true").lower() == "true",
+    "api_key": os.getenv("LANGCHAIN_API_KEY", ""),
+    "endpoint": os.getenv("LANGCHAIN_ENDPOINT", "https://api.smith.langchain.com"),
+    "project": os.getenv("LANGCHAIN_PROJECT", "insupanda"),
+    # 요청(루트 span) 단위 샘플링 비율. 선택되지 않은 요청의 하위 span도 모두 생략
+    "sample_rate": float(os.getenv("TRACE_SAMPLE_RATE", "0.1")),
+    # 전송 대기 span 수 한도. 넘치면 요청 스레드를 막지 않고 버린다
+    "queue_size": int(os.getenv("TRACE_QUEUE_SIZE", "2000")),
+    "batch_size": int(os.getenv("TRACE_BATCH_SIZE", "100")),
+    "flush_interval": float(os.getenv("TRACE_FLUSH_INTERVAL", "2")),
+    # 메타데이터 문자열/목록 최대 길이 (질문 전문, 컬렉션 목록 등을 잘라서 전송)
+    "max_value_chars": int(os.getenv("TRACE_MAX_VALUE_CHARS", "200")),
+    "max_list_items": int(os.getenv("TRACE_MAX_LIST_ITEMS", "10")),
+}
+
+# 대화 세션 저장소 설정 (rag/src/session_store.py). 기본값은 api/config.py의 세션 관리 설정
+SESSION_CONFIG = {
+    # memory: 워커 프로세스별 메모리, sqlite: 워커 간 공유 파일, redis: Redis 호환 서버
+    "backend": os.getenv("SESSION_BACKEND", "memory").lower(),
+    # 세션별로 보관하는 최근 메시지 수
+    "max_history": int(os.getenv("SESSION_MAX_HISTORY", str(_ApiConfig.MAX_HISTORY_LENGTH))),
+    # 마지막 대화 후 이 시간(초)이 지난 세션은 삭제
+    "ttl_seconds": float(os.getenv("SESSION_TTL_HOURS", str(_ApiConfig.SESSION_CLEANUP_HOURS))) * 3600,
+    # 만료 세션 정리 주기(초)
+    "cleanup_interval": float(os.getenv("SESSION_CLEANUP_INTERVAL", "300")),
+    # 메모리 저장소의 최대 세션 수 (넘치면 가장 오래된 세션부터 삭제)
+    "max_sessions": int(os.getenv("SESSION_MAX_SESSIONS", "100000")),
+    # 메시지 하나에 저장하는 최대 글자 수 (긴 비교설계 표 등은 잘라서 보관)
+    "max_content_chars": int(os.getenv("SESSION_MAX_CONTENT_CHARS", "4000")),
+    "sqlite_path": os.getenv("SESSION_SQLITE_PATH", os.path.join(DATA_DIR, "sessions.sqlite3")),
+    "redis_url": os.getenv("SESSION_REDIS_URL", "redis://localhost:6379/0"),
+    "redis_prefix": os.getenv("SESSION_REDIS_PREFIX", "insu:session:"),
+}
+
+# 응답 압축 설정 (api/middleware.py). 긴 약관 답변과 비교설계 표 JSON만 압축
+COMPRESSION_CONFIG = {
+    "enabled": os.getenv("COMPRESSION_ENABLED", "true").lower() == "true",
+    # 이 크기(바이트) 미만의 응답은 압축하지 않음
+    "minimum_size": int(os.getenv("COMPRESSION_MINIMUM_SIZE", "1024")),
+    "gzip_level": int(os.getenv("COMPRESSION_GZIP_LEVEL", "6")),
+    # brotli 패키지가 설치돼 있고 클라이언트가 br을 받으면 brotli 사용
+    "brotli_quality": int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4")),
+    "content_types": ("application/json", "text/"),
+}
+
+# 요청 프로파일링 설정 (rag/src/profiler.py). 관리자 토큰이 없으면 프로파일링 미들웨어와
+# /admin 엔드포인트를 켜지 않으므로 요청 처리에 추가 비용이 없다
+PROFILING_CONFIG = {
+    "admin_token": os.getenv("ADMIN_TOKEN", ""),
+    # 이 헤더에 관리자 토큰을 담은 요청은 예약 없이 프로파일링
+    "header": os.getenv("PROFILING_HEADER", "x-profile").lower(),
+    # 샘플링 간격(초)
+    "interval": float(os.getenv("PROFILING_INTERVAL_MS", "5")) / 1000,
+    # 한 번에 예약할 수 있는 최대 요청 수
+    "max_requests": int(os.getenv("PROFILING_MAX_REQUESTS", "100")),
+    # 요청 하나의 샘플링 한도 (넘으면 그때까지의 샘플만 저장)
+    "max_seconds": float(os.getenv("PROFILING_MAX_SECONDS", "120")),
+    "max_samples": int(os.getenv("PROFILING_MAX_SAMPLES", "100000")),
+    # 보관할 프로파일 수 (오래된 것부터 삭제)
+    "max_profiles": int(os.getenv("PROFILING_MAX_PROFILES", "50")),
+    "output_dir": os.getenv("PROFILING_DIR", os.path.join(DATA_DIR, "profiles")),
+    # 관리/지표 경로는 예약 횟수를 소모하지 않음
+    "exclude_prefixes": ("/admin", "/metrics", "/stats", "/docs", "/redoc", "/openapi.json"),
+}
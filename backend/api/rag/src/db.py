@@ -0,0 +1,248 @@
+"""
+MySQL 커넥션 관리
+
+프로세스 전체에서 하나의 커넥션 풀을 공유한다. 커넥션은 사용 전 상태를 확인하고
+(오래 쉬었으면 ping), 일정 시간이 지나면 다시 연결하며, 쿼리마다 실행 시간 제한을 건다.
+커서와 커넥션은 결과 유무와 관계없이 항상 반환된다.
+비동기 /chat 핸들러를 위해 aiomysql 기반 비동기 경로도 제공한다 (미설치 시 DB 단계 스레드 풀로 대체).
+"""
+import asyncio
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+from .config import DB_CONFIG, DB_POOL_CONFIG
+from .executors import run_in_stage
+
+# mysql.connector/aiomysql는 처음 연결할 때 import (SQLite 저장소나 CLI만 쓰는 프로세스는 로드하지 않음)
+_aiomysql = None
+
+
+def _load_aiomysql():
+    """aiomysql 모듈 (미설치 시 False)"""
+    global _aiomysql
+    if _aiomysql is None:
+        try:
+            import aiomysql
+        except ImportError:
+            aiomysql = False
+        _aiomysql = aiomysql
+    return _aiomysql
+
+
+class PoolTimeoutError(Exception):
+    """풀에서 제한 시간 안에 커넥션을 얻지 못함"""
+
+
+class ConnectionManager:
+    def __init__(self, db_config: dict = None, pool_config: dict = None):
+        self.db_config = db_config or DB_CONFIG
+        self.pool_config = pool_config or DB_POOL_CONFIG
+        self._pool = None
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.pool_config["pool_size"])
+        # 서버 커넥션 ID별 (연결 시각, 마지막 사용 시각)
+        self._connection_state = {}
+        self._async_pool = None
+        self._async_lock = None
+
+    def _get_pool(self):
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    from mysql.connector import pooling
+
+                    self._pool = pooling.MySQLConnectionPool(
+                        pool_name=self.pool_config["pool_name"],
+                        pool_size=self.pool_config["pool_size"],
+                        # 반환할 때 세션을 초기화 (열린 트랜잭션/세션 변수 정리).
+                        # 실행 시간 제한도 함께 사라지므로 _prepare가 빌려줄 때마다 다시 설정
+                        pool_reset_session=True,
+                        **self.db_config,
+                    )
+        return self._pool
+
+    def _prepare(self, conn, timeout_ms: int) -> None:
+        """재연결(recycle), 상태 확인(ping), 실행 시간 제한 설정"""
+        now = time.monotonic()
+        key = conn.connection_id
+        connected_at, last_used = self._connection_state.pop(key, (now, now))
+
+        if now - connected_at > self.pool_config["recycle_seconds"]:
+            conn.reconnect(attempts=1, delay=0)
+            connected_at = now
+        elif now - last_used > self.pool_config["health_check_interval"]:
+            conn.ping(reconnect=True, attempts=1, delay=0)
+
+        # 풀 반환 시 세션 초기화로 이전 값이 남아 있지 않으므로 매번 설정
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SET SESSION max_execution_time = %s", (timeout_ms,))
+        finally:
+            cursor.close()
+
+        # 다시 연결됐으면 새 커넥션 ID로 기록
+        self._connection_state[conn.connection_id] = (connected_at, now)
+
+    @contextmanager
+    def connection(self, timeout_ms: int = None):
+        """풀에서 커넥션을 빌려오고, 블록이 끝나면 반드시 반환 (timeout_ms=0이면 실행 시간 제한 없음)"""
+        if timeout_ms is None:
+            timeout_ms = self.pool_config["query_timeout_ms"]
+        if not self._slots.acquire(timeout=self.pool_config["acquire_timeout"]):
+            raise PoolTimeoutError(
+                f"{self.pool_config['acquire_timeout']}초 안에 DB 커넥션을 얻지 못했습니다."
+            )
+        conn = None
+        try:
+            conn = self._get_pool().get_connection()
+            self._prepare(conn, timeout_ms)
+            yield conn
+        finally:
+            if conn is not None:
+                # 풀 커넥션의 close()는 풀로 반환
+                conn.close()
+            self._slots.release()
+
+    def execute(self, sql: str, params=None, timeout_ms: int = None) -> list:
+        """쿼리를 실행하고 결과 행을 딕셔너리 목록으로 반환"""
+        with self.connection(timeout_ms) as conn:
+            cursor = conn.cursor(dictionary=True)
+            try:
+                cursor.execute(sql, params)
+                return cursor.fetchall() if cursor.with_rows else []
+            finally:
+                cursor.close()
+
+    @contextmanager
+    def transaction(self, timeout_ms: int = 0):
+        """쓰기 작업용 커서. 블록이 정상 종료되면 커밋, 예외가 나면 롤백"""
+        with self.connection(timeout_ms) as conn:
+            cursor = conn.cursor()
+            try:
+                yield cursor
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                cursor.close()
+
+    def stream(self, sql: str, params=None, batch_size: int = 50000, timeout_ms: int = None):
+        """큰 결과를 batch_size 행(튜플) 단위로 나눠 반환 (대량 적재/큐브 생성용)"""
+        with self.connection(timeout_ms) as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(sql, params)
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    yield rows
+            finally:
+                cursor.close()
+
+    async def _get_async_pool(self):
+        if self._async_lock is None:
+            self._async_lock = asyncio.Lock()
+        async with self._async_lock:
+            if self._async_pool is None:
+                self._async_pool = await _load_aiomysql().create_pool(
+                    host=self.db_config["host"],
+                    user=self.db_config["user"],
+                    password=self.db_config["password"],
+                    db=self.db_config["database"],
+                    port=self.db_config.get("port", 3306),
+                    minsize=1,
+                    maxsize=self.pool_config["pool_size"],
+                    pool_recycle=self.pool_config["recycle_seconds"],
+                    charset="utf8mb4",
+                    autocommit=True,
+                )
+        return self._async_pool
+
+    async def execute_async(self, sql: str, params=None, timeout_ms: int = None) -> list:
+        """비동기 쿼리 실행 (aiomysql이 없으면 동기 풀을 DB 단계 스레드 풀에서 사용)"""
+        if timeout_ms is None:
+            timeout_ms = self.pool_config["query_timeout_ms"]
+        aiomysql = _load_aiomysql()
+        if not aiomysql:
+            return await run_in_stage("db", self.execute, sql, params, timeout_ms)
+
+        pool = await self._get_async_pool()
+        acquire_timeout = self.pool_config["acquire_timeout"]
+        conn = await asyncio.wait_for(pool.acquire(), timeout=acquire_timeout)
+        try:
+            async with conn.cursor(aiomysql.DictCursor) as cursor:
+                await cursor.execute("SET SESSION max_execution_time = %s", (timeout_ms,))
+                await asyncio.wait_for(
+                    cursor.execute(sql, params), timeout=timeout_ms / 1000 + 1
+                )
+                return list(await cursor.fetchall())
+        except asyncio.TimeoutError:
+            # 응답이 끊긴 커넥션은 풀에 돌려보내지 않음
+            conn.close()
+            raise
+        finally:
+            pool.release(conn)
+
+    def close(self) -> None:
+        """모든 커넥션 정리 (fork 전에 호출하면 자식 프로세스가 새 풀을 만듦)"""
+        with self._lock:
+            if self._pool is not None:
+                self._pool._remove_connections()
+                self._pool = None
+        if self._async_pool is not None:
+            self._async_pool.close()
+            self._async_pool = None
+        self._connection_state.clear()
+
+
+db = ConnectionManager()
+
+
+def query_database(sql: str, params=None, timeout_ms: int = None) -> list:
+    return db.execute(sql, params, timeout_ms)
+
+
+async def query_database_async(sql: str, params=None, timeout_ms: int = None) -> list:
+    return await db.execute_async(sql, params, timeout_ms)
+
+
+def get_data_version(table_name: str = "comparison") -> Optional[str]:
+    """
+    요금 데이터 버전 스탬프 (data_version 테이블이나 행이 없으면 None)
+
+    적재 도구(load_premiums)가 요금 테이블을 바꿀 때마다 version을 올린다.
+    information_schema의 UPDATE_TIME/TABLE_ROWS는 MySQL 8에서 캐시된 값이고
+    (information_schema_stats_expiry, 기본 하루) 행 수도 추정치라 버전으로 쓰지 않는다.
+    None이면 버전에 의존하는 재사용(보험료 큐브, 결과 캐시)을 하지 않는다.
+    """
+    from mysql.connector import errorcode, Error
+
+    try:
+        rows = db.execute(
+            "SELECT version FROM data_version WHERE table_name = %s", (table_name,)
+        )
+    except Error as e:
+        if e.errno == errorcode.ER_NO_SUCH_TABLE:
+            return None
+        raise
+    return str(rows[0]["version"]) if rows else None
+
+
+def mysql_threads_connected(conn_config: dict = None) -> int:
+    """서버 전체 연결 수 (부하 테스트용, 풀을 거치지 않는 별도 연결 사용)"""
+    import mysql.connector
+
+    conn = mysql.connector.connect(**(conn_config or DB_CONFIG))
+    try:
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SHOW STATUS LIKE 'Threads_connected'")
+            return int(cursor.fetchone()[1])
+        finally:
+            cursor.close()
+    finally:
+        conn.close()
@@ -0,0 +1,102 @@
+"""
+/chat 단계별 전용 스레드 풀
+
+동기 클라이언트(OpenAI, ChatOpenAI, mysql.connector, FAISS)를 사용하는 각 단계를 단계별로
+크기가 정해진 스레드 풀에서 실행하고, 비동기 핸들러는 그 결과를 await 한다.
+이벤트 루프는 막히지 않으므로 한 워커가 여러 요청을 동시에 처리하며, 느린 단계(LLM)가
+다른 단계(DB, 검색)의 스레드를 모두 차지하지 못한다.
+"""
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from .config import EXECUTOR_CONFIG
+from .profiler import run_in_context
+
+STAGES = ("intent", "llm", "search", "db")
+
+
+class StageExecutors:
+    def __init__(self, config: dict = None):
+        self.config = config or EXECUTOR_CONFIG
+        self._executors = {}
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.submitted = {stage: 0 for stage in STAGES}
+        self.running = {stage: 0 for stage in STAGES}
+        self.completed = {stage: 0 for stage in STAGES}
+
+    def get(self, stage: str) -> ThreadPoolExecutor:
+        executor = self._executors.get(stage)
+        if executor is None:
+            if stage not in STAGES:
+                raise ValueError(f"알 수 없는 단계입니다: {stage}")
+            with self._lock:
+                executor = self._executors.get(stage)
+                if executor is None:
+                    executor = ThreadPoolExecutor(
+                        max_workers=self.config[f"{stage}_workers"],
+                        thread_name_prefix=f"stage-{stage}",
+                    )
+                    self._executors[stage] = executor
+        return executor
+
+    def _track(self, stage: str, context: contextvars.Context, fn):
+        with self._stats_lock:
+            self.running[stage] += 1
+        try:
+            # 요청별 컨텍스트 변수(단계 시간 측정, 프로파일링 등)를 작업 스레드에서도 사용
+            return run_in_context(context, fn)
+        finally:
+            with self._stats_lock:
+                self.running[stage] -= 1
+                self.completed[stage] += 1
+
+    async def run(self, stage: str, fn, *args, **kwargs):
+        """fn(*args, **kwargs)를 stage 전용 스레드 풀에서 실행하고 결과를 기다림"""
+        executor = self.get(stage)
+        call = functools.partial(fn, *args, **kwargs)
+        with self._stats_lock:
+            self.submitted[stage] += 1
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            executor, self._track, stage, contextvars.copy_context(), call
+        )
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return {
+                stage: {
+                    "workers": self.config[f"{stage}_workers"],
+                    "running": self.running[stage],
+                    "queued": self.submitted[stage] - self.completed[stage] - self.running[stage],
+                    "completed": self.completed[stage],
+                }
+                for stage in STAGES
+            }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            for executor in self._executors.values():
+                executor.shutdown(wait=False, cancel_futures=True)
+            self._executors.clear()
+
+
+_stage_executors = None
+_stage_executors_lock = threading.Lock()
+
+
+def get_stage_executors() -> StageExecutors:
+    """워커 프로세스의 단계별 스레드 풀 (main.lifespan에서 생성, 스레드는 단계를 처음 실행할 때 만듦)"""
+    global _stage_executors
+    if _stage_executors is None:
+        with _stage_executors_lock:
+            if _stage_executors is None:
+                _stage_executors = StageExecutors()
+    return _stage_executors
+
+
+async def run_in_stage(stage: str, fn, *args, **kwargs):
+    return await get_stage_executors().run(stage, fn, *args, **kwargs)
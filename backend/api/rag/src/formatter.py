@@ -0,0 +1,103 @@
+"""
+비교설계 결과 포맷터
+
+EXAMPLE_PROMPT에 정의된 두 가지 출력 형식을 SQL 결과 행으로부터 직접 만든다.
+1. "구분"(합계/상세) 행이 있는 경우 -> 보험사별 보험료합계 + 상품별 보장항목
+2. "구분"이 없는 경우 -> 보험사/상품별 보험료합계 목록
+두 형식 어디에도 맞지 않는 행(LLM이 만든 임의의 SQL 결과)은 None을 반환해
+호출 측에서 LLM 변환을 사용하도록 한다.
+"""
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+
+import simplejson as json
+
+PRODUCT_TYPE_NAMES = {"nr": "무해지형", "r": "해지환급형"}
+
+
+def _number(value: Any):
+    """DECIMAL/문자열 보험료를 JSON 숫자로 변환"""
+    if value is None:
+        return None
+    if isinstance(value, (Decimal, str)):
+        value = Decimal(value)
+        return int(value) if value == value.to_integral_value() else float(value)
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def format_settings(config: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "이름": config.get("custom_name"),
+        "나이": config.get("insu_age"),
+        "성별": "남자" if config.get("sex") == 1 else "여자",
+        "상품유형": PRODUCT_TYPE_NAMES.get(config.get("product_type"), config.get("product_type")),
+        "보험기간": config.get("expiry_year"),
+        "보험사ID": config.get("company_id"),
+    }
+
+
+def _is_detailed(rows: List[Dict[str, Any]]) -> bool:
+    return any("구분" in row or "보장항목명" in row for row in rows)
+
+
+def _format_detailed(rows: List[Dict[str, Any]]) -> Optional[List[Dict[str, Any]]]:
+    companies: Dict[str, Dict[str, Any]] = {}
+    for row in rows:
+        company_name = row.get("보험사명")
+        if company_name is None:
+            return None
+        company = companies.setdefault(
+            company_name, {"이름": company_name, "보험료합계": 0, "상품": [], "_products": {}}
+        )
+
+        is_total = row.get("구분") == "합계" or (
+            "구분" not in row and row.get("상품명") is None and row.get("보장항목명") is None
+        )
+        if is_total:
+            company["보험료합계"] = _number(row.get("보험료", row.get("보험료합계")))
+            continue
+
+        product_name = row.get("상품명")
+        product = company["_products"].get(product_name)
+        if product is None:
+            product = {"상품명": product_name, "보장항목": {}}
+            company["_products"][product_name] = product
+            company["상품"].append(product)
+        product["보장항목"][row.get("보장항목명")] = _number(row.get("보험료"))
+
+    for company in companies.values():
+        del company["_products"]
+    return list(companies.values())
+
+
+def _format_totals(rows: List[Dict[str, Any]]) -> Optional[List[Dict[str, Any]]]:
+    result = []
+    for row in rows:
+        if "보험사명" not in row or "보험료합계" not in row:
+            return None
+        result.append(
+            {
+                "이름": row["보험사명"],
+                "상품명": row.get("상품명"),
+                "보험료합계": _number(row["보험료합계"]),
+            }
+        )
+    return result
+
+
+def format_compare_rows(rows: List[Dict[str, Any]], config: Dict[str, Any]) -> Optional[dict]:
+    """SQL 결과 행 -> 출력 형식 (형식을 알 수 없으면 None)"""
+    rows = [dict(row) for row in rows]
+    companies = _format_detailed(rows) if _is_detailed(rows) else _format_totals(rows)
+    if companies is None:
+        return None
+    return {"설정값": format_settings(config), "보험사": companies}
+
+
+def format_compare_json(rows: List[Dict[str, Any]], config: Dict[str, Any]) -> Optional[str]:
+    formatted = format_compare_rows(rows, config)
+    if formatted is None:
+        return None
+    return json.dumps(formatted, ensure_ascii=False, indent=2, use_decimal=True)
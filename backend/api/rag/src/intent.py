@@ -0,0 +1,264 @@
+"""
+로컬 의도 분류기
+
+"비교설계 질문" / "그 외의 질문" 분류를 LLM 호출 없이 처리하기 위한 모듈.
+process_query가 추출하는 조건(나이, 성별, 상품유형, 보험기간)과 키워드 규칙에
+LLM 분류 기록으로 학습한 나이브 베이즈 모델을 더해 신뢰도를 계산하고,
+신뢰도가 임계값보다 낮을 때만 LLM 분류로 넘긴다. 학습 모델이 없으면 규칙만으로는
+더 높은 임계값을 적용해 키워드 하나만 맞은 질문은 LLM이 분류하게 한다.
+"""
+import json
+import math
+import os
+import threading
+from collections import Counter
+
+from .config import INTENT_CONFIG
+from .log import configure, get_logger
+from .utils import extract_query_slots
+
+logger = get_logger("intent")
+
+COMPARE_INTENT = "비교설계 질문"
+OTHER_INTENT = "그 외의 질문"
+
+# 보험료 조회 키워드 (비교설계 방향)
+PREMIUM_KEYWORDS = ["보험료", "얼마", "가격", "저렴", "비싼", "싼곳", "견적", "납입액"]
+# 비교설계 결과 형태 키워드
+COMPARE_SHAPE_KEYWORDS = ["보장항목별", "상세", "기본플랜", "합계", "순위", "비교"]
+# 약관 질문 키워드 (그 외 방향)
+TERMS_KEYWORDS = [
+    "약관", "정의", "면책", "지급사유", "지급조건", "보장범위", "청구",
+    "무엇", "뭐야", "뭔가요", "설명", "의미", "해당되", "인정되",
+]
+# DB에 없는 보험사 (생명보험사)
+NON_DB_COMPANIES = ["삼성생명", "교보생명", "한화생명", "신한라이프", "라이나생명", "동양생명"]
+# 건강보험이 아닌 보험 (DB에 없음, INTENT_PROMPT 기준 그 외)
+NON_HEALTH_PRODUCTS = [
+    "자동차보험", "운전자보험", "화재보험", "여행자보험", "펫보험", "연금보험",
+    "저축보험", "종신보험", "치아보험", "실손보험", "실비보험",
+]
+
+# 규칙별 로그 오즈 가중치
+RULE_WEIGHTS = {
+    "premium": 2.5,
+    "slot": 1.0,
+    "compare_shape": 0.5,
+    "terms": -2.5,
+    "non_db_company": -3.0,
+    "non_health_product": -3.0,
+}
+
+_log_lock = threading.Lock()
+_model = None
+_model_loaded = False
+
+
+def _normalize(question: str) -> str:
+    return question.lower().replace(" ", "")
+
+
+def rule_log_odds(question: str) -> float:
+    """규칙 기반 로그 오즈 (양수: 비교설계, 음수: 그 외)"""
+    normalized = _normalize(question)
+    score = 0.0
+
+    if any(keyword in normalized for keyword in PREMIUM_KEYWORDS):
+        score += RULE_WEIGHTS["premium"]
+
+    slots = extract_query_slots(question)
+    score += RULE_WEIGHTS["slot"] * sum(
+        1 for key in ("insu_age", "sex", "product_type", "expiry_year") if key in slots
+    )
+
+    if any(keyword in normalized for keyword in COMPARE_SHAPE_KEYWORDS):
+        score += RULE_WEIGHTS["compare_shape"]
+
+    if any(keyword in normalized for keyword in TERMS_KEYWORDS):
+        score += RULE_WEIGHTS["terms"]
+
+    if any(company in normalized for company in NON_DB_COMPANIES):
+        score += RULE_WEIGHTS["non_db_company"]
+
+    if any(product in normalized for product in NON_HEALTH_PRODUCTS):
+        score += RULE_WEIGHTS["non_health_product"]
+
+    return score
+
+
+def _features(question: str) -> list:
+    """문자 바이그램 + 추출된 조건 토큰"""
+    normalized = _normalize(question)
+    features = [normalized[i:i + 2] for i in range(len(normalized) - 1)]
+    features.extend(f"slot:{key}" for key in extract_query_slots(question))
+    return features
+
+
+class NaiveBayesIntentModel:
+    """문자 바이그램 기반 다항 나이브 베이즈 (CPU 전용, 외부 의존성 없음)"""
+
+    def __init__(self, class_counts=None, feature_counts=None, alpha: float = 1.0):
+        self.alpha = alpha
+        self.class_counts = class_counts or {COMPARE_INTENT: 0, OTHER_INTENT: 0}
+        self.feature_counts = feature_counts or {COMPARE_INTENT: {}, OTHER_INTENT: {}}
+        self._totals = {
+            label: sum(counts.values()) for label, counts in self.feature_counts.items()
+        }
+        vocabulary = set()
+        for counts in self.feature_counts.values():
+            vocabulary.update(counts)
+        self._vocab_size = max(len(vocabulary), 1)
+
+    @classmethod
+    def train(cls, samples, alpha: float = 1.0) -> "NaiveBayesIntentModel":
+        class_counts = {COMPARE_INTENT: 0, OTHER_INTENT: 0}
+        feature_counts = {COMPARE_INTENT: Counter(), OTHER_INTENT: Counter()}
+        for question, label in samples:
+            if label not in class_counts:
+                continue
+            class_counts[label] += 1
+            feature_counts[label].update(_features(question))
+        return cls(
+            class_counts,
+            {label: dict(counts) for label, counts in feature_counts.items()},
+            alpha,
+        )
+
+    @property
+    def samples(self) -> int:
+        return sum(self.class_counts.values())
+
+    def log_odds(self, question: str) -> float:
+        """비교설계 대 그 외의 로그 오즈"""
+        compare_n = self.class_counts[COMPARE_INTENT]
+        other_n = self.class_counts[OTHER_INTENT]
+        if compare_n == 0 or other_n == 0:
+            return 0.0
+
+        score = math.log(compare_n / other_n)
+        compare_counts = self.feature_counts[COMPARE_INTENT]
+        other_counts = self.feature_counts[OTHER_INTENT]
+        compare_denominator = self._totals[COMPARE_INTENT] + self.alpha * self._vocab_size
+        other_denominator = self._totals[OTHER_INTENT] + self.alpha * self._vocab_size
+        for feature in _features(question):
+            score += math.log((compare_counts.get(feature, 0) + self.alpha) / compare_denominator)
+            score -= math.log((other_counts.get(feature, 0) + self.alpha) / other_denominator)
+        return score
+
+    def to_dict(self) -> dict:
+        return {
+            "alpha": self.alpha,
+            "class_counts": self.class_counts,
+            "feature_counts": self.feature_counts,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "NaiveBayesIntentModel":
+        return cls(data["class_counts"], data["feature_counts"], data.get("alpha", 1.0))
+
+
+def load_intent_model(model_path: str = None):
+    """학습된 모델 로드 (없으면 None, 규칙만 사용)"""
+    global _model, _model_loaded
+    model_path = model_path or INTENT_CONFIG["model_path"]
+    _model_loaded = True
+    if not os.path.exists(model_path):
+        _model = None
+        return None
+    try:
+        with open(model_path, "r", encoding="utf-8") as f:
+            _model = NaiveBayesIntentModel.from_dict(json.load(f))
+    except Exception as e:
+        logger.warning("의도 분류 모델 로드 오류: %s", e)
+        _model = None
+    return _model
+
+
+def _confidence(score: float) -> tuple:
+    """로그 오즈 -> (의도, 신뢰도)"""
+    # 오버플로 방지를 위해 범위 제한 후 시그모이드
+    score = max(min(score, 50.0), -50.0)
+    probability = 1.0 / (1.0 + math.exp(-score))
+    intent = COMPARE_INTENT if probability >= 0.5 else OTHER_INTENT
+    return intent, max(probability, 1.0 - probability)
+
+
+def classify_intent_locally(question: str):
+    """
+    로컬 분류 결과 반환
+
+    - 충분히 학습된 모델: 규칙 + 모델 점수가 confidence_threshold 이상이면 확정
+    - 샘플이 부족한 모델: 모델과 규칙의 방향이 같고 합산 점수가 임계값 이상일 때만 확정
+    - 모델 없음: 규칙만으로 rule_only_threshold 이상일 때만 확정 (키워드 하나로는 부족)
+
+    Returns:
+        (의도, 신뢰도). 확정하지 못하면 의도는 None (LLM 분류 필요)
+    """
+    if not INTENT_CONFIG["enabled"]:
+        return None, 0.0
+    if not _model_loaded:
+        load_intent_model()
+
+    rule_score = rule_log_odds(question)
+    if _model is None:
+        intent, confidence = _confidence(rule_score)
+        threshold = INTENT_CONFIG["rule_only_threshold"]
+    else:
+        model_score = _model.log_odds(question)
+        intent, confidence = _confidence(rule_score + model_score)
+        threshold = INTENT_CONFIG["confidence_threshold"]
+        if _model.samples < INTENT_CONFIG["min_model_samples"] and rule_score * model_score <= 0:
+            return None, confidence
+
+    if confidence < threshold:
+        return None, confidence
+    return intent, confidence
+
+
+def normalize_intent_label(llm_output: str) -> str:
+    return COMPARE_INTENT if "비교설계" in (llm_output or "") else OTHER_INTENT
+
+
+def log_intent_decision(question: str, llm_output: str) -> None:
+    """LLM 분류 결과를 학습 데이터로 기록"""
+    log_path = INTENT_CONFIG["decision_log_path"]
+    record = {"question": question, "intent": normalize_intent_label(llm_output)}
+    try:
+        with _log_lock:
+            os.makedirs(os.path.dirname(log_path), exist_ok=True)
+            with open(log_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    except OSError as e:
+        logger.warning("의도 분류 기록 오류: %s", e)
+
+
+def train_from_log(log_path: str = None, model_path: str = None) -> NaiveBayesIntentModel:
+    """기록된 LLM 분류 결과로 모델을 학습하고 저장"""
+    log_path = log_path or INTENT_CONFIG["decision_log_path"]
+    model_path = model_path or INTENT_CONFIG["model_path"]
+
+    samples = []
+    with open(log_path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                record = json.loads(line)
+                samples.append((record["question"], record["intent"]))
+
+    model = NaiveBayesIntentModel.train(samples)
+    os.makedirs(os.path.dirname(model_path), exist_ok=True)
+    with open(model_path, "w", encoding="utf-8") as f:
+        json.dump(model.to_dict(), f, ensure_ascii=False)
+    print(f"의도 분류 모델 학습 완료: {len(samples)}개 샘플 -> {model_path}")
+    return model
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="로컬 의도 분류 모델 학습")
+    parser.add_argument("--log", default=None, help="LLM 분류 기록(JSONL) 경로")
+    parser.add_argument("--model", default=None, help="모델 저장 경로")
+    args = parser.parse_args()
+    configure()
+    train_from_log(args.log, args.model)
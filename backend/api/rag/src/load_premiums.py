@@ -0,0 +1,362 @@
+"""
+보험료 테이블 대량 적재
+
+CSV/Parquet 요금표를 청크 단위로 읽어 coverage/insu_company/insu_product 기준으로 검증한 뒤
+comparison_staging 테이블에 적재하고, RENAME TABLE 한 번으로 comparison과 원자적으로 교체한다.
+staging은 expiry_year를 포함한 기본 키(COMPARISON_PRIMARY_KEY)로 만들어지므로, 이전 기본 키의
+comparison도 교체와 함께 새 기본 키로 바뀐다 (--migrate는 적재 없이 기본 키만 변경).
+기본 키가 같은 행은 청크 안에서는 검증 단계에서, 청크 사이에서는 staging 기본 키로 걸러
+거부 행으로 센다 (--validate-only는 청크 안의 중복만 검사).
+교체 후 집계 테이블(premium_totals)이 있으면 트리거와 합계를 다시 만들고, 마지막에 데이터 버전을 올린다.
+
+실행: backend 디렉토리에서
+    python -m api.rag.src.load_premiums rates.csv
+    python -m api.rag.src.load_premiums rates.parquet --batch-size 20000
+    python -m api.rag.src.load_premiums rates.csv --mode load-data   # LOAD DATA LOCAL INFILE
+    python -m api.rag.src.load_premiums rates.csv --validate-only
+    python -m api.rag.src.load_premiums --migrate
+"""
+import argparse
+import csv
+import os
+import tempfile
+import time
+
+import mysql.connector
+
+from .config import DB_CONFIG, DEFAULT_CONFIG
+from .log import configure
+from .schema import (
+    COMPARISON_PRIMARY_KEY,
+    COMPARISON_PRIMARY_KEY_MIGRATION,
+    DATA_VERSION_TABLE,
+    PREMIUM_TOTALS_TRIGGERS,
+)
+
+COLUMNS = (
+    "custom_name", "insu_age", "sex", "product_type", "expiry_year",
+    "company_id", "product_id", "coverage_id", "premium_amount",
+)
+STAGING_TABLE = "comparison_staging"
+OLD_TABLE = "comparison_old"
+KEY_INDEXES = tuple(COLUMNS.index(name) for name in COMPARISON_PRIMARY_KEY)
+
+
+class InvalidRow(ValueError):
+    """참조 테이블이나 값 범위에 맞지 않는 행"""
+
+
+class DuplicateKey(InvalidRow):
+    """같은 청크에서 이미 읽은 행과 comparison 기본 키가 같은 행"""
+
+
+def iter_csv_chunks(path: str, batch_size: int, delimiter: str = ","):
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        chunk = []
+        for record in csv.DictReader(f, delimiter=delimiter):
+            chunk.append(record)
+            if len(chunk) >= batch_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+
+def iter_parquet_chunks(path: str, batch_size: int):
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise SystemExit("Parquet 파일을 읽으려면 pyarrow를 설치하세요: pip install pyarrow")
+
+    parquet_file = pq.ParquetFile(path)
+    columns = [name for name in COLUMNS if name in parquet_file.schema_arrow.names]
+    for batch in parquet_file.iter_batches(batch_size=batch_size, columns=columns):
+        yield batch.to_pylist()
+
+
+def iter_chunks(path: str, batch_size: int, delimiter: str = ","):
+    if path.lower().endswith((".parquet", ".pq")):
+        return iter_parquet_chunks(path, batch_size)
+    return iter_csv_chunks(path, batch_size, delimiter)
+
+
+def primary_key(row: tuple) -> tuple:
+    """검증된 행의 comparison 기본 키 (MySQL 기본 콜레이션처럼 대소문자 구분 없음)"""
+    return tuple(
+        row[index].lower() if isinstance(row[index], str) else row[index]
+        for index in KEY_INDEXES
+    )
+
+
+class RowValidator:
+    """coverage, insu_company, insu_product 참조 무결성과 값 범위 검증"""
+
+    def __init__(self, conn):
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT coverage_id FROM coverage")
+            self.coverages = {row[0] for row in cursor.fetchall()}
+            cursor.execute("SELECT company_id FROM insu_company")
+            self.companies = {row[0] for row in cursor.fetchall()}
+            cursor.execute("SELECT company_id, product_id FROM insu_product")
+            self.products = {(row[0], row[1]) for row in cursor.fetchall()}
+        finally:
+            cursor.close()
+
+    def validate(self, record: dict) -> tuple:
+        try:
+            age = int(record["insu_age"])
+            sex = int(record["sex"])
+            premium = int(float(record["premium_amount"]))
+        except (KeyError, TypeError, ValueError) as e:
+            raise InvalidRow(f"숫자 컬럼 오류: {e}")
+
+        product_type = str(record.get("product_type", "")).strip()
+        expiry_year = str(record.get("expiry_year", "")).strip()
+        company_id = str(record.get("company_id", "")).strip()
+        product_id = str(record.get("product_id", "")).strip()
+        coverage_id = str(record.get("coverage_id", "")).strip()
+
+        if not 0 <= age <= 255:
+            raise InvalidRow(f"보험나이 범위 오류: {age}")
+        if sex not in (0, 1):
+            raise InvalidRow(f"성별 오류: {sex}")
+        if product_type not in ("nr", "r"):
+            raise InvalidRow(f"상품유형 오류: {product_type}")
+        if not expiry_year or len(expiry_year) > 10:
+            raise InvalidRow(f"만기 오류: {expiry_year}")
+        if premium < 0:
+            raise InvalidRow(f"보험료 오류: {premium}")
+        if company_id not in self.companies:
+            raise InvalidRow(f"알 수 없는 보험사ID: {company_id}")
+        if (company_id, product_id) not in self.products:
+            raise InvalidRow(f"알 수 없는 보험ID: {company_id}/{product_id}")
+        if coverage_id not in self.coverages:
+            raise InvalidRow(f"알 수 없는 보장항목ID: {coverage_id}")
+
+        custom_name = record.get("custom_name") or DEFAULT_CONFIG["custom_name"]
+        return (
+            custom_name, age, sex, product_type, expiry_year,
+            company_id, product_id, coverage_id, premium,
+        )
+
+
+def _insert_executemany(conn, rows: list) -> None:
+    placeholders = ", ".join(["%s"] * len(COLUMNS))
+    cursor = conn.cursor()
+    try:
+        # 이전 청크와 기본 키가 같은 행은 건너뜀 (적재 후 행 수 차이로 중복 수를 셈)
+        cursor.executemany(
+            f"INSERT INTO {STAGING_TABLE} ({', '.join(COLUMNS)}) VALUES ({placeholders}) "
+            "ON DUPLICATE KEY UPDATE premium_amount = premium_amount",
+            rows,
+        )
+    finally:
+        cursor.close()
+
+
+def _insert_load_data(conn, rows: list) -> None:
+    with tempfile.NamedTemporaryFile(
+        "w", encoding="utf-8", newline="", suffix=".tsv", delete=False
+    ) as f:
+        writer = csv.writer(f, delimiter="\t", lineterminator="\n", quoting=csv.QUOTE_NONE, escapechar="\\")
+        writer.writerows(rows)
+        temp_path = f.name
+    cursor = conn.cursor()
+    try:
+        # LOCAL 적재는 기본 키 중복 행을 오류 대신 건너뜀 (IGNORE와 같음)
+        cursor.execute(
+            f"""LOAD DATA LOCAL INFILE %s INTO TABLE {STAGING_TABLE}
+CHARACTER SET utf8mb4 FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' LINES TERMINATED BY '\\n'
+({', '.join(COLUMNS)})""",
+            (temp_path.replace("\\", "/"),),
+        )
+    finally:
+        cursor.close()
+        os.remove(temp_path)
+
+
+def _table_exists(cursor, table_name: str) -> bool:
+    cursor.execute(
+        "SELECT COUNT(*) FROM information_schema.TABLES WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s",
+        (DB_CONFIG["database"], table_name),
+    )
+    return cursor.fetchone()[0] > 0
+
+
+def _primary_key_columns(cursor, table_name: str) -> tuple:
+    cursor.execute(
+        """SELECT COLUMN_NAME FROM information_schema.KEY_COLUMN_USAGE
+WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s AND CONSTRAINT_NAME = 'PRIMARY'
+ORDER BY ORDINAL_POSITION""",
+        (DB_CONFIG["database"], table_name),
+    )
+    return tuple(row[0] for row in cursor.fetchall())
+
+
+def migrate_primary_key(conn, table_name: str = "comparison") -> bool:
+    """기본 키가 COMPARISON_PRIMARY_KEY와 다르면 변경 (변경했으면 True)"""
+    cursor = conn.cursor()
+    try:
+        if _primary_key_columns(cursor, table_name) == COMPARISON_PRIMARY_KEY:
+            return False
+        cursor.execute(COMPARISON_PRIMARY_KEY_MIGRATION.format(table=table_name))
+        conn.commit()
+        return True
+    finally:
+        cursor.close()
+
+
+def swap_in_staging(conn) -> None:
+    """staging 테이블을 comparison으로 원자적 교체 후 집계/버전 갱신"""
+    cursor = conn.cursor()
+    try:
+        cursor.execute(f"DROP TABLE IF EXISTS {OLD_TABLE}")
+        cursor.execute(
+            f"RENAME TABLE comparison TO {OLD_TABLE}, {STAGING_TABLE} TO comparison"
+        )
+        # 트리거는 이름이 바뀐 이전 테이블에 남아 있으므로 함께 삭제됨
+        cursor.execute(f"DROP TABLE {OLD_TABLE}")
+
+        if _table_exists(cursor, "premium_totals"):
+            for statement in PREMIUM_TOTALS_TRIGGERS:
+                cursor.execute(statement)
+            conn.commit()
+            from .aggregates import refresh_premium_totals
+
+            refreshed = refresh_premium_totals()
+            print(f"premium_totals 재계산 완료: {refreshed}행")
+
+        # 버전은 집계까지 끝난 뒤 마지막에 올림 (그 전에 캐시된 결과는 이전 버전으로 남아 무효화됨)
+        # 결과 캐시/보험료 큐브는 이 버전으로만 무효화되므로 테이블이 없으면 만듦
+        cursor.execute(DATA_VERSION_TABLE)
+        cursor.execute(
+            "INSERT INTO data_version (table_name, version) VALUES ('comparison', 1) "
+            "ON DUPLICATE KEY UPDATE version = version + 1"
+        )
+        conn.commit()
+    finally:
+        cursor.close()
+
+
+def load(
+    path: str,
+    batch_size: int = 50000,
+    mode: str = "executemany",
+    delimiter: str = ",",
+    max_reject_ratio: float = 0.0,
+    validate_only: bool = False,
+) -> dict:
+    conn = mysql.connector.connect(
+        **DB_CONFIG, allow_local_infile=(mode == "load-data"), autocommit=False
+    )
+    try:
+        validator = RowValidator(conn)
+        insert = _insert_load_data if mode == "load-data" else _insert_executemany
+
+        if not validate_only:
+            cursor = conn.cursor()
+            cursor.execute(f"DROP TABLE IF EXISTS {STAGING_TABLE}")
+            cursor.execute(f"CREATE TABLE {STAGING_TABLE} LIKE comparison")
+            cursor.close()
+            if migrate_primary_key(conn, STAGING_TABLE):
+                print(f"staging 기본 키 변경: ({', '.join(COMPARISON_PRIMARY_KEY)})")
+
+        loaded = 0
+        rejected = 0
+        duplicates = 0
+        started_at = time.perf_counter()
+        for chunk in iter_chunks(path, batch_size, delimiter):
+            rows = []
+            chunk_keys = set()
+            for record in chunk:
+                try:
+                    row = validator.validate(record)
+                    key = primary_key(row)
+                    if key in chunk_keys:
+                        raise DuplicateKey(f"기본 키 중복 ({', '.join(COMPARISON_PRIMARY_KEY)}): {key}")
+                    chunk_keys.add(key)
+                    rows.append(row)
+                except InvalidRow as e:
+                    rejected += 1
+                    duplicates += isinstance(e, DuplicateKey)
+                    if rejected <= 10:
+                        print(f"거부된 행: {e} - {record}")
+            if rows and not validate_only:
+                insert(conn, rows)
+                conn.commit()
+            loaded += len(rows)
+            elapsed = time.perf_counter() - started_at
+            print(f"적재 {loaded:,}행, 거부 {rejected:,}행, {loaded / elapsed:,.0f} rows/s")
+
+        if not validate_only:
+            # 청크 사이의 중복은 staging 기본 키가 건너뛴 행 수로 계산
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT COUNT(*) FROM {STAGING_TABLE}")
+            skipped = loaded - cursor.fetchone()[0]
+            cursor.close()
+            loaded -= skipped
+            rejected += skipped
+            duplicates += skipped
+
+        total = loaded + rejected
+        if total == 0:
+            raise SystemExit("적재할 행이 없습니다.")
+        if duplicates:
+            print(f"기본 키 중복 {duplicates:,}행 거부 (comparison 기본 키: {', '.join(COMPARISON_PRIMARY_KEY)})")
+        if rejected / total > max_reject_ratio:
+            if not validate_only:
+                cursor = conn.cursor()
+                cursor.execute(f"DROP TABLE IF EXISTS {STAGING_TABLE}")
+                cursor.close()
+            raise SystemExit(
+                f"거부 비율 {rejected / total:.2%}가 허용치 {max_reject_ratio:.2%}를 넘어 교체하지 않습니다."
+            )
+
+        if not validate_only:
+            swap_in_staging(conn)
+
+        elapsed = time.perf_counter() - started_at
+        result = {
+            "loaded_rows": loaded,
+            "rejected_rows": rejected,
+            "duplicate_rows": duplicates,
+            "seconds": round(elapsed, 2),
+            "rows_per_second": round(loaded / elapsed) if elapsed else 0,
+            "swapped": not validate_only,
+        }
+        print(f"적재 완료: {result}")
+        return result
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="보험료 테이블(comparison) 대량 적재")
+    parser.add_argument("path", nargs="?", help="CSV 또는 Parquet 파일 경로")
+    parser.add_argument("--batch-size", type=int, default=50000)
+    parser.add_argument("--mode", choices=["executemany", "load-data"], default="executemany")
+    parser.add_argument("--delimiter", default=",")
+    parser.add_argument("--max-reject-ratio", type=float, default=0.0, help="허용 거부 비율 (0~1)")
+    parser.add_argument("--validate-only", action="store_true", help="검증만 하고 적재하지 않음")
+    parser.add_argument("--migrate", action="store_true", help="적재 없이 comparison 기본 키만 변경")
+    args = parser.parse_args()
+    configure()
+    if args.migrate:
+        conn = mysql.connector.connect(**DB_CONFIG, autocommit=False)
+        try:
+            changed = migrate_primary_key(conn)
+        finally:
+            conn.close()
+        print("comparison 기본 키 변경 완료" if changed else "comparison 기본 키가 이미 최신입니다.")
+        raise SystemExit(0)
+    if not args.path:
+        parser.error("path가 필요합니다.")
+    load(
+        args.path,
+        batch_size=args.batch_size,
+        mode=args.mode,
+        delimiter=args.delimiter,
+        max_reject_ratio=args.max_reject_ratio,
+        validate_only=args.validate_only,
+    )
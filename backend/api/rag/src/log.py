@@ -0,0 +1,165 @@
+"""
+구조화 로깅
+
+요청 경로의 진단 출력을 print 대신 레벨이 있는 로거("insu.*")로 남긴다.
+- 메시지는 logger.debug("검색 중: %s", name)처럼 인자로 넘긴다. 레벨이 꺼져 있으면 문자열을 만들지 않는다.
+- 요청 스레드는 레코드를 큐에 넣기만 하고, JSON 직렬화와 stderr 쓰기는 리스너 스레드가 한다.
+  큐가 가득 차면 요청을 막지 않고 레코드를 버린다 (stats()의 dropped).
+- 계산 자체가 비싼 진단(벡터 노름 통계, 메타데이터 덤프)은 logger.isEnabledFor(logging.DEBUG)일 때만 계산한다.
+
+레벨과 형식은 LOG_CONFIG(LOG_LEVEL, LOG_FORMAT 환경 변수)로 정한다.
+모듈 import만으로는 핸들러/리스너 스레드를 만들지 않는다. 서버(main.lifespan, api.serve)와
+CLI 진입점이 configure()를 호출하며, 그 전까지 insu.* 레코드는 일반 logging 설정(루트 핸들러)을 따른다.
+"""
+import atexit
+import copy
+import datetime
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+
+from .config import LOG_CONFIG
+
+ROOT_LOGGER = "insu"
+
+# LogRecord 기본 속성 (나머지는 extra={...}로 넘긴 구조화 필드)
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """레코드 하나를 JSON 한 줄로 출력 (extra 필드 포함)"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_text:
+            entry["exc_info"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """사람이 읽는 한 줄 형식 (extra 필드는 key=value로 덧붙임)"""
+
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    def formatMessage(self, record: logging.LogRecord) -> str:
+        line = super().formatMessage(record)
+        extras = [
+            f"{key}={value}" for key, value in record.__dict__.items() if key not in _RECORD_ATTRS
+        ]
+        return f"{line} {' '.join(extras)}" if extras else line
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """요청 스레드를 막지 않는 큐 핸들러"""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # 메시지 인자와 예외는 요청 스레드에서 문자열로 확정 (리스너에서 객체가 바뀌어 있을 수 있음)
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_lock = threading.Lock()
+_handler = None
+_listener = None
+_output = None
+
+
+def _make_formatter(fmt: str) -> logging.Formatter:
+    return TextFormatter() if fmt == "text" else JsonFormatter()
+
+
+def _start_listener() -> None:
+    global _listener
+    _listener = logging.handlers.QueueListener(_handler.queue, _output, respect_handler_level=False)
+    _listener.start()
+
+
+def _after_fork_in_child() -> None:
+    # 리스너 스레드는 fork 후 자식에 없으므로 새 큐와 리스너를 만든다 (api.serve 워커)
+    if _handler is None:
+        return
+    _handler.queue = queue.Queue(LOG_CONFIG["queue_size"])
+    _start_listener()
+
+
+def configure(level: str = None, fmt: str = None, stream=None) -> logging.Logger:
+    """insu 로거에 큐 핸들러를 연결 (처음 한 번). 인자를 주면 레벨/형식/출력 대상을 바꾼다"""
+    global _handler, _output
+    root = logging.getLogger(ROOT_LOGGER)
+    with _lock:
+        if _handler is None:
+            _handler = _QueueHandler(queue.Queue(LOG_CONFIG["queue_size"]))
+            _output = logging.StreamHandler(stream or sys.stderr)
+            _output.setFormatter(_make_formatter(fmt or LOG_CONFIG["format"]))
+            root.addHandler(_handler)
+            # uvicorn 등 루트 로거 설정과 중복 출력되지 않도록 전파하지 않음
+            root.propagate = False
+            root.setLevel(level or LOG_CONFIG["level"])
+            _start_listener()
+            atexit.register(shutdown)
+            if hasattr(os, "register_at_fork"):
+                os.register_at_fork(after_in_child=_after_fork_in_child)
+            return root
+
+        if level is not None:
+            root.setLevel(level)
+        if fmt is not None:
+            _output.setFormatter(_make_formatter(fmt))
+        if stream is not None:
+            _output.setStream(stream)
+    return root
+
+
+def get_logger(name: str) -> logging.Logger:
+    """모듈별 로거 (insu.<name>). 출력 설정은 configure()에서 한다"""
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+
+def flush() -> None:
+    """큐에 쌓인 레코드가 모두 출력될 때까지 대기"""
+    if _handler is not None and _listener is not None and _listener._thread is not None:
+        _handler.queue.join()
+
+
+def shutdown() -> None:
+    global _listener
+    with _lock:
+        if _listener is not None and _listener._thread is not None:
+            _listener.stop()
+        _listener = None
+
+
+def stats() -> dict:
+    return {
+        "level": logging.getLevelName(logging.getLogger(ROOT_LOGGER).level),
+        "queued": _handler.queue.qsize() if _handler is not None else 0,
+        "dropped": _handler.dropped if _handler is not None else 0,
+    }
@@ -0,0 +1,175 @@
+"""
+보험사/키워드 다중 패턴 매칭
+
+보험사 별칭, 보험 종류 키워드, 비교 요청 키워드를 하나의 Aho-Corasick 오토마톤으로
+한 번만 컴파일해 두고, 정규화된 질문을 한 번만 훑어 모든 키워드를 찾는다.
+"""
+from collections import deque
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from .config import COMPANY_REGISTRY, INSURANCE_TYPE_KEYWORDS, COMPARISON_KEYWORDS
+
+COMPANY = "company"
+INSURANCE_TYPE = "insurance_type"
+COMPARISON = "comparison"
+
+
+def normalize_text(text: str) -> str:
+    """매칭용 정규화 (소문자, 공백 제거)"""
+    return text.lower().replace(" ", "")
+
+
+class AhoCorasick:
+    """(패턴, 종류, 값) 목록으로 만드는 Aho-Corasick 오토마톤"""
+
+    def __init__(self, patterns: List[Tuple[str, str, str]]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[Tuple[str, str, str]]] = [[]]
+
+        for pattern, kind, value in patterns:
+            if pattern:
+                self._add(pattern, kind, value)
+        self._build_failure_links()
+
+    def _add(self, pattern: str, kind: str, value: str) -> None:
+        node = 0
+        for char in pattern:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][char] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            node = next_node
+        self._output[node].append((kind, value, pattern))
+
+    def _build_failure_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                # 실패 링크의 출력을 미리 합쳐 탐색 중 링크를 따라갈 필요가 없도록 함
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def iter_matches(self, text: str):
+        """text에서 발견된 (종류, 값, 패턴)을 순서대로 반환"""
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        node = 0
+        for char in text:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if output[node]:
+                yield from output[node]
+
+
+@dataclass
+class QueryMatch:
+    companies: List[str] = field(default_factory=list)
+    insurance_types: List[str] = field(default_factory=list)
+    comparison_keywords: List[str] = field(default_factory=list)
+
+    @property
+    def is_comparison(self) -> bool:
+        return bool(self.comparison_keywords)
+
+
+def _build_patterns() -> List[Tuple[str, str, str]]:
+    patterns = []
+    for company, entry in COMPANY_REGISTRY.items():
+        for alias in entry["aliases"]:
+            patterns.append((normalize_text(alias), COMPANY, company))
+    for keyword in INSURANCE_TYPE_KEYWORDS:
+        patterns.append((normalize_text(keyword), INSURANCE_TYPE, keyword))
+    for keyword in COMPARISON_KEYWORDS:
+        patterns.append((normalize_text(keyword), COMPARISON, keyword))
+    return patterns
+
+
+_automaton = AhoCorasick(_build_patterns())
+
+# 컬렉션 디렉토리 이름 -> 보험사
+_collection_to_company = {
+    entry["collection"]: company for company, entry in COMPANY_REGISTRY.items()
+}
+_prefix_to_company = {
+    entry["collection_prefix"]: company for company, entry in COMPANY_REGISTRY.items()
+}
+# 보험사 이름/별칭/이전 디렉토리 이름 (원래 표기와 소문자) -> 컬렉션 디렉토리 이름
+_alias_to_collection = {}
+for _company, _entry in COMPANY_REGISTRY.items():
+    for _alias in [_company, *_entry["aliases"], *_entry.get("legacy_collections", [])]:
+        _alias_to_collection[_alias] = _entry["collection"]
+        _alias_to_collection[_alias.lower()] = _entry["collection"]
+
+
+def match_question(question: str) -> QueryMatch:
+    """질문을 한 번 훑어 보험사, 보험 종류, 비교 키워드를 추출"""
+    found = {COMPANY: {}, INSURANCE_TYPE: {}, COMPARISON: {}}
+    for kind, value, _ in _automaton.iter_matches(normalize_text(question)):
+        # dict를 순서 있는 집합으로 사용
+        found[kind][value] = None
+    return QueryMatch(
+        companies=list(found[COMPANY]),
+        insurance_types=list(found[INSURANCE_TYPE]),
+        comparison_keywords=list(found[COMPARISON]),
+    )
+
+
+@lru_cache(maxsize=1024)
+def collection_company(collection_name: str) -> Optional[str]:
+    """컬렉션 이름에 해당하는 보험사 (알 수 없으면 None)"""
+    company = _collection_to_company.get(collection_name)
+    if company is None:
+        prefix = collection_name.split("_", 1)[0].lower()
+        company = _prefix_to_company.get(prefix)
+    return company
+
+
+def collection_company_mapping() -> Dict[str, str]:
+    """컬렉션 디렉토리 이름 -> 보험사 이름"""
+    return dict(_collection_to_company)
+
+
+def resolve_collection_name(name: str) -> str:
+    """보험사 이름/별칭이면 컬렉션 디렉토리 이름으로, 아니면 그대로"""
+    return _alias_to_collection.get(name, name)
+
+
+def select_collections(match: QueryMatch, available_collections: List[str]) -> List[str]:
+    """
+    매칭 결과에 따라 검색할 컬렉션 선택
+
+    두 개 이상 보험사가 언급되었거나 비교 요청 또는 '암' 질문이면 보험사 컬렉션 전체,
+    단일 보험사면 해당 보험사 컬렉션만, 보험사 언급이 없으면 모든 컬렉션을 사용한다.
+    """
+    mentioned = set(match.companies)
+    use_all_companies = (
+        len(mentioned) > 1 or match.is_comparison or "암" in match.insurance_types
+    )
+
+    matched_collections = []
+    for collection in available_collections:
+        company = collection_company(collection)
+        if not mentioned:
+            matched_collections.append(collection)
+        elif use_all_companies:
+            if company is not None:
+                matched_collections.append(collection)
+        elif company in mentioned:
+            matched_collections.append(collection)
+
+    # 순서를 유지한 중복 제거
+    return list(dict.fromkeys(matched_collections))
@@ -0,0 +1,304 @@
+"""
+프로세스 내 지표 (Prometheus 텍스트 형식)
+
+- 단계별 처리 시간 히스토그램(insu_stage_seconds{stage=...}): 의도 분류, 컬렉션 매칭/로드, 임베딩,
+  FAISS 검색, SQL 생성/실행, 결과 변환, 답변 생성
+- HTTP 요청 처리 시간 히스토그램과 처리 중 요청 수
+- 캐시 적중률, 수락 제어/스레드 풀 현황 등은 수집 시점에 콜백(register_collector)으로 읽는다
+
+요청별 단계 시간은 컨텍스트 변수에 모아 ServerTimingMiddleware가 응답의
+Server-Timing 헤더로 내보낸다. 단계별 스레드 풀(executors)과 투기적 검색(pipeline)은
+컨텍스트를 복사해 실행하므로 다른 스레드에서 측정한 시간도 같은 요청에 기록된다.
+값은 워커 프로세스별로 집계된다 (api.serve 다중 워커에서는 스크랩한 워커의 값).
+"""
+import bisect
+import contextvars
+import functools
+import threading
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+from typing import Callable, Iterable, Optional, Sequence
+
+# 수집 결과 하나: samples는 (라벨 딕셔너리, 값, 이름 접미사) 목록
+MetricFamily = namedtuple("MetricFamily", ["name", "kind", "help", "samples"])
+
+DEFAULT_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labelvalues: tuple) -> tuple:
+        if len(labelvalues) != len(self.labelnames):
+            raise ValueError(f"{self.name}: 라벨 {self.labelnames}의 값이 필요합니다: {labelvalues}")
+        return tuple(str(value) for value in labelvalues)
+
+    def _labels(self, key: tuple) -> dict:
+        return dict(zip(self.labelnames, key))
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values = {}
+
+    def inc(self, *labelvalues, amount: float = 1.0) -> None:
+        key = self._key(labelvalues)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def collect(self) -> MetricFamily:
+        with self._lock:
+            samples = [(self._labels(key), value, "") for key, value in self._values.items()]
+        return MetricFamily(self.name, self.kind, self.help, samples)
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values = {}
+
+    def set(self, value: float, *labelvalues) -> None:
+        key = self._key(labelvalues)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, *labelvalues, amount: float = 1.0) -> None:
+        key = self._key(labelvalues)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, *labelvalues, amount: float = 1.0) -> None:
+        self.inc(*labelvalues, amount=-amount)
+
+    def collect(self) -> MetricFamily:
+        with self._lock:
+            samples = [(self._labels(key), value, "") for key, value in self._values.items()]
+        return MetricFamily(self.name, self.kind, self.help, samples)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # 라벨 값 -> [버킷별 개수(마지막은 +Inf), 합계, 개수]
+        self._series = {}
+
+    def observe(self, value: float, *labelvalues) -> None:
+        key = self._key(labelvalues)
+        position = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][position] += 1
+            series[1] += value
+            series[2] += 1
+
+    def collect(self) -> MetricFamily:
+        samples = []
+        with self._lock:
+            series = [(key, list(counts), total, count) for key, (counts, total, count) in self._series.items()]
+        for key, counts, total, count in series:
+            labels = self._labels(key)
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                samples.append(({**labels, "le": _format_value(bound)}, cumulative, "_bucket"))
+            samples.append((labels, total, "_sum"))
+            samples.append((labels, count, "_count"))
+        return MetricFamily(self.name, self.kind, self.help, samples)
+
+
+def _format_value(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, int) or (isinstance(value, float) and value.is_integer()):
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def _register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help, labelnames))
+
+    def gauge(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, help, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, help, labelnames, buckets))
+
+    def register_collector(self, collector: Callable[[], Iterable[MetricFamily]]) -> None:
+        """수집 시점에 값을 읽는 콜백 등록 (캐시/풀 통계처럼 이미 다른 곳에서 세는 값)"""
+        self._collectors.append(collector)
+
+    def collect(self) -> list:
+        families = [metric.collect() for metric in self._metrics]
+        for collector in self._collectors:
+            families.extend(collector())
+        return families
+
+    def render(self) -> str:
+        """Prometheus 텍스트 형식 (version 0.0.4)"""
+        lines = []
+        for family in self.collect():
+            lines.append(f"# HELP {family.name} {_escape(family.help)}")
+            lines.append(f"# TYPE {family.name} {family.kind}")
+            for labels, value, suffix in family.samples:
+                if labels:
+                    label_text = ",".join(f'{key}="{_escape(val)}"' for key, val in labels.items())
+                    lines.append(f"{family.name}{suffix}{{{label_text}}} {_format_value(value)}")
+                else:
+                    lines.append(f"{family.name}{suffix} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+STAGE_SECONDS = registry.histogram(
+    "insu_stage_seconds", "요청 단계별 처리 시간(초)", ["stage"]
+)
+HTTP_REQUEST_SECONDS = registry.histogram(
+    "insu_http_request_seconds", "HTTP 요청 처리 시간(초)", ["method", "path", "status"]
+)
+HTTP_REQUESTS_IN_FLIGHT = registry.gauge(
+    "insu_http_requests_in_flight", "처리 중인 HTTP 요청 수"
+)
+HTTP_REQUESTS_IN_FLIGHT.set(0)
+
+# 현재 요청의 (단계, 초) 목록. 여러 스레드가 list.append로만 추가한다
+_request_timings: contextvars.ContextVar[Optional[list]] = contextvars.ContextVar(
+    "request_timings", default=None
+)
+
+
+def record_stage(stage: str, seconds: float) -> None:
+    STAGE_SECONDS.observe(seconds, stage)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.append((stage, seconds))
+
+
+def current_stage_durations() -> dict:
+    """현재 요청에서 지금까지 기록된 단계별 합계 시간(초), 처음 기록된 순서대로"""
+    durations = {}
+    for stage, seconds in _request_timings.get() or ():
+        durations[stage] = durations.get(stage, 0.0) + seconds
+    return durations
+
+
+@contextmanager
+def stage_timer(stage: str):
+    """with stage_timer("faiss"): ... 블록 실행 시간을 단계 히스토그램과 현재 요청에 기록"""
+    started_at = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, time.perf_counter() - started_at)
+
+
+def timed(stage: str):
+    """함수 전체 실행 시간을 stage로 기록하는 데코레이터"""
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage_timer(stage):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def server_timing_header(timings: list, total: float = None) -> str:
+    """같은 단계는 합산해 처음 기록된 순서대로 "stage;dur=ms" 목록으로 변환"""
+    durations = {}
+    for stage, seconds in timings:
+        durations[stage] = durations.get(stage, 0.0) + seconds
+    entries = [f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in durations.items()]
+    if total is not None:
+        entries.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(entries)
+
+
+class ServerTimingMiddleware:
+    """요청별 단계 시간을 Server-Timing 헤더로 내보내고 HTTP 지표를 기록하는 ASGI 미들웨어"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = []
+        token = _request_timings.set(timings)
+        started_at = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                header = server_timing_header(timings, time.perf_counter() - started_at)
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"server-timing", header.encode("latin-1"))
+                ]
+            await send(message)
+
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            _request_timings.reset(token)
+            # 라벨 수가 늘지 않도록 경로 대신 매칭된 라우트 템플릿 사용
+            route = getattr(scope.get("route"), "path", "unmatched")
+            HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - started_at, scope["method"], route, status
+            )
@@ -0,0 +1,129 @@
+"""
+/chat 파이프라인의 투기적(speculative) 실행
+
+의도 분류(LLM 호출 가능)가 진행되는 동안 약관 검색 단계(컬렉션 매칭, 로드, 임베딩,
+벡터 검색)를 별도 스레드에서 미리 실행한다. 의도가 비교설계로 결정되면 미리 실행한
+작업은 취소/폐기되고, 약관 질문이면 그 결과를 그대로 재사용한다.
+"""
+import asyncio
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .config import PIPELINE_CONFIG
+from .profiler import run_in_context
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=PIPELINE_CONFIG["speculative_workers"],
+                    thread_name_prefix="speculative",
+                )
+    return _executor
+
+
+class SpeculationStats:
+    """투기적 실행 통계 (낭비된 작업 비율 포함)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = 0
+        self.reused = 0
+        self.discarded = 0
+        self.used_seconds = 0.0
+        self.wasted_seconds = 0.0
+
+    def record(self, reused: bool, seconds: float) -> None:
+        with self._lock:
+            if reused:
+                self.reused += 1
+                self.used_seconds += seconds
+            else:
+                self.discarded += 1
+                self.wasted_seconds += seconds
+
+    def record_start(self) -> None:
+        with self._lock:
+            self.started += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            total_seconds = self.used_seconds + self.wasted_seconds
+            resolved = self.reused + self.discarded
+            return {
+                "enabled": PIPELINE_CONFIG["speculative_retrieval"],
+                "started": self.started,
+                "reused": self.reused,
+                "discarded": self.discarded,
+                "wasted_request_ratio": self.discarded / resolved if resolved else 0.0,
+                "wasted_work_ratio": self.wasted_seconds / total_seconds if total_seconds else 0.0,
+                "used_seconds": round(self.used_seconds, 3),
+                "wasted_seconds": round(self.wasted_seconds, 3),
+            }
+
+
+speculation_stats = SpeculationStats()
+
+
+class Speculation:
+    """미리 시작한 작업 하나. fn은 cancel_event 키워드 인자를 받아야 한다."""
+
+    def __init__(self, fn, *args, **kwargs):
+        self.cancel_event = threading.Event()
+        self._elapsed = 0.0
+        # 재사용 또는 폐기로 한 번 집계되면 True
+        self._resolved = False
+        speculation_stats.record_start()
+        # 요청별 컨텍스트 변수(단계 시간 측정 등)를 투기적 실행 스레드에서도 사용
+        context = contextvars.copy_context()
+        self._future = _get_executor().submit(run_in_context, context, self._run, fn, args, kwargs)
+
+    def _run(self, fn, args, kwargs):
+        started_at = time.perf_counter()
+        try:
+            return fn(*args, cancel_event=self.cancel_event, **kwargs)
+        finally:
+            self._elapsed = time.perf_counter() - started_at
+
+    def result(self):
+        """결과 재사용 (아직 실행 중이면 완료될 때까지 대기)"""
+        result = self._future.result()
+        self._resolved = True
+        speculation_stats.record(True, self._elapsed)
+        return result
+
+    async def result_async(self):
+        """result()의 비동기 버전 (이벤트 루프를 막지 않고 완료를 기다림)"""
+        result = await asyncio.wrap_future(self._future)
+        self._resolved = True
+        speculation_stats.record(True, self._elapsed)
+        return result
+
+    def cancel(self) -> None:
+        """결과 폐기. 실행 전이면 취소하고, 실행 중이면 다음 단계 진입 전에 멈추도록 알림
+        (이미 재사용/폐기된 작업이면 아무것도 하지 않음)"""
+        if self._resolved:
+            return
+        self._resolved = True
+        self.cancel_event.set()
+        if self._future.cancel():
+            speculation_stats.record(False, 0.0)
+        else:
+            self._future.add_done_callback(
+                lambda _: speculation_stats.record(False, self._elapsed)
+            )
+
+
+def start_speculation(fn, *args, **kwargs):
+    """설정이 켜져 있으면 작업을 미리 시작하고, 꺼져 있으면 None 반환"""
+    if not PIPELINE_CONFIG["speculative_retrieval"]:
+        return None
+    return Speculation(fn, *args, **kwargs)
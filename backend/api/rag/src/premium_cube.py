@@ -0,0 +1,315 @@
+"""
+인메모리 보험료 큐브
+
+comparison 테이블을 한 번 읽어 (보험나이, 성별, 상품유형, 만기, 상품, 보장항목) 축의
+밀집 NumPy 배열로 올려 두고, 비교설계 템플릿 쿼리(sql_builder.CompareQuery)를 SQL 없이
+슬라이싱과 합계로 계산한다. 상품 축은 (보험사ID, 보험ID) 쌍이며 상품별 보험사 인덱스를
+따로 가지고 있어 보험사 합계는 상품 합계를 보험사별로 모아 계산한다.
+데이터 버전 스탬프(storage.data_version)가 바뀌면 백그라운드 스레드에서 큐브를 다시 만들고,
+새 큐브가 준비되기 전이나 버전을 확인할 수 없으면(data_version 테이블 없음) 큐브 대신 SQL로 조회한다.
+"""
+import threading
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .config import PREMIUM_CUBE_CONFIG
+from .storage import storage
+from .log import get_logger
+from .metrics import timed
+from .sql_builder import CompareQuery, DETAILED_SHAPE, company_keyword
+
+logger = get_logger("premium_cube")
+
+
+class PremiumCube:
+    def __init__(self, version: str):
+        self.version = version
+        self.ages: Dict[int, int] = {}
+        self.sexes: Dict[int, int] = {}
+        self.product_types: Dict[str, int] = {}
+        self.expiry_years: Dict[str, int] = {}
+        self.products: Dict[tuple, int] = {}
+        self.coverages: Dict[str, int] = {}
+
+        self.company_names: List[str] = []
+        self.product_names: List[str] = []
+        self.product_company: np.ndarray = np.zeros(0, dtype=np.int32)
+        self.coverage_names: List[str] = []
+        self.coverage_ids: List[str] = []
+        self.coverage_is_default: np.ndarray = np.zeros(0, dtype=bool)
+
+        self.premiums: np.ndarray = np.zeros(0, dtype=np.int32)
+        self.present: np.ndarray = np.zeros(0, dtype=bool)
+
+    @staticmethod
+    def _axis(values) -> Dict:
+        return {value: index for index, value in enumerate(sorted(values))}
+
+    @classmethod
+    def build(cls, version: str, batch_size: int = None) -> "PremiumCube":
+        batch_size = batch_size or PREMIUM_CUBE_CONFIG["load_batch_size"]
+        cube = cls(version)
+        no_timeout = 0
+
+        # 이름 사전 (상품/보장항목은 이름이 있는 것만 큐브에 포함 = SQL JOIN과 같은 의미)
+        companies = {
+            row["company_id"]: row["company_name"]
+            for row in storage.execute("SELECT company_id, company_name FROM insu_company")
+        }
+        products = {
+            (row["company_id"], row["product_id"]): row["product_name"]
+            for row in storage.execute("SELECT company_id, product_id, product_name FROM insu_product")
+            if row["company_id"] in companies
+        }
+        coverages = {
+            row["coverage_id"]: (row["coverage_name"], int(row["is_default"]))
+            for row in storage.execute("SELECT coverage_id, coverage_name, is_default FROM coverage")
+        }
+
+        def distinct(column):
+            return [
+                row[column]
+                for row in storage.execute(f"SELECT DISTINCT {column} FROM comparison", timeout_ms=no_timeout)
+            ]
+
+        cube.ages = cls._axis(int(value) for value in distinct("insu_age"))
+        cube.sexes = cls._axis(int(value) for value in distinct("sex"))
+        cube.product_types = cls._axis(distinct("product_type"))
+        cube.expiry_years = cls._axis(distinct("expiry_year"))
+        cube.products = cls._axis(products)
+        cube.coverages = cls._axis(coverages)
+
+        company_index = cls._axis({company_id for company_id, _ in products})
+        cube.company_names = [companies[company_id] for company_id in company_index]
+        cube.product_names = [products[key] for key in cube.products]
+        cube.product_company = np.array(
+            [company_index[company_id] for company_id, _ in cube.products], dtype=np.int32
+        )
+        cube.coverage_ids = list(cube.coverages)
+        cube.coverage_names = [coverages[coverage_id][0] for coverage_id in cube.coverage_ids]
+        cube.coverage_is_default = np.array(
+            [coverages[coverage_id][1] == 1 for coverage_id in cube.coverage_ids], dtype=bool
+        )
+
+        shape = (
+            len(cube.ages), len(cube.sexes), len(cube.product_types),
+            len(cube.expiry_years), len(cube.products), len(cube.coverages),
+        )
+        cube.premiums = np.zeros(shape, dtype=np.int32)
+        cube.present = np.zeros(shape, dtype=bool)
+
+        sql = """SELECT insu_age, sex, product_type, expiry_year, company_id, product_id, coverage_id, premium_amount
+FROM comparison"""
+        for rows in storage.stream(sql, batch_size=batch_size, timeout_ms=no_timeout):
+            keys = []
+            amounts = []
+            for age, sex, product_type, expiry_year, company_id, product_id, coverage_id, amount in rows:
+                product = cube.products.get((company_id, product_id))
+                coverage = cube.coverages.get(coverage_id)
+                if product is None or coverage is None:
+                    continue
+                keys.append((
+                    cube.ages[int(age)], cube.sexes[int(sex)], cube.product_types[product_type],
+                    cube.expiry_years[expiry_year], product, coverage,
+                ))
+                amounts.append(amount)
+            if keys:
+                index = tuple(np.array(keys, dtype=np.int64).T)
+                cube.premiums[index] = amounts
+                cube.present[index] = True
+
+        logger.info(
+            "보험료 큐브 생성 완료: 버전=%s, 형태=%s, 값 %d개, %.1fMB",
+            version, shape, int(cube.present.sum()), cube.premiums.nbytes / 1e6,
+        )
+        return cube
+
+    def _profile_mask(self, query: CompareQuery):
+        """조건에 맞는 (상품, 보장항목) 보험료와 마스크. 해당 프로필이 없으면 None"""
+        try:
+            profile = (
+                self.ages[query.insu_age], self.sexes[query.sex],
+                self.product_types[query.product_type], self.expiry_years[query.expiry_year],
+            )
+        except KeyError:
+            return None, None
+
+        premiums = self.premiums[profile]
+        mask = self.present[profile]
+        if query.default_only:
+            mask = mask & self.coverage_is_default[np.newaxis, :]
+        if query.companies:
+            # SQL의 LOWER(company_name) LIKE '%검색어%'와 같은 비교
+            keywords = [company_keyword(company) for company in query.companies]
+            company_ok = np.array(
+                [any(keyword in name.lower() for keyword in keywords) for name in self.company_names],
+                dtype=bool,
+            )
+            mask = mask & company_ok[self.product_company][:, np.newaxis]
+        return premiums, mask
+
+    def query(self, query: CompareQuery) -> List[dict]:
+        """sql_builder 템플릿 쿼리와 같은 형태의 결과 행 반환"""
+        premiums, mask = self._profile_mask(query)
+        if premiums is None:
+            return []
+
+        product_totals = np.where(mask, premiums, 0).sum(axis=1, dtype=np.int64)
+        product_has_rows = mask.any(axis=1)
+
+        if query.shape != DETAILED_SHAPE:
+            rows = [
+                {
+                    "보험사명": self.company_names[self.product_company[product]],
+                    "상품명": self.product_names[product],
+                    "보험료합계": int(product_totals[product]),
+                }
+                for product in np.flatnonzero(product_has_rows)
+            ]
+            rows.sort(key=lambda row: (row["보험사명"], row["상품명"]))
+            return rows
+
+        company_count = len(self.company_names)
+        company_totals = np.zeros(company_count, dtype=np.int64)
+        np.add.at(company_totals, self.product_company, product_totals)
+        company_has_rows = np.zeros(company_count, dtype=bool)
+        company_has_rows[self.product_company[product_has_rows]] = True
+
+        rows = [
+            {
+                "구분": "합계",
+                "보험사명": self.company_names[company],
+                "상품명": None,
+                "보장항목명": None,
+                "보험료": int(company_totals[company]),
+                "sort_id": "0",
+            }
+            for company in np.flatnonzero(company_has_rows)
+        ]
+        product_index, coverage_index = np.nonzero(mask)
+        amounts = premiums[product_index, coverage_index]
+        for product, coverage, amount in zip(product_index, coverage_index, amounts):
+            rows.append(
+                {
+                    "구분": "상세",
+                    "보험사명": self.company_names[self.product_company[product]],
+                    "상품명": self.product_names[product],
+                    "보장항목명": self.coverage_names[coverage],
+                    "보험료": int(amount),
+                    "sort_id": self.coverage_ids[coverage],
+                }
+            )
+        rows.sort(
+            key=lambda row: (
+                row["보험사명"], row["구분"] != "합계", row["상품명"] or "", row["sort_id"],
+            )
+        )
+        return rows
+
+
+class PremiumCubeManager:
+    """
+    버전 스탬프를 주기적으로 확인해 큐브를 교체
+
+    요청 스레드는 버전 확인만 하고 큐브 생성(comparison 전체 스캔)은 백그라운드 스레드에서 한다.
+    확인한 버전의 큐브가 준비될 때까지는 None을 돌려줘 SQL로 조회하게 하고,
+    생성에 실패하면 재시도 대기 시간을 두 배씩 늘린다.
+    """
+
+    def __init__(self):
+        self._cube = None
+        self._lock = threading.Lock()
+        self._checked_at = 0.0
+        # 마지막으로 확인한 데이터 버전
+        self._version = None
+        # 생성 중인 큐브의 버전
+        self._building = None
+        self._failures = 0
+        self._retry_at = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return PREMIUM_CUBE_CONFIG["enabled"]
+
+    def get(self) -> Optional[PremiumCube]:
+        """확인한 데이터 버전의 큐브 (아직 없거나 버전을 확인할 수 없으면 None -> SQL로 조회)"""
+        if time.monotonic() - self._checked_at >= PREMIUM_CUBE_CONFIG["version_check_seconds"]:
+            # 다른 요청이 확인 중이면 기다리지 않고 현재 상태 사용
+            if self._lock.acquire(blocking=False):
+                try:
+                    self._check_version()
+                finally:
+                    self._lock.release()
+
+        cube = self._cube
+        if cube is None or cube.version != self._version:
+            return None
+        return cube
+
+    def _check_version(self) -> None:
+        if time.monotonic() - self._checked_at < PREMIUM_CUBE_CONFIG["version_check_seconds"]:
+            return
+        try:
+            version = storage.data_version()
+        except Exception:
+            logger.exception("데이터 버전 확인 실패, 보험료 큐브 대신 SQL로 조회합니다.")
+            version = None
+        if version is None and (self._version is not None or self._checked_at == 0.0):
+            # 적재 시점을 알 수 없으면 오래된 요금을 계속 쓰게 되므로 큐브를 쓰지 않음
+            logger.warning("데이터 버전을 확인할 수 없어 보험료 큐브를 사용하지 않습니다.")
+        self._version = version
+        self._checked_at = time.monotonic()
+
+        if version is None:
+            self._cube = None
+            return
+        if self._cube is not None and self._cube.version == version:
+            return
+        if self._building is not None or time.monotonic() < self._retry_at:
+            return
+        self._building = version
+        threading.Thread(
+            target=self._build, args=(version,), name="premium-cube-build", daemon=True
+        ).start()
+
+    def _build(self, version: str) -> None:
+        try:
+            cube = PremiumCube.build(version)
+        except Exception:
+            with self._lock:
+                self._failures += 1
+                delay = min(
+                    PREMIUM_CUBE_CONFIG["retry_seconds"] * 2 ** (self._failures - 1),
+                    PREMIUM_CUBE_CONFIG["max_retry_seconds"],
+                )
+                self._retry_at = time.monotonic() + delay
+                self._building = None
+            logger.exception("보험료 큐브 생성 실패 (버전=%s, %.0f초 후 재시도)", version, delay)
+            return
+
+        with self._lock:
+            self._cube = cube
+            self._building = None
+            self._failures = 0
+            self._retry_at = 0.0
+
+    def preload(self) -> Optional[PremiumCube]:
+        """현재 데이터 버전의 큐브를 이 스레드에서 바로 생성 (api.serve가 fork 전에 호출)"""
+        with self._lock:
+            version = storage.data_version()
+            self._version = version
+            self._checked_at = time.monotonic()
+            if version is not None and (self._cube is None or self._cube.version != version):
+                self._cube = PremiumCube.build(version)
+        return self.get()
+
+    @timed("cube")
+    def query(self, query: CompareQuery) -> Optional[List[dict]]:
+        """큐브로 계산한 결과 행 (큐브를 쓸 수 없으면 None)"""
+        cube = self.get()
+        return None if cube is None else cube.query(query)
+
+
+premium_cube = PremiumCubeManager()
@@ -0,0 +1,352 @@
+"""
+요청 단위 샘플링 프로파일러
+
+관리자가 다음 N개 요청을 예약하거나(arm) 요청에 프로파일 헤더(관리자 토큰)를 붙이면
+그 요청을 처리하는 동안 관련 스레드의 호출 스택을 일정 간격으로 샘플링해
+speedscope JSON과 flamegraph용 folded 스택 파일로 저장한다. 파일에는 요청의
+단계별 시간(Server-Timing과 같은 값)이 함께 기록된다.
+
+- 이벤트 루프 스레드: 요청 미들웨어 프레임이 스택에 있을 때만 (다른 요청 처리 중인 샘플 제외)
+- 단계별 스레드 풀/투기적 실행 스레드: 프로파일 중인 요청의 작업을 실행하는 동안만 (run_in_context)
+- 샘플링 스레드는 프로파일 중인 요청이 있을 때만 실행되고, 예약이 없으면 요청 처리 경로의
+  추가 비용은 공유 카운터 한 번 읽기뿐이다. 관리자 토큰이 없으면 미들웨어 자체를 붙이지 않는다.
+
+예약 횟수는 fork 전에 만든 공유 메모리에 두므로 api.serve 워커 모두가 함께 소모한다
+(워커끼리 잠금은 없어서 동시에 도착한 요청으로 몇 개 더 프로파일될 수 있음).
+"""
+import contextvars
+import hmac
+import json
+import mmap
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+
+from .config import PROFILING_CONFIG
+from .log import get_logger
+
+logger = get_logger("profiler")
+
+PROFILE_ID_PATTERN = re.compile(r"^[0-9]{8}-[0-9]{6}-[0-9a-f]{8}$")
+FORMATS = {"speedscope": ".speedscope.json", "folded": ".folded"}
+
+# 현재 요청의 프로파일 (단계별 스레드 풀은 컨텍스트를 복사해 실행하므로 작업 스레드에서도 보임)
+_current_profile: contextvars.ContextVar = contextvars.ContextVar("current_profile", default=None)
+
+
+def _frame_name(code) -> str:
+    """함수 이름 (co_qualname은 Python 3.11+ 전용이라 3.10에서는 co_name 사용)"""
+    return getattr(code, "co_qualname", code.co_name)
+
+
+class RequestProfile:
+    """요청 하나의 샘플 모음"""
+
+    def __init__(self, method: str, path: str, config: dict):
+        self.id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        self.method = method
+        self.path = path
+        self.config = config
+        self.started_at = time.time()
+        self._started = time.perf_counter()
+        self.duration = 0.0
+        # 스레드 ident -> (스레드 이름, 기준 프레임). 기준 프레임 위쪽(서버/스레드 풀 코드)은 잘라냄
+        self.threads = {}
+        # (스레드 이름, 스택) -> 샘플 수/누적 시간
+        self.counts = Counter()
+        self.weights = Counter()
+        self.samples = 0
+        self.truncated = False
+
+    def attach(self, ident: int, name: str, anchor=None) -> None:
+        self.threads[ident] = (name, anchor)
+
+    def detach(self, ident: int) -> None:
+        self.threads.pop(ident, None)
+
+    def sample(self, frames: dict, weight: float) -> bool:
+        """샘플링 스레드가 호출. 한도를 넘으면 False"""
+        if (
+            self.samples >= self.config["max_samples"]
+            or time.perf_counter() - self._started > self.config["max_seconds"]
+        ):
+            self.truncated = True
+            return False
+        for ident, (name, anchor) in list(self.threads.items()):
+            frame = frames.get(ident)
+            stack = []
+            while frame is not None:
+                stack.append(frame.f_code)
+                if frame is anchor:
+                    break
+                frame = frame.f_back
+            else:
+                if anchor is not None:
+                    # 이벤트 루프가 다른 요청을 처리하는 중
+                    continue
+            if stack:
+                key = (name, tuple(reversed(stack)))
+                self.counts[key] += 1
+                self.weights[key] += weight
+                self.samples += 1
+        return True
+
+    def stage_tags(self, stages: dict) -> str:
+        return ", ".join(f"{stage}={seconds * 1000:.1f}ms" for stage, seconds in stages.items())
+
+    def to_speedscope(self, stages: dict, status: int) -> dict:
+        """speedscope 파일 형식 (스레드별 sampled 프로파일)"""
+        frame_index = {}
+        frames = []
+        by_thread = {}
+        for (thread, stack), count in self.counts.items():
+            indices = []
+            for code in stack:
+                key = (_frame_name(code), code.co_filename, code.co_firstlineno)
+                if key not in frame_index:
+                    frame_index[key] = len(frames)
+                    frames.append({"name": key[0], "file": key[1], "line": key[2]})
+                indices.append(frame_index[key])
+            entry = by_thread.setdefault(thread, {"samples": [], "weights": []})
+            entry["samples"].append(indices)
+            entry["weights"].append(round(self.weights[(thread, stack)] * 1000, 3))
+
+        profiles = [
+            {
+                "type": "sampled",
+                "name": thread,
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": round(sum(entry["weights"]), 3),
+                "samples": entry["samples"],
+                "weights": entry["weights"],
+            }
+            for thread, entry in by_thread.items()
+        ]
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "exporter": "insu-profiler",
+            "name": f"{self.method} {self.path} {status} {self.duration * 1000:.0f}ms [{self.stage_tags(stages)}]",
+            "activeProfileIndex": 0,
+            "shared": {"frames": frames},
+            "profiles": profiles,
+        }
+
+    def to_folded(self) -> str:
+        """flamegraph.pl / inferno 입력 형식 (스레드;함수;함수 마이크로초)"""
+        lines = []
+        for (thread, stack), weight in self.weights.items():
+            names = [thread] + [_frame_name(code) for code in stack]
+            lines.append(f"{';'.join(name.replace(';', ':') for name in names)} {max(1, round(weight * 1e6))}")
+        return "\n".join(sorted(lines)) + "\n"
+
+
+class SamplingProfiler:
+    def __init__(self, config: dict = None):
+        self.config = config or PROFILING_CONFIG
+        # 예약된 요청 수 (fork 후에도 워커끼리 공유되는 익명 공유 메모리)
+        self._armed = memoryview(mmap.mmap(-1, 8)).cast("q")
+        self._lock = threading.Lock()
+        # 샘플링 한 번과 프로파일 종료가 겹치지 않도록 하는 잠금
+        self._tick_lock = threading.Lock()
+        self._active = set()
+        self._thread = None
+        self.profiled = 0
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._after_fork_in_child)
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.config["admin_token"])
+
+    @property
+    def armed(self) -> int:
+        return max(0, self._armed[0])
+
+    def arm(self, requests: int) -> int:
+        self._armed[0] = max(0, min(int(requests), self.config["max_requests"]))
+        logger.info("프로파일링 예약", extra={"requests": self._armed[0]})
+        return self._armed[0]
+
+    def disarm(self) -> None:
+        self._armed[0] = 0
+
+    def _after_fork_in_child(self) -> None:
+        # 샘플링 스레드는 fork 후 자식에 없음
+        self._lock = threading.Lock()
+        self._tick_lock = threading.Lock()
+        self._active = set()
+        self._thread = None
+
+    def should_profile(self, scope) -> bool:
+        """이 요청을 프로파일할지 결정 (예약 횟수는 여기서 소모)"""
+        path = scope["path"]
+        if path.startswith(self.config["exclude_prefixes"]):
+            return False
+        header = self.config["header"].encode("latin-1")
+        token = self.config["admin_token"].encode("latin-1")
+        for name, value in scope["headers"]:
+            if name == header:
+                return bool(token) and hmac.compare_digest(value, token)
+        if self._armed[0] <= 0:
+            return False
+        with self._lock:
+            if self._armed[0] <= 0:
+                return False
+            self._armed[0] -= 1
+        return True
+
+    def start(self, method: str, path: str, anchor) -> tuple:
+        """요청 프로파일 시작 -> (프로파일, 컨텍스트 토큰). anchor는 호출한 미들웨어 프레임"""
+        profile = RequestProfile(method, path, self.config)
+        profile.attach(threading.get_ident(), "event-loop", anchor)
+        token = _current_profile.set(profile)
+        with self._lock:
+            self._active.add(profile)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._sample_loop, name="profiler", daemon=True)
+                self._thread.start()
+        return profile, token
+
+    def stop(self, profile: RequestProfile, token) -> None:
+        _current_profile.reset(token)
+        with self._tick_lock:
+            with self._lock:
+                self._active.discard(profile)
+        profile.duration = time.perf_counter() - profile._started
+
+    def _sample_loop(self) -> None:
+        interval = self.config["interval"]
+        own_ident = threading.get_ident()
+        last = time.perf_counter()
+        while True:
+            with self._lock:
+                if not self._active:
+                    self._thread = None
+                    return
+            time.sleep(interval)
+            with self._tick_lock:
+                now = time.perf_counter()
+                weight, last = now - last, now
+                frames = sys._current_frames()
+                frames.pop(own_ident, None)
+                with self._lock:
+                    active = list(self._active)
+                for profile in active:
+                    if not profile.sample(frames, weight):
+                        with self._lock:
+                            self._active.discard(profile)
+                del frames
+
+    def save(self, profile: RequestProfile, status: int, stages: dict) -> dict:
+        """speedscope/folded 파일과 메타데이터 저장 후 오래된 프로파일 정리"""
+        output_dir = self.config["output_dir"]
+        os.makedirs(output_dir, exist_ok=True)
+        meta = {
+            "id": profile.id,
+            "method": profile.method,
+            "path": profile.path,
+            "status": status,
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(profile.started_at)),
+            "duration_ms": round(profile.duration * 1000, 1),
+            "stages_ms": {stage: round(seconds * 1000, 1) for stage, seconds in stages.items()},
+            "samples": profile.samples,
+            "threads": sorted({thread for thread, _ in profile.counts}),
+            "truncated": profile.truncated,
+            "interval_ms": self.config["interval"] * 1000,
+            "pid": os.getpid(),
+        }
+        speedscope = profile.to_speedscope(stages, status)
+        speedscope["metadata"] = meta
+        base = os.path.join(output_dir, profile.id)
+        with open(base + FORMATS["speedscope"], "w", encoding="utf-8") as f:
+            json.dump(speedscope, f, ensure_ascii=False)
+        with open(base + FORMATS["folded"], "w", encoding="utf-8") as f:
+            f.write(profile.to_folded())
+        with open(base + ".meta.json", "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        self.profiled += 1
+        self._prune(output_dir)
+        logger.info("요청 프로파일 저장", extra={"profile_id": profile.id, "samples": profile.samples})
+        return meta
+
+    def _prune(self, output_dir: str) -> None:
+        ids = sorted(name[:-len(".meta.json")] for name in os.listdir(output_dir) if name.endswith(".meta.json"))
+        for profile_id in ids[:max(0, len(ids) - self.config["max_profiles"])]:
+            for suffix in (*FORMATS.values(), ".meta.json"):
+                try:
+                    os.remove(os.path.join(output_dir, profile_id + suffix))
+                except FileNotFoundError:
+                    pass
+
+    def list_profiles(self) -> list:
+        """저장된 프로파일 메타데이터 (최신순, 모든 워커가 저장한 것)"""
+        output_dir = self.config["output_dir"]
+        if not os.path.isdir(output_dir):
+            return []
+        profiles = []
+        for name in sorted(os.listdir(output_dir), reverse=True):
+            if name.endswith(".meta.json"):
+                try:
+                    with open(os.path.join(output_dir, name), encoding="utf-8") as f:
+                        profiles.append(json.load(f))
+                except (OSError, ValueError):
+                    continue
+        return profiles
+
+    def profile_path(self, profile_id: str, fmt: str = "speedscope"):
+        """다운로드할 파일 경로 (없거나 잘못된 ID/형식이면 None)"""
+        if fmt not in FORMATS or not PROFILE_ID_PATTERN.match(profile_id):
+            return None
+        path = os.path.join(self.config["output_dir"], profile_id + FORMATS[fmt])
+        return path if os.path.exists(path) else None
+
+    def stats(self) -> dict:
+        with self._lock:
+            active = len(self._active)
+        return {
+            "enabled": self.enabled,
+            "armed": self.armed,
+            "active": active,
+            "profiled": self.profiled,
+            "interval_ms": self.config["interval"] * 1000,
+            "header": self.config["header"],
+        }
+
+
+_profiler = None
+_profiler_lock = threading.Lock()
+
+
+def get_profiler() -> SamplingProfiler:
+    """
+    프로세스의 프로파일러 (처음 호출할 때 공유 메모리 생성)
+
+    api.serve는 예약 횟수를 워커끼리 공유하도록 fork 전에 마스터에서 만들고,
+    단일 프로세스 서버는 main.lifespan에서 만든다.
+    """
+    global _profiler
+    if _profiler is None:
+        with _profiler_lock:
+            if _profiler is None:
+                _profiler = SamplingProfiler()
+    return _profiler
+
+
+def run_in_context(context: contextvars.Context, fn, *args, **kwargs):
+    """context.run(fn, ...). 프로파일 중인 요청의 작업이면 실행하는 동안 이 스레드도 샘플링"""
+    if _profiler is None or not _profiler._active:
+        return context.run(fn, *args, **kwargs)
+    profile = context.get(_current_profile)
+    if profile is None:
+        return context.run(fn, *args, **kwargs)
+    ident = threading.get_ident()
+    profile.attach(ident, threading.current_thread().name, sys._getframe())
+    try:
+        return context.run(fn, *args, **kwargs)
+    finally:
+        profile.detach(ident)
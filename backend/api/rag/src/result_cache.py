@@ -0,0 +1,149 @@
+"""
+비교설계 SQL 결과 캐시
+
+같은 조건(예: 40세 남자 무해지 20y_100)의 비교 질문이 반복되면 DB 쿼리와 JSON 변환을 건너뛴다.
+키는 정규화된 SQL 문장(템플릿 형태)과 바인딩 파라미터이며, 변환된 JSON은 설정값까지 포함한
+키로 따로 저장한다. 요금 데이터 버전이 바뀌면 캐시 전체를 비우고, 크기는 LRU로 제한한다.
+
+호출하는 쪽은 쿼리 전에 current_version()으로 버전을 한 번 읽고 조회/저장에 같은 버전을
+넘긴다. 쿼리 도중 적재가 끝나 버전이 바뀌었으면 이전 데이터로 만든 결과는 저장하지 않는다.
+버전을 확인할 수 없으면(data_version 테이블 없음) 캐시를 쓰지 않는다.
+"""
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from .config import RESULT_CACHE_CONFIG
+from .storage import storage
+from .log import get_logger
+
+logger = get_logger("result_cache")
+
+_MISSING = object()
+
+
+def _normalize_sql(sql: str) -> str:
+    return re.sub(r"\s+", " ", sql).strip().rstrip(";")
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+class ResultCache:
+    def __init__(self, max_entries: int = None, version_check_seconds: float = None):
+        self.max_entries = max_entries or RESULT_CACHE_CONFIG["max_entries"]
+        self.version_check_seconds = (
+            RESULT_CACHE_CONFIG["version_check_seconds"]
+            if version_check_seconds is None
+            else version_check_seconds
+        )
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = None
+        self._version_checked_at = 0.0
+        self.hits = {"rows": 0, "formatted": 0}
+        self.misses = {"rows": 0, "formatted": 0}
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return RESULT_CACHE_CONFIG["enabled"]
+
+    def _check_version(self) -> None:
+        """데이터 버전이 바뀌었으면 캐시 비움 (확인은 version_check_seconds마다)"""
+        now = time.monotonic()
+        if now - self._version_checked_at < self.version_check_seconds:
+            return
+        try:
+            version = storage.data_version()
+        except Exception as e:
+            # 버전 확인 실패 시 기존 캐시 유지 (다음 주기에 다시 확인)
+            logger.warning("데이터 버전 확인 오류: %s", e)
+            version = self._version
+        with self._lock:
+            self._version_checked_at = now
+            if version != self._version:
+                if self._entries:
+                    self.invalidations += 1
+                self._entries.clear()
+            self._version = version
+
+    def current_version(self):
+        """캐시에 사용할 데이터 버전 (None이면 캐시를 쓰지 않음)"""
+        self._check_version()
+        return self._version
+
+    def _key(self, kind: str, sql: str, params, config=None):
+        return (kind, _normalize_sql(sql), _freeze(params), _freeze(config))
+
+    def _get(self, kind: str, version, key):
+        with self._lock:
+            if version is None or version != self._version:
+                return _MISSING
+            value = self._entries.get(key, _MISSING)
+            if value is _MISSING:
+                self.misses[kind] += 1
+                return _MISSING
+            self._entries.move_to_end(key)
+            self.hits[kind] += 1
+            return value
+
+    def _put(self, version, key, value) -> None:
+        with self._lock:
+            # 쿼리 도중 버전이 바뀌었으면 이전 데이터로 만든 결과이므로 저장하지 않음
+            if version is None or version != self._version:
+                return
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_rows(self, version, sql: str, params):
+        """캐시된 SQL 결과 행 (없으면 None)"""
+        value = self._get("rows", version, self._key("rows", sql, params))
+        return None if value is _MISSING else value
+
+    def put_rows(self, version, sql: str, params, rows) -> None:
+        self._put(version, self._key("rows", sql, params), rows)
+
+    def get_formatted(self, version, sql: str, params, config: dict):
+        """캐시된 JSON 변환 결과 (없으면 None)"""
+        value = self._get("formatted", version, self._key("formatted", sql, params, config))
+        return None if value is _MISSING else value
+
+    def put_formatted(self, version, sql: str, params, config: dict, formatted) -> None:
+        self._put(version, self._key("formatted", sql, params, config), formatted)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = {
+                "enabled": self.enabled,
+                # data_version이 없으면 켜져 있어도 캐시를 쓰지 않음
+                "active": self.enabled and self._version is not None,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "data_version": self._version,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+            for kind in ("rows", "formatted"):
+                lookups = self.hits[kind] + self.misses[kind]
+                stats[f"{kind}_hits"] = self.hits[kind]
+                stats[f"{kind}_misses"] = self.misses[kind]
+                stats[f"{kind}_hit_rate"] = self.hits[kind] / lookups if lookups else 0.0
+            return stats
+
+
+result_cache = ResultCache()
@@ -14,7 +14,7 @@ CREATE TABLE comparison (
     product_id VARCHAR(20) NOT NULL COMMENT '보험ID',
     coverage_id VARCHAR(20) NOT NULL COMMENT '보장항목ID',
     premium_amount INT NOT NULL COMMENT '보험료',
-    PRIMARY KEY (insu_age, sex, product_type, company_id, product_id, coverage_id)
+    PRIMARY KEY (insu_age, sex, product_type, expiry_year, company_id, product_id, coverage_id)
 );
 
 -- 3. 보장항목 테이블 (coverage)
@@ -43,3 +43,179 @@ CREATE TABLE insu_product (
     PRIMARY KEY (company_id, product_id),
     FOREIGN KEY (company_id) REFERENCES insu_company(company_id) ON DELETE CASCADE
 );"""
+
+# comparison 기본 키 (만기별 요금이 따로 있으므로 expiry_year 포함)
+COMPARISON_PRIMARY_KEY = (
+    "insu_age", "sex", "product_type", "expiry_year", "company_id", "product_id", "coverage_id",
+)
+
+# 이전 기본 키(expiry_year 없음)로 만든 테이블을 위 기본 키로 변경 ({table}은 comparison 또는 staging)
+COMPARISON_PRIMARY_KEY_MIGRATION = (
+    "ALTER TABLE {table} DROP PRIMARY KEY, ADD PRIMARY KEY (" + ", ".join(COMPARISON_PRIMARY_KEY) + ")"
+)
+
+# 요금 데이터 버전 (요금 테이블을 다시 적재할 때마다 version 증가)
+DATA_VERSION_TABLE = """CREATE TABLE IF NOT EXISTS data_version (
+    table_name VARCHAR(64) NOT NULL COMMENT '테이블명',
+    version BIGINT UNSIGNED NOT NULL DEFAULT 1 COMMENT '데이터 버전',
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '변경 시각',
+    PRIMARY KEY (table_name)
+)"""
+
+DATA_VERSION_SCHEMA = DATA_VERSION_TABLE + """;
+
+INSERT IGNORE INTO data_version (table_name, version) VALUES ('comparison', 1);"""
+
+# 보험사/상품별 보험료 합계 집계 테이블 (comparison 변경 시 트리거로 증분 갱신)
+PREMIUM_TOTALS_SCHEMA = """CREATE TABLE IF NOT EXISTS premium_totals (
+    insu_age TINYINT UNSIGNED NOT NULL COMMENT '보험나이',
+    sex TINYINT(1) NOT NULL COMMENT '성별 (0: 여자, 1: 남자)',
+    product_type VARCHAR(50) NOT NULL COMMENT '상품유형',
+    expiry_year VARCHAR(10) NOT NULL COMMENT '만기',
+    company_id VARCHAR(20) NOT NULL COMMENT '보험사ID',
+    product_id VARCHAR(20) NOT NULL COMMENT '보험ID',
+    premium_total BIGINT NOT NULL DEFAULT 0 COMMENT '보험료합계',
+    coverage_count INT NOT NULL DEFAULT 0 COMMENT '보장항목 수',
+    default_premium_total BIGINT NOT NULL DEFAULT 0 COMMENT '기본플랜 보험료합계 (coverage.is_default = 1)',
+    default_coverage_count INT NOT NULL DEFAULT 0 COMMENT '기본플랜 보장항목 수',
+    PRIMARY KEY (insu_age, sex, product_type, expiry_year, company_id, product_id)
+);"""
+
+# 집계 테이블 증분 갱신 트리거 (문장별로 실행)
+PREMIUM_TOTALS_TRIGGERS = [
+    "DROP TRIGGER IF EXISTS comparison_totals_insert",
+    """CREATE TRIGGER comparison_totals_insert AFTER INSERT ON comparison FOR EACH ROW
+INSERT INTO premium_totals
+    (insu_age, sex, product_type, expiry_year, company_id, product_id,
+     premium_total, coverage_count, default_premium_total, default_coverage_count)
+SELECT NEW.insu_age, NEW.sex, NEW.product_type, NEW.expiry_year, NEW.company_id, NEW.product_id,
+    NEW.premium_amount, 1, IF(cv.is_default = 1, NEW.premium_amount, 0), IF(cv.is_default = 1, 1, 0)
+FROM coverage cv WHERE cv.coverage_id = NEW.coverage_id
+ON DUPLICATE KEY UPDATE
+    premium_total = premium_total + VALUES(premium_total),
+    coverage_count = coverage_count + 1,
+    default_premium_total = default_premium_total + VALUES(default_premium_total),
+    default_coverage_count = default_coverage_count + VALUES(default_coverage_count)""",
+    "DROP TRIGGER IF EXISTS comparison_totals_delete",
+    """CREATE TRIGGER comparison_totals_delete AFTER DELETE ON comparison FOR EACH ROW
+UPDATE premium_totals pt JOIN coverage cv ON cv.coverage_id = OLD.coverage_id
+SET pt.premium_total = pt.premium_total - OLD.premium_amount,
+    pt.coverage_count = pt.coverage_count - 1,
+    pt.default_premium_total = pt.default_premium_total - IF(cv.is_default = 1, OLD.premium_amount, 0),
+    pt.default_coverage_count = pt.default_coverage_count - IF(cv.is_default = 1, 1, 0)
+WHERE pt.insu_age = OLD.insu_age AND pt.sex = OLD.sex AND pt.product_type = OLD.product_type
+    AND pt.expiry_year = OLD.expiry_year AND pt.company_id = OLD.company_id AND pt.product_id = OLD.product_id""",
+    "DROP TRIGGER IF EXISTS comparison_totals_update",
+    """CREATE TRIGGER comparison_totals_update AFTER UPDATE ON comparison FOR EACH ROW
+BEGIN
+    UPDATE premium_totals pt JOIN coverage cv ON cv.coverage_id = OLD.coverage_id
+    SET pt.premium_total = pt.premium_total - OLD.premium_amount,
+        pt.coverage_count = pt.coverage_count - 1,
+        pt.default_premium_total = pt.default_premium_total - IF(cv.is_default = 1, OLD.premium_amount, 0),
+        pt.default_coverage_count = pt.default_coverage_count - IF(cv.is_default = 1, 1, 0)
+    WHERE pt.insu_age = OLD.insu_age AND pt.sex = OLD.sex AND pt.product_type = OLD.product_type
+        AND pt.expiry_year = OLD.expiry_year AND pt.company_id = OLD.company_id AND pt.product_id = OLD.product_id;
+    INSERT INTO premium_totals
+        (insu_age, sex, product_type, expiry_year, company_id, product_id,
+         premium_total, coverage_count, default_premium_total, default_coverage_count)
+    SELECT NEW.insu_age, NEW.sex, NEW.product_type, NEW.expiry_year, NEW.company_id, NEW.product_id,
+        NEW.premium_amount, 1, IF(cv.is_default = 1, NEW.premium_amount, 0), IF(cv.is_default = 1, 1, 0)
+    FROM coverage cv WHERE cv.coverage_id = NEW.coverage_id
+    ON DUPLICATE KEY UPDATE
+        premium_total = premium_total + VALUES(premium_total),
+        coverage_count = coverage_count + 1,
+        default_premium_total = default_premium_total + VALUES(default_premium_total),
+        default_coverage_count = default_coverage_count + VALUES(default_coverage_count);
+END""",
+    "DROP TRIGGER IF EXISTS coverage_default_totals_update",
+    """CREATE TRIGGER coverage_default_totals_update AFTER UPDATE ON coverage FOR EACH ROW
+UPDATE premium_totals pt
+JOIN (
+    SELECT insu_age, sex, product_type, expiry_year, company_id, product_id,
+        SUM(premium_amount) AS amount, COUNT(*) AS cnt
+    FROM comparison WHERE coverage_id = NEW.coverage_id
+    GROUP BY insu_age, sex, product_type, expiry_year, company_id, product_id
+) d ON pt.insu_age = d.insu_age AND pt.sex = d.sex AND pt.product_type = d.product_type
+    AND pt.expiry_year = d.expiry_year AND pt.company_id = d.company_id AND pt.product_id = d.product_id
+SET pt.default_premium_total = pt.default_premium_total + IF(NEW.is_default = 1, d.amount, -d.amount),
+    pt.default_coverage_count = pt.default_coverage_count + IF(NEW.is_default = 1, d.cnt, -d.cnt)
+WHERE OLD.is_default <> NEW.is_default""",
+]
+
+# 집계 테이블 재계산 (전체 또는 WHERE 조건으로 지정한 프로필)
+PREMIUM_TOTALS_REBUILD = """INSERT INTO premium_totals
+    (insu_age, sex, product_type, expiry_year, company_id, product_id,
+     premium_total, coverage_count, default_premium_total, default_coverage_count)
+SELECT c.insu_age, c.sex, c.product_type, c.expiry_year, c.company_id, c.product_id,
+    SUM(c.premium_amount), COUNT(*),
+    SUM(IF(cv.is_default = 1, c.premium_amount, 0)), SUM(IF(cv.is_default = 1, 1, 0))
+FROM comparison c
+JOIN coverage cv ON c.coverage_id = cv.coverage_id
+{where}
+GROUP BY c.insu_age, c.sex, c.product_type, c.expiry_year, c.company_id, c.product_id"""
+
+# 배포용 SQLite 파일 스키마 (MySQL 스키마와 같은 테이블/키, InnoDB처럼 기본키로 클러스터링)
+SQLITE_SCHEMA = """CREATE TABLE comparison (
+    custom_name TEXT NOT NULL,
+    insu_age INTEGER NOT NULL,
+    sex INTEGER NOT NULL,
+    product_type TEXT NOT NULL,
+    expiry_year TEXT NOT NULL,
+    company_id TEXT NOT NULL,
+    product_id TEXT NOT NULL,
+    coverage_id TEXT NOT NULL,
+    premium_amount INTEGER NOT NULL,
+    PRIMARY KEY (insu_age, sex, product_type, expiry_year, company_id, product_id, coverage_id)
+) WITHOUT ROWID;
+
+CREATE TABLE coverage (
+    coverage_id TEXT NOT NULL PRIMARY KEY,
+    coverage_name TEXT NOT NULL,
+    default_coverage_amount NUMERIC NOT NULL,
+    is_default INTEGER NOT NULL
+) WITHOUT ROWID;
+
+CREATE TABLE insu_company (
+    company_id TEXT NOT NULL PRIMARY KEY,
+    company_name TEXT NOT NULL,
+    is_default INTEGER NOT NULL
+) WITHOUT ROWID;
+
+CREATE TABLE insu_product (
+    company_id TEXT NOT NULL,
+    product_id TEXT NOT NULL,
+    product_name TEXT NOT NULL,
+    is_default INTEGER NOT NULL,
+    PRIMARY KEY (company_id, product_id)
+) WITHOUT ROWID;
+
+CREATE TABLE premium_totals (
+    insu_age INTEGER NOT NULL,
+    sex INTEGER NOT NULL,
+    product_type TEXT NOT NULL,
+    expiry_year TEXT NOT NULL,
+    company_id TEXT NOT NULL,
+    product_id TEXT NOT NULL,
+    premium_total INTEGER NOT NULL DEFAULT 0,
+    coverage_count INTEGER NOT NULL DEFAULT 0,
+    default_premium_total INTEGER NOT NULL DEFAULT 0,
+    default_coverage_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (insu_age, sex, product_type, expiry_year, company_id, product_id)
+) WITHOUT ROWID;
+
+CREATE TABLE data_version (
+    table_name TEXT NOT NULL PRIMARY KEY,
+    version TEXT NOT NULL
+);"""
+
+# SQLite용 집계 테이블 계산 (IF 대신 CASE 사용)
+SQLITE_PREMIUM_TOTALS_REBUILD = """INSERT INTO premium_totals
+    (insu_age, sex, product_type, expiry_year, company_id, product_id,
+     premium_total, coverage_count, default_premium_total, default_coverage_count)
+SELECT c.insu_age, c.sex, c.product_type, c.expiry_year, c.company_id, c.product_id,
+    SUM(c.premium_amount), COUNT(*),
+    SUM(CASE WHEN cv.is_default = 1 THEN c.premium_amount ELSE 0 END),
+    SUM(CASE WHEN cv.is_default = 1 THEN 1 ELSE 0 END)
+FROM comparison c
+JOIN coverage cv ON c.coverage_id = cv.coverage_id
+GROUP BY c.insu_age, c.sex, c.product_type, c.expiry_year, c.company_id, c.product_id"""
@@ -0,0 +1,450 @@
+"""
+대화 세션 저장소
+
+클라이언트가 매 요청마다 전체 대화 이력(chat_history)을 보내는 대신, 서버가 session_id별로
+최근 메시지 max_history개만 보관한다. 요청에는 새 메시지만 있으면 되므로 대화가 길어져도
+요청 크기와 파싱 시간이 늘지 않는다.
+
+- 메시지는 (역할, 내용, 시각) 튜플로 압축해 보관하고 긴 내용은 max_content_chars에서 자른다.
+- 마지막 대화 후 ttl_seconds가 지난 세션은 백그라운드 스레드가 cleanup_interval마다 삭제한다.
+- SESSION_CONFIG["backend"]로 선택한다.
+  memory: 워커 프로세스별 메모리 (단일 워커)
+  sqlite: 워커 간 공유 파일 (api.serve 다중 워커)
+  redis: Redis 호환 서버 (redis 패키지 필요, 만료는 서버의 EXPIRE 사용)
+"""
+import abc
+import datetime
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Iterable, List
+
+from .config import SESSION_CONFIG
+from .executors import run_in_stage
+from .log import get_logger
+
+logger = get_logger("session_store")
+
+
+def _now_iso() -> str:
+    return datetime.datetime.now().isoformat(timespec="seconds")
+
+
+class SessionStore(abc.ABC):
+    """대화 세션 저장소 공통 인터페이스"""
+
+    name = ""
+
+    def __init__(self, config: dict = None):
+        self.config = config or SESSION_CONFIG
+        self.max_history = self.config["max_history"]
+        self.ttl_seconds = self.config["ttl_seconds"]
+        self.evicted = 0
+        self._cleanup_thread = None
+        self._cleanup_lock = threading.Lock()
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._after_fork_in_child)
+
+    def _after_fork_in_child(self) -> None:
+        # 정리 스레드는 fork 후 자식에 없으므로 다음 append에서 다시 시작 (api.serve 워커)
+        self._cleanup_thread = None
+        self._cleanup_lock = threading.Lock()
+
+    def _compact(self, message) -> tuple:
+        """{"role", "content", "timestamp"} 딕셔너리(또는 pydantic 모델)를 저장용 튜플로 변환"""
+        if not isinstance(message, dict):
+            message = message.model_dump() if hasattr(message, "model_dump") else message.dict()
+        content = message.get("content")
+        if not isinstance(content, str):
+            content = json.dumps(content, ensure_ascii=False, default=str)
+        limit = self.config["max_content_chars"]
+        if len(content) > limit:
+            content = content[:limit]
+        return message.get("role", "user"), content, message.get("timestamp") or _now_iso()
+
+    @staticmethod
+    def _expand(entries: Iterable[tuple]) -> List[dict]:
+        return [
+            {"role": role, "content": content, "timestamp": timestamp}
+            for role, content, timestamp in entries
+        ]
+
+    @abc.abstractmethod
+    def get_history(self, session_id: str) -> List[dict]:
+        """세션의 최근 메시지 목록 (없거나 만료됐으면 빈 목록)"""
+
+    @abc.abstractmethod
+    def append(self, session_id: str, messages: list, seed: list = None) -> List[dict]:
+        """
+        메시지를 추가하고 최근 max_history개로 자른 이력을 반환
+
+        세션에 저장된 이력이 없으면 seed(이전 방식 클라이언트가 보낸 chat_history)를 먼저 넣는다.
+        """
+
+    @abc.abstractmethod
+    def delete(self, session_id: str) -> None:
+        """세션 삭제"""
+
+    def evict_expired(self) -> int:
+        """만료된 세션을 삭제하고 삭제한 수를 반환"""
+        return 0
+
+    @abc.abstractmethod
+    def session_count(self) -> int:
+        """보관 중인 세션 수"""
+
+    async def get_history_async(self, session_id: str) -> List[dict]:
+        return await run_in_stage("db", self.get_history, session_id)
+
+    async def append_async(self, session_id: str, messages: list, seed: list = None) -> List[dict]:
+        return await run_in_stage("db", self.append, session_id, messages, seed)
+
+    def _ensure_cleanup(self) -> None:
+        if self._cleanup_thread is not None or self.config["cleanup_interval"] <= 0:
+            return
+        with self._cleanup_lock:
+            if self._cleanup_thread is None:
+                self._cleanup_thread = threading.Thread(
+                    target=self._cleanup_loop, name="session-cleanup", daemon=True
+                )
+                self._cleanup_thread.start()
+
+    def _cleanup_loop(self) -> None:
+        while True:
+            time.sleep(self.config["cleanup_interval"])
+            try:
+                evicted = self.evict_expired()
+                if evicted:
+                    logger.info("만료 세션 삭제", extra={"evicted": evicted, "backend": self.name})
+            except Exception as e:
+                logger.warning("만료 세션 정리 오류: %s", e)
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.name,
+            "sessions": self.session_count(),
+            "max_history": self.max_history,
+            "ttl_seconds": self.ttl_seconds,
+            "evicted": self.evicted,
+        }
+
+    def close(self) -> None:
+        pass
+
+
+class MemorySessionStore(SessionStore):
+    """
+    워커 프로세스 메모리에 보관하는 세션 저장소
+
+    세션은 마지막 대화 순서(OrderedDict)로 유지하므로 만료/초과 세션은 앞에서부터 꺼내면 된다.
+    """
+
+    name = "memory"
+
+    def __init__(self, config: dict = None):
+        super().__init__(config)
+        # session_id -> [마지막 대화 시각(monotonic), deque((역할, 내용, 시각))]
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _live(self, session_id: str, now: float):
+        entry = self._sessions.get(session_id)
+        if entry is None:
+            return None
+        if now - entry[0] > self.ttl_seconds:
+            del self._sessions[session_id]
+            self.evicted += 1
+            return None
+        return entry
+
+    def get_history(self, session_id: str) -> List[dict]:
+        with self._lock:
+            entry = self._live(session_id, time.monotonic())
+            history = list(entry[1]) if entry is not None else []
+        return self._expand(history)
+
+    def append(self, session_id: str, messages: list, seed: list = None) -> List[dict]:
+        compacted = [self._compact(message) for message in messages]
+        seeded = [self._compact(message) for message in seed[-self.max_history:]] if seed else []
+        now = time.monotonic()
+        with self._lock:
+            entry = self._live(session_id, now)
+            if entry is None:
+                entry = self._sessions[session_id] = [now, deque(seeded, maxlen=self.max_history)]
+                while len(self._sessions) > self.config["max_sessions"]:
+                    self._sessions.popitem(last=False)
+                    self.evicted += 1
+            else:
+                entry[0] = now
+                self._sessions.move_to_end(session_id)
+            entry[1].extend(compacted)
+            history = list(entry[1])
+        self._ensure_cleanup()
+        return self._expand(history)
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def evict_expired(self) -> int:
+        cutoff = time.monotonic() - self.ttl_seconds
+        evicted = 0
+        with self._lock:
+            while self._sessions:
+                session_id, entry = next(iter(self._sessions.items()))
+                if entry[0] > cutoff:
+                    break
+                del self._sessions[session_id]
+                evicted += 1
+            self.evicted += evicted
+        return evicted
+
+    def session_count(self) -> int:
+        return len(self._sessions)
+
+    # 메모리 접근은 스레드 풀을 거치지 않고 이벤트 루프에서 바로 처리
+    async def get_history_async(self, session_id: str) -> List[dict]:
+        return self.get_history(session_id)
+
+    async def append_async(self, session_id: str, messages: list, seed: list = None) -> List[dict]:
+        return self.append(session_id, messages, seed)
+
+
+class SQLiteSessionStore(SessionStore):
+    """api.serve 워커들이 함께 쓰는 SQLite 파일 세션 저장소 (스레드별 커넥션, WAL 모드)"""
+
+    name = "sqlite"
+
+    SCHEMA = """
+CREATE TABLE IF NOT EXISTS chat_session (
+    session_id TEXT PRIMARY KEY,
+    updated_at REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_chat_session_updated_at ON chat_session (updated_at);
+CREATE TABLE IF NOT EXISTS chat_message (
+    session_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    role TEXT NOT NULL,
+    content TEXT NOT NULL,
+    created_at TEXT,
+    PRIMARY KEY (session_id, seq)
+) WITHOUT ROWID;
+"""
+
+    def __init__(self, config: dict = None, path: str = None):
+        super().__init__(config)
+        self.path = path or self.config["sqlite_path"]
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+        self._schema_ready = False
+
+    def _after_fork_in_child(self) -> None:
+        super()._after_fork_in_child()
+        # 부모의 커넥션은 자식에서 쓰지 않고 새로 연다
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            if not self._schema_ready:
+                conn.executescript(self.SCHEMA)
+                self._schema_ready = True
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def get_history(self, session_id: str) -> List[dict]:
+        conn = self._connection()
+        rows = conn.execute(
+            """SELECT m.role, m.content, m.created_at
+FROM chat_session s JOIN chat_message m ON m.session_id = s.session_id
+WHERE s.session_id = ? AND s.updated_at > ?
+ORDER BY m.seq""",
+            (session_id, time.time() - self.ttl_seconds),
+        ).fetchall()
+        return self._expand(rows)
+
+    def append(self, session_id: str, messages: list, seed: list = None) -> List[dict]:
+        compacted = [self._compact(message) for message in messages]
+        now = time.time()
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT updated_at FROM chat_session WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            if row is not None and row[0] <= now - self.ttl_seconds:
+                # 만료됐지만 아직 정리되지 않은 세션은 새 세션으로 시작
+                conn.execute("DELETE FROM chat_message WHERE session_id = ?", (session_id,))
+                row = None
+            if row is None and seed:
+                compacted = [self._compact(message) for message in seed[-self.max_history:]] + compacted
+            last = conn.execute(
+                "SELECT COALESCE(MAX(seq), 0) FROM chat_message WHERE session_id = ?", (session_id,)
+            ).fetchone()[0]
+            conn.executemany(
+                "INSERT INTO chat_message (session_id, seq, role, content, created_at) VALUES (?, ?, ?, ?, ?)",
+                [
+                    (session_id, last + offset, role, content, timestamp)
+                    for offset, (role, content, timestamp) in enumerate(compacted, start=1)
+                ],
+            )
+            conn.execute(
+                "DELETE FROM chat_message WHERE session_id = ? AND seq <= ?",
+                (session_id, last + len(compacted) - self.max_history),
+            )
+            conn.execute(
+                "INSERT INTO chat_session (session_id, updated_at) VALUES (?, ?) "
+                "ON CONFLICT (session_id) DO UPDATE SET updated_at = excluded.updated_at",
+                (session_id, now),
+            )
+            rows = conn.execute(
+                "SELECT role, content, created_at FROM chat_message WHERE session_id = ? ORDER BY seq",
+                (session_id,),
+            ).fetchall()
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        self._ensure_cleanup()
+        return self._expand(rows)
+
+    def delete(self, session_id: str) -> None:
+        conn = self._connection()
+        with conn:
+            conn.execute("DELETE FROM chat_message WHERE session_id = ?", (session_id,))
+            conn.execute("DELETE FROM chat_session WHERE session_id = ?", (session_id,))
+
+    def evict_expired(self) -> int:
+        cutoff = time.time() - self.ttl_seconds
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "DELETE FROM chat_message WHERE session_id IN "
+                "(SELECT session_id FROM chat_session WHERE updated_at <= ?)",
+                (cutoff,),
+            )
+            evicted = conn.execute("DELETE FROM chat_session WHERE updated_at <= ?", (cutoff,)).rowcount
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        self.evicted += evicted
+        return evicted
+
+    def session_count(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM chat_session").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+
+class RedisSessionStore(SessionStore):
+    """
+    Redis 호환 서버(Redis, Valkey, KeyDB 등)의 리스트로 보관하는 세션 저장소
+
+    세션마다 키 하나(리스트)에 메시지를 JSON으로 넣고 LTRIM으로 길이를, EXPIRE로 TTL을 유지한다.
+    만료는 서버가 처리하므로 정리 스레드를 쓰지 않는다.
+    """
+
+    name = "redis"
+
+    def __init__(self, config: dict = None, client=None):
+        super().__init__(config)
+        if client is None:
+            try:
+                import redis
+            except ImportError:
+                raise ImportError(
+                    "SESSION_BACKEND=redis 를 사용하려면 redis 패키지를 설치하세요: pip install redis"
+                )
+            client = redis.Redis.from_url(self.config["redis_url"])
+        self.client = client
+        self.prefix = self.config["redis_prefix"]
+
+    def _key(self, session_id: str) -> str:
+        return self.prefix + session_id
+
+    def _decode(self, values: list) -> List[dict]:
+        return self._expand(tuple(json.loads(value)) for value in values)
+
+    def get_history(self, session_id: str) -> List[dict]:
+        return self._decode(self.client.lrange(self._key(session_id), 0, -1))
+
+    def append(self, session_id: str, messages: list, seed: list = None) -> List[dict]:
+        key = self._key(session_id)
+        encoded = [
+            json.dumps(self._compact(message), ensure_ascii=False) for message in messages
+        ]
+        if seed and not self.client.exists(key):
+            encoded = [
+                json.dumps(self._compact(message), ensure_ascii=False)
+                for message in seed[-self.max_history:]
+            ] + encoded
+        pipe = self.client.pipeline()
+        pipe.rpush(key, *encoded)
+        pipe.ltrim(key, -self.max_history, -1)
+        pipe.expire(key, int(self.ttl_seconds))
+        pipe.lrange(key, 0, -1)
+        values = pipe.execute()[-1]
+        return self._decode(values)
+
+    def delete(self, session_id: str) -> None:
+        self.client.delete(self._key(session_id))
+
+    def session_count(self) -> int:
+        # 키를 훑어 세므로 통계 조회용으로만 사용
+        return sum(1 for _ in self.client.scan_iter(match=self.prefix + "*", count=1000))
+
+    def close(self) -> None:
+        self.client.close()
+
+
+def create_session_store(backend: str = None, config: dict = None) -> SessionStore:
+    backend = backend or SESSION_CONFIG["backend"]
+    if backend == "memory":
+        return MemorySessionStore(config)
+    if backend == "sqlite":
+        return SQLiteSessionStore(config)
+    if backend == "redis":
+        return RedisSessionStore(config)
+    raise ValueError(f"지원하지 않는 세션 저장소입니다: {backend}")
+
+
+_session_store = None
+_session_store_lock = threading.Lock()
+
+
+def get_session_store() -> SessionStore:
+    """워커 프로세스의 세션 저장소 (main.lifespan에서 생성, import 시점에는 파일/연결을 열지 않음)"""
+    global _session_store
+    if _session_store is None:
+        with _session_store_lock:
+            if _session_store is None:
+                _session_store = create_session_store()
+    return _session_store
+
+
+def close_session_store() -> None:
+    global _session_store
+    with _session_store_lock:
+        if _session_store is not None:
+            _session_store.close()
+            _session_store = None
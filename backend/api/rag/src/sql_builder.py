@@ -0,0 +1,201 @@
+"""
+비교설계 SQL 템플릿 빌더
+
+BASE_PROMPT가 허용하는 두 가지 쿼리 형태(보험사/상품별 보험료 합계, 보장항목별 상세
+WITH company_totals/detailed_coverage)를 process_query가 추출한 조건으로 직접 만든다.
+값은 모두 바인딩 파라미터로 전달하고, 형태별 SQL 문장은 한 번만 만들어 캐시한다.
+템플릿 문법을 벗어나는 질문(연령 범위, 특정 보장항목 조회 등)만 LLM으로 SQL을 생성한다.
+"""
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional, Tuple
+
+from .config import COMPANY_REGISTRY, AGGREGATE_CONFIG
+from .matcher import match_question, normalize_text
+
+TOTALS_SHAPE = "totals"
+DETAILED_SHAPE = "detailed"
+
+# 상세(보장항목별) 형태를 요구하는 키워드
+DETAILED_KEYWORDS = ["보장항목별", "상세"]
+# 기본플랜 (coverage.is_default = 1)
+DEFAULT_PLAN_KEYWORDS = ["기본플랜"]
+# 템플릿으로 표현할 수 없는 조건 (연령 범위, 보장항목 필터 등) -> LLM 사용
+UNSUPPORTED_KEYWORDS = [
+    "~", "부터", "사이", "이상", "이하", "미만", "초과", "세대",
+    "진단비", "수술비", "입원", "통원", "유사암", "일당", "후유장해",
+]
+
+
+def company_keyword(company: str) -> str:
+    """보험사명 부분 일치 검색어 (SQL과 큐브 모두 소문자로 비교)"""
+    return COMPANY_REGISTRY[company]["db_keyword"].lower()
+
+
+@dataclass(frozen=True)
+class CompareQuery:
+    shape: str
+    insu_age: int
+    sex: int
+    product_type: str
+    expiry_year: str
+    companies: Tuple[str, ...] = ()
+    default_only: bool = False
+
+    def params(self) -> tuple:
+        """WHERE 절 순서대로 나열한 바인딩 파라미터 (한 번의 필터링 분량)"""
+        params = [self.insu_age, self.sex, self.product_type, self.expiry_year]
+        params.extend(f"%{company_keyword(company)}%" for company in self.companies)
+        return tuple(params)
+
+
+def build_compare_query(prompt: str, config: dict) -> Optional[CompareQuery]:
+    """질문이 템플릿 문법 안에 있으면 CompareQuery, 아니면 None (LLM 사용)"""
+    normalized = normalize_text(prompt)
+    if any(keyword in normalized for keyword in UNSUPPORTED_KEYWORDS):
+        return None
+    if config.get("product_type") not in ("nr", "r"):
+        return None
+
+    shape = (
+        DETAILED_SHAPE
+        if any(keyword in normalized for keyword in DETAILED_KEYWORDS)
+        else TOTALS_SHAPE
+    )
+    return CompareQuery(
+        shape=shape,
+        insu_age=int(config["insu_age"]),
+        sex=int(config["sex"]),
+        product_type=config["product_type"],
+        expiry_year=config["expiry_year"],
+        companies=tuple(match_question(prompt).companies),
+        default_only=any(keyword in normalized for keyword in DEFAULT_PLAN_KEYWORDS),
+    )
+
+
+def _where_clause(
+    company_count: int, default_only: bool, placeholder: str, alias: str = "c"
+) -> str:
+    conditions = [
+        f"{alias}.insu_age = {placeholder}",
+        f"{alias}.sex = {placeholder}",
+        f"{alias}.product_type = {placeholder}",
+        f"{alias}.expiry_year = {placeholder}",
+    ]
+    if company_count:
+        conditions.append(
+            "("
+            + " OR ".join([f"LOWER(ic.company_name) LIKE {placeholder}"] * company_count)
+            + ")"
+        )
+    if default_only:
+        conditions.append("cv.is_default = 1")
+    return "\n    AND ".join(conditions)
+
+
+def _aggregate_columns(default_only: bool) -> Tuple[str, str]:
+    """premium_totals에서 읽을 (합계 컬럼, 행 수 컬럼)"""
+    if default_only:
+        return "pt.default_premium_total", "pt.default_coverage_count"
+    return "pt.premium_total", "pt.coverage_count"
+
+
+@lru_cache(maxsize=64)
+def _sql_template(
+    shape: str,
+    company_count: int,
+    default_only: bool,
+    placeholder: str,
+    use_aggregates: bool = False,
+) -> str:
+    where = _where_clause(company_count, default_only, placeholder)
+
+    if use_aggregates:
+        # 기본플랜 조건은 집계 컬럼 선택으로 대신함
+        aggregate_where = _where_clause(company_count, False, placeholder, alias="pt")
+        total_column, count_column = _aggregate_columns(default_only)
+
+    if shape == TOTALS_SHAPE and use_aggregates:
+        return f"""SELECT
+    ic.company_name AS 보험사명,
+    ip.product_name AS 상품명,
+    ROUND({total_column}) AS 보험료합계
+FROM premium_totals pt
+JOIN insu_company ic ON pt.company_id = ic.company_id
+JOIN insu_product ip ON pt.company_id = ip.company_id AND pt.product_id = ip.product_id
+WHERE {aggregate_where}
+    AND {count_column} > 0
+ORDER BY ic.company_name, ip.product_name"""
+
+    if shape == TOTALS_SHAPE:
+        return f"""SELECT
+    ic.company_name AS 보험사명,
+    ip.product_name AS 상품명,
+    ROUND(SUM(c.premium_amount)) AS 보험료합계
+FROM comparison c
+JOIN insu_company ic ON c.company_id = ic.company_id
+JOIN insu_product ip ON c.company_id = ip.company_id AND c.product_id = ip.product_id
+JOIN coverage cv ON c.coverage_id = cv.coverage_id
+WHERE {where}
+GROUP BY ic.company_name, ip.product_name
+ORDER BY ic.company_name, ip.product_name"""
+
+    if use_aggregates:
+        company_totals = f"""SELECT
+        ic.company_name AS 보험사명,
+        ROUND(SUM({total_column})) AS 보험료합계
+    FROM premium_totals pt
+    JOIN insu_company ic ON pt.company_id = ic.company_id
+    WHERE {aggregate_where}
+        AND {count_column} > 0
+    GROUP BY ic.company_name"""
+    else:
+        company_totals = f"""SELECT
+        ic.company_name AS 보험사명,
+        ROUND(SUM(c.premium_amount)) AS 보험료합계
+    FROM comparison c
+    JOIN insu_company ic ON c.company_id = ic.company_id
+    JOIN coverage cv ON c.coverage_id = cv.coverage_id
+    WHERE {where}
+    GROUP BY ic.company_name"""
+
+    return f"""WITH company_totals AS (
+    {company_totals}
+),
+detailed_coverage AS (
+    SELECT DISTINCT
+        ic.company_name AS 보험사명,
+        ip.product_name AS 상품명,
+        cv.coverage_name AS 보장항목명,
+        c.premium_amount AS 보험료,
+        cv.coverage_id AS sort_id
+    FROM comparison c
+    JOIN insu_company ic ON c.company_id = ic.company_id
+    JOIN insu_product ip ON c.company_id = ip.company_id AND c.product_id = ip.product_id
+    JOIN coverage cv ON c.coverage_id = cv.coverage_id
+    WHERE {where}
+)
+SELECT * FROM (
+    SELECT '합계' AS 구분, ct.보험사명, NULL AS 상품명, NULL AS 보장항목명, ct.보험료합계 AS 보험료, '0' AS sort_id
+    FROM company_totals ct
+    UNION ALL
+    SELECT '상세' AS 구분, dc.보험사명, dc.상품명, dc.보장항목명, dc.보험료, dc.sort_id
+    FROM detailed_coverage dc
+) result
+ORDER BY 보험사명, 구분 DESC, 상품명, sort_id"""
+
+
+def render_sql(
+    query: CompareQuery, placeholder: str = "%s", use_aggregates: bool = None
+) -> Tuple[str, tuple]:
+    """CompareQuery -> (SQL 문장, 바인딩 파라미터). 합계는 설정에 따라 premium_totals에서 읽음"""
+    if use_aggregates is None:
+        use_aggregates = AGGREGATE_CONFIG["enabled"]
+    sql = _sql_template(
+        query.shape, len(query.companies), query.default_only, placeholder, use_aggregates
+    )
+    params = query.params()
+    if query.shape == DETAILED_SHAPE:
+        # company_totals, detailed_coverage 두 CTE에 같은 조건이 들어감
+        params = params + params
+    return sql, params
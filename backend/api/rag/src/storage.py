@@ -0,0 +1,319 @@
+"""
+비교설계 저장소 백엔드
+
+비교설계 조회(SQL 실행, 대량 읽기, 데이터 버전 확인)를 MySQL 또는 내장 SQLite 파일로 처리한다.
+SQLite 파일은 MySQL과 같은 스키마를 가지며 vector_db와 함께 배포되어 DB 서버 없이
+읽기 전용(mode=ro), 메모리 매핑(mmap_size)으로 열린다. 내보내기는 버전별 파일을 롤백 저널
+모드로 만들고 설정 경로의 심볼릭 링크를 교체하며, 읽는 쪽은 링크가 바뀌면 새 커넥션을 연다.
+STORAGE_CONFIG["backend"]로 선택하고, 템플릿 SQL의 바인딩 기호는 backend.placeholder를 사용한다.
+
+SQLite 파일 생성: backend 디렉토리에서
+    python -m api.rag.src.storage export [경로]
+"""
+import abc
+import argparse
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from decimal import Decimal
+from typing import Optional
+
+from .config import STORAGE_CONFIG
+from .db import db, get_data_version
+from .executors import run_in_stage
+from .log import configure
+from .schema import SQLITE_SCHEMA, SQLITE_PREMIUM_TOTALS_REBUILD
+
+SQLITE_TABLES = {
+    "insu_company": ("company_id", "company_name", "is_default"),
+    "insu_product": ("company_id", "product_id", "product_name", "is_default"),
+    "coverage": ("coverage_id", "coverage_name", "default_coverage_amount", "is_default"),
+    "comparison": (
+        "custom_name", "insu_age", "sex", "product_type", "expiry_year",
+        "company_id", "product_id", "coverage_id", "premium_amount",
+    ),
+}
+
+
+class StorageBackend(abc.ABC):
+    """비교설계 조회 저장소 공통 인터페이스"""
+
+    name = ""
+    # 템플릿 SQL 바인딩 기호 (sql_builder.render_sql)
+    placeholder = "%s"
+
+    @abc.abstractmethod
+    def execute(self, sql: str, params=None, timeout_ms: int = None) -> list:
+        """쿼리를 실행하고 결과 행을 딕셔너리 목록으로 반환"""
+
+    async def execute_async(self, sql: str, params=None, timeout_ms: int = None) -> list:
+        return await run_in_stage("db", self.execute, sql, params, timeout_ms)
+
+    @abc.abstractmethod
+    def stream(self, sql: str, params=None, batch_size: int = 50000, timeout_ms: int = None):
+        """큰 결과를 batch_size 행(튜플) 단위로 나눠 반환"""
+
+    @abc.abstractmethod
+    def data_version(self) -> Optional[str]:
+        """요금 데이터 버전 스탬프 (확인할 수 없으면 None -> 버전 기반 재사용 안 함)"""
+
+    def close(self) -> None:
+        pass
+
+
+class MySQLBackend(StorageBackend):
+    name = "mysql"
+    placeholder = "%s"
+
+    def __init__(self, manager=None):
+        self.manager = manager or db
+
+    def execute(self, sql: str, params=None, timeout_ms: int = None) -> list:
+        return self.manager.execute(sql, params, timeout_ms)
+
+    async def execute_async(self, sql: str, params=None, timeout_ms: int = None) -> list:
+        return await self.manager.execute_async(sql, params, timeout_ms)
+
+    def stream(self, sql: str, params=None, batch_size: int = 50000, timeout_ms: int = None):
+        return self.manager.stream(sql, params, batch_size, timeout_ms)
+
+    def data_version(self) -> Optional[str]:
+        return get_data_version()
+
+    def close(self) -> None:
+        self.manager.close()
+
+
+class SQLiteBackend(StorageBackend):
+    """스레드별 커넥션을 사용하는 내장 SQLite 저장소"""
+
+    name = "sqlite"
+    placeholder = "?"
+
+    def __init__(
+        self,
+        path: str = None,
+        read_only: bool = None,
+        immutable: bool = None,
+        mmap_size: int = None,
+    ):
+        self.path = path or STORAGE_CONFIG["sqlite_path"]
+        self.read_only = STORAGE_CONFIG["sqlite_read_only"] if read_only is None else read_only
+        self.immutable = STORAGE_CONFIG["sqlite_immutable"] if immutable is None else immutable
+        self.mmap_size = STORAGE_CONFIG["sqlite_mmap_size"] if mmap_size is None else mmap_size
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+        # 커넥션을 연 파일 (내보내기가 심볼릭 링크를 바꾸면 세대를 올려 스레드별 커넥션을 다시 엶)
+        self._target = None
+        self._generation = 0
+        self._target_checked_at = 0.0
+
+    def _check_target(self) -> None:
+        now = time.monotonic()
+        if now - self._target_checked_at < STORAGE_CONFIG["sqlite_reopen_check_seconds"]:
+            return
+        self._target_checked_at = now
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return
+        target = (stat.st_dev, stat.st_ino)
+        with self._lock:
+            if self._target is not None and target != self._target:
+                self._generation += 1
+            self._target = target
+
+    def _uri(self) -> str:
+        options = []
+        if self.read_only:
+            options.append("mode=ro")
+        if self.immutable:
+            options.append("immutable=1")
+        path = os.path.abspath(self.path).replace("\\", "/")
+        return f"file:{path}" + ("?" + "&".join(options) if options else "")
+
+    def _connection(self) -> sqlite3.Connection:
+        self._check_target()
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.generation != self._generation:
+            # 이전 파일의 커넥션은 닫고 새 파일로 다시 연결
+            with self._lock:
+                self._connections.remove(conn)
+            conn.close()
+            conn = None
+        if conn is None:
+            if not os.path.exists(self.path):
+                raise FileNotFoundError(
+                    f"SQLite 파일이 없습니다: {self.path} (python -m api.rag.src.storage export 로 생성)"
+                )
+            conn = sqlite3.connect(self._uri(), uri=True, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute(f"PRAGMA mmap_size = {int(self.mmap_size)}")
+            if self.read_only:
+                conn.execute("PRAGMA query_only = 1")
+            self._local.conn = conn
+            with self._lock:
+                self._local.generation = self._generation
+                self._connections.append(conn)
+        return conn
+
+    @staticmethod
+    def _set_deadline(conn: sqlite3.Connection, timeout_ms: int) -> None:
+        """실행 시간 제한 (MySQL max_execution_time 대응, 0/None이면 제한 없음)"""
+        if not timeout_ms:
+            conn.set_progress_handler(None, 0)
+            return
+        deadline = time.monotonic() + timeout_ms / 1000
+        conn.set_progress_handler(lambda: time.monotonic() > deadline, 10000)
+
+    def execute(self, sql: str, params=None, timeout_ms: int = None) -> list:
+        conn = self._connection()
+        self._set_deadline(conn, timeout_ms)
+        cursor = conn.execute(sql, params or ())
+        try:
+            return [dict(row) for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+
+    def stream(self, sql: str, params=None, batch_size: int = 50000, timeout_ms: int = None):
+        conn = self._connection()
+        self._set_deadline(conn, timeout_ms)
+        cursor = conn.execute(sql, params or ())
+        try:
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield [tuple(row) for row in rows]
+        finally:
+            cursor.close()
+
+    def data_version(self) -> Optional[str]:
+        # 버전 행이 없는 파일은 파일 변경 시각 사용 (내보내기는 항상 새 파일로 교체)
+        # 파일이나 링크 대상이 없으면 버전을 알 수 없으므로 None
+        try:
+            rows = self.execute(
+                "SELECT version FROM data_version WHERE table_name = ?", ("comparison",)
+            )
+            if rows:
+                return str(rows[0]["version"])
+        except sqlite3.Error:
+            pass
+        except OSError:
+            return None
+        try:
+            return f"sqlite:{os.path.getmtime(self.path)}"
+        except OSError:
+            return None
+
+    def close(self) -> None:
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+
+def create_storage(backend: str = None) -> StorageBackend:
+    backend = backend or STORAGE_CONFIG["backend"]
+    if backend == "sqlite":
+        return SQLiteBackend()
+    if backend == "mysql":
+        return MySQLBackend()
+    raise ValueError(f"지원하지 않는 저장소입니다: {backend}")
+
+
+storage = create_storage()
+
+
+def _switch_link(path: str, target: str, keep: int) -> None:
+    """path를 target을 가리키는 심볼릭 링크로 원자적으로 교체하고 오래된 버전 파일 정리"""
+    link_path = path + ".link"
+    if os.path.lexists(link_path):
+        os.remove(link_path)
+    os.symlink(os.path.basename(target), link_path)
+    os.replace(link_path, path)
+
+    # 읽고 있는 프로세스는 삭제된 파일도 닫을 때까지 계속 읽을 수 있음
+    directory, base = os.path.split(path)
+    pattern = re.compile(re.escape(base) + r"\.v\d+")
+    versions = sorted(name for name in os.listdir(directory or ".") if pattern.fullmatch(name))
+    for name in versions[:-max(keep, 1)]:
+        for suffix in ("", "-journal", "-wal", "-shm"):
+            stale = os.path.join(directory, name + suffix)
+            if os.path.exists(stale):
+                os.remove(stale)
+
+
+def export_sqlite_from_mysql(path: str = None, batch_size: int = 50000, keep: int = 2) -> str:
+    """
+    MySQL 비교설계 테이블을 배포용 SQLite 파일로 내보냄
+
+    버전별 파일(path.v<시각>)에 롤백 저널(DELETE) 모드로 쓰고 path 심볼릭 링크를 교체한다.
+    열린 커넥션은 이전 파일을 그대로 읽으며, 같은 경로의 파일을 덮어쓰지 않으므로 새 파일이
+    이전 파일의 -wal/-shm과 짝지어지는 일이 없다. 버전 파일은 최근 keep개만 남긴다.
+    """
+    path = path or STORAGE_CONFIG["sqlite_path"]
+    target = f"{path}.v{datetime.now().strftime('%Y%m%d%H%M%S%f')}"
+    temp_path = target + ".tmp"
+    for stale in (temp_path, temp_path + "-journal"):
+        if os.path.exists(stale):
+            os.remove(stale)
+
+    started_at = time.perf_counter()
+    conn = sqlite3.connect(temp_path)
+    try:
+        conn.execute("PRAGMA journal_mode = DELETE")
+        conn.execute("PRAGMA synchronous = OFF")
+        conn.executescript(SQLITE_SCHEMA)
+
+        for table, columns in SQLITE_TABLES.items():
+            insert = (
+                f"INSERT INTO {table} ({', '.join(columns)}) "
+                f"VALUES ({', '.join(['?'] * len(columns))})"
+            )
+            copied = 0
+            for rows in db.stream(
+                f"SELECT {', '.join(columns)} FROM {table}", batch_size=batch_size, timeout_ms=0
+            ):
+                conn.executemany(insert, [
+                    tuple(float(value) if isinstance(value, Decimal) else value for value in row)
+                    for row in rows
+                ])
+                copied += len(rows)
+            conn.commit()
+            print(f"{table}: {copied:,}행 복사")
+
+        conn.execute(SQLITE_PREMIUM_TOTALS_REBUILD)
+        version = get_data_version()
+        if version is not None:
+            conn.execute(
+                "INSERT INTO data_version (table_name, version) VALUES ('comparison', ?)",
+                (version,),
+            )
+        conn.commit()
+        conn.execute("ANALYZE")
+    finally:
+        conn.close()
+
+    os.replace(temp_path, target)
+    _switch_link(path, target, keep)
+    print(f"SQLite 내보내기 완료: {path} -> {target} ({time.perf_counter() - started_at:.1f}초)")
+    return target
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="비교설계 저장소 관리")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    export_parser = subparsers.add_parser("export", help="MySQL -> SQLite 파일 내보내기")
+    export_parser.add_argument("path", nargs="?", default=None)
+    export_parser.add_argument("--batch-size", type=int, default=50000)
+    export_parser.add_argument("--keep", type=int, default=2, help="남길 버전 파일 수")
+    args = parser.parse_args()
+    configure()
+    if args.command == "export":
+        export_sqlite_from_mysql(args.path, batch_size=args.batch_size, keep=args.keep)
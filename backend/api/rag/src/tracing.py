@@ -0,0 +1,292 @@
+"""
+LangSmith 트레이싱 파사드
+
+langsmith.trace(...) 대신 get_tracer().trace(...)를 사용한다. 사용법은 같다:
+
+    with get_tracer().trace("vector_search", tags=[...], metadata={...}) as run:
+        ...
+        if run:
+            run.add_metadata({...})
+
+- 트레이싱이 꺼져 있으면(API 키 없음) 공유 no-op 객체를 반환하고 run은 None이다.
+- 샘플링은 루트 span에서 한 번 정한다(head-based). 선택되지 않은 요청의 하위 span도 모두 no-op.
+- 끝난 span은 크기가 제한된 큐에 넣기만 하고, 백그라운드 스레드가 모아서 batch_ingest_runs로 전송한다.
+  큐가 가득 차거나 전송이 실패해도 요청 스레드는 기다리지 않는다 (stats()의 dropped/failed).
+- 메타데이터의 긴 문자열(질문 전문)과 목록(컬렉션 목록)은 전송 전에 잘라낸다.
+"""
+import atexit
+import contextvars
+import datetime
+import os
+import queue
+import random
+import threading
+import time
+import uuid
+
+from .config import TRACING_CONFIG
+from .log import get_logger
+
+logger = get_logger("tracing")
+
+
+class _NoopSpan:
+    """트레이싱이 꺼져 있을 때 반환하는 공유 객체 (with ... as run: run은 None)"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return None
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP = _NoopSpan()
+# 샘플링되지 않은 요청 표시 (하위 span도 no-op)
+_UNSAMPLED = object()
+_current_span = contextvars.ContextVar("trace_span", default=None)
+
+
+class _UnsampledRoot:
+    __slots__ = ("_token",)
+
+    def __enter__(self):
+        self._token = _current_span.set(_UNSAMPLED)
+        return None
+
+    def __exit__(self, exc_type, exc, tb):
+        _current_span.reset(self._token)
+        return False
+
+
+def _utcnow() -> datetime.datetime:
+    return datetime.datetime.now(datetime.timezone.utc)
+
+
+class Span:
+    """샘플링된 span 하나 (LangSmith run)"""
+
+    __slots__ = (
+        "exporter", "id", "trace_id", "parent_id", "dotted_order", "name", "run_type",
+        "tags", "metadata", "inputs", "outputs", "error", "start_time", "end_time", "_token",
+    )
+
+    def __init__(self, exporter, name, run_type, tags, metadata, inputs, parent):
+        self.exporter = exporter
+        self.id = uuid.uuid4()
+        self.start_time = _utcnow()
+        self.name = name
+        self.run_type = run_type
+        self.tags = list(tags) if tags else []
+        self.metadata = dict(metadata) if metadata else {}
+        self.inputs = inputs
+        self.outputs = None
+        self.error = None
+        self.end_time = None
+        order = f"{self.start_time:%Y%m%dT%H%M%S%fZ}{self.id}"
+        if parent is None:
+            self.trace_id = self.id
+            self.parent_id = None
+            self.dotted_order = order
+        else:
+            self.trace_id = parent.trace_id
+            self.parent_id = parent.id
+            self.dotted_order = f"{parent.dotted_order}.{order}"
+
+    def add_metadata(self, metadata: dict) -> None:
+        self.metadata.update(metadata)
+
+    def set_outputs(self, outputs: dict) -> None:
+        self.outputs = outputs
+
+    def __enter__(self):
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _current_span.reset(self._token)
+        if exc is not None:
+            self.error = f"{exc_type.__name__}: {exc}"
+        self.end_time = _utcnow()
+        self.exporter.submit(self)
+        return False
+
+
+def _compact(value, config: dict, depth: int = 0):
+    """전송할 메타데이터 크기 제한"""
+    if isinstance(value, str):
+        limit = config["max_value_chars"]
+        return value if len(value) <= limit else value[:limit] + f"... ({len(value)}자)"
+    if isinstance(value, (list, tuple, set)):
+        items = list(value)
+        limit = config["max_list_items"]
+        compacted = [_compact(item, config, depth + 1) for item in items[:limit]]
+        if len(items) > limit:
+            compacted.append(f"... (+{len(items) - limit})")
+        return compacted
+    if isinstance(value, dict):
+        if depth > 3:
+            return str(value)[: config["max_value_chars"]]
+        return {str(key): _compact(item, config, depth + 1) for key, item in value.items()}
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    return _compact(str(value), config, depth)
+
+
+class TraceExporter:
+    """끝난 span을 모아 백그라운드 스레드에서 전송"""
+
+    def __init__(self, config: dict = None, sender=None):
+        self.config = config or TRACING_CONFIG
+        # sender(runs): 실행 기록 목록 전송 (기본: LangSmith batch_ingest_runs)
+        self.sender = sender or self._send_to_langsmith
+        self._queue = queue.Queue(self.config["queue_size"])
+        self._thread = None
+        self._lock = threading.Lock()
+        self._client = None
+        self.exported = 0
+        self.dropped = 0
+        self.failed = 0
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._after_fork_in_child)
+
+    def _after_fork_in_child(self) -> None:
+        # 전송 스레드는 fork 후 자식에 없으므로 다음 submit에서 다시 시작 (api.serve 워커)
+        self._queue = queue.Queue(self.config["queue_size"])
+        self._thread = None
+        self._lock = threading.Lock()
+        self._client = None
+
+    def submit(self, span: Span) -> None:
+        if self._thread is None:
+            self._start()
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="trace-exporter", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self) -> None:
+        batch_size = self.config["batch_size"]
+        flush_interval = self.config["flush_interval"]
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + flush_interval
+            while len(batch) < batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._export(batch)
+            for _ in batch:
+                self._queue.task_done()
+
+    def _export(self, spans: list) -> None:
+        try:
+            self.sender([self._to_run(span) for span in spans])
+            self.exported += len(spans)
+        except Exception as e:
+            self.failed += len(spans)
+            logger.warning("트레이스 전송 오류: %s", e)
+
+    def _to_run(self, span: Span) -> dict:
+        return {
+            "id": str(span.id),
+            "trace_id": str(span.trace_id),
+            "parent_run_id": str(span.parent_id) if span.parent_id else None,
+            "dotted_order": span.dotted_order,
+            "name": span.name,
+            "run_type": span.run_type,
+            "start_time": span.start_time,
+            "end_time": span.end_time,
+            "inputs": _compact(span.inputs or {}, self.config),
+            "outputs": _compact(span.outputs or {}, self.config),
+            "extra": {"metadata": _compact(span.metadata, self.config)},
+            "tags": span.tags,
+            "error": span.error,
+            "session_name": self.config["project"],
+        }
+
+    def _send_to_langsmith(self, runs: list) -> None:
+        if self._client is None:
+            from langsmith import Client
+
+            # SDK 자체 자동 배치 스레드는 사용하지 않음 (이 스레드에서 직접 전송)
+            self._client = Client(
+                api_url=self.config["endpoint"],
+                api_key=self.config["api_key"],
+                auto_batch_tracing=False,
+            )
+        self._client.batch_ingest_runs(create=runs)
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """큐에 쌓인 span이 전송될 때까지 최대 timeout초 대기"""
+        if self._thread is None:
+            return True
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if time.monotonic() > deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def stats(self) -> dict:
+        return {
+            "queued": self._queue.qsize(),
+            "exported": self.exported,
+            "dropped": self.dropped,
+            "failed": self.failed,
+        }
+
+
+class Tracer:
+    def __init__(self, config: dict = None, exporter: TraceExporter = None):
+        self.config = config or TRACING_CONFIG
+        self.enabled = self.config["enabled"]
+        self.sample_rate = self.config["sample_rate"]
+        self.exporter = exporter or TraceExporter(self.config)
+
+    def trace(self, name: str, run_type: str = "chain", tags=None, metadata=None, inputs=None):
+        """span 컨텍스트 매니저. 꺼져 있거나 샘플링되지 않으면 run은 None"""
+        if not self.enabled:
+            return _NOOP
+        parent = _current_span.get()
+        if parent is _UNSAMPLED:
+            return _NOOP
+        if parent is None and random.random() >= self.sample_rate:
+            return _UnsampledRoot()
+        return Span(self.exporter, name, run_type, tags, metadata, inputs, parent)
+
+    def stats(self) -> dict:
+        return {"enabled": self.enabled, "sample_rate": self.sample_rate, **self.exporter.stats()}
+
+
+_tracer = None
+_tracer_lock = threading.Lock()
+
+
+def get_tracer() -> Tracer:
+    """워커 프로세스의 tracer (main.lifespan에서 생성, import 시점에는 전송 스레드/fork 훅을 만들지 않음)"""
+    global _tracer
+    if _tracer is None:
+        with _tracer_lock:
+            if _tracer is None:
+                _tracer = Tracer()
+    return _tracer
+
+
+@atexit.register
+def _flush_at_exit() -> None:
+    if _tracer is not None and _tracer.enabled:
+        _tracer.exporter.flush(timeout=2.0)
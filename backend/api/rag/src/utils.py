@@ -1,49 +1,76 @@
 import re
-import mysql.connector
-import openai
+import threading
 import simplejson as json
 from .schema import DB_SCHEMA
 from .config import DEFAULT_CONFIG, DB_CONFIG
+from .storage import storage
+from .executors import run_in_stage
+from .log import get_logger
+from .metrics import stage_timer, timed
+from .formatter import format_compare_json
+from .result_cache import result_cache
 from .prompts import BASE_PROMPT, EXAMPLE_PROMPT, INTENT_PROMPT
 
-client = openai.OpenAI()
+logger = get_logger("utils")
 
+_client = None
+_client_lock = threading.Lock()
 
-def process_query(prompt: str, config):
-    # 현재 사용되는 설정값 저장
-    current_config = config.copy()
+
+def get_openai_client():
+    """공유 OpenAI 클라이언트 (처음 호출할 때 openai를 import 하고 생성, 서버는 lifespan에서 미리 생성)"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                import openai
+
+                _client = openai.OpenAI()
+    return _client
+
+
+def extract_query_slots(prompt: str) -> dict:
+    """질문에서 명시된 비교설계 조건(나이, 성별, 상품유형, 보험기간, 보험사)만 추출"""
+    slots = {}
 
     # 나이 추출 (숫자 + "세" 패턴)
     age_match = re.search(r"(\d+)세", prompt)
     if age_match:
-        current_config["insu_age"] = int(age_match.group(1))
+        slots["insu_age"] = int(age_match.group(1))
 
     # 성별 추출
     if "남성" in prompt or "남자" in prompt:
-        current_config["sex"] = 1
+        slots["sex"] = 1
     elif "여성" in prompt or "여자" in prompt:
-        current_config["sex"] = 0
+        slots["sex"] = 0
 
     # 상품유형 추출
     if "무해지" in prompt:
-        current_config["product_type"] = "nr"
+        slots["product_type"] = "nr"
     elif "해지환급" in prompt:
-        current_config["product_type"] = "r"
+        slots["product_type"] = "r"
 
     # 보험기간 추출
     period_match = re.search(r"(\d+)년[/\s](\d+)세", prompt)
     if period_match:
         years = period_match.group(1)
         age = period_match.group(2)
-        current_config["expiry_year"] = f"{years}y_{age}"
+        slots["expiry_year"] = f"{years}y_{age}"
 
     # 보험사 추출 (옵션)
     if "삼성" in prompt:
-        current_config["company_id"] = "01"
+        slots["company_id"] = "01"
     elif "한화" in prompt:
-        current_config["company_id"] = "02"
+        slots["company_id"] = "02"
     # 다른 보험사들에 대한 매핑도 추가 가능
 
+    return slots
+
+
+def process_query(prompt: str, config):
+    # 현재 사용되는 설정값 저장
+    current_config = config.copy()
+    current_config.update(extract_query_slots(prompt))
     return prompt, current_config
 
 
@@ -54,7 +81,7 @@ def convert_sql_to_json_format(generate_json_data, EXAMPLE_PROMPT) -> str:
     )
 
     prompt = EXAMPLE_PROMPT + converter_json_data
-    response = client.chat.completions.create(
+    response = get_openai_client().chat.completions.create(
         model="gpt-4-0125-preview",
         messages=[
             {
@@ -71,35 +98,103 @@ def convert_sql_to_json_format(generate_json_data, EXAMPLE_PROMPT) -> str:
     return json_str
 
 
-def execute_sql_query(generated_sql: str, used_config: dict) -> str:
-    conn = mysql.connector.connect(**DB_CONFIG)
-    cursor = conn.cursor(dictionary=True)
+def _format_locally(results: list, generated_sql: str, used_config: dict):
+    """-> (로컬 변환 결과, LLM 변환 입력). 로컬에서 변환할 수 없으면 결과가 None"""
+    logger.debug("비교설계 검색 결과 수: %d개", len(results))
 
-    # 쿼리 실행
-    cursor.execute(generated_sql)
-    results = cursor.fetchall()
-
-    print("\n[검색 결과]")
-    if results:
-        print(f"전체 결과 수: {len(results)}개")
+    # 결과를 그대로 저장 (JSON 변환 없이)
+    temp_data = {
+        "설정값": used_config,
+        "쿼리": generated_sql,
+        "결과": [dict(row) for row in results],  # SQL 결과를 그대로 딕셔너리로 변환
+    }
+    # 알려진 두 결과 형식은 로컬에서 변환, 그 외(LLM이 만든 SQL 결과)만 LLM 변환
+    return format_compare_json(temp_data["결과"], used_config), temp_data
 
-        # 결과를 그대로 저장 (JSON 변환 없이)
-        temp_data = {
-            "설정값": used_config,
-            "쿼리": generated_sql,
-            "결과": [dict(row) for row in results],  # SQL 결과를 그대로 딕셔너리로 변환
-        }
 
-        json_result = convert_sql_to_json_format(temp_data, EXAMPLE_PROMPT)
+@timed("format")
+def format_query_results(results: list, generated_sql: str, used_config: dict):
+    if results:
+        json_result, temp_data = _format_locally(results, generated_sql, used_config)
+        if json_result is None:
+            json_result = convert_sql_to_json_format(temp_data, EXAMPLE_PROMPT)
         return json_result
     else:
-        print("검색 결과가 없습니다.")
+        logger.info("비교설계 검색 결과가 없습니다.")
 
-    cursor.close()
-    conn.close()
     return results
 
 
+async def format_query_results_async(results: list, generated_sql: str, used_config: dict):
+    """format_query_results의 비동기 버전 (로컬 변환은 바로 하고, LLM 변환만 llm 단계 스레드 풀에서 실행)"""
+    if not results:
+        logger.info("비교설계 검색 결과가 없습니다.")
+        return results
+    with stage_timer("format"):
+        json_result, temp_data = _format_locally(results, generated_sql, used_config)
+    if json_result is None:
+        json_result = await run_in_stage(
+            "llm", timed("format")(convert_sql_to_json_format), temp_data, EXAMPLE_PROMPT
+        )
+    return json_result
+
+
+def _lookup_cached(generated_sql: str, used_config: dict, params):
+    """결과 캐시 조회 -> (데이터 버전, 변환 결과, SQL 결과 행). 없는 항목은 None"""
+    if not result_cache.enabled:
+        return None, None, None
+    # 버전은 쿼리 전에 한 번만 읽고 저장할 때도 같은 값을 사용
+    version = result_cache.current_version()
+    if version is None:
+        return None, None, None
+    formatted = result_cache.get_formatted(version, generated_sql, params, used_config)
+    if formatted is not None:
+        logger.debug("[결과 캐시 적중] 변환된 결과 사용")
+        return version, formatted, None
+    return version, None, result_cache.get_rows(version, generated_sql, params)
+
+
+def _store_cached(results: list, generated_sql: str, used_config: dict, params, version, rows_cached: bool, formatted):
+    if version is not None:
+        if not rows_cached:
+            result_cache.put_rows(version, generated_sql, params, results)
+        result_cache.put_formatted(version, generated_sql, params, used_config, formatted)
+
+
+def _format_and_cache(results: list, generated_sql: str, used_config: dict, params, version, rows_cached: bool):
+    formatted = format_query_results(results, generated_sql, used_config)
+    _store_cached(results, generated_sql, used_config, params, version, rows_cached, formatted)
+    return formatted
+
+
+def execute_sql_query(generated_sql: str, used_config: dict, params=None) -> str:
+    version, formatted, results = _lookup_cached(generated_sql, used_config, params)
+    if formatted is not None:
+        return formatted
+    rows_cached = results is not None
+    if not rows_cached:
+        # 설정된 저장소(MySQL 풀 또는 내장 SQLite) 사용
+        with stage_timer("sql"):
+            results = storage.execute(generated_sql, params)
+    return _format_and_cache(results, generated_sql, used_config, params, version, rows_cached)
+
+
+async def execute_sql_query_async(generated_sql: str, used_config: dict, params=None) -> str:
+    # 캐시 버전 확인(DB 조회)과 LLM 결과 변환은 이벤트 루프 밖에서 실행
+    version, formatted, results = await run_in_stage(
+        "db", _lookup_cached, generated_sql, used_config, params
+    )
+    if formatted is not None:
+        return formatted
+    rows_cached = results is not None
+    if not rows_cached:
+        with stage_timer("sql"):
+            results = await storage.execute_async(generated_sql, params)
+    formatted = await format_query_results_async(results, generated_sql, used_config)
+    _store_cached(results, generated_sql, used_config, params, version, rows_cached, formatted)
+    return formatted
+
+
 def generate_sql_query(prompt, config) -> str:
     system_prompt = BASE_PROMPT.format(
         schema=DB_SCHEMA,
@@ -110,7 +205,7 @@ def generate_sql_query(prompt, config) -> str:
         expiry_year=config["expiry_year"],
     )
 
-    response = client.chat.completions.create(
+    response = get_openai_client().chat.completions.create(
         model="gpt-4-0125-preview",
         messages=[
             {"role": "system", "content": system_prompt},
@@ -0,0 +1,148 @@
+"""
+사전 로드 후 fork 하는 다중 워커 서버 (Linux/macOS)
+
+마스터 프로세스가 앱을 import 하고 모든 약관 컬렉션(FAISS 인덱스, 청크 메타데이터)과
+캐시(의도 분류 모델, 매처, 보험료 큐브)를 미리 로드한 뒤 워커를 fork 한다.
+읽기 전용 FAISS 버퍼와 청크 저장소는 copy-on-write로 모든 워커가 공유한다.
+fork 전에 gc.freeze()로 로드된 객체를 영구 세대로 옮겨 워커의 GC가 공유 페이지를
+건드리지 않게 하고, DB 커넥션/스레드 풀처럼 fork 후 공유하면 안 되는 자원은 닫는다.
+
+실행: backend 디렉토리에서 python -m api.serve --workers 4
+"""
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+
+import uvicorn
+
+from .config import Config
+from .main import app, preload_client_modules, rag
+from .rag.src.config import PROFILING_CONFIG
+from .rag.src.db import db
+from .rag.src.executors import get_stage_executors
+from .rag.src import log as log_module
+from .rag.src.intent import load_intent_model
+from .rag.src.matcher import match_question
+from .rag.src.premium_cube import premium_cube
+from .rag.src.profiler import get_profiler
+from .rag.src.storage import storage
+
+
+def warm_up() -> dict:
+    """모든 컬렉션과 캐시를 마스터 프로세스에서 미리 로드"""
+    started_at = time.perf_counter()
+    collection_names = sorted(
+        name
+        for name in os.listdir(rag.base_path)
+        if os.path.isdir(os.path.join(rag.base_path, name))
+    )
+    loaded = [name for name in collection_names if rag.load_collection(name)]
+
+    # LLM/임베딩 클라이언트 모듈은 마스터에서 import (워커 재시작 시 lifespan은 클라이언트 생성만 함)
+    preload_client_modules()
+    load_intent_model()
+    match_question("삼성화재 암보험 비교")
+    if premium_cube.enabled:
+        # 백그라운드 생성 스레드는 fork 후 자식에 없으므로 마스터에서 기다려 생성
+        premium_cube.preload()
+    if PROFILING_CONFIG["admin_token"]:
+        # 프로파일링 예약 횟수(공유 메모리)를 워커 모두가 함께 쓰도록 fork 전에 생성
+        get_profiler()
+
+    # fork 후 공유하면 안 되는 자원 정리 (워커에서 필요할 때 다시 만듦)
+    db.close()
+    storage.close()
+    get_stage_executors().shutdown()
+
+    return {
+        "collections": loaded,
+        "seconds": round(time.perf_counter() - started_at, 2),
+    }
+
+
+def _bind_socket(host: str, port: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _run_worker(sock: socket.socket) -> None:
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    gc.enable()
+    config = uvicorn.Config(app, log_level=Config.LOG_LEVEL.lower())
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def _spawn(sock: socket.socket) -> int:
+    pid = os.fork()
+    if pid == 0:
+        try:
+            _run_worker(sock)
+        finally:
+            os._exit(0)
+    return pid
+
+
+def serve(workers: int, host: str, port: int) -> None:
+    if not hasattr(os, "fork"):
+        raise SystemExit("사전 로드 서버는 fork를 지원하는 OS에서만 사용할 수 있습니다.")
+
+    # fork 후 워커에서는 로그 리스너를 다시 시작함 (log._after_fork_in_child)
+    log_module.configure()
+    # 로드 중 생긴 객체가 GC 세대를 옮겨 다니며 페이지를 더럽히지 않도록 로드 전부터 GC 중지
+    gc.disable()
+    result = warm_up()
+    print(f"사전 로드 완료: 컬렉션 {len(result['collections'])}개, {result['seconds']}초")
+
+    sock = _bind_socket(host, port)
+    gc.freeze()
+
+    children = {_spawn(sock) for _ in range(workers)}
+    print(f"워커 {workers}개 시작 (마스터 PID {os.getpid()}, http://{host}:{port})")
+
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        children.discard(pid)
+        if not stopping:
+            # 비정상 종료된 워커는 로드된 상태의 마스터에서 다시 fork
+            print(f"워커 {pid} 종료 (상태 {status}), 다시 시작합니다.")
+            children.add(_spawn(sock))
+
+    sock.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="사전 로드 후 fork 하는 다중 워커 서버")
+    parser.add_argument("--workers", type=int, default=Config.WORKERS)
+    parser.add_argument("--host", default=Config.HOST)
+    parser.add_argument("--port", type=int, default=Config.PORT)
+    args = parser.parse_args()
+    serve(args.workers, args.host, args.port)
+    sys.exit(0)
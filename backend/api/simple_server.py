@@ -2,34 +2,27 @@ import os
 from typing import Dict, Any, List, Optional
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
 from pydantic import BaseModel, Field
 import uvicorn
 from datetime import datetime
 
 # Import our encoding helpers
-from .encoders import utf8_json_response, ensure_utf8_encoding
+from .encoders import UTF8JSONResponse, utf8_json_response, ensure_utf8_encoding
+from .middleware import CompressionMiddleware, UTF8CharsetMiddleware
 
 # Initialize FastAPI
 app = FastAPI(
     title="Simple Korean Text API", 
     description="API for testing Korean character encoding", 
     version="1.0.0",
-    default_response_class=JSONResponse
+    default_response_class=UTF8JSONResponse
 )
 
-# Add UTF-8 encoding middleware
-@app.middleware("http")
-async def add_utf8_charset_header(request: Request, call_next):
-    """Add UTF-8 charset header to all responses"""
-    response = await call_next(request)
-    content_type = response.headers.get("content-type", "")
-    
-    # Add charset=utf-8 to JSON responses
-    if "application/json" in content_type and "charset" not in content_type:
-        response.headers["content-type"] = "application/json; charset=utf-8"
-    
-    return response
+# Add UTF-8 charset header to JSON responses (pure ASGI, no response buffering)
+app.add_middleware(UTF8CharsetMiddleware)
+
+# Compress large responses (gzip, or brotli if installed)
+app.add_middleware(CompressionMiddleware)
 
 # Add CORS middleware
 app.add_middleware(
@@ -0,0 +1,151 @@
+"""
+요청 수락 제어 테스트 (rag/src/admission.py)
+
+대기열이 가득 차면 429, 대기 시간 예산을 넘기면 503을 Retry-After 값과 함께 돌려주는지,
+거절/취소 후에도 슬롯이 새지 않는지 확인한다.
+
+실행: backend 디렉토리에서 python -m pytest -q api/test_admission.py
+"""
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from api.rag.src.admission import AdmissionController, AdmissionLimiter, AdmissionRejected
+
+
+def _limiter(**overrides) -> AdmissionLimiter:
+    settings = dict(max_in_flight=1, max_queue=1, queue_timeout=5.0, retry_after=3)
+    settings.update(overrides)
+    return AdmissionLimiter("compare", **settings)
+
+
+def _controller(**overrides) -> AdmissionController:
+    settings = dict(max_in_flight=1, max_queue=0, queue_timeout=0.05, retry_after=2)
+    settings.update(overrides)
+    return AdmissionController({
+        "enabled": True,
+        "classes": {name: dict(settings) for name in ("intent", "compare", "terms")},
+    })
+
+
+def test_queue_full_rejects_with_429():
+    async def scenario():
+        limiter = _limiter()
+        await limiter.acquire()
+        waiter = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+        with pytest.raises(AdmissionRejected) as rejected:
+            await limiter.acquire()
+        limiter.release()
+        await waiter
+        limiter.release()
+        return limiter, rejected.value
+
+    limiter, error = asyncio.run(scenario())
+    assert (error.status_code, error.retry_after, error.request_class) == (429, 3, "compare")
+    assert limiter.in_flight == 0
+    assert limiter.stats()["rejected_queue_full"] == 1
+    assert limiter.stats()["admitted"] == 2
+
+
+def test_queue_timeout_rejects_with_503():
+    async def scenario():
+        limiter = _limiter(queue_timeout=0.02)
+        await limiter.acquire()
+        with pytest.raises(AdmissionRejected) as rejected:
+            await limiter.acquire()
+        limiter.release()
+        return limiter, rejected.value
+
+    limiter, error = asyncio.run(scenario())
+    assert (error.status_code, error.retry_after) == (503, 3)
+    assert limiter.in_flight == 0
+    assert limiter.queue_depth == 0
+    assert limiter.stats()["rejected_queue_timeout"] == 1
+
+
+def test_release_hands_slot_to_waiter_in_order():
+    async def scenario():
+        limiter = _limiter(max_queue=2)
+        order = []
+        await limiter.acquire()
+
+        async def request(name):
+            await limiter.acquire()
+            order.append(name)
+
+        tasks = [asyncio.ensure_future(request(name)) for name in ("first", "second")]
+        await asyncio.sleep(0)
+        limiter.release()
+        await tasks[0]
+        limiter.release()
+        await tasks[1]
+        limiter.release()
+        return limiter, order
+
+    limiter, order = asyncio.run(scenario())
+    assert order == ["first", "second"]
+    assert limiter.in_flight == 0
+
+
+def test_cancelled_waiter_does_not_leak_slot():
+    async def scenario():
+        limiter = _limiter()
+        await limiter.acquire()
+        waiter = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        limiter.release()
+        return limiter
+
+    limiter = asyncio.run(scenario())
+    assert limiter.in_flight == 0
+    assert limiter.queue_depth == 0
+
+
+def test_check_rejects_only_when_all_classes_saturated():
+    async def scenario():
+        admission = _controller()
+        admission.check("compare", "terms")
+        async with admission.admit("compare"):
+            # 약관 쪽은 아직 받을 수 있음
+            admission.check("compare", "terms")
+            async with admission.admit("terms"):
+                with pytest.raises(AdmissionRejected) as rejected:
+                    admission.check("compare", "terms")
+        return admission, rejected.value
+
+    admission, error = asyncio.run(scenario())
+    assert (error.status_code, error.retry_after, error.request_class) == (429, 2, "compare/terms")
+    for name in ("compare", "terms"):
+        stats = admission.stats()["classes"][name]
+        assert stats["rejected_precheck"] == 1
+        assert stats["in_flight"] == 0
+
+
+def test_reserve_and_release_once():
+    admission = _controller()
+    reserved = admission.reserve("terms")
+    assert reserved is not None
+    assert admission.reserve("terms") is None
+    reserved.release()
+    reserved.release()
+    assert admission.limiters["terms"].in_flight == 0
+
+
+def test_disabled_admits_everything():
+    async def scenario():
+        admission = AdmissionController({"enabled": False, "classes": {"compare": {
+            "max_in_flight": 0, "max_queue": 0, "queue_timeout": 0.0,
+        }}})
+        admission.check("compare")
+        async with admission.admit("compare"):
+            pass
+        return admission.reserve("compare")
+
+    assert asyncio.run(scenario()) is not None
@@ -0,0 +1,128 @@
+"""
+컬렉션 레지스트리/임베딩 캐시 테스트 (rag/src/collection_registry.py)
+
+여러 스레드가 같은 컬렉션을 동시에 찾을 때 loader가 한 번만 실행되는지(single-flight) 확인한다.
+
+실행: backend 디렉토리에서 python -m pytest -q api/test_collection_registry.py
+"""
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from api.rag.src.collection_registry import CollectionRegistry, EmbeddingCache
+
+THREADS = 8
+
+
+class BlockingLoader:
+    """release()를 호출할 때까지 끝나지 않는 loader"""
+
+    def __init__(self, error: Exception = None):
+        self.error = error
+        self.calls = 0
+        self._release = threading.Event()
+
+    def __call__(self, name: str) -> dict:
+        self.calls += 1
+        self._release.wait(5)
+        if self.error is not None:
+            raise self.error
+        return {"name": name}
+
+    def release(self) -> None:
+        self._release.set()
+
+
+def _wait_for(condition, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "시간 초과"
+        time.sleep(0.001)
+
+
+def _load_concurrently(registry: CollectionRegistry, loader: BlockingLoader) -> list:
+    def call():
+        try:
+            return registry.get_or_load("samsung", loader)
+        except Exception as e:
+            return e
+
+    with ThreadPoolExecutor(THREADS) as pool:
+        futures = [pool.submit(call) for _ in range(THREADS)]
+        # 나머지 스레드가 모두 같은 Future를 기다릴 때까지 로드를 끝내지 않음
+        _wait_for(lambda: registry.stats()["shared_waits"] == THREADS - 1)
+        loader.release()
+        return [future.result(5) for future in futures]
+
+
+def test_single_flight_load():
+    registry = CollectionRegistry()
+    loader = BlockingLoader()
+    results = _load_concurrently(registry, loader)
+
+    assert loader.calls == 1
+    assert all(result is results[0] for result in results)
+    assert registry.get("samsung") is results[0]
+    assert registry.stats() == {
+        "loaded": 1, "loading": 0, "loads": 1, "shared_waits": THREADS - 1, "failures": 0,
+    }
+    # 이미 로드된 컬렉션은 loader를 부르지 않음
+    assert registry.get_or_load("samsung", loader) is results[0]
+    assert loader.calls == 1
+
+
+def test_failed_load_is_shared_and_retried():
+    registry = CollectionRegistry()
+    loader = BlockingLoader(error=FileNotFoundError("index.faiss"))
+    results = _load_concurrently(registry, loader)
+
+    assert loader.calls == 1
+    assert all(isinstance(result, FileNotFoundError) for result in results)
+    assert "samsung" not in registry
+    assert registry.stats()["failures"] == 1
+
+    # 실패한 로드는 등록되지 않으므로 다음 요청이 다시 시도
+    assert registry.get_or_load("samsung", lambda name: {"name": name}) == {"name": "samsung"}
+
+
+def test_snapshot_is_not_affected_by_later_loads():
+    registry = CollectionRegistry()
+    registry.get_or_load("a", lambda name: {"name": name})
+    snapshot = registry.snapshot()
+    registry.get_or_load("b", lambda name: {"name": name})
+    assert [collection["name"] for collection in snapshot] == ["a"]
+    assert len(registry) == 2
+
+
+def test_embedding_cache_returns_copies():
+    cache = EmbeddingCache(max_entries=2)
+    vector = np.ones(4, dtype=np.float32)
+    cache.put("q1", vector)
+    vector[:] = 0
+    cached = cache.get("q1")
+    cached[:] = 2
+    assert cache.get("q1").tolist() == [1.0] * 4
+
+
+def test_embedding_cache_lru():
+    cache = EmbeddingCache(max_entries=2)
+    for text in ("q1", "q2"):
+        cache.put(text, np.zeros(2))
+    cache.get("q1")
+    cache.put("q3", np.zeros(2))
+    assert "q1" in cache and "q3" in cache and "q2" not in cache
+    assert cache.stats()["hits"] == 1
+
+
+@pytest.mark.parametrize("max_entries", [1, 3])
+def test_embedding_cache_size_limit(max_entries):
+    cache = EmbeddingCache(max_entries=max_entries)
+    for index in range(5):
+        cache.put(f"q{index}", np.zeros(2))
+    assert len(cache) == max_entries
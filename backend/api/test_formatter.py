@@ -0,0 +1,79 @@
+"""
+비교설계 결과 포맷터 테스트 (rag/src/formatter.py)
+
+LLM 변환에 쓰던 EXAMPLE_PROMPT의 입력/출력 예시를 그대로 읽어 로컬 포맷터 결과와 비교한다.
+
+실행: backend 디렉토리에서 python -m pytest -q api/test_formatter.py
+"""
+import json
+import os
+import sys
+from decimal import Decimal
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from api.rag.src.formatter import format_compare_json, format_compare_rows
+from api.rag.src.prompts import EXAMPLE_PROMPT
+
+SETTINGS = {
+    "custom_name": "홍길동", "insu_age": 45, "sex": 1,
+    "product_type": "nr", "expiry_year": "20y_100", "company_id": None,
+}
+
+
+def _examples() -> list:
+    """EXAMPLE_PROMPT의 (입력 데이터, 출력 형식) JSON 쌍"""
+    decoder = json.JSONDecoder()
+    examples = []
+    for block in EXAMPLE_PROMPT.split("입력 데이터:")[1:]:
+        source, output = block.split("출력 형식:", 1)
+        examples.append((
+            decoder.raw_decode(source.strip())[0],
+            decoder.raw_decode(output.strip())[0],
+        ))
+    return examples
+
+
+@pytest.mark.parametrize("source,expected", _examples())
+def test_matches_example_prompt(source, expected):
+    formatted = format_compare_json(source["결과"], source["설정값"])
+    assert json.loads(formatted) == expected
+
+
+def test_example_prompt_has_both_shapes():
+    assert len(_examples()) == 2
+
+
+def test_template_detailed_rows():
+    """sql_builder 상세 형태 결과 (구분/sort_id 컬럼, DECIMAL 보험료)"""
+    rows = [
+        {"구분": "합계", "보험사명": "삼성화재", "상품명": None, "보장항목명": None,
+         "보험료": Decimal("30000"), "sort_id": "0"},
+        {"구분": "상세", "보험사명": "삼성화재", "상품명": "건강", "보장항목명": "암진단비",
+         "보험료": Decimal("10000"), "sort_id": "c1"},
+        {"구분": "상세", "보험사명": "삼성화재", "상품명": "건강", "보장항목명": "뇌졸중진단비",
+         "보험료": Decimal("20000.50"), "sort_id": "c2"},
+    ]
+    formatted = format_compare_rows(rows, SETTINGS)
+    assert formatted["보험사"] == [{
+        "이름": "삼성화재",
+        "보험료합계": 30000,
+        "상품": [{"상품명": "건강", "보장항목": {"암진단비": 10000, "뇌졸중진단비": 20000.5}}],
+    }]
+
+
+def test_template_totals_rows():
+    rows = [{"보험사명": "현대해상", "상품명": "건강", "보험료합계": 191875.0}]
+    formatted = format_compare_rows(rows, dict(SETTINGS, sex=2, product_type="r"))
+    assert formatted["설정값"]["성별"] == "여자"
+    assert formatted["설정값"]["상품유형"] == "해지환급형"
+    assert formatted["보험사"] == [{"이름": "현대해상", "상품명": "건강", "보험료합계": 191875}]
+
+
+@pytest.mark.parametrize("rows", [
+    [{"보험사명": "현대해상", "평균보험료": 1000}],
+    [{"보장항목명": "암진단비", "보험료": 1000}],
+])
+def test_unknown_rows_fall_back_to_llm(rows):
+    assert format_compare_json(rows, SETTINGS) is None
@@ -0,0 +1,67 @@
+"""
+로컬 의도 분류기 테스트 (rag/src/intent.py, 외부 API/DB 없이 실행)
+
+실행: backend 디렉토리에서 python -m pytest -q api/test_intent.py
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from api.rag.src import intent
+from api.rag.src.intent import (
+    COMPARE_INTENT,
+    OTHER_INTENT,
+    NaiveBayesIntentModel,
+    classify_intent_locally,
+)
+
+
+@pytest.fixture
+def rules_only(monkeypatch):
+    """학습 모델 없이 규칙만 사용"""
+    monkeypatch.setattr(intent, "_model", None)
+    monkeypatch.setattr(intent, "_model_loaded", True)
+    monkeypatch.setitem(intent.INTENT_CONFIG, "enabled", True)
+
+
+def test_premium_question_with_slots_is_compare(rules_only):
+    label, confidence = classify_intent_locally("40세 남자 암보험 20년만기 보험료 얼마야")
+    assert label == COMPARE_INTENT
+    assert confidence >= intent.INTENT_CONFIG["rule_only_threshold"]
+
+
+def test_non_db_company_terms_question_is_other(rules_only):
+    label, _ = classify_intent_locally("삼성생명 종신보험 약관 설명해줘")
+    assert label == OTHER_INTENT
+
+
+@pytest.mark.parametrize("question", ["보험료 알려줘", "암 진단비 지급사유가 뭐야"])
+def test_single_keyword_falls_back_to_llm(rules_only, question):
+    """키워드 하나만 맞은 질문은 규칙만으로 확정하지 않음"""
+    label, _ = classify_intent_locally(question)
+    assert label is None
+
+
+def test_disabled_always_falls_back(rules_only, monkeypatch):
+    monkeypatch.setitem(intent.INTENT_CONFIG, "enabled", False)
+    assert classify_intent_locally("40세 남자 암보험 20년만기 보험료 얼마야") == (None, 0.0)
+
+
+def test_small_model_disagreeing_with_rules_falls_back(rules_only, monkeypatch):
+    """샘플이 부족한 모델은 규칙과 방향이 다르면 LLM으로 넘김"""
+    question = "40세 남자 암보험 20년만기 보험료 얼마야"
+    model = NaiveBayesIntentModel.train([(question, OTHER_INTENT)] * 5 + [("약관 설명", COMPARE_INTENT)])
+    assert model.log_odds(question) < 0 < intent.rule_log_odds(question)
+    monkeypatch.setattr(intent, "_model", model)
+    label, _ = classify_intent_locally(question)
+    assert label is None
+
+
+def test_model_round_trip():
+    samples = [("40세 남자 보험료", COMPARE_INTENT), ("면책 기간이 뭐야", OTHER_INTENT)]
+    model = NaiveBayesIntentModel.train(samples)
+    restored = NaiveBayesIntentModel.from_dict(model.to_dict())
+    assert restored.samples == 2
+    assert restored.log_odds("50세 여자 보험료") == pytest.approx(model.log_odds("50세 여자 보험료"))
@@ -0,0 +1,83 @@
+"""
+보험사/키워드 매처 테스트 (rag/src/matcher.py)
+
+Aho-Corasick 매처 결과가 키워드마다 `in`으로 훑던 이전 방식과 같은지 확인한다.
+
+실행: backend 디렉토리에서 python -m pytest -q api/test_matcher.py
+"""
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from api.rag.src.matcher import (
+    AhoCorasick,
+    COMPANY,
+    COMPARISON,
+    INSURANCE_TYPE,
+    _build_patterns,
+    match_question,
+    normalize_text,
+    select_collections,
+)
+
+PATTERNS = _build_patterns()
+
+QUESTIONS = [
+    "삼성화재 암보험 비교해줘",
+    "DB손해보험이랑 현대해상 중에 어디가 더 싸?",
+    "메리츠 화재 뇌졸중 진단비 약관 알려줘",
+    "40세 남자 건강보험 20년 만기 보험료",
+    "kb손보 어린이보험 보장 범위",
+    "면책 기간이 뭐야?",
+    "",
+]
+
+
+def substring_scan(question: str) -> dict:
+    """이전 방식: 키워드마다 정규화된 질문에 포함되는지 확인"""
+    normalized = normalize_text(question)
+    found = {COMPANY: set(), INSURANCE_TYPE: set(), COMPARISON: set()}
+    for pattern, kind, value in PATTERNS:
+        if pattern and pattern in normalized:
+            found[kind].add(value)
+    return found
+
+
+def _random_questions(count: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    fillers = ["", " ", "의 ", "랑 ", "보험료 ", "어디가 ", "약관 "]
+    words = [pattern for pattern, _, _ in PATTERNS] + ["보험", "화재", "생명", "손해"]
+    return [
+        "".join(rng.choice(words) + rng.choice(fillers) for _ in range(rng.randint(1, 6)))
+        for _ in range(count)
+    ]
+
+
+@pytest.mark.parametrize("question", QUESTIONS + _random_questions(300))
+def test_matches_substring_scan(question):
+    match = match_question(question)
+    expected = substring_scan(question)
+    assert set(match.companies) == expected[COMPANY]
+    assert set(match.insurance_types) == expected[INSURANCE_TYPE]
+    assert set(match.comparison_keywords) == expected[COMPARISON]
+    # 값마다 한 번만
+    assert len(match.companies) == len(set(match.companies))
+
+
+def test_overlapping_patterns():
+    automaton = AhoCorasick([(word, "word", word) for word in ("he", "she", "his", "hers")])
+    found = [value for _, value, _ in automaton.iter_matches("ushers")]
+    assert sorted(found) == ["he", "hers", "she"]
+
+
+def test_select_collections():
+    available = ["Samsung_YakMu2404103NapHae20250113", "DBSonBo_YakMu20250123", "other_docs"]
+    # 단일 보험사 -> 그 보험사 컬렉션만
+    assert select_collections(match_question("삼성화재 면책 기간"), available) == available[:1]
+    # '암' 질문/비교 요청 -> 보험사 컬렉션 전체
+    assert select_collections(match_question("삼성화재 암 진단비"), available) == available[:2]
+    # 보험사 언급 없음 -> 모든 컬렉션
+    assert select_collections(match_question("면책 기간이 뭐야"), available) == available
@@ -0,0 +1,103 @@
+"""
+비교설계 결과 캐시 테스트 (rag/src/result_cache.py)
+
+저장소의 데이터 버전 스탬프를 바꿔 가며 버전 고정(조회/저장에 쿼리 전 버전 사용)을 확인한다.
+
+실행: backend 디렉토리에서 python -m pytest -q api/test_result_cache.py
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from api.rag.src import result_cache as result_cache_module
+from api.rag.src.result_cache import ResultCache
+
+SQL = "SELECT *\n  FROM comparison WHERE insu_age = ?;"
+PARAMS = (40, 1, "nr", "20y")
+ROWS = [{"보험사명": "삼성화재", "보험료합계": 1000}]
+
+
+class FakeVersion:
+    def __init__(self, version="v1"):
+        self.version = version
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.version
+
+
+@pytest.fixture
+def data_version(monkeypatch):
+    fake = FakeVersion()
+    monkeypatch.setattr(result_cache_module.storage, "data_version", fake)
+    return fake
+
+
+@pytest.fixture
+def cache(data_version):
+    return ResultCache(max_entries=2, version_check_seconds=0)
+
+
+def test_hit_with_same_version(cache):
+    version = cache.current_version()
+    assert cache.get_rows(version, SQL, PARAMS) is None
+    cache.put_rows(version, SQL, PARAMS, ROWS)
+    # 공백/세미콜론만 다른 SQL은 같은 키
+    assert cache.get_rows(cache.current_version(), "SELECT * FROM comparison WHERE insu_age = ?", PARAMS) == ROWS
+    assert cache.get_rows(version, SQL, (41, 1, "nr", "20y")) is None
+
+
+def test_version_change_invalidates(cache, data_version):
+    version = cache.current_version()
+    cache.put_rows(version, SQL, PARAMS, ROWS)
+    data_version.version = "v2"
+    new_version = cache.current_version()
+    assert new_version == "v2"
+    assert cache.get_rows(new_version, SQL, PARAMS) is None
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_result_from_old_version_is_not_stored(cache, data_version):
+    """쿼리 도중 적재가 끝나 버전이 바뀌면 이전 버전으로 만든 결과는 저장하지 않음"""
+    version = cache.current_version()
+    data_version.version = "v2"
+    cache.current_version()
+    cache.put_rows(version, SQL, PARAMS, ROWS)
+    assert cache.get_rows(cache.current_version(), SQL, PARAMS) is None
+    # 이전 버전으로는 조회도 하지 않음
+    assert cache.get_rows(version, SQL, PARAMS) is None
+
+
+def test_unknown_version_disables_cache(cache, data_version):
+    data_version.version = None
+    version = cache.current_version()
+    assert version is None
+    cache.put_rows(version, SQL, PARAMS, ROWS)
+    assert cache.get_rows(version, SQL, PARAMS) is None
+    assert cache.stats()["active"] is False
+
+
+def test_version_check_interval(data_version):
+    cache = ResultCache(version_check_seconds=3600)
+    cache.current_version()
+    cache.current_version()
+    assert data_version.calls == 1
+
+
+def test_formatted_key_includes_config(cache):
+    version = cache.current_version()
+    cache.put_formatted(version, SQL, PARAMS, {"custom_name": "홍길동"}, "{}")
+    assert cache.get_formatted(version, SQL, PARAMS, {"custom_name": "홍길동"}) == "{}"
+    assert cache.get_formatted(version, SQL, PARAMS, {"custom_name": "김철수"}) is None
+
+
+def test_lru_eviction(cache):
+    version = cache.current_version()
+    for age in (40, 41, 42):
+        cache.put_rows(version, SQL, (age,), [age])
+    assert cache.get_rows(version, SQL, (40,)) is None
+    assert cache.get_rows(version, SQL, (42,)) == [42]
+    assert cache.stats()["evictions"] == 1
@@ -0,0 +1,134 @@
+"""
+대화 세션 저장소 테스트 (rag/src/session_store.py)
+
+가짜 시계로 TTL 만료를, 작은 max_history로 이력 상한을 확인한다.
+memory/sqlite 저장소에 같은 시나리오를 실행한다 (redis는 서버가 필요해 제외).
+
+실행: backend 디렉토리에서 python -m pytest -q api/test_session_store.py
+"""
+import os
+import sys
+import types
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from api.rag.src import session_store as session_store_module
+from api.rag.src.config import SESSION_CONFIG
+from api.rag.src.session_store import MemorySessionStore, SQLiteSessionStore
+
+TTL_SECONDS = 60.0
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(
+        session_store_module, "time", types.SimpleNamespace(monotonic=clock, time=clock)
+    )
+    return clock
+
+
+def _config(**overrides) -> dict:
+    # 정리 스레드 없이 (cleanup_interval=0) 만료는 조회/evict_expired로 확인
+    config = dict(
+        SESSION_CONFIG, max_history=3, ttl_seconds=TTL_SECONDS, cleanup_interval=0,
+        max_sessions=100, max_content_chars=10,
+    )
+    config.update(overrides)
+    return config
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path, clock):
+    if request.param == "memory":
+        store = MemorySessionStore(_config())
+    else:
+        store = SQLiteSessionStore(_config(), path=str(tmp_path / "sessions.sqlite3"))
+    yield store
+    store.close()
+
+
+def _message(content: str, role: str = "user") -> dict:
+    return {"role": role, "content": content, "timestamp": "2024-01-01T00:00:00"}
+
+
+def _contents(history: list) -> list:
+    return [message["content"] for message in history]
+
+
+def test_history_is_capped(store):
+    for index in range(5):
+        history = store.append("s1", [_message(f"q{index}"), _message(f"a{index}", "assistant")])
+    assert _contents(history) == ["a3", "q4", "a4"]
+    assert _contents(store.get_history("s1")) == ["a3", "q4", "a4"]
+
+
+def test_seed_is_used_only_for_new_session(store):
+    seed = [_message(f"old{index}") for index in range(5)]
+    history = store.append("s1", [_message("q1")], seed=seed)
+    assert _contents(history) == ["old3", "old4", "q1"]
+    history = store.append("s1", [_message("q2")], seed=seed)
+    assert _contents(history) == ["old4", "q1", "q2"]
+
+
+def test_long_content_is_truncated(store):
+    history = store.append("s1", [_message("가" * 50)])
+    assert history[0]["content"] == "가" * 10
+
+
+def test_expired_session_starts_over(store, clock):
+    store.append("s1", [_message("q1")])
+    clock.advance(TTL_SECONDS - 1)
+    assert _contents(store.get_history("s1")) == ["q1"]
+    # 대화할 때마다 만료 시각이 늘어남
+    store.append("s1", [_message("q2")])
+    clock.advance(TTL_SECONDS - 1)
+    assert _contents(store.get_history("s1")) == ["q1", "q2"]
+
+    clock.advance(2)
+    assert store.get_history("s1") == []
+    assert _contents(store.append("s1", [_message("q3")])) == ["q3"]
+
+
+def test_evict_expired(store, clock):
+    store.append("old", [_message("q1")])
+    clock.advance(TTL_SECONDS / 2)
+    store.append("new", [_message("q1")])
+    clock.advance(TTL_SECONDS / 2 + 1)
+
+    assert store.evict_expired() == 1
+    assert store.session_count() == 1
+    assert store.get_history("old") == []
+    assert _contents(store.get_history("new")) == ["q1"]
+
+
+def test_delete(store):
+    store.append("s1", [_message("q1")])
+    store.delete("s1")
+    assert store.get_history("s1") == []
+    assert store.session_count() == 0
+
+
+def test_memory_store_evicts_oldest_session_over_limit(clock):
+    store = MemorySessionStore(_config(max_sessions=2))
+    for session_id in ("s1", "s2"):
+        store.append(session_id, [_message("q")])
+        clock.advance(1)
+    # s1을 다시 사용해 가장 오래된 세션은 s2가 됨
+    store.append("s1", [_message("q")])
+    store.append("s3", [_message("q")])
+    assert store.get_history("s2") == []
+    assert store.session_count() == 2
+    assert store.stats()["evicted"] == 1
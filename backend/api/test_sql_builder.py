@@ -0,0 +1,128 @@
+"""
+비교설계 SQL 템플릿 테스트 (rag/src/sql_builder.py)
+
+작은 데이터로 만든 인메모리 SQLite(SQLITE_SCHEMA)에서 render_sql 결과를 실행해
+바인딩 파라미터 순서(특히 두 CTE에 같은 조건이 들어가는 상세 형태)를 확인한다.
+
+실행: backend 디렉토리에서 python -m pytest -q api/test_sql_builder.py
+"""
+import itertools
+import os
+import sqlite3
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from api.rag.src.schema import SQLITE_SCHEMA, SQLITE_PREMIUM_TOTALS_REBUILD
+from api.rag.src.sql_builder import (
+    DETAILED_SHAPE,
+    TOTALS_SHAPE,
+    CompareQuery,
+    build_compare_query,
+    render_sql,
+)
+
+COMPANIES = [("01", "삼성화재"), ("02", "Db손해보험"), ("03", "현대해상")]
+PRODUCTS = [("01", "p1", "삼성 건강"), ("01", "p2", "삼성 암"), ("02", "p1", "DB 건강"), ("03", "p1", "현대 건강")]
+COVERAGES = [("c1", "암진단비", 1), ("c2", "뇌졸중진단비", 0)]
+# 조회 대상 프로필 외 다른 나이/성별/상품유형/만기 행도 넣어 파라미터 순서가 틀리면 결과가 달라지게 함
+PROFILES = [(40, 1, "nr", "20y"), (40, 2, "nr", "20y"), (40, 1, "r", "20y"), (40, 1, "nr", "30y"), (20, 1, "nr", "20y")]
+CONFIG = {"insu_age": 40, "sex": 1, "product_type": "nr", "expiry_year": "20y"}
+
+
+def _amount(profile_index: int, product_index: int, coverage_index: int) -> int:
+    return 1000 * (profile_index + 1) + 100 * (product_index + 1) + 10 * (coverage_index + 1)
+
+
+@pytest.fixture(scope="module")
+def conn():
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = sqlite3.Row
+    conn.executescript(SQLITE_SCHEMA)
+    conn.executemany("INSERT INTO insu_company VALUES (?, ?, 1)", COMPANIES)
+    conn.executemany("INSERT INTO insu_product VALUES (?, ?, ?, 1)", PRODUCTS)
+    conn.executemany("INSERT INTO coverage VALUES (?, ?, 0, ?)", COVERAGES)
+    rows = []
+    for (p, profile), (q, product), (v, coverage) in itertools.product(
+        enumerate(PROFILES), enumerate(PRODUCTS), enumerate(COVERAGES)
+    ):
+        rows.append(("t", *profile, product[0], product[1], coverage[0], _amount(p, q, v)))
+    conn.executemany("INSERT INTO comparison VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+    conn.execute(SQLITE_PREMIUM_TOTALS_REBUILD)
+    yield conn
+    conn.close()
+
+
+def _expected_details(companies: list, default_only: bool) -> list:
+    """조회 대상 프로필(PROFILES[0])의 (보험사, 상품, 보장항목, 보험료)"""
+    names = dict(COMPANIES)
+    details = []
+    for (q, (company_id, _, product_name)), (v, (_, coverage_name, is_default)) in itertools.product(
+        enumerate(PRODUCTS), enumerate(COVERAGES)
+    ):
+        if companies and names[company_id] not in companies:
+            continue
+        if default_only and not is_default:
+            continue
+        details.append((names[company_id], product_name, coverage_name, _amount(0, q, v)))
+    return sorted(details)
+
+
+def _run(conn, query: CompareQuery, use_aggregates: bool) -> list:
+    sql, params = render_sql(query, placeholder="?", use_aggregates=use_aggregates)
+    return [dict(row) for row in conn.execute(sql, params)]
+
+
+@pytest.mark.parametrize(
+    "shape,company_count,default_only,use_aggregates",
+    list(itertools.product((TOTALS_SHAPE, DETAILED_SHAPE), (0, 1, 2), (False, True), (False, True))),
+)
+def test_placeholder_count_matches_params(shape, company_count, default_only, use_aggregates):
+    companies = ("삼성화재", "DB손해보험")[:company_count]
+    query = CompareQuery(shape, 40, 1, "nr", "20y", companies, default_only)
+    sql, params = render_sql(query, placeholder="?", use_aggregates=use_aggregates)
+    assert sql.count("?") == len(params)
+
+
+@pytest.mark.parametrize("use_aggregates", [False, True])
+@pytest.mark.parametrize("default_only", [False, True])
+@pytest.mark.parametrize("companies", [(), ("삼성화재", "DB손해보험")])
+def test_detailed_shape(conn, use_aggregates, default_only, companies):
+    query = CompareQuery(DETAILED_SHAPE, 40, 1, "nr", "20y", companies, default_only)
+    rows = _run(conn, query, use_aggregates)
+    expected = _expected_details(["삼성화재", "Db손해보험"] if companies else [], default_only)
+
+    details = sorted(
+        (row["보험사명"], row["상품명"], row["보장항목명"], row["보험료"])
+        for row in rows if row["구분"] == "상세"
+    )
+    assert details == expected
+
+    totals = {row["보험사명"]: row["보험료"] for row in rows if row["구분"] == "합계"}
+    expected_totals = {}
+    for company, _, _, amount in expected:
+        expected_totals[company] = expected_totals.get(company, 0) + amount
+    assert totals == expected_totals
+
+
+@pytest.mark.parametrize("use_aggregates", [False, True])
+def test_totals_shape(conn, use_aggregates):
+    query = CompareQuery(TOTALS_SHAPE, 40, 1, "nr", "20y", ("DB손해보험",))
+    rows = _run(conn, query, use_aggregates)
+    assert rows == [{"보험사명": "Db손해보험", "상품명": "DB 건강", "보험료합계": _amount(0, 2, 0) + _amount(0, 2, 1)}]
+
+
+def test_build_compare_query():
+    query = build_compare_query("삼성화재랑 DB손보 기본플랜 보장항목별 비교", CONFIG)
+    assert query == CompareQuery(DETAILED_SHAPE, 40, 1, "nr", "20y", ("삼성화재", "DB손해보험"), True)
+    assert build_compare_query("40세 남자 보험료", CONFIG).shape == TOTALS_SHAPE
+
+
+@pytest.mark.parametrize("prompt,config", [
+    ("40세 남자 암진단비 보험료", CONFIG),
+    ("30세부터 40세까지 보험료", CONFIG),
+    ("40세 남자 보험료", dict(CONFIG, product_type=None)),
+])
+def test_outside_template_uses_llm(prompt, config):
+    assert build_compare_query(prompt, config) is None
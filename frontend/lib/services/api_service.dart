@@ -67,35 +67,30 @@ class ApiService {
     };
   }
 
-  // API 호출 함수 (채팅 이력 포함)
+  // /chat API 호출 (대화 이력은 서버가 세션 ID별로 보관하므로 새 메시지만 전송)
   Future<Map<String, dynamic>> searchQuery(String query, List<Message> chatHistory) async {
     try {
       final sessionId = await getSessionId();
-      
-      // 채팅 이력을 API 형식으로 변환
-      final formattedHistory = chatHistory.map((msg) => {
-        'role': msg.isUser ? 'user' : 'assistant',
-        'content': msg.text
-      }).toList();
-      
-      // API 요청 본문 구성
+
       final requestBody = {
-        'query_text': query,
-        'collections': <String>[],
         'session_id': sessionId,
-        'chat_history': formattedHistory
+        'message': query,
       };
-      
+
       // HTTP POST 요청
-      final url = getApiUrl('/api/search');
+      final url = getApiUrl('/chat');
       final response = await http.post(
         Uri.parse(url),
         headers: {'Content-Type': 'application/json'},
         body: jsonEncode(requestBody),
       );
-      
+
       if (response.statusCode == 200) {
-        final data = jsonDecode(utf8.decode(response.bodyBytes));
+        final data = jsonDecode(utf8.decode(response.bodyBytes)) as Map<String, dynamic>;
+        // 비교설계 답변은 JSON 객체/목록일 수 있으므로 문자열로 맞춤
+        final answer = data['answer'];
+        data['answer'] = answer is String ? answer : jsonEncode(answer);
+        data['collections_used'] ??= <String>[];
         return data;
       } else {
         return _standardErrorResponse('API 응답 오류: ${response.statusCode}');